@@ -0,0 +1,244 @@
+"""
+Micro-benchmark: single-pass JSON repair vs. the legacy multi-strategy recovery.
+
+Usage:
+    python bench_json_repair.py                       # synthetic report samples
+    python bench_json_repair.py --samples-dir DIR     # plus captured LLM outputs (*.txt / *.json)
+    python bench_json_repair.py --repeat 50
+
+For each sample it prints the mean parse time of both implementations, whether
+each produced a value, and the repairs the new parser reported.
+"""
+import argparse
+import json
+import os
+import re
+import time
+
+from src.services.json_repair import repair_json
+
+
+# ---------------------------------------------------------------------------
+# Legacy implementation (copied from ollama_llm_generator.py before the
+# single-pass parser replaced it) so the comparison stays reproducible.
+# ---------------------------------------------------------------------------
+
+def legacy_repair_json_response(text):
+    """Robust JSON repair for common LLM formatting issues"""
+    
+    # Step 1: Remove any non-JSON content before/after the JSON object
+    first_brace = text.find('{')
+    last_brace = text.rfind('}')
+    if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
+        text = text[first_brace:last_brace + 1]
+    
+    # Step 2: Remove control characters (except newlines and tabs for now)
+    text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]', '', text)
+    
+    # Step 3: Handle trailing commas - multiple passes
+    for _ in range(10):
+        text = re.sub(r',(\s*[\]\}])', r'\1', text)
+    
+    # Step 4: Handle missing commas between elements
+    text = re.sub(r'"\s*\n\s*"', '",\n"', text)
+    text = re.sub(r'(\}|\])\s*\n\s*(\{|\[|")', r'\1,\n\2', text)
+    text = re.sub(r'(\d+)\s*\n\s*"', r'\1,\n"', text)
+    text = re.sub(r'(true|false|null)\s*\n\s*"', r'\1,\n"', text)
+    
+    # Step 5: Handle truncated JSON
+    open_braces = text.count('{') - text.count('}')
+    open_brackets = text.count('[') - text.count(']')
+    
+    if open_braces > 0:
+        text = text.rstrip().rstrip(',') + '}' * open_braces
+    if open_brackets > 0:
+        text = text.rstrip().rstrip(',') + ']' * open_brackets
+    
+    # Step 6: Remove double commas
+    text = re.sub(r',\s*,', ',', text)
+    
+    return text
+
+def legacy_fix_unescaped_quotes_in_strings(text):
+    """Try to fix unescaped quotes within JSON string values"""
+    result = []
+    in_string = False
+    escape_next = False
+    
+    for i, char in enumerate(text):
+        if escape_next:
+            result.append(char)
+            escape_next = False
+            continue
+            
+        if char == '\\':
+            result.append(char)
+            escape_next = True
+            continue
+            
+        if char == '"':
+            if not in_string:
+                in_string = True
+                result.append(char)
+            else:
+                # Check if this quote ends the string or is embedded
+                # Look ahead to see if next non-whitespace is : , } ]
+                rest = text[i+1:].lstrip()
+                if rest and rest[0] in ':,}]':
+                    # This is a closing quote
+                    in_string = False
+                    result.append(char)
+                else:
+                    # This might be an embedded quote - escape it
+                    result.append('\\"')
+        else:
+            result.append(char)
+    
+    return ''.join(result)
+
+def legacy_try_parse_json_with_recovery(text):
+    """Try multiple strategies to parse JSON"""
+    strategies = []
+    
+    # Strategy 1: Direct parse
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        strategies.append(("direct", str(e)))
+    
+    # Strategy 2: Basic repair
+    try:
+        repaired = legacy_repair_json_response(text)
+        return json.loads(repaired)
+    except json.JSONDecodeError as e:
+        strategies.append(("basic_repair", str(e)))
+    
+    # Strategy 3: Fix unescaped quotes then repair
+    try:
+        fixed_quotes = legacy_fix_unescaped_quotes_in_strings(text)
+        repaired = legacy_repair_json_response(fixed_quotes)
+        return json.loads(repaired)
+    except json.JSONDecodeError as e:
+        strategies.append(("fix_quotes", str(e)))
+    
+    # Strategy 4: Remove all newlines within strings (collapse to single line)
+    try:
+        # Replace newlines that are inside strings with spaces
+        collapsed = re.sub(r'\n\s*', ' ', text)
+        collapsed = legacy_repair_json_response(collapsed)
+        return json.loads(collapsed)
+    except json.JSONDecodeError as e:
+        strategies.append(("collapse_newlines", str(e)))
+    
+    # Strategy 5: Binary search to find valid JSON prefix
+    try:
+        first_brace = text.find('{')
+        if first_brace != -1:
+            # Try progressively shorter substrings
+            for end_pos in range(len(text), first_brace + 100, -100):
+                try:
+                    substring = text[first_brace:end_pos]
+                    # Close any open structures
+                    open_braces = substring.count('{') - substring.count('}')
+                    open_brackets = substring.count('[') - substring.count(']')
+                    substring = substring.rstrip().rstrip(',')
+                    substring += ']' * max(0, open_brackets) + '}' * max(0, open_braces)
+                    result = json.loads(substring)
+                    if result:  # If we got something valid, return it
+                        return result
+                except:
+                    continue
+    except Exception as e:
+        strategies.append(("binary_search", str(e)))
+    
+    # Strategy 6: Try using ast.literal_eval as last resort for simpler structures
+    try:
+        import ast
+        # Replace JSON booleans/null with Python equivalents
+        py_text = text.replace('true', 'True').replace('false', 'False').replace('null', 'None')
+        result = ast.literal_eval(py_text)
+        # Convert back to JSON-compatible format
+        return json.loads(json.dumps(result))
+    except Exception as e:
+        strategies.append(("ast_eval", str(e)))
+    
+    # All strategies failed
+    error_msg = "; ".join([f"{s[0]}: {s[1][:50]}" for s in strategies])  # Truncate error messages
+    raise json.JSONDecodeError(f"All JSON recovery strategies failed: {error_msg}", text, 0)
+
+
+# ---------------------------------------------------------------------------
+# Samples
+# ---------------------------------------------------------------------------
+
+def _synthetic_report(tag_count: int = 25, items_per_tag: int = 4) -> dict:
+    """A report shaped like the LLM output for marketing_report_schema."""
+    tags = [{
+        "id": f"tag_{i}",
+        "content": [{
+            "source": "Ollama",
+            "title": f"tag_{i}",
+            "data": [f"Metric {i}.{j}: email open rate reached {30 + j}.{i}% across {1000 * (i + 1):,} sends" for j in range(items_per_tag)]
+        }]
+    } for i in range(tag_count)]
+    return {"pages": [{"page_number": 1, "tags": tags[:15]}, {"page_number": 2, "tags": tags[15:]}]}
+
+
+def synthetic_samples() -> dict:
+    text = json.dumps(_synthetic_report(), indent=2)
+    large = json.dumps(_synthetic_report(tag_count=120, items_per_tag=8), indent=2)
+    return {
+        "valid": text,
+        "fenced": "```json\n" + text + "\n```",
+        "trailing_commas": re.sub(r"(\])(\s*\})", r"\1,\2", text),
+        "missing_commas": text.replace('},\n', '}\n'),
+        "unescaped_quotes": text.replace("email open rate", 'the "email" open rate'),
+        "truncated": text[:int(len(text) * 0.7)],
+        "truncated_large": large[:int(len(large) * 0.9)],
+    }
+
+
+def captured_samples(directory: str) -> dict:
+    samples = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith((".txt", ".json")):
+            with open(os.path.join(directory, name), encoding="utf-8") as handle:
+                samples[name] = handle.read()
+    return samples
+
+
+def _time(func, text: str, repeat: int):
+    ok = True
+    start = time.perf_counter()
+    for _ in range(repeat):
+        try:
+            func(text)
+        except Exception:
+            ok = False
+            break
+    runs = repeat if ok else 1
+    return (time.perf_counter() - start) / runs * 1000, ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples-dir", help="directory of captured raw LLM outputs")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    samples = synthetic_samples()
+    if args.samples_dir:
+        samples.update(captured_samples(args.samples_dir))
+
+    print(f"{'sample':<28}{'chars':>9}{'legacy ms':>12}{'new ms':>10}{'speedup':>9}  legacy/new ok  repairs")
+    for name, text in samples.items():
+        legacy_ms, legacy_ok = _time(legacy_try_parse_json_with_recovery, text, args.repeat)
+        new_ms, new_ok = _time(repair_json, text, args.repeat)
+        repairs = repair_json(text).repairs if new_ok else []
+        speedup = legacy_ms / new_ms if new_ms else float("inf")
+        print(f"{name[:27]:<28}{len(text):>9}{legacy_ms:>12.3f}{new_ms:>10.3f}{speedup:>8.1f}x  "
+              f"{str(legacy_ok):>6}/{str(new_ok):<6}  {', '.join(repairs)}")
+
+
+if __name__ == "__main__":
+    main()
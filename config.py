@@ -1,8 +1,10 @@
 import os
-import time
 from dotenv import load_dotenv
 import google.generativeai as genai
 from google.api_core import exceptions as google_exceptions
+from src.services.llm_cache import get_llm_cache, is_cacheable_response, make_cache_key
+from src.services.llm_clients import gemini_generate_async
+from src.services.rate_limiter import estimate_tokens, get_rate_limiter
 
 
 # Load environment variables from .env file
@@ -18,26 +20,41 @@ genai.configure(api_key=GEMINI_API_KEY)
 class GeminiClient:
     # Retry configuration
     MAX_RETRIES = 3
-    INITIAL_DELAY = 60  # seconds to wait on rate limit
+    INITIAL_DELAY = 60  # seconds to pause the model on rate limit
     
     @staticmethod
-    def generate(model: str, prompt: str) -> str:
+    def generate(model: str, prompt: str, use_cache: bool = True) -> str:
         """
         Generates content from the Gemini model with retry logic for rate limits.
+        Identical (model, prompt) requests are served from the LLM response cache
+        unless use_cache is False. Calls are admitted by the model's shared rate
+        limiter, and a 429 pauses that limiter rather than just this caller.
         """
+        cache = get_llm_cache() if use_cache else None
+        cache_key = make_cache_key(model, prompt) if cache else None
+        if cache:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         model_instance = genai.GenerativeModel(model)
+        limiter = get_rate_limiter(model)
+        tokens = estimate_tokens(prompt)
         
         for attempt in range(GeminiClient.MAX_RETRIES):
             try:
-                response = model_instance.generate_content(prompt)
+                with limiter.limit_sync(tokens):
+                    response = model_instance.generate_content(prompt)
+                if cache and is_cacheable_response(response.text):
+                    cache.set(cache_key, response.text)
                 return response.text
                 
             except google_exceptions.ResourceExhausted as e:
                 # Rate limit error (429)
                 if attempt < GeminiClient.MAX_RETRIES - 1:
                     delay = GeminiClient.INITIAL_DELAY * (2 ** attempt)  # Exponential backoff
-                    print(f"[Gemini] Rate limit hit. Waiting {delay} seconds before retry {attempt + 2}/{GeminiClient.MAX_RETRIES}...")
-                    time.sleep(delay)
+                    print(f"[Gemini] Rate limit hit. Pausing {model} for {delay} seconds before retry {attempt + 2}/{GeminiClient.MAX_RETRIES}...")
+                    limiter.penalize(delay)
                 else:
                     print(f"[Gemini] Rate limit exceeded after {GeminiClient.MAX_RETRIES} retries")
                     raise
@@ -48,8 +65,8 @@ class GeminiClient:
                 if "429" in str(e) or "quota" in error_msg or "rate" in error_msg:
                     if attempt < GeminiClient.MAX_RETRIES - 1:
                         delay = GeminiClient.INITIAL_DELAY * (2 ** attempt)
-                        print(f"[Gemini] Rate limit detected. Waiting {delay} seconds before retry {attempt + 2}/{GeminiClient.MAX_RETRIES}...")
-                        time.sleep(delay)
+                        print(f"[Gemini] Rate limit detected. Pausing {model} for {delay} seconds before retry {attempt + 2}/{GeminiClient.MAX_RETRIES}...")
+                        limiter.penalize(delay)
                     else:
                         print(f"[Gemini] Rate limit exceeded after {GeminiClient.MAX_RETRIES} retries")
                         raise
@@ -60,5 +77,10 @@ class GeminiClient:
         # Should not reach here, but just in case
         raise Exception("Failed to generate content after retries")
 
+    @staticmethod
+    async def generate_async(model: str, prompt: str, use_cache: bool = True) -> str:
+        """Async counterpart of generate() that uses the shared httpx connection pool."""
+        return await gemini_generate_async(model, prompt, use_cache=use_cache)
+
 # Create global reusable instance
 client = GeminiClient()
\ No newline at end of file
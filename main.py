@@ -1,55 +1,111 @@
-from typing import Dict, Any, Union, List
-from fastapi import FastAPI, HTTPException, Body
-from src.services.retrievers import get_mock_data
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Union, List, Optional
+from fastapi import FastAPI, HTTPException, Body, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from src.services.parallel_report_generator import ParallelReportGenerator
 from src.models.report_schema import get_report_schema
 from src.file_operations.load_email_marketing_data import SupportingDataLoader
 from src.services.email_service import EmailService
+from src.services.llm_clients import close_clients
+from src.database.db_connection import dispose_engine, pool_metrics
+from src.services.report_streaming import FlatReportBuilder
+from src.services.job_queue import JOB_PARSE_WORKERS, Job, get_job_queue, shutdown_job_queue
+from src.services.query_runner import get_query_runner, shutdown_query_runner
+from src.services.context_builder import ReportPeriod, get_context_builder, shutdown_context_builder
 import asyncio
-import re
-import unicodedata
+import json
 import httpx
 import logging
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Report Generation API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Shut down in dependency order, so the DB pool is disposed last
+    await close_clients()  # shared LLM connection pool
+    # Background loads: queued jobs are cancelled, running ones get JOB_SHUTDOWN_TIMEOUT to finish
+    if not await asyncio.to_thread(shutdown_job_queue):
+        logger.warning("Disposing the DB pool while background jobs are still running")
+    shutdown_context_builder()  # report context threads
+    shutdown_query_runner()  # query threads
+    dispose_engine()  # pooled MySQL connections
+
+app = FastAPI(title="Report Generation API", lifespan=lifespan)
 
 @app.get("/")
 def root():
     return {"message": "✅ Report Generation API is running"}
 
+@app.get("/metrics/db_pool")
+def db_pool_metrics():
+    """MySQL connection pool usage for this worker process"""
+    return pool_metrics()
+
+@app.get("/metrics/query_cache")
+def query_cache_metrics():
+    """Report query cache size, hit/miss counts and data version for this worker process"""
+    return {**get_query_runner().stats(), "context": get_context_builder().stats()}
+
+def _resolve_report_request(context_data: Dict[str, Any]) -> tuple:
+    """Return (metadata, canonical report type, report structure) for a generation request"""
+    # Get metadata from context first to determine report type
+    metadata = {}
+    report_type = ""  # Extract report_type from metadata
+    if isinstance(context_data, dict):
+        # If metadata is directly in the context
+        if "metadata" in context_data:
+            metadata = context_data["metadata"]
+            report_type = str(metadata.get("reportType", ""))
+        # For backward compatibility - convert old filterValue structure
+        elif "filterValue" in context_data:
+            filter_data = context_data["filterValue"]
+            report_type = str(filter_data.get("reportType", ""))
+            metadata = {
+                "reportType": report_type,
+                "period": str(filter_data.get("period", "")),
+                "dateRange": {
+                    "startDate": "",
+                    "endDate": ""
+                },
+                "recordCount": 0
+            }
+
+    # Normalize report type to accept many input variants
+    from src.services.report_types import normalize_report_type
+    canonical_report_type = normalize_report_type(report_type)
+
+    # Load report structure based on canonical report type
+    structure = get_report_schema(canonical_report_type).dict()
+    return metadata, canonical_report_type, structure
+
+def _build_report_context(context_data: Dict[str, Any], metadata: Dict[str, Any],
+                          canonical_report_type: str, structure: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill in the request's data from the database when it only carries metadata"""
+    if not isinstance(context_data, dict) or context_data.get("data"):
+        return context_data
+    period = ReportPeriod.from_metadata(metadata)
+    if period is None:
+        return context_data
+    try:
+        built = get_context_builder().build(structure, period, canonical_report_type, metadata)
+    except Exception as e:
+        # An unreachable database should not fail the report; generate from what the request sent
+        logger.error(f"Could not build report context for {period.key} from the database, using the request's context: {e}")
+        return context_data
+    if not built["data"]:
+        logger.warning(f"No report data in the database for {period.key}, using the request's context")
+        return context_data
+    return {**context_data, **built}
+
 @app.post("/generate_report")
 async def generate_report_endpoint(context_data: Dict[str, Any] = Body(...)):
     try:
-        # Get metadata from context first to determine report type
-        metadata = {}
-        report_type = ""  # Extract report_type from metadata
-        if isinstance(context_data, dict):
-            # If metadata is directly in the context
-            if "metadata" in context_data:
-                metadata = context_data["metadata"]
-                report_type = str(metadata.get("reportType", ""))
-            # For backward compatibility - convert old filterValue structure
-            elif "filterValue" in context_data:
-                filter_data = context_data["filterValue"]
-                report_type = str(filter_data.get("reportType", ""))
-                metadata = {
-                    "reportType": report_type,
-                    "period": str(filter_data.get("period", "")),
-                    "dateRange": {
-                        "startDate": "",
-                        "endDate": ""
-                    },
-                    "recordCount": 0
-                }
-
-        # Normalize report type to accept many input variants
-        from src.services.report_types import normalize_report_type
-        canonical_report_type = normalize_report_type(report_type)
-
-        # Load report structure based on canonical report type
-        structure = get_report_schema(canonical_report_type).dict()
+        metadata, canonical_report_type, structure = _resolve_report_request(context_data)
+        context_data = await run_in_threadpool(
+            _build_report_context, context_data, metadata, canonical_report_type, structure
+        )
 
         # Initialize parallel report generator
         generator = ParallelReportGenerator()
@@ -57,13 +113,6 @@ async def generate_report_endpoint(context_data: Dict[str, Any] = Body(...)):
         # Generate reports using multiple LLMs
         reports = await generator.generate_reports(structure, context_data)
 
-        # Create a map of tag IDs to their proper titles from the report structure
-        title_map = {}
-        for page in structure.get("pages", []):
-            for tag in page.get("tags", []):
-                if tag.get("title") and tag.get("id"):
-                    title_map[tag["id"]] = tag["title"]
-
         # Handle different report types with specific logic
         if canonical_report_type == "retail-data":
             print(f"Processing retail data report (type: {canonical_report_type})")
@@ -81,84 +130,16 @@ async def generate_report_endpoint(context_data: Dict[str, Any] = Body(...)):
             print(f"Processing report with unknown type: '{canonical_report_type}' - using default logic")
             # Add default processing logic here
 
-        def _normalize_text(s) -> str:
-            if not s:
-                return ""
-            if isinstance(s, list):
-                # For lists, normalize each item and join with newlines
-                return "\n".join(_normalize_text(item) for item in s)
-            # Convert to string if not already
-            s = str(s)
-            s2 = unicodedata.normalize('NFKC', s)
-            s2 = s2.replace('\u00A0', ' ')
-            s2 = re.sub(r"\s+", ' ', s2)
-            return s2.strip().lower()
-
         # Create flat data structure organized by sources
-        flat_data = {}
+        builder = FlatReportBuilder(structure)
         for report in reports:
-            source = report["source"]
-            for page in report["report"]["pages"]:
-                for tag in page["tags"]:
-                    tag_id = str(tag["id"])
-                    title = title_map.get(tag_id, tag_id)
-                    
-                    if tag_id not in flat_data:
-                        flat_data[tag_id] = {
-                            "id": tag_id,
-                            "title": title,
-                            "sources": {}
-                        }
-                    
-                    if tag.get("content"):
-                        content = tag["content"]
-                        data = ""
-                        try:
-                            if isinstance(content, list) and len(content) > 0:
-                                item = content[0]
-                                if isinstance(item, dict):
-                                    data = item.get("data", "")
-                                elif isinstance(item, str):
-                                    try:
-                                        import json
-                                        parsed = json.loads(item)
-                                        if isinstance(parsed, dict):
-                                            data = parsed.get("data", "")
-                                        elif isinstance(parsed, list) and len(parsed) > 0 and isinstance(parsed[0], dict):
-                                            data = parsed[0].get("data", "")
-                                    except json.JSONDecodeError:
-                                        data = item
-                                else:
-                                    data = str(item)
-                            else:
-                                data = str(content)
-                        except Exception:
-                            data = ""
-                        
-                        # Normalize data for deduplication
-                        norm_data = _normalize_text(str(data))
-                        if source not in flat_data[tag_id]["sources"] or not _normalize_text(flat_data[tag_id]["sources"][source]):
-                            flat_data[tag_id]["sources"][source] = data
+            builder.add_report(report["source"], report["report"])
 
         # Transform flat_data into the final response format
         response = {
-            "items": [
-                {
-                    "id": item_data["id"],
-                    "title": item_data["title"],
-                    "content": [
-                        {
-                            "source": source,
-                            "data": data
-                        }
-                        for source, data in item_data["sources"].items()
-                        if data  # Only include non-empty data
-                    ]
-                }
-                for item_data in flat_data.values()
-                if any(data for data in item_data["sources"].values())  # Only include items with non-empty content
-            ],
-            "metadata": metadata
+            "items": builder.items(),
+            "metadata": metadata,
+            "timings": generator.timings
         }
         
         return response
@@ -166,10 +147,329 @@ async def generate_report_endpoint(context_data: Dict[str, Any] = Body(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/generate_report/stream")
+async def generate_report_stream_endpoint(request: Request, context_data: Dict[str, Any] = Body(...)):
+    """
+    Stream report generation progress as NDJSON (default) or server-sent events
+    (when the client sends ``Accept: text/event-stream``).
+
+    Events:
+    - {"event": "item", "final": false, "item": {...}}: draft content for a tag as soon as an LLM writes it
+    - {"event": "source_complete", "source", "validation", "confidence_score", "regeneration_attempt"}
+    - {"event": "item", "final": true, "item": {...}}: validated content that differs from the draft
+    - {"event": "source_failed", "source"}
+    - {"event": "done", "items", "metadata", "timings"}: the same body /generate_report returns
+    - {"event": "error", "detail"}
+    """
+    try:
+        metadata, canonical_report_type, structure = _resolve_report_request(context_data)
+        context_data = await run_in_threadpool(
+            _build_report_context, context_data, metadata, canonical_report_type, structure
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    use_sse = "text/event-stream" in request.headers.get("accept", "")
+
+    def encode(event: dict) -> str:
+        payload = json.dumps(event, default=str)
+        if use_sse:
+            return f"event: {event['event']}\ndata: {payload}\n\n"
+        return payload + "\n"
+
+    async def event_stream():
+        generator = ParallelReportGenerator()
+        builder = FlatReportBuilder(structure)
+        completed = 0
+        try:
+            async for event in generator.stream_reports(structure, context_data):
+                if event["event"] == "tag":
+                    item = builder.add_tag(event["source"], event["tag"])
+                    if item:
+                        yield encode({"event": "item", "final": False, "item": item})
+                elif event["event"] == "source_complete":
+                    result = event["result"]
+                    completed += 1
+                    yield encode({
+                        "event": "source_complete",
+                        "source": result["source"],
+                        "validation": result["validation"],
+                        "confidence_score": result["confidence_score"],
+                        "regeneration_attempt": result["regeneration_attempt"]
+                    })
+                    for item in builder.add_report(result["source"], result["report"], replace=True):
+                        yield encode({"event": "item", "final": True, "item": item})
+                else:
+                    yield encode(event)
+
+            if not completed:
+                yield encode({"event": "error", "detail": "All report generations failed"})
+                return
+            yield encode({
+                "event": "done",
+                "items": builder.items(),
+                "metadata": metadata,
+                "timings": generator.timings
+            })
+        except Exception as e:
+            logger.error(f"Streaming report generation failed: {e}")
+            yield encode({"event": "error", "detail": str(e)})
+
+    media_type = "text/event-stream" if use_sse else "application/x-ndjson"
+    return StreamingResponse(event_stream(), media_type=media_type)
+
+class DataLoadFailed(Exception):
+    """The loader ran but failed; the user has already been notified."""
+
+def _parse_load_request(payload: Union[List[Dict[str, Any]], Dict[str, Any]]) -> Dict[str, Any]:
+    """Map an upload payload to loader file paths, bucket, user, file names and report period"""
+    # Normalize payload to dictionary format
+    if isinstance(payload, list):
+        # If payload is an array, wrap it in a dictionary with 'files' key
+        payload = {"files": payload}
+    # Initialize file paths
+    delivery_file = None
+    engagement_file = None
+    performance_file = None
+    social_media_file = None
+    retail_file = None
+
+    # Initialize variables
+    s3_bucket = None
+    user_email = None
+
+    # Collect file names for email notification
+    processed_files = []
+
+    # Track period extracted from files
+    extracted_period = None
+
+    # Check if new format with files array is provided
+    if "files" in payload and isinstance(payload["files"], list):
+        # Process new format with files array
+        for file_info in payload["files"]:
+            # Support both camelCase (fileName) and lowercase (filename)
+            original_file_name = file_info.get("fileName") or file_info.get("filename") or ""
+            file_name = original_file_name.lower()
+            file_type = file_info.get("type", "").lower()
+            s3_key = file_info.get("s3Key", "")
+            bucket_name = file_info.get("bucketName", "")
+
+            # Collect file names for notification
+            if original_file_name:
+                processed_files.append(original_file_name)
+
+            # Set bucket name from first file (assuming all files are in same bucket)
+            if not s3_bucket and bucket_name:
+                s3_bucket = bucket_name
+
+            # Get user email from the first file that has it
+            if not user_email and file_info.get("uploadedBy"):
+                user_email = file_info.get("uploadedBy")
+
+            # Get period from the first file that has it
+            if not extracted_period and file_info.get("period"):
+                extracted_period = file_info.get("period")
+
+            # Map files based on type first, then filename patterns
+            if file_type.lower() == "retail data" or file_type.lower() == "retail":
+                retail_file = s3_key
+            elif file_type.lower() == "email delivery":
+                delivery_file = s3_key
+            elif file_type.lower() == "email engagement":
+                engagement_file = s3_key
+            elif file_type.lower() == "email performance":
+                performance_file = s3_key
+            elif file_type.lower() == "social media":
+                social_media_file = s3_key
+            # Fallback to filename patterns if type doesn't match
+            elif "retail" in file_name.lower():
+                retail_file = s3_key
+            elif "deliver" in file_name.lower():
+                delivery_file = s3_key
+            elif "engagement" in file_name.lower():
+                engagement_file = s3_key
+            elif "performance" in file_name.lower() and "social" not in file_name.lower():
+                performance_file = s3_key
+            elif "social" in file_name.lower() or "media" in file_name.lower():
+                social_media_file = s3_key
+
+    else:
+        # Fallback to legacy format
+        delivery_file = payload.get("delivery_file_path")
+        engagement_file = payload.get("engagement_file_path")
+        performance_file = payload.get("performance_file_path")
+        social_media_file = payload.get("social_media_file_path")
+        retail_file = payload.get("retail_file_path")
+        # For legacy format, add file names if provided
+        for f in [delivery_file, engagement_file, performance_file, social_media_file, retail_file]:
+            if f:
+                processed_files.append(f.split("/")[-1] if "/" in f else f)
+
+    # Check if at least one file type is provided
+    if not any([delivery_file, engagement_file, performance_file, social_media_file, retail_file]):
+        raise HTTPException(status_code=400, detail="At least one file must be provided")
+
+    # Period for the automatic report: payload metadata, then payload, then the file objects
+    period = None
+    if "metadata" in payload and isinstance(payload["metadata"], dict):
+        period = payload["metadata"].get("period")
+    if not period and "period" in payload:
+        period = payload.get("period")
+    if not period and extracted_period:
+        period = extracted_period
+
+    return {
+        "files": [delivery_file, engagement_file, performance_file, social_media_file, retail_file],
+        "s3_bucket": s3_bucket,
+        "user_email": user_email,
+        "processed_files": processed_files,
+        "period": period
+    }
+
+def _send_load_notification(user_email: str, processed_files: List[str], load_success: bool):
+    """Email the uploader whether their data load succeeded"""
+    email_service = EmailService()
+
+    # Build file list HTML
+    files_html = ""
+    files_text = ""
+    if processed_files:
+        files_html = "<h3 style='margin-top: 20px; margin-bottom: 10px;'>Files Processed:</h3><ul style='margin: 0; padding-left: 20px;'>"
+        for fname in processed_files:
+            files_html += f"<li style='margin: 5px 0;'>{fname}</li>"
+        files_html += "</ul>"
+        files_text = "\n\nFiles Processed:\n" + "\n".join(f"- {fname}" for fname in processed_files)
+
+    if load_success:
+        # Success email
+        subject = "✅ AI Report Agent: Data Load Completed Successfully"
+        body_text = f"Your data load request has been successfully completed. You can now generate reports using the loaded data.{files_text}"
+        body_html = f"""
+        <html>
+            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+                <div style="max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #e0e0e0; border-radius: 5px;">
+                    <h2 style="color: #28a745; margin-top: 0;">✅ Data Load Completed Successfully</h2>
+                    <p>Your data load request has been successfully completed.</p>
+                    <p>You can now generate reports using the loaded data.</p>
+                    {files_html}
+                    <hr style="border: none; border-top: 1px solid #e0e0e0; margin: 20px 0;">
+                    <p style="font-size: 12px; color: #666;">
+                        This is an automated message from AI Report Agent.
+                    </p>
+                </div>
+            </body>
+        </html>
+        """
+    else:
+        # Failure email
+        subject = "❌ AI Report Agent: Data Load Failed"
+        body_text = f"Unfortunately, your data load request could not be completed. Please re-upload your files and try again.{files_text}"
+        body_html = f"""
+        <html>
+            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+                <div style="max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #e0e0e0; border-radius: 5px;">
+                    <h2 style="color: #dc3545; margin-top: 0;">❌ Data Load Failed</h2>
+                    <p>Unfortunately, your data load request could not be completed.</p>
+                    <p><strong>Please re-upload your files and try again.</strong></p>
+                    <p>If the problem persists after multiple attempts, please contact support for assistance.</p>
+                    {files_html}
+                    <hr style="border: none; border-top: 1px solid #e0e0e0; margin: 20px 0;">
+                    <p style="font-size: 12px; color: #666;">
+                        This is an automated message from AI Report Agent.
+                    </p>
+                </div>
+            </body>
+        </html>
+        """
+
+    email_service.send_notification(user_email, subject, body_text, body_html)
+
+def _run_supporting_data_load(request: Dict[str, Any], job: Job) -> Dict[str, Any]:
+    """
+    Blocking part of a supporting data load: S3 download, ETL and the notification email.
+    Runs on a worker thread (threadpool or job queue), never on the event loop.
+    Raises DataLoadFailed if the loader fails.
+    """
+    user_email = request["user_email"]
+    try:
+        # Create loader instance with provided file paths, S3 bucket, and user_id
+        with job.stage("download"):
+            loader = SupportingDataLoader(*request["files"], request["s3_bucket"], user_id=user_email,
+                                          parse_workers=JOB_PARSE_WORKERS)
+
+        # Track success/failure for email notification
+        load_success = False
+        error_message = None
+
+        try:
+            # Load the data needed for reports
+            loader.load_all_data(stage=job.stage)
+            load_success = True
+        except Exception as load_error:
+            load_success = False
+            error_message = str(load_error)
+            logger.error(f"Data load failed: {error_message}")
+        finally:
+            loader.cleanup_temp_files()
+
+        # Send email notification if user email is provided
+        if user_email:
+            with job.stage("notify"):
+                _send_load_notification(user_email, request["processed_files"], load_success)
+    except Exception:
+        # Send failure email for unexpected errors if we have user email
+        if user_email:
+            try:
+                _send_load_notification(user_email, [], False)
+            except Exception as email_error:
+                logger.error(f"Failed to send error notification email: {email_error}")
+        raise
+
+    if not load_success:
+        raise DataLoadFailed(error_message)
+    return {"rows": {stage["name"]: stage["rows"] for stage in job.stages if stage.get("rows") is not None}}
+
+async def _trigger_report_generation(period: Optional[str]):
+    """Trigger automatic report generation after a successful data load"""
+    try:
+        # Only trigger report generation if we have a valid period
+        if period:
+            # Trigger report generation
+            report_payload = {
+                "reportType": "All Categories",
+                "period": period
+            }
+
+            async with httpx.AsyncClient(timeout=500.0) as client:
+                response = await client.post(
+                    "https://api.runtimeterrors.info/api/reports/generate",
+                    json=report_payload
+                )
+
+                if response.status_code == 200:
+                    logger.info(f"Report generation triggered successfully for period {report_payload['period']}")
+                else:
+                    logger.warning(f"Report generation request returned status {response.status_code}")
+        else:
+            logger.warning("No period found in payload metadata. Skipping automatic report generation.")
+
+    except Exception as report_error:
+        # Don't fail the data load if report generation fails
+        logger.error(f"Failed to trigger automatic report generation: {report_error}")
+
+def _supporting_data_job(job: Job, request: Dict[str, Any]) -> Dict[str, Any]:
+    result = _run_supporting_data_load(request, job)
+    with job.stage("report_trigger"):
+        # Job threads have no event loop of their own
+        asyncio.run(_trigger_report_generation(request["period"]))
+    return result
+
 @app.post("/load_supporting_data")
 async def load_supporting_data(payload: Union[List[Dict[str, Any]], Dict[str, Any]] = Body(...)):
     """
     Load supporting data from various file types (email marketing, social media, retail).
+    Waits for the load to finish; use POST /jobs/load_supporting_data to load in the background.
 
     Expected body format (array):
     [
@@ -209,244 +509,31 @@ async def load_supporting_data(payload: Union[List[Dict[str, Any]], Dict[str, An
     }
     """
     print("Payload received for supporting data load:", payload)
+    request = _parse_load_request(payload)
     try:
-        # Normalize payload to dictionary format
-        if isinstance(payload, list):
-            # If payload is an array, wrap it in a dictionary with 'files' key
-            payload = {"files": payload}
-        # Initialize file paths
-        delivery_file = None
-        engagement_file = None
-        performance_file = None
-        social_media_file = None
-        retail_file = None
-
-        # Initialize variables
-        s3_bucket = None
-        user_email = None
-        
-        # Collect file names for email notification
-        processed_files = []
-        
-        # Track period extracted from files
-        extracted_period = None
-
-        # Check if new format with files array is provided
-        if "files" in payload and isinstance(payload["files"], list):
-            # Process new format with files array
-            for file_info in payload["files"]:
-                # Support both camelCase (fileName) and lowercase (filename)
-                original_file_name = file_info.get("fileName") or file_info.get("filename") or ""
-                file_name = original_file_name.lower()
-                file_type = file_info.get("type", "").lower()
-                s3_key = file_info.get("s3Key", "")
-                bucket_name = file_info.get("bucketName", "")
-                
-                # Collect file names for notification
-                if original_file_name:
-                    processed_files.append(original_file_name)
-
-                # Set bucket name from first file (assuming all files are in same bucket)
-                if not s3_bucket and bucket_name:
-                    s3_bucket = bucket_name
-                
-                # Get user email from the first file that has it
-                if not user_email and file_info.get("uploadedBy"):
-                    user_email = file_info.get("uploadedBy")
-                
-                # Get period from the first file that has it
-                if not extracted_period and file_info.get("period"):
-                    extracted_period = file_info.get("period")
-
-                # Map files based on type first, then filename patterns
-                if file_type.lower() == "retail data" or file_type.lower() == "retail":
-                    retail_file = s3_key
-                elif file_type.lower() == "email delivery":
-                    delivery_file = s3_key
-                elif file_type.lower() == "email engagement":
-                    engagement_file = s3_key
-                elif file_type.lower() == "email performance":
-                    performance_file = s3_key
-                elif file_type.lower() == "social media":
-                    social_media_file = s3_key
-                # Fallback to filename patterns if type doesn't match
-                elif "retail" in file_name.lower():
-                    retail_file = s3_key
-                elif "deliver" in file_name.lower():
-                    delivery_file = s3_key
-                elif "engagement" in file_name.lower():
-                    engagement_file = s3_key
-                elif "performance" in file_name.lower() and "social" not in file_name.lower():
-                    performance_file = s3_key
-                elif "social" in file_name.lower() or "media" in file_name.lower():
-                    social_media_file = s3_key
-
-        else:
-            # Fallback to legacy format
-            delivery_file = payload.get("delivery_file_path")
-            engagement_file = payload.get("engagement_file_path")
-            performance_file = payload.get("performance_file_path")
-            social_media_file = payload.get("social_media_file_path")
-            retail_file = payload.get("retail_file_path")
-            # For legacy format, add file names if provided
-            for f in [delivery_file, engagement_file, performance_file, social_media_file, retail_file]:
-                if f:
-                    processed_files.append(f.split("/")[-1] if "/" in f else f)
-
-        # Check if at least one file type is provided
-        if not any([delivery_file, engagement_file, performance_file, social_media_file, retail_file]):
-            raise HTTPException(status_code=400, detail="At least one file must be provided")
-
-        # Create loader instance with provided file paths, S3 bucket, and user_id
-        loader = SupportingDataLoader(delivery_file, engagement_file, performance_file, social_media_file, retail_file, s3_bucket, user_id=user_email)
+        # Run the blocking download/ETL off the event loop
+        await run_in_threadpool(_run_supporting_data_load, request, Job("load_supporting_data"))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Track success/failure for email notification
-        load_success = False
-        error_message = None
-        
-        try:
-            # Load the data needed for reports
-            loader.load_all_data()
-            load_success = True
-        except Exception as load_error:
-            load_success = False
-            error_message = str(load_error)
-            logger.error(f"Data load failed: {error_message}")
+    await _trigger_report_generation(request["period"])
+    return {"message": "Supporting data loaded successfully"}
 
-        # Send email notification if user email is provided
-        if user_email:
-            email_service = EmailService()
-            
-            # Build file list HTML
-            files_html = ""
-            files_text = ""
-            if processed_files:
-                files_html = "<h3 style='margin-top: 20px; margin-bottom: 10px;'>Files Processed:</h3><ul style='margin: 0; padding-left: 20px;'>"
-                for fname in processed_files:
-                    files_html += f"<li style='margin: 5px 0;'>{fname}</li>"
-                files_html += "</ul>"
-                files_text = "\n\nFiles Processed:\n" + "\n".join(f"- {fname}" for fname in processed_files)
-            
-            if load_success:
-                # Success email
-                subject = "✅ AI Report Agent: Data Load Completed Successfully"
-                body_text = f"Your data load request has been successfully completed. You can now generate reports using the loaded data.{files_text}"
-                body_html = f"""
-                <html>
-                    <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                        <div style="max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #e0e0e0; border-radius: 5px;">
-                            <h2 style="color: #28a745; margin-top: 0;">✅ Data Load Completed Successfully</h2>
-                            <p>Your data load request has been successfully completed.</p>
-                            <p>You can now generate reports using the loaded data.</p>
-                            {files_html}
-                            <hr style="border: none; border-top: 1px solid #e0e0e0; margin: 20px 0;">
-                            <p style="font-size: 12px; color: #666;">
-                                This is an automated message from AI Report Agent.
-                            </p>
-                        </div>
-                    </body>
-                </html>
-                """
-            else:
-                # Failure email
-                subject = "❌ AI Report Agent: Data Load Failed"
-                body_text = f"Unfortunately, your data load request could not be completed. Please re-upload your files and try again.{files_text}"
-                body_html = f"""
-                <html>
-                    <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                        <div style="max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #e0e0e0; border-radius: 5px;">
-                            <h2 style="color: #dc3545; margin-top: 0;">❌ Data Load Failed</h2>
-                            <p>Unfortunately, your data load request could not be completed.</p>
-                            <p><strong>Please re-upload your files and try again.</strong></p>
-                            <p>If the problem persists after multiple attempts, please contact support for assistance.</p>
-                            {files_html}
-                            <hr style="border: none; border-top: 1px solid #e0e0e0; margin: 20px 0;">
-                            <p style="font-size: 12px; color: #666;">
-                                This is an automated message from AI Report Agent.
-                            </p>
-                        </div>
-                    </body>
-                </html>
-                """
-            
-            email_service.send_notification(user_email, subject, body_text, body_html)
-
-        # Trigger automatic report generation after successful data load
-        if load_success:
-            try:
-                # Extract period from payload metadata
-                period = None
-                # Attempt to extract period from the payload's metadata if available
-                if "metadata" in payload and isinstance(payload["metadata"], dict):
-                    period = payload["metadata"].get("period")
-                
-                # Fallback: if period not in metadata, check if it's directly in payload
-                if not period and "period" in payload:
-                    period = payload.get("period")
-                
-                # Fallback: use period extracted from file_info objects
-                if not period and extracted_period:
-                    period = extracted_period
-                
-                # Only trigger report generation if we have a valid period
-                if period:
-                    # Trigger report generation
-                    report_payload = {
-                        "reportType": "All Categories",
-                        "period": period
-                    }
-                    
-                    async with httpx.AsyncClient(timeout=500.0) as client:
-                        response = await client.post(
-                            "https://api.runtimeterrors.info/api/reports/generate",
-                            json=report_payload
-                        )
-                        
-                        if response.status_code == 200:
-                            logger.info(f"Report generation triggered successfully for period {report_payload['period']}")
-                        else:
-                            logger.warning(f"Report generation request returned status {response.status_code}")
-                else:
-                    logger.warning("No period found in payload metadata. Skipping automatic report generation.")
-                        
-            except Exception as report_error:
-                # Don't fail the data load if report generation fails
-                logger.error(f"Failed to trigger automatic report generation: {report_error}")
-
-        # Return appropriate response
-        if load_success:
-            return {"message": "Supporting data loaded successfully"}
-        else:
-            raise HTTPException(status_code=500, detail=error_message)
+@app.post("/jobs/load_supporting_data", status_code=202)
+def enqueue_supporting_data_load(payload: Union[List[Dict[str, Any]], Dict[str, Any]] = Body(...)):
+    """
+    Queue a supporting data load (same body as /load_supporting_data) and return at once.
+    Poll GET /jobs/{job_id} for status, per-stage timings and row counts.
+    """
+    print("Payload received for background supporting data load:", payload)
+    request = _parse_load_request(payload)
+    job = get_job_queue().submit("load_supporting_data", _supporting_data_job, request)
+    return {"job_id": job.id, "status": job.status, "status_url": f"/jobs/{job.id}"}
 
-    except HTTPException:
-        # Re-raise HTTP exceptions as-is
-        raise
-    except Exception as e:
-        # Send failure email for unexpected errors if we have user email
-        if 'user_email' in locals() and user_email:
-            try:
-                email_service = EmailService()
-                subject = "❌ AI Report Agent: Data Load Failed"
-                body_text = "Unfortunately, your data load request could not be completed. Please re-upload your files and try again."
-                body_html = """
-                <html>
-                    <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                        <div style="max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #e0e0e0; border-radius: 5px;">
-                            <h2 style="color: #dc3545; margin-top: 0;">❌ Data Load Failed</h2>
-                            <p>Unfortunately, your data load request could not be completed.</p>
-                            <p><strong>Please re-upload your files and try again.</strong></p>
-                            <p>If the problem persists after multiple attempts, please contact support for assistance.</p>
-                            <hr style="border: none; border-top: 1px solid #e0e0e0; margin: 20px 0;">
-                            <p style="font-size: 12px; color: #666;">
-                                This is an automated message from AI Report Agent.
-                            </p>
-                        </div>
-                    </body>
-                </html>
-                """
-                email_service.send_notification(user_email, subject, body_text, body_html)
-            except Exception as email_error:
-                logger.error(f"Failed to send error notification email: {email_error}")
-        
-        raise HTTPException(status_code=500, detail=str(e))
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Status, per-stage timings and row counts of a background job"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.to_dict()
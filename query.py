@@ -7,46 +7,125 @@ This file contains SQL queries for comprehensive analysis of:
 3. Social media engagement and performance
 
 All queries are parameterized and include trend analysis capabilities.
+Retail queries read the precomputed rollups (retail_sales_daily,
+retail_sales_monthly, retail_items_daily) maintained by src/database/rollups.py
+when a retail file loads, instead of scanning retail_data line items.
 """
 
+# =============================================================================
+# SHARED BUILDING BLOCKS
+# =============================================================================
+
+# One row per day and channel: each channel is aggregated to a daily series on its
+# own, so joining them on date is 1:1 (joining raw line items to engagement rows
+# multiplied the rows per day and inflated every SUM). Parameters: (start, end) x 3.
+_CHANNEL_DAILY_CTES = """
+retail_daily AS (
+    SELECT
+        sale_date as date,
+        SUM(total_sales) as retail_sales,
+        SUM(total_quantity) as retail_quantity,
+        SUM(line_count) as retail_transactions
+    FROM retail_sales_daily
+    WHERE sale_date BETWEEN %s AND %s
+    GROUP BY sale_date
+),
+email_daily AS (
+    SELECT
+        send_date as date,
+        AVG(open_rate) as email_open_rate,
+        SUM(unique_opens) as email_opens,
+        SUM(unique_clicks) as email_clicks
+    FROM email_engagement_details
+    WHERE send_date BETWEEN %s AND %s
+    GROUP BY send_date
+),
+social_daily AS (
+    SELECT
+        date,
+        SUM(total_engagements) as social_engagements,
+        SUM(posts_published) as social_posts,
+        SUM(reach) as social_reach
+    FROM social_media_engagement_daily
+    WHERE date BETWEEN %s AND %s
+    GROUP BY date
+)"""
+
+
+def _pearson(x, y):
+    """
+    Pearson correlation of two columns as a MySQL aggregate (MySQL has no CORR()),
+    from sums of products over the rows where both values are present
+    """
+    x, y = f"({x} * 1e0)", f"({y} * 1e0)"  # DOUBLE arithmetic; DECIMAL products run out of digits
+    n = f"COUNT({x} * {y})"
+    sum_x, sum_y = f"SUM({x} + 0 * {y})", f"SUM({y} + 0 * {x})"
+    sum_xx, sum_yy = f"SUM({x} * {x} + 0 * {y})", f"SUM({y} * {y} + 0 * {x})"
+    return (
+        f"({n} * SUM({x} * {y}) - {sum_x} * {sum_y}) / "
+        f"NULLIF(SQRT(({n} * {sum_xx} - {sum_x} * {sum_x}) * ({n} * {sum_yy} - {sum_y} * {sum_y})), 0)"
+    )
+
 # =============================================================================
 # RETAIL DATA ANALYSIS QUERIES
 # =============================================================================
 
 # 1. Monthly Sales Trends
 RETAIL_MONTHLY_SALES = """
+WITH period AS (
+    SELECT CAST(%s AS DATE) as start_date, CAST(%s AS DATE) as end_date
+),
+monthly_sales AS (
+    SELECT
+        DATE_FORMAT(d.sale_date, '%Y-%m') as month,
+        COUNT(DISTINCT d.sale_date) as days_with_sales,
+        SUM(d.line_count) as total_transactions,
+        SUM(d.total_sales) as total_sales,
+        SUM(d.total_sales) / SUM(d.priced_line_count) as avg_transaction_value,
+        SUM(d.total_quantity) as total_quantity_sold
+    FROM retail_sales_daily d
+    JOIN period p ON d.sale_date BETWEEN p.start_date AND p.end_date
+    GROUP BY DATE_FORMAT(d.sale_date, '%Y-%m')
+),
+monthly_items AS (
+    SELECT
+        DATE_FORMAT(i.sale_date, '%Y-%m') as month,
+        COUNT(DISTINCT i.item_id) as unique_items_sold
+    FROM retail_items_daily i
+    JOIN period p ON i.sale_date BETWEEN p.start_date AND p.end_date
+    GROUP BY DATE_FORMAT(i.sale_date, '%Y-%m')
+)
 SELECT
-    DATE_FORMAT(sale_date, '%Y-%m') as month,
-    COUNT(DISTINCT sale_date) as days_with_sales,
-    COUNT(*) as total_transactions,
-    SUM(extension_amount) as total_sales,
-    AVG(extension_amount) as avg_transaction_value,
-    SUM(qty) as total_quantity_sold,
-    COUNT(DISTINCT item_id) as unique_items_sold
-FROM retail_data
-WHERE sale_date BETWEEN %s AND %s
-GROUP BY DATE_FORMAT(sale_date, '%Y-%m')
-ORDER BY month;
+    ms.month,
+    ms.days_with_sales,
+    ms.total_transactions,
+    ms.total_sales,
+    ms.avg_transaction_value,
+    ms.total_quantity_sold,
+    COALESCE(mi.unique_items_sold, 0) as unique_items_sold
+FROM monthly_sales ms
+LEFT JOIN monthly_items mi ON mi.month = ms.month
+ORDER BY ms.month;
 """
 
 # 2. Period-over-Period Sales Comparison (45 days, etc.)
 RETAIL_PERIOD_COMPARISON = """
 WITH current_period AS (
     SELECT
-        SUM(extension_amount) as current_sales,
-        COUNT(*) as current_transactions,
-        AVG(extension_amount) as current_avg_transaction,
-        SUM(qty) as current_quantity
-    FROM retail_data
+        SUM(total_sales) as current_sales,
+        SUM(line_count) as current_transactions,
+        SUM(total_sales) / SUM(priced_line_count) as current_avg_transaction,
+        SUM(total_quantity) as current_quantity
+    FROM retail_sales_daily
     WHERE sale_date BETWEEN %s AND %s
 ),
 previous_period AS (
     SELECT
-        SUM(extension_amount) as previous_sales,
-        COUNT(*) as previous_transactions,
-        AVG(extension_amount) as previous_avg_transaction,
-        SUM(qty) as previous_quantity
-    FROM retail_data
+        SUM(total_sales) as previous_sales,
+        SUM(line_count) as previous_transactions,
+        SUM(total_sales) / SUM(priced_line_count) as previous_avg_transaction,
+        SUM(total_quantity) as previous_quantity
+    FROM retail_sales_daily
     WHERE sale_date BETWEEN DATE_SUB(%s, INTERVAL (DATEDIFF(%s, %s) + 1) DAY) AND DATE_SUB(%s, INTERVAL 1 DAY)
 )
 SELECT
@@ -69,10 +148,10 @@ WITH monthly_sales AS (
         DATE_FORMAT(sale_date, '%Y-%m') as month,
         store_format,
         command_name,
-        SUM(extension_amount) as monthly_sales,
-        SUM(qty) as monthly_quantity,
-        COUNT(*) as monthly_transactions
-    FROM retail_data
+        SUM(total_sales) as monthly_sales,
+        SUM(total_quantity) as monthly_quantity,
+        SUM(line_count) as monthly_transactions
+    FROM retail_sales_daily
     WHERE sale_date BETWEEN %s AND %s
     GROUP BY DATE_FORMAT(sale_date, '%Y-%m'), store_format, command_name
 ),
@@ -106,32 +185,24 @@ LIMIT 3;
 
 # 4. Retail Sales Correlation with Email/Social Media
 RETAIL_CORRELATION_ANALYSIS = """
-WITH daily_metrics AS (
+WITH""" + _CHANNEL_DAILY_CTES + """,
+daily_metrics AS (
     SELECT
-        rd.sale_date,
-        SUM(rd.extension_amount) as daily_sales,
-        SUM(rd.qty) as daily_quantity,
-        COUNT(*) as daily_transactions,
-
-        -- Email metrics (simplified - would need proper date matching)
-        COALESCE(AVG(eed.open_rate), 0) as avg_email_open_rate,
-        COALESCE(SUM(eed.unique_opens), 0) as total_email_opens,
-
-        -- Social media metrics
-        COALESCE(SUM(smed.total_engagements), 0) as daily_social_engagements,
-        COALESCE(SUM(smed.posts_published), 0) as daily_social_posts
-
-    FROM retail_data rd
-    LEFT JOIN email_engagement_details eed ON DATE(eed.send_date) = rd.sale_date
-    LEFT JOIN social_media_engagement_daily smed ON smed.date = rd.sale_date
-    WHERE rd.sale_date BETWEEN %s AND %s
-    GROUP BY rd.sale_date
+        r.date,
+        r.retail_sales as daily_sales,
+        COALESCE(e.email_open_rate, 0) as avg_email_open_rate,
+        COALESCE(e.email_opens, 0) as total_email_opens,
+        COALESCE(s.social_engagements, 0) as daily_social_engagements,
+        COALESCE(s.social_posts, 0) as daily_social_posts
+    FROM retail_daily r
+    LEFT JOIN email_daily e ON e.date = r.date
+    LEFT JOIN social_daily s ON s.date = r.date
 )
 SELECT
-    CORR(daily_sales, avg_email_open_rate) as sales_email_open_correlation,
-    CORR(daily_sales, total_email_opens) as sales_email_opens_correlation,
-    CORR(daily_sales, daily_social_engagements) as sales_social_engagement_correlation,
-    CORR(daily_sales, daily_social_posts) as sales_social_posts_correlation,
+    """ + _pearson("daily_sales", "avg_email_open_rate") + """ as sales_email_open_correlation,
+    """ + _pearson("daily_sales", "total_email_opens") + """ as sales_email_opens_correlation,
+    """ + _pearson("daily_sales", "daily_social_engagements") + """ as sales_social_engagement_correlation,
+    """ + _pearson("daily_sales", "daily_social_posts") + """ as sales_social_posts_correlation,
     AVG(daily_sales) as avg_daily_sales,
     AVG(avg_email_open_rate) as avg_email_open_rate,
     AVG(daily_social_engagements) as avg_social_engagements
@@ -141,21 +212,68 @@ WHERE daily_sales > 0;
 
 # 5. Store Performance Analysis
 RETAIL_STORE_PERFORMANCE = """
+WITH period AS (
+    SELECT CAST(%s AS DATE) as start_date, CAST(%s AS DATE) as end_date
+),
+store_sales AS (
+    SELECT
+        d.site_name,
+        d.store_format,
+        d.command_name,
+        COUNT(DISTINCT d.sale_date) as active_days,
+        SUM(d.total_sales) as total_sales,
+        SUM(d.total_sales) / SUM(d.priced_line_count) as avg_daily_sales,
+        SUM(d.total_quantity) as total_quantity,
+        SUM(d.line_count) as total_transactions,
+        MAX(d.sale_date) as last_sale_date
+    FROM retail_sales_daily d
+    JOIN period p ON d.sale_date BETWEEN p.start_date AND p.end_date
+    GROUP BY d.site_name, d.store_format, d.command_name
+),
+store_items AS (
+    SELECT
+        i.site_name,
+        i.store_format,
+        i.command_name,
+        COUNT(DISTINCT i.item_id) as unique_items_sold
+    FROM retail_items_daily i
+    JOIN period p ON i.sale_date BETWEEN p.start_date AND p.end_date
+    GROUP BY i.site_name, i.store_format, i.command_name
+)
+SELECT
+    ss.site_name,
+    ss.store_format,
+    ss.command_name,
+    ss.active_days,
+    ss.total_sales,
+    ss.avg_daily_sales,
+    ss.total_quantity,
+    ss.total_transactions,
+    COALESCE(si.unique_items_sold, 0) as unique_items_sold,
+    ss.last_sale_date
+FROM store_sales ss
+LEFT JOIN store_items si ON si.site_name <=> ss.site_name
+    AND si.store_format <=> ss.store_format
+    AND si.command_name <=> ss.command_name
+ORDER BY ss.total_sales DESC;
+"""
+
+# 6. Monthly Sales by Store Format for whole months ('YYYY-MM' to 'YYYY-MM')
+RETAIL_MONTHLY_FORMAT_SALES = """
 SELECT
-    site_name,
+    month,
     store_format,
     command_name,
-    COUNT(DISTINCT sale_date) as active_days,
-    SUM(extension_amount) as total_sales,
-    AVG(extension_amount) as avg_daily_sales,
-    SUM(qty) as total_quantity,
-    COUNT(*) as total_transactions,
-    COUNT(DISTINCT item_id) as unique_items_sold,
-    MAX(sale_date) as last_sale_date
-FROM retail_data
-WHERE sale_date BETWEEN %s AND %s
-GROUP BY site_name, store_format, command_name
-ORDER BY total_sales DESC;
+    SUM(total_sales) as total_sales,
+    SUM(total_quantity) as total_quantity,
+    SUM(line_count) as total_transactions,
+    SUM(total_sales) / SUM(priced_line_count) as avg_transaction_value,
+    MIN(first_sale_date) as first_sale_date,
+    MAX(last_sale_date) as last_sale_date
+FROM retail_sales_monthly
+WHERE month BETWEEN %s AND %s
+GROUP BY month, store_format, command_name
+ORDER BY month, total_sales DESC;
 """
 
 # =============================================================================
@@ -287,6 +405,45 @@ FROM engagement_changes
 ORDER BY month;
 """
 
+# 6. Email Totals for a Period (sends come from the delivery details, engagement
+#    from the engagement details; each is aggregated on its own before combining)
+EMAIL_PERIOD_SUMMARY = """
+WITH deliveries AS (
+    SELECT
+        COUNT(DISTINCT email_content_name) as campaigns_sent,
+        SUM(sends) as total_sends,
+        SUM(deliveries) as total_deliveries,
+        SUM(bounces) as total_bounces
+    FROM email_delivery_details
+    WHERE send_date BETWEEN %s AND %s
+),
+engagement AS (
+    SELECT
+        AVG(open_rate) as avg_open_rate,
+        AVG(click_rate) as avg_click_rate,
+        AVG(click_to_open_rate) as avg_click_to_open_rate,
+        AVG(unsubscribe_rate) as avg_unsubscribe_rate,
+        SUM(unique_opens) as total_unique_opens,
+        SUM(unique_clicks) as total_unique_clicks,
+        SUM(unique_unsubscribes) as total_unsubscribes
+    FROM email_engagement_details
+    WHERE send_date BETWEEN %s AND %s
+)
+SELECT
+    d.campaigns_sent,
+    d.total_sends,
+    d.total_deliveries,
+    d.total_bounces,
+    e.avg_open_rate,
+    e.avg_click_rate,
+    e.avg_click_to_open_rate,
+    e.avg_unsubscribe_rate,
+    e.total_unique_opens,
+    e.total_unique_clicks,
+    e.total_unsubscribes
+FROM deliveries d, engagement e;
+"""
+
 # =============================================================================
 # SOCIAL MEDIA ANALYSIS QUERIES
 # =============================================================================
@@ -461,28 +618,25 @@ ORDER BY avg_engagement_rate DESC;
 
 # 1. Multi-Channel Correlation Analysis
 MULTI_CHANNEL_CORRELATION = """
-WITH daily_channel_metrics AS (
+WITH""" + _CHANNEL_DAILY_CTES + """,
+daily_channel_metrics AS (
     SELECT
-        rd.sale_date as date,
-        SUM(rd.extension_amount) as retail_sales,
-        AVG(eed.open_rate) as email_open_rate,
-        SUM(eed.unique_clicks) as email_clicks,
-        SUM(smed.total_engagements) as social_engagements,
-        SUM(smed.reach) as social_reach,
-        AVG(smp.engagement_rate) as social_engagement_rate
-    FROM retail_data rd
-    LEFT JOIN email_engagement_details eed ON DATE(eed.send_date) = rd.sale_date
-    LEFT JOIN social_media_engagement_daily smed ON smed.date = rd.sale_date
-    LEFT JOIN social_media_performance smp ON smp.period_month = '2024'
-    WHERE rd.sale_date BETWEEN %s AND %s
-    GROUP BY rd.sale_date
+        r.date,
+        r.retail_sales,
+        e.email_open_rate,
+        e.email_clicks,
+        s.social_engagements,
+        s.social_reach
+    FROM retail_daily r
+    LEFT JOIN email_daily e ON e.date = r.date
+    LEFT JOIN social_daily s ON s.date = r.date
 )
 SELECT
-    CORR(retail_sales, email_open_rate) as sales_email_open_corr,
-    CORR(retail_sales, email_clicks) as sales_email_clicks_corr,
-    CORR(retail_sales, social_engagements) as sales_social_engagement_corr,
-    CORR(retail_sales, social_reach) as sales_social_reach_corr,
-    CORR(email_open_rate, social_engagements) as email_social_engagement_corr,
+    """ + _pearson("retail_sales", "email_open_rate") + """ as sales_email_open_corr,
+    """ + _pearson("retail_sales", "email_clicks") + """ as sales_email_clicks_corr,
+    """ + _pearson("retail_sales", "social_engagements") + """ as sales_social_engagement_corr,
+    """ + _pearson("retail_sales", "social_reach") + """ as sales_social_reach_corr,
+    """ + _pearson("email_open_rate", "social_engagements") + """ as email_social_engagement_corr,
     AVG(retail_sales) as avg_daily_sales,
     AVG(email_open_rate) as avg_email_open_rate,
     AVG(social_engagements) as avg_social_engagements
@@ -490,14 +644,36 @@ FROM daily_channel_metrics
 WHERE retail_sales > 0;
 """
 
-# 2. Trend Analysis with Top 3 Changes
+# 2. Daily Channel Series (one row per retail sales day) for the NumPy correlation
+#    engine in src/services/correlation.py, which adds Spearman rank correlations
+CHANNEL_DAILY_SERIES = """
+WITH""" + _CHANNEL_DAILY_CTES + """
+SELECT
+    r.date,
+    r.retail_sales,
+    r.retail_quantity,
+    r.retail_transactions,
+    e.email_open_rate,
+    e.email_opens,
+    e.email_clicks,
+    s.social_engagements,
+    s.social_posts,
+    s.social_reach
+FROM retail_daily r
+LEFT JOIN email_daily e ON e.date = r.date
+LEFT JOIN social_daily s ON s.date = r.date
+WHERE r.retail_sales > 0
+ORDER BY r.date;
+"""
+
+# 3. Trend Analysis with Top 3 Changes
 TREND_ANALYSIS_TOP_CHANGES = """
 WITH monthly_kpis AS (
     SELECT
-        DATE_FORMAT(date, '%Y-%m') as month,
+        DATE_FORMAT(sale_date, '%Y-%m') as month,
         'Retail Sales' as metric,
-        SUM(extension_amount) as value
-    FROM retail_data
+        SUM(total_sales) as value
+    FROM retail_sales_daily
     WHERE sale_date BETWEEN %s AND %s
     GROUP BY DATE_FORMAT(sale_date, '%Y-%m')
 
@@ -551,12 +727,12 @@ LIMIT 9;
 DATA_QUALITY_CHECK = """
 SELECT
     'retail_data' as table_name,
-    COUNT(*) as total_rows,
+    SUM(line_count) as total_rows,
     COUNT(DISTINCT sale_date) as unique_dates,
     MIN(sale_date) as min_date,
     MAX(sale_date) as max_date,
-    SUM(extension_amount) as total_sales
-FROM retail_data
+    SUM(total_sales) as total_sales
+FROM retail_sales_daily
 
 UNION ALL
 
@@ -599,7 +775,7 @@ SELECT
     MIN(sale_date) as earliest_date,
     MAX(sale_date) as latest_date,
     COUNT(DISTINCT sale_date) as days_with_data
-FROM retail_data
+FROM retail_sales_daily
 
 UNION ALL
 
@@ -648,6 +824,36 @@ def get_period_comparison_dates(start_date, end_date):
 
     return prev_start.strftime('%Y-%m-%d'), prev_end.strftime('%Y-%m-%d')
 
+def bind_params(name, start_date, end_date, sql=None):
+    """
+    Parameters for the named query over a date range ('YYYY-MM-DD' strings):
+    (start, end) for each BETWEEN unless the query takes something else
+    """
+    if name == "SOCIAL_MEDIA_OVERVIEW":
+        return (f"{start_date[:4]}%",)
+    if name == "RETAIL_MONTHLY_FORMAT_SALES":
+        return (start_date[:7], end_date[:7])
+    if name == "RETAIL_PERIOD_COMPARISON":
+        return (start_date, end_date, start_date, end_date, start_date, start_date)
+    count = (sql if sql is not None else globals()[name]).count("%s")
+    return tuple((start_date, end_date)[i % 2] for i in range(count))
+
+def run_query(query, params=None):
+    """
+    Execute one of the queries above on a pooled connection and return rows as dicts
+    """
+    from src.database.db_connection import get_engine
+
+    connection = get_engine().raw_connection()
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute(query, params or ())
+        rows = cursor.fetchall()
+        cursor.close()
+        return rows
+    finally:
+        connection.close()  # returns the connection to the pool
+
 def format_query_results(results, query_name):
     """
     Helper to format query results for reporting
@@ -661,11 +867,18 @@ def format_query_results(results, query_name):
 
 # Example usage:
 """
+# Several queries for one period at once, as DataFrames (cached until the next load)
+from src.services.query_runner import get_query_runner
+get_query_runner().run(["RETAIL_MONTHLY_SALES", "EMAIL_CAMPAIGN_OVERVIEW"], '2024-10-01', '2024-12-31')
+
 # Monthly retail sales for Q4 2024
+format_query_results(run_query(RETAIL_MONTHLY_SALES, ('2024-10-01', '2024-12-31')), "Monthly Sales")
+
+# Or with a cursor of your own
 cursor.execute(RETAIL_MONTHLY_SALES, ('2024-10-01', '2024-12-31'))
 
 # Period comparison (45 days ending 2024-12-31 vs previous 45 days)
-cursor.execute(RETAIL_PERIOD_COMPARISON, ('2024-11-17', '2024-12-31', '2024-11-17', '2024-12-31', '2024-11-17'))
+cursor.execute(RETAIL_PERIOD_COMPARISON, bind_params('RETAIL_PERIOD_COMPARISON', '2024-11-17', '2024-12-31'))
 
 # Email performance trends
 cursor.execute(EMAIL_PERFORMANCE_TRENDS, ('2024-01-01', '2024-12-31'))
@@ -2,6 +2,9 @@ import os
 from dotenv import load_dotenv
 import google.generativeai as genai
 from src.config.settings import settings
+from src.services.llm_cache import get_llm_cache, is_cacheable_response, make_cache_key
+from src.services.llm_clients import gemini_generate_async
+from src.services.rate_limiter import estimate_tokens, get_rate_limiter
 
 # Load environment variables from .env file
 load_dotenv()
@@ -15,11 +18,26 @@ genai.configure(api_key=GEMINI_API_KEY)
 
 class GeminiClient:
     @staticmethod
-    def generate(model: str, prompt: str) -> str:
-        """Generates content from the Gemini model."""
+    def generate(model: str, prompt: str, use_cache: bool = True) -> str:
+        """Generates content from the Gemini model, reusing cached responses for identical prompts."""
+        cache = get_llm_cache() if use_cache else None
+        cache_key = make_cache_key(model, prompt) if cache else None
+        if cache:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         model_instance = genai.GenerativeModel(model)
-        response = model_instance.generate_content(prompt)
+        with get_rate_limiter(model).limit_sync(estimate_tokens(prompt)):
+            response = model_instance.generate_content(prompt)
+        if cache and is_cacheable_response(response.text):
+            cache.set(cache_key, response.text)
         return response.text
 
+    @staticmethod
+    async def generate_async(model: str, prompt: str, use_cache: bool = True) -> str:
+        """Async counterpart of generate() that uses the shared httpx connection pool."""
+        return await gemini_generate_async(model, prompt, use_cache=use_cache)
+
 # Create global reusable instance
 client = GeminiClient()
\ No newline at end of file
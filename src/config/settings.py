@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 
 class Settings(BaseSettings):
     """Pydantic settings class for environment variables and configuration"""
@@ -25,6 +25,29 @@ class Settings(BaseSettings):
     MAX_RETRIES: int = 3
     PARALLEL_GENERATION: bool = True
     GENERATION_TIMEOUT: int = 30
+    SHARDED_GENERATION: bool = False  # generate groups of tags concurrently and merge them
+    SHARD_TAG_COUNT: int = 8
+    PARTIAL_REGENERATION: bool = True  # regenerate and re-validate only the tags flagged by the validator
+
+    # LLM Response Cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 256
+    LLM_CACHE_TTL_SECONDS: int = 3600
+    LLM_CACHE_DB_PATH: Optional[str] = None  # e.g. /tmp/llm_cache.sqlite3 to share across workers
+
+    # Shared async HTTP pool for LLM calls
+    LLM_HTTP_MAX_CONNECTIONS: int = 20
+    LLM_HTTP_MAX_KEEPALIVE: int = 10
+    LLM_HTTP_TIMEOUT: float = 300.0
+
+    # LLM rate limits. Set these to the account's quota; the defaults only smooth bursts.
+    # Per-model overrides as JSON, e.g. LLM_RATE_LIMITS='{"gemini-2.5-flash": {"rpm": 10, "tpm": 250000}}'
+    LLM_RATE_LIMITS: Dict[str, Dict[str, int]] = {}
+    LLM_DEFAULT_RPM: int = 1000
+    LLM_DEFAULT_TPM: int = 4000000
+    LLM_DEFAULT_MAX_IN_FLIGHT: int = 8
+    LLM_RATE_LIMIT_BACKOFF_SECONDS: int = 60  # pause after a 429 without Retry-After, doubled per attempt
+    LLM_RATE_LIMIT_STATE_DIR: Optional[str] = None  # e.g. /tmp/llm_rate_limits to share quota across workers
     
     # AWS Settings (for S3 only)
     AWS_ACCESS_KEY_ID: Optional[str] = None
@@ -41,6 +64,7 @@ class Settings(BaseSettings):
     # Validation Settings
     MIN_CONSISTENCY_SCORE: float = 0.8
     REQUIRE_DUAL_VALIDATION: bool = True
+    RULE_PREVALIDATION: bool = True  # local checks before the LLM validator; skip the LLM on structural failures
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,71 @@
+"""Batched MySQL writes.
+
+Loading a sheet row by row costs one round trip per row. ``upsert_dataframe``
+converts the frame to SQL-ready tuples in one vectorized step (NaN/NA/NaT
+become None) and sends them as multi-row
+``INSERT ... VALUES (...), (...) ON DUPLICATE KEY UPDATE`` statements, one per
+chunk of ``DB_BATCH_SIZE`` rows. ``insert_rows`` does the same for plain
+appends.
+"""
+import os
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+DEFAULT_BATCH_SIZE = int(os.getenv('DB_BATCH_SIZE', '1000'))
+
+
+def dataframe_rows(df: pd.DataFrame, columns: Sequence[str]) -> List[Tuple]:
+    """Return ``df[columns]`` as a list of tuples with missing values replaced by None."""
+    frame = df[list(columns)].astype(object)
+    frame = frame.where(pd.notna(frame), None)
+    return list(frame.itertuples(index=False, name=None))
+
+
+def build_upsert_sql(table: str, columns: Sequence[str], update_columns: Sequence[str], row_count: int) -> str:
+    """Build a multi-row INSERT ... ON DUPLICATE KEY UPDATE statement for ``row_count`` rows."""
+    placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    updates = ", ".join(f"{col}=VALUES({col})" for col in update_columns)
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+        + ", ".join([placeholders] * row_count)
+        + f" ON DUPLICATE KEY UPDATE {updates}"
+    )
+
+
+def upsert_rows(cursor, table: str, columns: Sequence[str], update_columns: Sequence[str],
+                rows: Iterable[Tuple], batch_size: Optional[int] = None) -> int:
+    """Upsert ``rows`` in chunks of ``batch_size``; returns the number of rows sent."""
+    batch_size = batch_size or DEFAULT_BATCH_SIZE
+    rows = list(rows)
+    full_chunk_sql = None
+    for start in range(0, len(rows), batch_size):
+        chunk = rows[start:start + batch_size]
+        if len(chunk) == batch_size:
+            # Every chunk but the last has the same shape, so build its SQL once
+            full_chunk_sql = full_chunk_sql or build_upsert_sql(table, columns, update_columns, batch_size)
+            sql = full_chunk_sql
+        else:
+            sql = build_upsert_sql(table, columns, update_columns, len(chunk))
+        cursor.execute(sql, [value for row in chunk for value in row])
+    return len(rows)
+
+
+def insert_rows(cursor, table: str, columns: Sequence[str], rows: Iterable[Tuple],
+                batch_size: Optional[int] = None) -> int:
+    """Plain INSERT of ``rows`` in chunks of ``batch_size``; returns the number of rows sent.
+
+    mysql-connector rewrites ``executemany`` of an INSERT into one multi-row statement per call.
+    """
+    batch_size = batch_size or DEFAULT_BATCH_SIZE
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    rows = list(rows)
+    for start in range(0, len(rows), batch_size):
+        cursor.executemany(sql, rows[start:start + batch_size])
+    return len(rows)
+
+
+def upsert_dataframe(cursor, table: str, df: pd.DataFrame, columns: Sequence[str],
+                     update_columns: Sequence[str], batch_size: Optional[int] = None) -> int:
+    """Upsert the given columns of ``df`` into ``table`` using batched multi-row statements."""
+    return upsert_rows(cursor, table, columns, update_columns, dataframe_rows(df, columns), batch_size)
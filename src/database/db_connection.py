@@ -1,29 +1,97 @@
-import mysql.connector
 from mysql.connector import Error
 import os
+import threading
+from urllib.parse import quote_plus
 from dotenv import load_dotenv
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import SQLAlchemyError
 
 load_dotenv()
 
+# One engine (and QueuePool) per process, shared by the mysql-connector loaders,
+# SocialMediaDataLoader's to_sql calls and query helpers.
+_engine = None
+_engine_lock = threading.Lock()
+_pool_counters = {"connections_created": 0, "checkouts": 0, "invalidated": 0}
+
+
+def build_db_url() -> str:
+    """SQLAlchemy URL from the MYSQL_* environment variables (password URL-encoded)."""
+    password = quote_plus(os.getenv('MYSQL_PASSWORD', 'password'))
+    return (
+        f"mysql+mysqlconnector://{os.getenv('MYSQL_USER', 'user')}:{password}"
+        f"@{os.getenv('MYSQL_HOST', 'db')}:{os.getenv('MYSQL_PORT', '3306')}"
+        f"/{os.getenv('MYSQL_DATABASE', 'capstone_db')}"
+    )
+
+
+def _count(name):
+    def listener(*args):
+        _pool_counters[name] += 1
+    return listener
+
+
+def get_engine():
+    """Return the process-wide pooled engine, creating it on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = create_engine(
+                    build_db_url(),
+                    pool_size=int(os.getenv('DB_POOL_SIZE', '5')),
+                    max_overflow=int(os.getenv('DB_POOL_MAX_OVERFLOW', '10')),
+                    pool_timeout=int(os.getenv('DB_POOL_TIMEOUT', '30')),
+                    pool_recycle=int(os.getenv('DB_POOL_RECYCLE', '1800')),
+                    pool_pre_ping=True,  # replace connections MySQL closed while idle
+                    connect_args={"allow_local_infile": True}  # Enable LOAD DATA LOCAL INFILE
+                )
+                event.listen(engine, "connect", _count("connections_created"))
+                event.listen(engine, "checkout", _count("checkouts"))
+                event.listen(engine, "invalidate", _count("invalidated"))
+                _engine = engine
+    return _engine
+
+
+def pool_metrics() -> dict:
+    """Current pool usage plus counters since the engine was created."""
+    if _engine is None:
+        return {"initialized": False, **_pool_counters}
+    pool = _engine.pool
+    return {
+        "initialized": True,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        **_pool_counters
+    }
+
+
+def dispose_engine():
+    """Close every pooled connection (e.g. on shutdown or after fork)."""
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
+
+
 class DatabaseConnection:
     def __init__(self):
         self.connection = None
         try:
-            self.connection = mysql.connector.connect(
-                host=os.getenv('MYSQL_HOST', 'db'),
-                user=os.getenv('MYSQL_USER', 'user'),
-                password=os.getenv('MYSQL_PASSWORD', 'password'),
-                database=os.getenv('MYSQL_DATABASE', 'capstone_db'),
-                allow_local_infile=True  # Enable LOAD DATA LOCAL INFILE
-            )
+            # A pooled mysql-connector connection; close_connection returns it to the pool
+            self.connection = get_engine().raw_connection()
             print("Successfully connected to the database")
-        except Error as e:
+        except (Error, SQLAlchemyError) as e:
             print(f"Error connecting to MySQL Database: {e}")
 
     def get_connection(self):
         return self.connection
 
     def close_connection(self):
-        if self.connection and self.connection.is_connected():
+        if self.connection is not None:
             self.connection.close()
-            print("Database connection closed.")
+            self.connection = None
+            print("Database connection returned to the pool.")
@@ -0,0 +1,355 @@
+"""Versioned schema migrations for the tables behind query.py.
+
+Migrations are applied in order and recorded in ``schema_migrations``, so each
+runs once per database. A step is either a SQL string or a callable taking the
+cursor (for steps that depend on the current schema, e.g. indexes on tables
+that existed before the DDL was managed here):
+
+1. managed DDL for the email, retail and upload-log tables
+2. composite indexes for the ``BETWEEN`` date filters and name joins in query.py
+3. monthly RANGE partitioning of ``retail_data`` on ``sale_date``
+
+``check_query_plans`` runs EXPLAIN for every query.py statement and reports the
+tables each one reads without an index.
+
+Usage:
+    python -m src.database.migrations              # apply pending migrations
+    python -m src.database.migrations --check-plans
+"""
+import os
+import sys
+from datetime import date
+from typing import Callable, Dict, List, Tuple, Union
+
+Step = Union[str, Callable]
+
+RETAIL_PARTITION_MONTHS_AHEAD = int(os.getenv('RETAIL_PARTITION_MONTHS_AHEAD', '3'))
+
+TABLES = {
+    "file_upload_logs": """
+        CREATE TABLE IF NOT EXISTS file_upload_logs (
+            file_id INT AUTO_INCREMENT PRIMARY KEY,
+            file_name VARCHAR(255) NOT NULL,
+            file_type VARCHAR(50) NOT NULL,
+            no_rows INT NOT NULL DEFAULT 0,
+            user_id VARCHAR(255),
+            load_status TINYINT NOT NULL DEFAULT 0,
+            date_time DATETIME
+        )
+    """,
+    "email_delivery_details": """
+        CREATE TABLE IF NOT EXISTS email_delivery_details (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            email_content_name VARCHAR(255) NOT NULL,
+            send_date DATE,
+            sends INT,
+            deliveries INT,
+            bounces INT,
+            bounce_rate DOUBLE,
+            UNIQUE KEY uq_email_delivery (email_content_name, send_date)
+        )
+    """,
+    "email_engagement_details": """
+        CREATE TABLE IF NOT EXISTS email_engagement_details (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            message_name VARCHAR(255) NOT NULL,
+            campaign VARCHAR(255),
+            send_date DATE,
+            open_rate DOUBLE,
+            click_rate DOUBLE,
+            click_to_open_rate DOUBLE,
+            unsubscribe_rate DOUBLE,
+            unique_opens INT,
+            unique_clicks INT,
+            unique_unsubscribes INT,
+            UNIQUE KEY uq_email_engagement (message_name, send_date)
+        )
+    """,
+    "email_campaign_performance": """
+        CREATE TABLE IF NOT EXISTS email_campaign_performance (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            email_content_name VARCHAR(255) NOT NULL,
+            email_subject VARCHAR(500),
+            sends INT,
+            open_rate DOUBLE,
+            click_to_open_rate DOUBLE,
+            UNIQUE KEY uq_email_campaign (email_content_name)
+        )
+    """,
+    # No unique keys, so the table can be partitioned on sale_date (MySQL requires the
+    # partitioning column in every unique key) and rows with unparseable dates still load
+    "retail_data": """
+        CREATE TABLE IF NOT EXISTS retail_data (
+            id BIGINT NOT NULL AUTO_INCREMENT,
+            sale_date_time DATETIME,
+            sale_date DATE,
+            store_format VARCHAR(100),
+            command_name VARCHAR(100),
+            site_id VARCHAR(50),
+            site_name VARCHAR(255),
+            slip_no VARCHAR(50),
+            line INT,
+            item_id BIGINT,
+            item_desc VARCHAR(255),
+            extension_amount DECIMAL(12, 2),
+            qty DECIMAL(12, 3),
+            return_ind VARCHAR(10),
+            price_status VARCHAR(50),
+            file_id INT,
+            load_status TINYINT,
+            KEY idx_retail_id (id)
+        )
+    """
+}
+
+# (table, index name, columns) for the access patterns in query.py
+INDEXES = [
+    ("retail_data", "idx_retail_sale_date_site", "sale_date, site_name"),
+    ("retail_data", "idx_retail_file", "file_id"),
+    ("email_engagement_details", "idx_engagement_send_date_message", "send_date, message_name"),
+    ("email_engagement_details", "idx_engagement_message_send_date", "message_name, send_date"),
+    ("email_delivery_details", "idx_delivery_send_date_name", "send_date, email_content_name"),
+    ("email_campaign_performance", "idx_campaign_content_name", "email_content_name"),
+    ("file_upload_logs", "idx_upload_logs_type_status", "file_type, load_status"),
+]
+
+
+def _table_exists(cursor, table: str) -> bool:
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (table,))
+    return cursor.fetchone()[0] > 0
+
+
+def _indexed_column_lists(cursor, table: str) -> List[List[str]]:
+    """The column list of every index on ``table``."""
+    cursor.execute("""
+        SELECT INDEX_NAME, COLUMN_NAME FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        ORDER BY INDEX_NAME, SEQ_IN_INDEX
+    """, (table,))
+    indexes = {}
+    for index_name, column in cursor.fetchall():
+        indexes.setdefault(index_name, []).append(column.lower())
+    return list(indexes.values())
+
+
+def _add_indexes(cursor):
+    """Create the query.py indexes unless an existing index already starts with the same columns."""
+    for table, name, columns in INDEXES:
+        if not _table_exists(cursor, table):
+            continue
+        wanted = [column.strip() for column in columns.split(",")]
+        if any(existing[:len(wanted)] == wanted for existing in _indexed_column_lists(cursor, table)):
+            continue
+        cursor.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+        print(f"Created index {name} on {table} ({columns})")
+
+
+def _next_month(day: date) -> date:
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def _add_months(day: date, months: int) -> date:
+    for _ in range(months):
+        day = _next_month(day)
+    return day
+
+
+def _month_partitions(first_month: date, through: date) -> List[str]:
+    """PARTITION clauses for each month from ``first_month`` through ``through``'s month."""
+    clauses, month = [], first_month
+    while month <= through:
+        upper = _next_month(month)
+        clauses.append(f"PARTITION p{month:%Y%m} VALUES LESS THAN ('{upper:%Y-%m-%d}')")
+        month = upper
+    return clauses
+
+
+def retail_partitions(cursor) -> List[str]:
+    """Names of retail_data's partitions, in order (empty if it isn't partitioned)."""
+    cursor.execute("""
+        SELECT PARTITION_NAME FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'retail_data' AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """)
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _partition_retail_data(cursor):
+    """Partition retail_data by sale_date month, from its first month to a few months ahead."""
+    if retail_partitions(cursor):
+        return
+    cursor.execute("""
+        SELECT DISTINCT s.INDEX_NAME FROM information_schema.STATISTICS s
+        WHERE s.TABLE_SCHEMA = DATABASE() AND s.TABLE_NAME = 'retail_data' AND s.NON_UNIQUE = 0
+          AND NOT EXISTS (
+              SELECT 1 FROM information_schema.STATISTICS k
+              WHERE k.TABLE_SCHEMA = s.TABLE_SCHEMA AND k.TABLE_NAME = s.TABLE_NAME
+                AND k.INDEX_NAME = s.INDEX_NAME AND k.COLUMN_NAME = 'sale_date'
+          )
+    """)
+    blocking = [row[0] for row in cursor.fetchall()]
+    if blocking:
+        print(f"Skipping retail_data partitioning: unique keys {', '.join(blocking)} do not include sale_date")
+        return
+
+    cursor.execute("SELECT MIN(sale_date) FROM retail_data")
+    first_sale = cursor.fetchone()[0] or date.today()
+    first_month = first_sale.replace(day=1)
+    through = _add_months(date.today().replace(day=1), RETAIL_PARTITION_MONTHS_AHEAD)
+    partitions = (
+        [f"PARTITION p_start VALUES LESS THAN ('{first_month:%Y-%m-%d}')"]
+        + _month_partitions(first_month, through)
+        + ["PARTITION p_future VALUES LESS THAN (MAXVALUE)"]
+    )
+    cursor.execute(f"ALTER TABLE retail_data PARTITION BY RANGE COLUMNS(sale_date) ({', '.join(partitions)})")
+    print(f"Partitioned retail_data into {len(partitions)} partitions")
+
+
+def ensure_retail_partitions(cursor, through: date = None):
+    """Split p_future so retail_data has monthly partitions through ``through``'s month.
+
+    No-op if retail_data isn't partitioned. DDL commits implicitly, so call this
+    before a load's transaction starts.
+    """
+    months = [name for name in retail_partitions(cursor) if name.startswith("p") and name[1:].isdigit()]
+    if not months:
+        return
+    through = through or _add_months(date.today().replace(day=1), RETAIL_PARTITION_MONTHS_AHEAD)
+    last = date(int(months[-1][1:5]), int(months[-1][5:]), 1)
+    partitions = _month_partitions(_next_month(last), through)
+    if not partitions:
+        return
+    partitions.append("PARTITION p_future VALUES LESS THAN (MAXVALUE)")
+    cursor.execute(f"ALTER TABLE retail_data REORGANIZE PARTITION p_future INTO ({', '.join(partitions)})")
+    print(f"Added {len(partitions) - 1} monthly retail_data partitions")
+
+
+MIGRATIONS: List[Tuple[int, str, List[Step]]] = [
+    (1, "Managed DDL for email, retail and upload log tables", list(TABLES.values())),
+    (2, "Indexes for query.py date filters and joins", [_add_indexes]),
+    (3, "Partition retail_data by month", [_partition_retail_data]),
+]
+
+
+def applied_versions(cursor) -> set:
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            applied_at DATETIME NOT NULL
+        )
+    """)
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def apply_migrations(connection) -> List[int]:
+    """Apply pending migrations in order; returns the versions applied.
+
+    A named lock keeps concurrent app workers from migrating at the same time.
+    """
+    cursor = connection.cursor()
+    cursor.execute("SELECT GET_LOCK('schema_migrations', 60)")
+    if cursor.fetchone()[0] != 1:
+        cursor.close()
+        raise RuntimeError("Timed out waiting for the schema migration lock")
+    applied = []
+    try:
+        done = applied_versions(cursor)
+        for version, description, steps in MIGRATIONS:
+            if version in done:
+                continue
+            print(f"Applying migration {version}: {description}")
+            for step in steps:
+                if callable(step):
+                    step(cursor)
+                else:
+                    cursor.execute(step)
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, description, applied_at) VALUES (%s, %s, NOW())",
+                (version, description)
+            )
+            connection.commit()
+            applied.append(version)
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK('schema_migrations')")
+        cursor.fetchall()
+        cursor.close()
+    return applied
+
+
+# =============================================================================
+# QUERY PLAN CHECK
+# =============================================================================
+
+# Statements that summarize whole tables by design
+FULL_SCAN_QUERIES = {"DATA_QUALITY_CHECK", "DATE_RANGE_VALIDATION"}
+# Tables small enough that a scan is cheaper than an index (one row per platform and month)
+SMALL_TABLES = {"social_media_performance"}
+
+
+def query_statements(module) -> Dict[str, str]:
+    """The SQL statements defined as upper-case string constants in ``module`` (query.py).
+
+    Private names (``_CHANNEL_DAILY_CTES``) are fragments shared by statements, not statements.
+    """
+    return {
+        name: value for name, value in vars(module).items()
+        if name.isupper() and not name.startswith("_") and isinstance(value, str) and "SELECT" in value
+    }
+
+
+def query_params(name: str, sql: str, start_date: str, end_date: str) -> tuple:
+    """Sample parameters for EXPLAIN, bound the way the report queries are run."""
+    import query
+
+    return query.bind_params(name, start_date, end_date, sql)
+
+
+def full_scans(plan: List[dict]) -> List[str]:
+    """Base tables an EXPLAIN plan reads with a full scan and no usable index."""
+    return [
+        row["table"] for row in plan
+        if row.get("type") == "ALL" and not row.get("key")
+        and row.get("table") and not row["table"].startswith("<")  # <derivedN>, <union...>
+        and row["table"] not in SMALL_TABLES
+    ]
+
+
+def check_query_plans(connection, statements: Dict[str, str], start_date: str, end_date: str) -> Dict[str, List[str]]:
+    """EXPLAIN each statement; returns {query name: tables read without an index}."""
+    problems = {}
+    cursor = connection.cursor(dictionary=True)
+    try:
+        for name, sql in statements.items():
+            if name in FULL_SCAN_QUERIES:
+                continue
+            cursor.execute("EXPLAIN " + sql.strip().rstrip(";"), query_params(name, sql, start_date, end_date))
+            scans = full_scans(cursor.fetchall())
+            if scans:
+                problems[name] = scans
+    finally:
+        cursor.close()
+    return problems
+
+
+if __name__ == "__main__":
+    from .db_connection import DatabaseConnection
+
+    db = DatabaseConnection()
+    try:
+        if "--check-plans" in sys.argv:
+            import query
+
+            problems = check_query_plans(db.get_connection(), query_statements(query), "2024-01-01", "2024-12-31")
+            for name, tables in problems.items():
+                print(f"{name}: full scan of {', '.join(tables)}")
+            print("All query.py statements use indexes" if not problems else f"{len(problems)} queries need an index")
+            sys.exit(1 if problems else 0)
+        applied = apply_migrations(db.get_connection())
+        print(f"Applied migrations: {applied}" if applied else "Schema is up to date")
+    finally:
+        db.close_connection()
@@ -0,0 +1,155 @@
+"""Precomputed retail rollups.
+
+The analytics queries in query.py used to aggregate raw ``retail_data`` line
+items on every call (a full scan for ``DATE_FORMAT(sale_date, ...)`` groupings).
+They now read these much smaller tables instead:
+
+- ``retail_sales_daily``: sales, quantity and line counts per
+  day x site x store_format x command_name
+- ``retail_sales_monthly``: the same per month, for month-aligned periods
+- ``retail_items_daily``: the items sold per day x site x store_format x
+  command_name, for exact ``COUNT(DISTINCT item_id)`` over any date range
+
+Every rollup row carries the ``file_id`` it came from, so loading a retail file
+only aggregates that file's rows (``refresh_retail_rollups``), in the same
+transaction as the load. Queries sum across files.
+"""
+from typing import List
+
+ROLLUP_TABLES = {
+    "retail_sales_daily": """
+        CREATE TABLE IF NOT EXISTS retail_sales_daily (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            file_id INT NOT NULL,
+            sale_date DATE NOT NULL,
+            site_id VARCHAR(50),
+            site_name VARCHAR(255),
+            store_format VARCHAR(100),
+            command_name VARCHAR(100),
+            total_sales DECIMAL(18, 2),
+            total_quantity DECIMAL(18, 3),
+            line_count INT NOT NULL,
+            priced_line_count INT NOT NULL,
+            KEY idx_retail_sales_daily_date (sale_date, store_format, command_name),
+            KEY idx_retail_sales_daily_file (file_id)
+        )
+    """,
+    "retail_sales_monthly": """
+        CREATE TABLE IF NOT EXISTS retail_sales_monthly (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            file_id INT NOT NULL,
+            month CHAR(7) NOT NULL,
+            site_id VARCHAR(50),
+            site_name VARCHAR(255),
+            store_format VARCHAR(100),
+            command_name VARCHAR(100),
+            total_sales DECIMAL(18, 2),
+            total_quantity DECIMAL(18, 3),
+            line_count INT NOT NULL,
+            priced_line_count INT NOT NULL,
+            first_sale_date DATE,
+            last_sale_date DATE,
+            KEY idx_retail_sales_monthly_month (month, store_format, command_name),
+            KEY idx_retail_sales_monthly_file (file_id)
+        )
+    """,
+    "retail_items_daily": """
+        CREATE TABLE IF NOT EXISTS retail_items_daily (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            file_id INT NOT NULL,
+            sale_date DATE NOT NULL,
+            site_id VARCHAR(50),
+            site_name VARCHAR(255),
+            store_format VARCHAR(100),
+            command_name VARCHAR(100),
+            item_id BIGINT NOT NULL,
+            line_count INT NOT NULL,
+            KEY idx_retail_items_daily_date (sale_date, item_id),
+            KEY idx_retail_items_daily_file (file_id)
+        )
+    """
+}
+
+# Statements run in order for one file_id; the monthly rollup is built from the
+# daily one rather than from retail_data
+REFRESH_STATEMENTS = [
+    """
+    INSERT INTO retail_sales_daily (file_id, sale_date, site_id, site_name, store_format, command_name,
+                                    total_sales, total_quantity, line_count, priced_line_count)
+    SELECT file_id, sale_date, site_id, MAX(site_name), store_format, command_name,
+           SUM(extension_amount), SUM(qty), COUNT(*), COUNT(extension_amount)
+    FROM retail_data
+    WHERE file_id = %s AND sale_date IS NOT NULL
+    GROUP BY file_id, sale_date, site_id, store_format, command_name
+    """,
+    """
+    INSERT INTO retail_sales_monthly (file_id, month, site_id, site_name, store_format, command_name,
+                                      total_sales, total_quantity, line_count, priced_line_count,
+                                      first_sale_date, last_sale_date)
+    SELECT file_id, DATE_FORMAT(sale_date, '%Y-%m'), site_id, MAX(site_name), store_format, command_name,
+           SUM(total_sales), SUM(total_quantity), SUM(line_count), SUM(priced_line_count),
+           MIN(sale_date), MAX(sale_date)
+    FROM retail_sales_daily
+    WHERE file_id = %s
+    GROUP BY file_id, DATE_FORMAT(sale_date, '%Y-%m'), site_id, store_format, command_name
+    """,
+    """
+    INSERT INTO retail_items_daily (file_id, sale_date, site_id, site_name, store_format, command_name,
+                                    item_id, line_count)
+    SELECT file_id, sale_date, site_id, MAX(site_name), store_format, command_name, item_id, COUNT(*)
+    FROM retail_data
+    WHERE file_id = %s AND sale_date IS NOT NULL AND item_id IS NOT NULL
+    GROUP BY file_id, sale_date, site_id, store_format, command_name, item_id
+    """
+]
+
+
+def ensure_rollup_tables(cursor):
+    """Create the rollup tables if they don't exist yet.
+
+    DDL commits implicitly in MySQL, so call this before a load's transaction starts.
+    """
+    for ddl in ROLLUP_TABLES.values():
+        cursor.execute(ddl)
+
+
+def remove_retail_rollups(cursor, file_id: int):
+    """Drop one file's contribution from every rollup."""
+    for table in ROLLUP_TABLES:
+        cursor.execute(f"DELETE FROM {table} WHERE file_id = %s", (file_id,))
+
+
+def refresh_retail_rollups(cursor, file_id: int):
+    """(Re)aggregate one retail file into the rollups; the caller commits.
+
+    Safe to re-run: the file's previous rollup rows are removed first.
+    """
+    remove_retail_rollups(cursor, file_id)
+    for statement in REFRESH_STATEMENTS:
+        cursor.execute(statement, (file_id,))
+
+
+def rebuild_retail_rollups(connection) -> List[int]:
+    """Backfill the rollups for every retail file already loaded; returns the file_ids."""
+    cursor = connection.cursor()
+    try:
+        ensure_rollup_tables(cursor)
+        cursor.execute("SELECT DISTINCT file_id FROM retail_data ORDER BY file_id")
+        file_ids = [row[0] for row in cursor.fetchall()]
+        for file_id in file_ids:
+            refresh_retail_rollups(cursor, file_id)
+            connection.commit()
+            print(f"Rebuilt retail rollups for file_id {file_id}")
+        return file_ids
+    finally:
+        cursor.close()
+
+
+if __name__ == "__main__":
+    from .db_connection import DatabaseConnection
+
+    db = DatabaseConnection()
+    try:
+        rebuild_retail_rollups(db.get_connection())
+    finally:
+        db.close_connection()
@@ -1,9 +1,18 @@
 import sys
+import os
+import argparse
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pandas.tseries.api import guess_datetime_format
 import traceback
 from pathlib import Path
 
+# Files larger than this are converted batch by batch even without --stream
+STREAM_THRESHOLD_BYTES = int(os.getenv('PARQUET_STREAM_THRESHOLD_MB', '256')) * 1024 * 1024
+DEFAULT_BATCH_ROWS = 250_000
+
 def validate_file_path(parquet_path):
     """Validate the parquet file exists and is readable."""
     print(f"Validating file path: {parquet_path}", flush=True)
@@ -49,7 +58,7 @@ def check_null_values(df):
                 percentage = (null_count / len(df)) * 100
                 print(f"Warning: Column '{col}' has {null_count:,} null values ({percentage:.2f}%)", flush=True)
 
-def clean_data(df):
+def clean_data(df, verbose=True):
     """Apply basic data cleaning."""
     original_rows = len(df)
     
@@ -72,19 +81,25 @@ def clean_data(df):
         df['ITEM_ID'] = df['ITEM_ID'].astype('Int64')
     
     rows_removed = original_rows - len(df)
-    if rows_removed > 0:
+    if rows_removed > 0 and verbose:
         print(f"Removed {rows_removed:,} rows during preprocessing", flush=True)
     
     return df
 
-def normalize_date_formats(df):
-    """Normalize date formats to standardized formats for MySQL loading."""
-    print("Normalizing date formats...", flush=True)
+def normalize_date_formats(df, verbose=True, formats=None):
+    """Normalize date formats to standardized formats for MySQL loading.
+
+    ``formats`` optionally fixes the input format per column (streaming mode uses
+    it so every batch parses dates the same way the whole file would).
+    """
+    formats = formats or {}
+    if verbose:
+        print("Normalizing date formats...", flush=True)
     
     # Process SALE_DATE_TIME using vectorized operations (much faster)
     if 'SALE_DATE_TIME' in df.columns:
         original_nulls = df['SALE_DATE_TIME'].isna().sum()
-        df['SALE_DATE_TIME'] = pd.to_datetime(df['SALE_DATE_TIME'], errors='coerce')
+        df['SALE_DATE_TIME'] = pd.to_datetime(df['SALE_DATE_TIME'], errors='coerce', format=formats.get('SALE_DATE_TIME'))
         df['SALE_DATE_TIME'] = df['SALE_DATE_TIME'].dt.strftime('%Y-%m-%d %H:%M:%S').fillna('')
         new_nulls = (df['SALE_DATE_TIME'] == '').sum()
         if new_nulls > original_nulls:
@@ -93,24 +108,95 @@ def normalize_date_formats(df):
     # Process SALE_DATE using vectorized operations
     if 'SALE_DATE' in df.columns:
         original_nulls = df['SALE_DATE'].isna().sum()
-        df['SALE_DATE'] = pd.to_datetime(df['SALE_DATE'], errors='coerce')
+        df['SALE_DATE'] = pd.to_datetime(df['SALE_DATE'], errors='coerce', format=formats.get('SALE_DATE'))
         df['SALE_DATE'] = df['SALE_DATE'].dt.strftime('%Y-%m-%d').fillna('')
         new_nulls = (df['SALE_DATE'] == '').sum()
         if new_nulls > original_nulls:
             print(f"  Warning: {new_nulls - original_nulls:,} SALE_DATE values could not be parsed", flush=True)
     
-    print("Date normalization complete", flush=True)
+    if verbose:
+        print("Date normalization complete", flush=True)
     return df
 
+def _infer_date_formats(df, formats):
+    """Fix each text date column's format from its first value, as pandas does for a whole file."""
+    for col in ['SALE_DATE_TIME', 'SALE_DATE']:
+        if col in formats or col not in df.columns or pd.api.types.is_datetime64_any_dtype(df[col]):
+            continue
+        values = df[col].dropna()
+        if len(values):
+            formats[col] = guess_datetime_format(str(values.iloc[0]))
+    return formats
+
+def _nullable_integers(arrow_type):
+    """Keep integer columns as integers when a batch has nulls (pandas would make them floats)."""
+    if pa.types.is_integer(arrow_type):
+        return pd.Int64Dtype()
+    return None
+
+def convert_streaming(parquet_path, csv_path, batch_rows=DEFAULT_BATCH_ROWS):
+    """Convert batch by batch so peak memory is bounded by ``batch_rows``, not the file size."""
+    parquet_file = pq.ParquetFile(parquet_path)
+    total_rows = parquet_file.metadata.num_rows
+    print(f"Streaming {total_rows:,} rows in batches of {batch_rows:,} "
+          f"({parquet_file.num_row_groups} row groups)", flush=True)
+    check_required_columns(pd.DataFrame(columns=parquet_file.schema_arrow.names))
+
+    date_columns = [name for name in parquet_file.schema_arrow.names if name.upper() in ['SALE_DATE', 'SALE_DATE_TIME']]
+    null_counts = dict.fromkeys(date_columns, 0)
+    date_formats = {}
+    rows_read = rows_written = 0
+
+    with open(csv_path, 'w', newline='') as output:
+        for batch_number, batch in enumerate(parquet_file.iter_batches(batch_size=batch_rows), start=1):
+            df = batch.to_pandas(types_mapper=_nullable_integers)
+            rows_read += len(df)
+            for col in date_columns:
+                null_counts[col] += int(df[col].isnull().sum())
+
+            df = clean_data(df, verbose=False)
+            df = normalize_date_formats(df, verbose=False, formats=_infer_date_formats(df, date_formats))
+            df.to_csv(output, index=False, header=batch_number == 1)
+            rows_written += len(df)
+            print(f"  Batch {batch_number}: {rows_read:,}/{total_rows:,} rows read, "
+                  f"{rows_written:,} written", flush=True)
+
+    for col, null_count in null_counts.items():
+        if null_count > 0:
+            percentage = (null_count / rows_read) * 100 if rows_read else 0
+            print(f"Warning: Column '{col}' has {null_count:,} null values ({percentage:.2f}%)", flush=True)
+    if rows_read > rows_written:
+        print(f"Removed {rows_read - rows_written:,} rows during preprocessing", flush=True)
+    return rows_written
+
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python convert_parquet_to_csv.py <path_to_parquet_file>", flush=True)
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        usage="python convert_parquet_to_csv.py <path_to_parquet_file> [--stream] [--batch-rows N]"
+    )
+    parser.add_argument("parquet_path")
+    parser.add_argument("--stream", action="store_true",
+                        help="convert batch by batch (automatic for files over PARQUET_STREAM_THRESHOLD_MB)")
+    parser.add_argument("--batch-rows", type=int, default=DEFAULT_BATCH_ROWS)
+    args = parser.parse_args()
 
-    parquet_path = Path(sys.argv[1])
+    parquet_path = Path(args.parquet_path)
     
     # Validate file
     validate_file_path(parquet_path)
+    csv_path = parquet_path.with_suffix(".csv")
+
+    if args.stream or parquet_path.stat().st_size > STREAM_THRESHOLD_BYTES:
+        print(f"Streaming parquet file: {parquet_path.name} -> {csv_path.name}", flush=True)
+        try:
+            rows_written = convert_streaming(parquet_path, csv_path, args.batch_rows)
+            print(f"Conversion complete: {rows_written:,} rows written", flush=True)
+        except Exception as e:
+            print(f"Error converting parquet file: {e}", flush=True)
+            traceback.print_exc()
+            sys.exit(1)
+        # Output the path (for the bash script to capture)
+        print(csv_path, flush=True)
+        return
     
     # Read parquet file
     print(f"Reading parquet file: {parquet_path.name}", flush=True)
@@ -133,7 +219,6 @@ def main():
     df = normalize_date_formats(df)
     
     # Convert to CSV
-    csv_path = parquet_path.with_suffix(".csv")
     print(f"Writing CSV file: {csv_path.name}", flush=True)
     
     try:
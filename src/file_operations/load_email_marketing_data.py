@@ -3,95 +3,223 @@ import mysql.connector
 from mysql.connector import Error
 from datetime import datetime
 import os
-import subprocess
-import sys
-import tempfile
-import boto3
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
 from botocore.exceptions import NoCredentialsError, ClientError
 from dotenv import load_dotenv
-from ..database.db_connection import DatabaseConnection
-from .load_social_media_data import SocialMediaDataLoader
-from sqlalchemy import create_engine
+from ..database.db_connection import DatabaseConnection, get_engine
+from ..database.bulk_upsert import upsert_dataframe
+from .load_social_media_data import PARSE_POOL_CONTEXT, SocialMediaDataLoader
+from .retail_loader import load_retail_file
+from .s3_downloader import S3DownloadError, S3Downloader, remove_temp_files
 
 load_dotenv()
 
+# "sequential" loads one file after another; "parallel" loads all files at once
+LOAD_MODE = os.getenv('SUPPORTING_DATA_LOAD_MODE', 'sequential').lower()
+
+@contextmanager
+def _print_stage(name):
+    """Default stage timer for load_all_data; yields a record the caller may add "rows" to"""
+    record = {"name": name, "rows": None}
+    start = time.perf_counter()
+    yield record
+    print(f"Stage {name} finished in {time.perf_counter() - start:.2f}s (rows: {record['rows']})")
+
+def clean_numeric(value):
+    """Convert string percentages/rates to decimal"""
+    if isinstance(value, str):
+        if '%' in value:
+            return float(value.replace('%', '')) / 100
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return value
+
+def parse_delivery_details(path):
+    """Read and clean the 'Email Deliveries Details' sheet (module-level so it can run in a process pool)"""
+    df = pd.read_excel(path, sheet_name='Email Deliveries Details', engine='openpyxl')
+    # Skip header rows
+    start_row = None
+    for idx, row in df.iterrows():
+        if str(row.iloc[0]).strip().lower() == 'email content name':
+            start_row = idx + 1
+            break
+
+    if start_row is None:
+        raise ValueError("Could not find data start for delivery details")
+
+    df = df.iloc[start_row:].reset_index(drop=True)
+    df.columns = ['email_content_name', 'send_date', 'sends', 'deliveries', 'bounces', 'bounce_rate']
+
+    # Clean data
+    df['send_date'] = pd.to_datetime(df['send_date'], errors='coerce').dt.date
+    df['sends'] = pd.to_numeric(df['sends'], errors='coerce').astype('Int64')
+    df['deliveries'] = pd.to_numeric(df['deliveries'], errors='coerce').astype('Int64')
+    df['bounces'] = pd.to_numeric(df['bounces'], errors='coerce').astype('Int64')
+    df['bounce_rate'] = df['bounce_rate'].apply(clean_numeric)
+
+    # Remove empty rows
+    return df.dropna(subset=['email_content_name'])
+
+def parse_engagement_details(path):
+    """Read and clean the 'Email Engagement Details' sheet"""
+    # Read Excel file, skip the first 4 rows (widget metadata), use row 4 as header
+    df = pd.read_excel(path, sheet_name='Email Engagement Details', engine='openpyxl', header=4)
+
+    # Clean column names
+    df.columns = [str(col).strip().lower().replace(' ', '_') for col in df.columns]
+
+    # Rename columns to match expected names
+    column_mapping = {
+        'message_name': 'message_name',
+        'campaign': 'campaign',
+        'send_date': 'send_date',
+        'open_rate': 'open_rate',
+        'click_rate': 'click_rate',
+        'click_to_open_rate': 'click_to_open_rate',
+        'unsubscribe_rate': 'unsubscribe_rate',
+        'unique_opens': 'unique_opens',
+        'unique_clicks': 'unique_clicks',
+        'unique_unsubscribes': 'unique_unsubscribes'
+    }
+
+    # Keep only expected columns that exist in the dataframe
+    available_cols = [col for col in column_mapping.keys() if col in df.columns]
+    df = df[available_cols]
+    df = df.rename(columns={k: v for k, v in column_mapping.items() if k in available_cols})
+
+    # Clean data
+    df['send_date'] = pd.to_datetime(df['send_date'], errors='coerce').dt.date
+    df['unique_opens'] = pd.to_numeric(df['unique_opens'], errors='coerce').astype('Int64')
+    df['unique_clicks'] = pd.to_numeric(df['unique_clicks'], errors='coerce').astype('Int64')
+    df['unique_unsubscribes'] = pd.to_numeric(df['unique_unsubscribes'], errors='coerce').astype('Int64')
+    df['open_rate'] = df['open_rate'].apply(clean_numeric)
+    df['click_rate'] = df['click_rate'].apply(clean_numeric)
+    df['click_to_open_rate'] = df['click_to_open_rate'].apply(clean_numeric)
+    df['unsubscribe_rate'] = df['unsubscribe_rate'].apply(clean_numeric)
+
+    # Remove empty rows and rows with NaN in key columns
+    df = df.dropna(subset=['message_name'])
+    df = df[df['message_name'].notna()]
+
+    # Filter out rows where message_name is 'nan' (string), empty, or contains widget metadata
+    df = df[
+        (df['message_name'].astype(str).str.lower() != 'nan') &
+        (df['message_name'].astype(str).str.strip() != '') &
+        (~df['message_name'].astype(str).str.contains('widget', case=False, na=False)) &
+        (~df['message_name'].astype(str).str.contains('unnamed', case=False, na=False))
+    ]
+    return df
+
+def parse_campaign_performance(path):
+    """Read and clean the 'Email Performance Email Sends T' sheet"""
+    # Read Excel file, skip the first 4 rows (widget metadata), use row 4 as header
+    df = pd.read_excel(path, sheet_name='Email Performance Email Sends T', engine='openpyxl', header=4)
+
+    # Clean column names
+    df.columns = [str(col).strip().lower().replace(' ', '_') for col in df.columns]
+
+    # Rename columns to match expected names
+    column_mapping = {
+        'email_content_name': 'email_content_name',
+        'email_subject': 'email_subject',
+        'sends': 'sends',
+        'open_rate': 'open_rate',
+        'click_to_open_rate': 'click_to_open_rate'
+    }
+
+    # Keep only expected columns that exist in the dataframe
+    available_cols = [col for col in column_mapping.keys() if col in df.columns]
+    df = df[available_cols]
+    df = df.rename(columns={k: v for k, v in column_mapping.items() if k in available_cols})
+
+    # Clean data
+    df['sends'] = pd.to_numeric(df['sends'], errors='coerce').astype('Int64')
+    df['open_rate'] = df['open_rate'].apply(clean_numeric)
+    df['click_to_open_rate'] = df['click_to_open_rate'].apply(clean_numeric)
+
+    # Remove empty rows and rows with NaN in key columns
+    df = df.dropna(subset=['email_content_name'])
+    df = df[df['email_content_name'].notna()]
+
+    # Filter out rows where email_content_name is 'nan' (string), empty, or contains widget metadata
+    df = df[
+        (df['email_content_name'].astype(str).str.lower() != 'nan') &
+        (df['email_content_name'].astype(str).str.strip() != '') &
+        (~df['email_content_name'].astype(str).str.contains('widget', case=False, na=False)) &
+        (~df['email_content_name'].astype(str).str.contains('unnamed', case=False, na=False))
+    ]
+    return df
+
+# Email workbook parsers by file type, run in a process pool by the parallel load mode
+EMAIL_PARSERS = {
+    "email_delivery": parse_delivery_details,
+    "email_engagement": parse_engagement_details,
+    "email_performance": parse_campaign_performance
+}
+
+class SupportingDataLoadError(Exception):
+    """One or more files failed to load; the other files were still loaded."""
+    def __init__(self, failures):
+        super().__init__("; ".join(f"{file_type}: {error}" for file_type, error in failures.items()))
+        self.failures = failures
+
 class SupportingDataLoader:
-    def __init__(self, deliveries_file_path=None, engagement_file_path=None, performance_file_path=None, social_media_file_path=None, retail_file_path=None, s3_bucket=None, user_id=None):
+    def __init__(self, deliveries_file_path=None, engagement_file_path=None, performance_file_path=None, social_media_file_path=None, retail_file_path=None, s3_bucket=None, user_id=None, parse_workers=0):
         self.db = DatabaseConnection()
         self.s3_bucket = s3_bucket
         self.user_id = user_id or "System"  # Default to "System" if not provided
+        self.parse_workers = parse_workers  # > 1 parses social media sheets in a process pool
         self.temp_files = []  # Track temporary files for cleanup
+        self.row_counts = {}  # file_type -> rows loaded, filled in by log_file_upload
 
-        # Download files from S3 if bucket is provided and paths look like S3 keys
-        self.deliveries_file = self._resolve_file_path(deliveries_file_path)
-        self.engagement_file = self._resolve_file_path(engagement_file_path)
-        self.performance_file = self._resolve_file_path(performance_file_path)
-        self.social_media_file = self._resolve_file_path(social_media_file_path)
-        self.retail_file = self._resolve_file_path(retail_file_path)
+        # Download files from S3 (concurrently) if bucket is provided and paths look like S3 keys
+        paths = self._resolve_file_paths([
+            deliveries_file_path, engagement_file_path, performance_file_path,
+            social_media_file_path, retail_file_path
+        ])
+        (self.deliveries_file, self.engagement_file, self.performance_file,
+         self.social_media_file, self.retail_file) = paths
 
-    def _resolve_file_path(self, file_path):
-        """Resolve file path - download from S3 if needed, otherwise return as-is"""
-        if not file_path or not self.s3_bucket:
-            return file_path
+    def _resolve_file_paths(self, file_paths):
+        """Resolve file paths - download S3 keys concurrently if a bucket is set, otherwise return as-is"""
+        if not self.s3_bucket:
+            return file_paths
 
         # Download from S3 if bucket is provided and file_path is a non-empty string
-        if isinstance(file_path, str) and file_path.strip():
-            try:
-                return self._download_from_s3(file_path)
-            except Exception as e:
-                error_msg = f"Failed to download {file_path} from S3: {e}"
-                print(error_msg)
-                # Re-raise the exception so it propagates to the caller
-                raise Exception(error_msg)
-        return file_path
-
-    def _download_from_s3(self, s3_key):
-        """Download file from S3 and return local path"""
+        keys = [path for path in file_paths if isinstance(path, str) and path.strip()]
         try:
-            s3_client = boto3.client('s3')
-
-            # Extract the original filename from the S3 key and create temp file with same name
-            original_filename = os.path.basename(s3_key)
-            temp_dir = tempfile.gettempdir()
-            temp_path = os.path.join(temp_dir, original_filename)
-
-            # Download the file
-            s3_client.download_file(self.s3_bucket, s3_key, temp_path)
-
-            # Track for cleanup
-            self.temp_files.append(temp_path)
-
-            print(f"Downloaded {s3_key} from S3 bucket {self.s3_bucket} to {temp_path}")
-            return temp_path
-
-        except NoCredentialsError:
-            raise Exception("AWS credentials not found")
-        except ClientError as e:
-            raise Exception(f"S3 download failed: {e}")
-        except Exception as e:
-            raise Exception(f"Unexpected error downloading from S3: {e}")
+            downloads = S3Downloader(self.s3_bucket).download_all(keys)
+        except S3DownloadError as e:
+            error_msg = f"Failed to download {e.key} from S3: {self._describe_s3_error(e.error)}"
+            print(error_msg)
+            # Re-raise the exception so it propagates to the caller
+            raise Exception(error_msg)
+
+        self.temp_files.extend(path for path, is_temp in downloads.values() if is_temp)
+        return [downloads[path][0] if path in downloads else path for path in file_paths]
+
+    @staticmethod
+    def _describe_s3_error(error):
+        if isinstance(error, NoCredentialsError):
+            return "AWS credentials not found"
+        if isinstance(error, ClientError):
+            return f"S3 download failed: {error}"
+        return f"Unexpected error downloading from S3: {error}"
 
     def cleanup_temp_files(self):
-        """Clean up temporary files downloaded from S3"""
+        """Clean up temporary files downloaded from S3 (cached copies are kept)"""
+        remove_temp_files(self.temp_files)
         for temp_file in self.temp_files:
-            try:
-                if os.path.exists(temp_file):
-                    os.unlink(temp_file)
-                    print(f"Cleaned up temporary file: {temp_file}")
-            except Exception as e:
-                print(f"Failed to cleanup {temp_file}: {e}")
+            print(f"Cleaned up temporary file: {temp_file}")
         self.temp_files = []
 
     def clean_numeric(self, value):
         """Convert string percentages/rates to decimal"""
-        if isinstance(value, str):
-            if '%' in value:
-                return float(value.replace('%', '')) / 100
-            try:
-                return float(value)
-            except ValueError:
-                return None
-        return value
+        return clean_numeric(value)
 
     def clean_date(self, date_str):
         """Convert date string to YYYY-MM-DD format"""
@@ -141,20 +269,11 @@ class SupportingDataLoader:
             connection = self.db.get_connection()
             cursor = connection.cursor()
 
-            for _, row in df.iterrows():
-                if pd.notna(row['date']):
-                    cursor.execute("""
-                        INSERT INTO email_delivery_daily
-                        (date, sends, deliveries, delivery_rate, bounces, bounce_rate)
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                        ON DUPLICATE KEY UPDATE
-                        sends=VALUES(sends), deliveries=VALUES(deliveries),
-                        delivery_rate=VALUES(delivery_rate), bounces=VALUES(bounces),
-                        bounce_rate=VALUES(bounce_rate)
-                    """, (
-                        row['date'], row['sends'], row['deliveries'],
-                        row['delivery_rate'], row['bounces'], row['bounce_rate']
-                    ))
+            upsert_dataframe(
+                cursor, 'email_delivery_daily', df[df['date'].notna()],
+                columns=['date', 'sends', 'deliveries', 'delivery_rate', 'bounces', 'bounce_rate'],
+                update_columns=['sends', 'deliveries', 'delivery_rate', 'bounces', 'bounce_rate']
+            )
 
             connection.commit()
             print(f"Loaded {len(df)} delivery timeline records")
@@ -192,19 +311,11 @@ class SupportingDataLoader:
             connection = self.db.get_connection()
             cursor = connection.cursor()
 
-            for _, row in df.iterrows():
-                if pd.notna(row['audience_name']):
-                    cursor.execute("""
-                        INSERT INTO email_delivery_audience
-                        (audience_name, audience_type, sends, deliveries, bounces, bounce_rate)
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                        ON DUPLICATE KEY UPDATE
-                        sends=VALUES(sends), deliveries=VALUES(deliveries),
-                        bounces=VALUES(bounces), bounce_rate=VALUES(bounce_rate)
-                    """, (
-                        row['audience_name'], row['audience_type'], row['sends'],
-                        row['deliveries'], row['bounces'], row['bounce_rate']
-                    ))
+            upsert_dataframe(
+                cursor, 'email_delivery_audience', df,
+                columns=['audience_name', 'audience_type', 'sends', 'deliveries', 'bounces', 'bounce_rate'],
+                update_columns=['sends', 'deliveries', 'bounces', 'bounce_rate']
+            )
 
             connection.commit()
             print(f"Loaded {len(df)} delivery audience records")
@@ -212,13 +323,14 @@ class SupportingDataLoader:
         except Exception as e:
             print(f"Error loading delivery audience: {e}")
 
-    def log_file_upload(self, file_name, file_type, row_count, user_id=None):
+    def log_file_upload(self, file_name, file_type, row_count, user_id=None, connection=None):
         """Log file upload to file_upload_logs table following retail data pattern"""
         try:
             # Use instance user_id if not explicitly provided
             actual_user_id = user_id if user_id is not None else self.user_id
-            
-            connection = self.db.get_connection()
+            self.row_counts[file_type] = row_count
+
+            connection = connection or self.db.get_connection()
             cursor = connection.cursor()
 
             # Insert initial log entry
@@ -236,58 +348,30 @@ class SupportingDataLoader:
     def load_delivery_details(self):
         """Load per-email delivery details"""
         try:
-            df = pd.read_excel(self.deliveries_file, sheet_name='Email Deliveries Details', engine='openpyxl')
-            # Skip header rows
-            start_row = None
-            for idx, row in df.iterrows():
-                if str(row.iloc[0]).strip().lower() == 'email content name':
-                    start_row = idx + 1
-                    break
-
-            if start_row is None:
-                print("Could not find data start for delivery details")
-                return
-
-            df = df.iloc[start_row:].reset_index(drop=True)
-            df.columns = ['email_content_name', 'send_date', 'sends', 'deliveries', 'bounces', 'bounce_rate']
-
-            # Clean data
-            df['send_date'] = pd.to_datetime(df['send_date'], errors='coerce').dt.date
-            df['sends'] = pd.to_numeric(df['sends'], errors='coerce').astype('Int64')
-            df['deliveries'] = pd.to_numeric(df['deliveries'], errors='coerce').astype('Int64')
-            df['bounces'] = pd.to_numeric(df['bounces'], errors='coerce').astype('Int64')
-            df['bounce_rate'] = df['bounce_rate'].apply(self.clean_numeric)
-
-            # Remove empty rows
-            df = df.dropna(subset=['email_content_name'])
-
-            connection = self.db.get_connection()
-            cursor = connection.cursor()
+            self._store_delivery_details(parse_delivery_details(self.deliveries_file))
+        except Exception as e:
+            print(f"Error loading delivery details: {e}")
+            raise
 
-            for _, row in df.iterrows():
-                if pd.notna(row['email_content_name']):
-                    cursor.execute("""
-                        INSERT INTO email_delivery_details
-                        (email_content_name, send_date, sends, deliveries, bounces, bounce_rate)
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                        ON DUPLICATE KEY UPDATE
-                        sends=VALUES(sends), deliveries=VALUES(deliveries),
-                        bounces=VALUES(bounces), bounce_rate=VALUES(bounce_rate)
-                    """, (
-                        row['email_content_name'], row['send_date'], row['sends'],
-                        row['deliveries'], row['bounces'], row['bounce_rate']
-                    ))
+    def _store_delivery_details(self, df, connection=None):
+        """Upsert parsed delivery details and log the upload; returns the row count"""
+        connection = connection or self.db.get_connection()
+        cursor = connection.cursor()
 
-            connection.commit()
-            row_count = len(df)
-            print(f"Loaded {row_count} delivery details records")
+        upsert_dataframe(
+            cursor, 'email_delivery_details', df,
+            columns=['email_content_name', 'send_date', 'sends', 'deliveries', 'bounces', 'bounce_rate'],
+            update_columns=['sends', 'deliveries', 'bounces', 'bounce_rate']
+        )
 
-            # Log file upload
-            file_name = os.path.basename(self.deliveries_file) if self.deliveries_file else "email_deliveries.xlsx"
-            self.log_file_upload(file_name, "email_delivery", row_count)
+        connection.commit()
+        row_count = len(df)
+        print(f"Loaded {row_count} delivery details records")
 
-        except Exception as e:
-            print(f"Error loading delivery details: {e}")
+        # Log file upload
+        file_name = os.path.basename(self.deliveries_file) if self.deliveries_file else "email_deliveries.xlsx"
+        self.log_file_upload(file_name, "email_delivery", row_count, connection=connection)
+        return row_count
 
     def load_engagement_timeline(self):
         """Load daily engagement metrics"""
@@ -325,23 +409,15 @@ class SupportingDataLoader:
             connection = self.db.get_connection()
             cursor = connection.cursor()
 
-            for _, row in df.iterrows():
-                if pd.notna(row['date']):
-                    cursor.execute("""
-                        INSERT INTO email_engagement_daily
-                        (date, deliveries, unique_opens, open_rate, unique_clicks, click_rate,
-                         click_to_open_rate, unique_unsubscribes, unsubscribe_rate)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        ON DUPLICATE KEY UPDATE
-                        deliveries=VALUES(deliveries), unique_opens=VALUES(unique_opens),
-                        open_rate=VALUES(open_rate), unique_clicks=VALUES(unique_clicks),
-                        click_rate=VALUES(click_rate), click_to_open_rate=VALUES(click_to_open_rate),
-                        unique_unsubscribes=VALUES(unique_unsubscribes), unsubscribe_rate=VALUES(unsubscribe_rate)
-                    """, (
-                        row['date'], row['deliveries'], row['unique_opens'], row['open_rate'],
-                        row['unique_clicks'], row['click_rate'], row['click_to_open_rate'],
-                        row['unique_unsubscribes'], row['unsubscribe_rate']
-                    ))
+            upsert_dataframe(
+                cursor, 'email_engagement_daily', df[df['date'].notna()],
+                columns=['date', 'deliveries', 'unique_opens', 'open_rate', 'unique_clicks',
+                         'click_rate', 'click_to_open_rate', 'unique_unsubscribes',
+                         'unsubscribe_rate'],
+                update_columns=['deliveries', 'unique_opens', 'open_rate', 'unique_clicks',
+                                'click_rate', 'click_to_open_rate', 'unique_unsubscribes',
+                                'unsubscribe_rate']
+            )
 
             connection.commit()
             print(f"Loaded {len(df)} engagement timeline records")
@@ -383,23 +459,14 @@ class SupportingDataLoader:
             connection = self.db.get_connection()
             cursor = connection.cursor()
 
-            for _, row in df.iterrows():
-                if pd.notna(row['audience_name']):
-                    cursor.execute("""
-                        INSERT INTO email_engagement_audience
-                        (audience_name, audience_type, unique_opens, open_rate, unique_clicks,
-                         click_rate, click_to_open_rate, unique_unsubscribes, unsubscribe_rate)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        ON DUPLICATE KEY UPDATE
-                        unique_opens=VALUES(unique_opens), open_rate=VALUES(open_rate),
-                        unique_clicks=VALUES(unique_clicks), click_rate=VALUES(click_rate),
-                        click_to_open_rate=VALUES(click_to_open_rate),
-                        unique_unsubscribes=VALUES(unique_unsubscribes), unsubscribe_rate=VALUES(unsubscribe_rate)
-                    """, (
-                        row['audience_name'], row['audience_type'], row['unique_opens'],
-                        row['open_rate'], row['unique_clicks'], row['click_rate'],
-                        row['click_to_open_rate'], row['unique_unsubscribes'], row['unsubscribe_rate']
-                    ))
+            upsert_dataframe(
+                cursor, 'email_engagement_audience', df,
+                columns=['audience_name', 'audience_type', 'unique_opens', 'open_rate',
+                         'unique_clicks', 'click_rate', 'click_to_open_rate',
+                         'unique_unsubscribes', 'unsubscribe_rate'],
+                update_columns=['unique_opens', 'open_rate', 'unique_clicks', 'click_rate',
+                                'click_to_open_rate', 'unique_unsubscribes', 'unsubscribe_rate']
+            )
 
             connection.commit()
             print(f"Loaded {len(df)} engagement audience records")
@@ -410,165 +477,62 @@ class SupportingDataLoader:
     def load_engagement_details(self):
         """Load per-email engagement details"""
         try:
-            # Read Excel file, skip the first 4 rows (widget metadata), use row 4 as header
-            df = pd.read_excel(self.engagement_file, sheet_name='Email Engagement Details', engine='openpyxl', header=4)
-
-            # Clean column names
-            df.columns = [str(col).strip().lower().replace(' ', '_') for col in df.columns]
-
-            # Rename columns to match expected names
-            column_mapping = {
-                'message_name': 'message_name',
-                'campaign': 'campaign',
-                'send_date': 'send_date',
-                'open_rate': 'open_rate',
-                'click_rate': 'click_rate',
-                'click_to_open_rate': 'click_to_open_rate',
-                'unsubscribe_rate': 'unsubscribe_rate',
-                'unique_opens': 'unique_opens',
-                'unique_clicks': 'unique_clicks',
-                'unique_unsubscribes': 'unique_unsubscribes'
-            }
-
-            # Keep only expected columns that exist in the dataframe
-            available_cols = [col for col in column_mapping.keys() if col in df.columns]
-            df = df[available_cols]
-            df = df.rename(columns={k: v for k, v in column_mapping.items() if k in available_cols})
-
-            # Clean data
-            df['send_date'] = pd.to_datetime(df['send_date'], errors='coerce').dt.date
-            df['unique_opens'] = pd.to_numeric(df['unique_opens'], errors='coerce').astype('Int64')
-            df['unique_clicks'] = pd.to_numeric(df['unique_clicks'], errors='coerce').astype('Int64')
-            df['unique_unsubscribes'] = pd.to_numeric(df['unique_unsubscribes'], errors='coerce').astype('Int64')
-            df['open_rate'] = df['open_rate'].apply(self.clean_numeric)
-            df['click_rate'] = df['click_rate'].apply(self.clean_numeric)
-            df['click_to_open_rate'] = df['click_to_open_rate'].apply(self.clean_numeric)
-            df['unsubscribe_rate'] = df['unsubscribe_rate'].apply(self.clean_numeric)
-
-            # Remove empty rows and rows with NaN in key columns
-            df = df.dropna(subset=['message_name'])
-            df = df[df['message_name'].notna()]
-
-            # Filter out rows where message_name is 'nan' (string), empty, or contains widget metadata
-            df = df[
-                (df['message_name'].astype(str).str.lower() != 'nan') &
-                (df['message_name'].astype(str).str.strip() != '') &
-                (~df['message_name'].astype(str).str.contains('widget', case=False, na=False)) &
-                (~df['message_name'].astype(str).str.contains('unnamed', case=False, na=False))
-            ]
-
-            connection = self.db.get_connection()
-            cursor = connection.cursor()
-
-            for _, row in df.iterrows():
-                if pd.notna(row['message_name']) and str(row['message_name']).lower() != 'nan':
-                    # Convert NaN values to None for SQL
-                    def clean_value(val):
-                        if pd.isna(val):
-                            return None
-                        return val
-
-                    cursor.execute("""
-                        INSERT INTO email_engagement_details
-                        (message_name, campaign, send_date, open_rate, click_rate,
-                         click_to_open_rate, unsubscribe_rate, unique_opens, unique_clicks, unique_unsubscribes)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        ON DUPLICATE KEY UPDATE
-                        open_rate=VALUES(open_rate), click_rate=VALUES(click_rate),
-                        click_to_open_rate=VALUES(click_to_open_rate), unsubscribe_rate=VALUES(unsubscribe_rate),
-                        unique_opens=VALUES(unique_opens), unique_clicks=VALUES(unique_clicks),
-                        unique_unsubscribes=VALUES(unique_unsubscribes)
-                    """, (
-                        clean_value(row['message_name']), clean_value(row['campaign']), clean_value(row['send_date']),
-                        clean_value(row['open_rate']), clean_value(row['click_rate']), clean_value(row['click_to_open_rate']),
-                        clean_value(row['unsubscribe_rate']), clean_value(row['unique_opens']), clean_value(row['unique_clicks']),
-                        clean_value(row['unique_unsubscribes'])
-                    ))
-
-            connection.commit()
-            row_count = len(df)
-            print(f"Loaded {row_count} engagement details records")
-
-            # Log file upload
-            file_name = os.path.basename(self.engagement_file) if self.engagement_file else "email_engagement.xlsx"
-            self.log_file_upload(file_name, "email_engagement", row_count)
-
+            self._store_engagement_details(parse_engagement_details(self.engagement_file))
         except Exception as e:
             print(f"Error loading engagement details: {e}")
+            raise
+
+    def _store_engagement_details(self, df, connection=None):
+        """Upsert parsed engagement details and log the upload; returns the row count"""
+        connection = connection or self.db.get_connection()
+        cursor = connection.cursor()
+
+        upsert_dataframe(
+            cursor, 'email_engagement_details', df,
+            columns=['message_name', 'campaign', 'send_date', 'open_rate', 'click_rate',
+                     'click_to_open_rate', 'unsubscribe_rate', 'unique_opens', 'unique_clicks',
+                     'unique_unsubscribes'],
+            update_columns=['open_rate', 'click_rate', 'click_to_open_rate',
+                            'unsubscribe_rate', 'unique_opens', 'unique_clicks',
+                            'unique_unsubscribes']
+        )
+
+        connection.commit()
+        row_count = len(df)
+        print(f"Loaded {row_count} engagement details records")
+
+        # Log file upload
+        file_name = os.path.basename(self.engagement_file) if self.engagement_file else "email_engagement.xlsx"
+        self.log_file_upload(file_name, "email_engagement", row_count, connection=connection)
+        return row_count
 
     def load_campaign_performance(self):
         """Load campaign performance summary data"""
         try:
-            # Read Excel file, skip the first 4 rows (widget metadata), use row 4 as header
-            df = pd.read_excel(self.performance_file, sheet_name='Email Performance Email Sends T', engine='openpyxl', header=4)
-
-            # Clean column names
-            df.columns = [str(col).strip().lower().replace(' ', '_') for col in df.columns]
-
-            # Rename columns to match expected names
-            column_mapping = {
-                'email_content_name': 'email_content_name',
-                'email_subject': 'email_subject',
-                'sends': 'sends',
-                'open_rate': 'open_rate',
-                'click_to_open_rate': 'click_to_open_rate'
-            }
-
-            # Keep only expected columns that exist in the dataframe
-            available_cols = [col for col in column_mapping.keys() if col in df.columns]
-            df = df[available_cols]
-            df = df.rename(columns={k: v for k, v in column_mapping.items() if k in available_cols})
-
-            # Clean data
-            df['sends'] = pd.to_numeric(df['sends'], errors='coerce').astype('Int64')
-            df['open_rate'] = df['open_rate'].apply(self.clean_numeric)
-            df['click_to_open_rate'] = df['click_to_open_rate'].apply(self.clean_numeric)
-
-            # Remove empty rows and rows with NaN in key columns
-            df = df.dropna(subset=['email_content_name'])
-            df = df[df['email_content_name'].notna()]
-
-            # Filter out rows where email_content_name is 'nan' (string), empty, or contains widget metadata
-            df = df[
-                (df['email_content_name'].astype(str).str.lower() != 'nan') &
-                (df['email_content_name'].astype(str).str.strip() != '') &
-                (~df['email_content_name'].astype(str).str.contains('widget', case=False, na=False)) &
-                (~df['email_content_name'].astype(str).str.contains('unnamed', case=False, na=False))
-            ]
-
-            connection = self.db.get_connection()
-            cursor = connection.cursor()
+            self._store_campaign_performance(parse_campaign_performance(self.performance_file))
+        except Exception as e:
+            print(f"Error loading campaign performance: {e}")
+            raise
 
-            for _, row in df.iterrows():
-                if pd.notna(row['email_content_name']) and str(row['email_content_name']).lower() != 'nan':
-                    # Convert NaN values to None for SQL
-                    def clean_value(val):
-                        if pd.isna(val):
-                            return None
-                        return val
-
-                    cursor.execute("""
-                        INSERT INTO email_campaign_performance
-                        (email_content_name, email_subject, sends, open_rate, click_to_open_rate)
-                        VALUES (%s, %s, %s, %s, %s)
-                        ON DUPLICATE KEY UPDATE
-                        sends=VALUES(sends), open_rate=VALUES(open_rate),
-                        click_to_open_rate=VALUES(click_to_open_rate)
-                    """, (
-                        clean_value(row['email_content_name']), clean_value(row['email_subject']),
-                        clean_value(row['sends']), clean_value(row['open_rate']), clean_value(row['click_to_open_rate'])
-                    ))
+    def _store_campaign_performance(self, df, connection=None):
+        """Upsert parsed campaign performance and log the upload; returns the row count"""
+        connection = connection or self.db.get_connection()
+        cursor = connection.cursor()
 
-            connection.commit()
-            row_count = len(df)
-            print(f"Loaded {row_count} campaign performance records")
+        upsert_dataframe(
+            cursor, 'email_campaign_performance', df,
+            columns=['email_content_name', 'email_subject', 'sends', 'open_rate', 'click_to_open_rate'],
+            update_columns=['sends', 'open_rate', 'click_to_open_rate']
+        )
 
-            # Log file upload
-            file_name = os.path.basename(self.performance_file) if self.performance_file else "email_performance.xlsx"
-            self.log_file_upload(file_name, "email_performance", row_count)
+        connection.commit()
+        row_count = len(df)
+        print(f"Loaded {row_count} campaign performance records")
 
-        except Exception as e:
-            print(f"Error loading campaign performance: {e}")
+        # Log file upload
+        file_name = os.path.basename(self.performance_file) if self.performance_file else "email_performance.xlsx"
+        self.log_file_upload(file_name, "email_performance", row_count, connection=connection)
+        return row_count
 
     def load_all_data(self):
         """Load all email marketing data"""
@@ -587,78 +551,130 @@ class SupportingDataLoader:
 
 
 
-    def load_retail_data(self):
-        """Load retail data using the existing load_retail_data_v1.py script"""
+    def load_retail_data(self, connection=None):
+        """Load retail data in-process, streaming the parquet file into retail_data"""
         if not self.retail_file:
             print("[DEBUG] No retail file provided")
             return
 
         try:
             print(f"Loading retail data from {self.retail_file}...")
-
-            # Close our database connection to avoid conflicts with the retail script
-            self.db.close_connection()
-
-            # Set PYTHONPATH to include the project root so imports work
-            env = os.environ.copy()
-            env['PYTHONPATH'] = os.getcwd()
-
-            # Change to the script's directory so the relative path works
-            script_dir = os.path.join(os.getcwd(), "src", "file_operations")
-            
-            # Call the existing load_retail_data_v1.py script with user_id
-            result = subprocess.run(
-                [sys.executable, "load_retail_data_v1.py", self.retail_file, self.user_id],
-                capture_output=True,
-                text=True,
-                cwd=script_dir,
-                env=env
-            )
-
-            if result.returncode != 0:
-                print("Retail data loading failed!")
-                print("STDOUT:", result.stdout)
-                print("STDERR:", result.stderr)
-                raise Exception(f"Retail data loading failed with return code {result.returncode}")
-
-            print("Retail data loaded successfully")
+            result = load_retail_file(self.retail_file, self.user_id, connection or self.db.get_connection())
+            self.row_counts["retail"] = result["rows"]
+            print(f"Retail data loaded successfully ({result['rows']:,} rows)")
 
         except Exception as e:
             print(f"Error loading retail data: {e}")
             raise  # Re-raise to propagate the error
 
-    def load_all_data(self):
-        """Load all supporting data"""
-        print("Starting supporting data load...")
-
-        # Load email data if files provided
-        if self.deliveries_file:
-            self.load_delivery_details()
-        if self.engagement_file:
-            self.load_engagement_details()
-        if self.performance_file:
-            self.load_campaign_performance()
-        if self.social_media_file:
-            # Create SQLAlchemy engine for SocialMediaDataLoader
-            # URL encode the password to handle special characters like '@'
-            from urllib.parse import quote_plus
-            password = quote_plus(os.getenv('MYSQL_PASSWORD', 'password'))
-            db_url = f"mysql+mysqlconnector://{os.getenv('MYSQL_USER', 'user')}:{password}@{os.getenv('MYSQL_HOST', 'db')}/{os.getenv('MYSQL_DATABASE', 'capstone_db')}"
-            engine = create_engine(db_url)
-            # Use the external SocialMediaDataLoader
-            social_loader = SocialMediaDataLoader(self.social_media_file, engine)
-            social_loader.run()
-
-            # Log social media file upload (approximate total rows loaded)
-            # Since SocialMediaDataLoader doesn't return row counts, we'll use a placeholder
-            file_name = os.path.basename(self.social_media_file) if self.social_media_file else "social_media_performance.xlsx"
-            self.log_file_upload(file_name, "social_media", 0)  # 0 as placeholder since we don't have exact count
-        if self.retail_file:
-            self.load_retail_data()
+    def _load_steps(self):
+        """(file type, path, sequential loader) for each file that was provided"""
+        steps = [
+            ("email_delivery", self.deliveries_file, self.load_delivery_details),
+            ("email_engagement", self.engagement_file, self.load_engagement_details),
+            ("email_performance", self.performance_file, self.load_campaign_performance),
+            ("social_media", self.social_media_file, self.load_social_media_data),
+            ("retail", self.retail_file, self.load_retail_data)
+        ]
+        return [step for step in steps if step[1]]
+
+    def load_all_data(self, stage=None, mode=None):
+        """Load all supporting data
+
+        ``stage(name)`` is a context manager timing each step (e.g. ``Job.stage``);
+        the loaded row count is set on the record it yields. ``mode`` (default
+        SUPPORTING_DATA_LOAD_MODE) is "sequential" or "parallel".
+        """
+        stage = stage or _print_stage
+        mode = mode or LOAD_MODE
+        print(f"Starting supporting data load ({mode})...")
 
-        self.db.close_connection()
+        try:
+            if mode == "parallel":
+                self._load_all_parallel(stage)
+            else:
+                self._load_all_sequential(stage)
+        finally:
+            self.db.close_connection()
         print("Supporting data load completed.")
 
+    def _load_all_sequential(self, stage):
+        """Load one file after another, one stage per file type that was provided. A failed
+        file does not stop the rest; raises SupportingDataLoadError listing every failure."""
+        failures = {}
+        for file_type, _, load in self._load_steps():
+            try:
+                with stage(file_type) as record:
+                    load()
+                    record["rows"] = self.row_counts.get(file_type)
+            except Exception as e:
+                print(f"Error loading {file_type}: {e}")
+                failures[file_type] = e
+
+        if failures:
+            raise SupportingDataLoadError(failures)
+
+    def _load_all_parallel(self, stage):
+        """Load every file at once: email workbooks are parsed in a process pool and each
+        file writes through its own pooled connection. Raises SupportingDataLoadError
+        listing every file that failed once all of them have finished."""
+        steps = self._load_steps()
+        email_steps = [(file_type, path) for file_type, path, _ in steps if file_type in EMAIL_PARSERS]
+        failures = {}
+        parse_pool = ProcessPoolExecutor(
+            max_workers=min(len(email_steps), os.cpu_count() or 1), mp_context=PARSE_POOL_CONTEXT
+        ) if email_steps else None
+        try:
+            parsed = {file_type: parse_pool.submit(EMAIL_PARSERS[file_type], path) for file_type, path in email_steps}
+            with ThreadPoolExecutor(max_workers=len(steps), thread_name_prefix="load") as pool:
+                futures = {
+                    file_type: pool.submit(self._load_file, file_type, stage, parsed.get(file_type))
+                    for file_type, _, _ in steps
+                }
+            for file_type, future in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Error loading {file_type}: {e}")
+                    failures[file_type] = e
+        finally:
+            if parse_pool is not None:
+                parse_pool.shutdown(cancel_futures=True)
+
+        if failures:
+            raise SupportingDataLoadError(failures)
+
+    def _load_file(self, file_type, stage, parsed=None):
+        """Load one file on its own pooled connection (one worker thread of the parallel mode)"""
+        db = DatabaseConnection()
+        try:
+            connection = db.get_connection()
+            if connection is None:
+                raise ConnectionError("Could not get a database connection")
+            with stage(file_type) as record:
+                if parsed is not None:
+                    store = {
+                        "email_delivery": self._store_delivery_details,
+                        "email_engagement": self._store_engagement_details,
+                        "email_performance": self._store_campaign_performance
+                    }[file_type]
+                    store(parsed.result(), connection)
+                elif file_type == "social_media":
+                    self.load_social_media_data(connection)
+                else:
+                    self.load_retail_data(connection)
+                record["rows"] = self.row_counts.get(file_type)
+        finally:
+            db.close_connection()
+
+    def load_social_media_data(self, connection=None):
+        """Run the social media ETL with the shared pooled engine and log the rows loaded"""
+        social_loader = SocialMediaDataLoader(self.social_media_file, get_engine(), parse_workers=self.parse_workers)
+        frames = social_loader.run()
+
+        file_name = os.path.basename(self.social_media_file)
+        self.log_file_upload(file_name, "social_media", sum(len(df) for df in frames.values()), connection=connection)
+
 
 if __name__ == "__main__":
     loader = SupportingDataLoader()
@@ -1,7 +1,210 @@
+import hashlib
+import multiprocessing
+import os
+import numpy as np
 import pandas as pd
 import sqlalchemy
-from typing import Optional
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from datetime import date, timedelta
+from ..database.bulk_upsert import DEFAULT_BATCH_SIZE
+
+
+# Parse pools are started from job and load threads that hold DB, logging and pool
+# locks; forking such a process can deadlock the child, so workers are spawned
+PARSE_POOL_CONTEXT = multiprocessing.get_context("spawn")
+
+SOCIAL_TABLES = {
+    "social_media_performance": {
+        "key": ["platform", "period_month"],
+        "ddl": """
+            CREATE TABLE IF NOT EXISTS social_media_performance (
+                platform VARCHAR(100) NOT NULL,
+                period_month VARCHAR(20) NOT NULL,
+                followers BIGINT NOT NULL DEFAULT 0,
+                impressions BIGINT NOT NULL DEFAULT 0,
+                engagement_rate DOUBLE,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                PRIMARY KEY (platform, period_month)
+            )
+        """
+    },
+    "social_media_engagement_daily": {
+        "key": ["date"],
+        "ddl": """
+            CREATE TABLE IF NOT EXISTS social_media_engagement_daily (
+                date DATE NOT NULL,
+                posts_published INT NOT NULL DEFAULT 0,
+                total_engagements BIGINT NOT NULL DEFAULT 0,
+                likes_reactions BIGINT NOT NULL DEFAULT 0,
+                comments BIGINT NOT NULL DEFAULT 0,
+                shares BIGINT NOT NULL DEFAULT 0,
+                estimated_clicks BIGINT NOT NULL DEFAULT 0,
+                reach BIGINT NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                PRIMARY KEY (date)
+            )
+        """
+    },
+    "social_media_engagement_posts": {
+        # Posts have no natural key (the Posts sheet has no dates), so rows are keyed
+        # by a hash of date and content
+        "key": ["post_key"],
+        "ddl": """
+            CREATE TABLE IF NOT EXISTS social_media_engagement_posts (
+                post_key CHAR(40) NOT NULL,
+                date DATE NULL,
+                post_content TEXT,
+                total_engagements BIGINT NOT NULL DEFAULT 0,
+                likes_reactions BIGINT NOT NULL DEFAULT 0,
+                comments BIGINT NOT NULL DEFAULT 0,
+                shares BIGINT NOT NULL DEFAULT 0,
+                estimated_clicks BIGINT NOT NULL DEFAULT 0,
+                reach BIGINT NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                PRIMARY KEY (post_key),
+                INDEX idx_social_posts_date (date)
+            )
+        """
+    },
+}
+
+
+def _column_definition(table: str, column: str) -> str:
+    """The column's definition line from the table's DDL, e.g. ``date DATE NOT NULL``."""
+    for line in SOCIAL_TABLES[table]["ddl"].splitlines():
+        if line.strip().split(" ", 1)[0] == column:
+            return line.strip().rstrip(",")
+    raise KeyError(f"{column} is not defined for {table}")
+
+
+def prepare_for_upsert(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    """Give each row its primary key, drop rows without one and keep the last row per key."""
+    df = df.copy()
+    if table == "social_media_engagement_posts":
+        df.insert(0, "post_key", [
+            hashlib.sha1(f"{post_date}|{content}".encode("utf-8")).hexdigest()
+            for post_date, content in zip(df["date"], df["post_content"])
+        ])
+    key = SOCIAL_TABLES[table]["key"]
+    keyless = df[key].isna().any(axis=1)
+    if keyless.any():
+        print(f"⚠️ Skipping {int(keyless.sum())} rows without {', '.join(key)} for {table}")
+    return df[~keyless].drop_duplicates(key, keep="last").reset_index(drop=True)
+
+
+def _comparable(series: pd.Series) -> pd.Series:
+    # Dates come back from MySQL as datetime.date or Timestamp depending on the driver
+    if series.name == "date" or pd.api.types.is_datetime64_any_dtype(series):
+        return pd.to_datetime(series, errors="coerce").dt.date
+    return series
+
+
+def changed_rows(new: pd.DataFrame, existing: pd.DataFrame, key: List[str]) -> pd.DataFrame:
+    """Rows of ``new`` whose key is not in ``existing`` or whose values differ from it."""
+    if existing.empty or new.empty:
+        return new
+    existing = existing.apply(_comparable)
+    merged = new.apply(_comparable).merge(existing, on=key, how="left", suffixes=("", "__old"), indicator=True)
+    changed = merged["_merge"].eq("left_only")
+    for column in new.columns.difference(key):
+        current, previous = merged[column], merged[f"{column}__old"]
+        changed |= ~(current.eq(previous) | (current.isna() & previous.isna()))
+    return new[changed.to_numpy()]
+
+
+def _mysql_upsert(pd_table, conn, keys, data_iter):
+    """``to_sql`` method writing each chunk as one multi-row INSERT ... ON DUPLICATE KEY UPDATE."""
+    rows = [dict(zip(keys, row)) for row in data_iter]
+    stmt = mysql_insert(pd_table.table).values(rows)
+    stmt = stmt.on_duplicate_key_update({column: stmt.inserted[column] for column in keys})
+    return conn.execute(stmt).rowcount
+
+
+def _read_sheets(path: str, sheets: List[str]) -> Dict[str, pd.DataFrame]:
+    """Open the workbook once and parse the requested sheets without a header row."""
+    with pd.ExcelFile(path) as workbook:
+        available = set(workbook.sheet_names)
+        return {sheet: workbook.parse(sheet, header=None) for sheet in sheets if sheet in available}
+
+
+def read_workbook_sheets(path: str, sheets: List[str], workers: int = 0) -> Dict[str, pd.DataFrame]:
+    """Parse only ``sheets`` from the workbook; missing sheets are left out.
+
+    With ``workers`` > 1 the sheets are split across a process pool, each worker
+    opening the workbook once for its share.
+    """
+    if workers <= 1 or len(sheets) <= 1:
+        return _read_sheets(path, sheets)
+
+    workers = min(workers, len(sheets))
+    groups = [sheets[i::workers] for i in range(workers)]
+    frames = {}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=PARSE_POOL_CONTEXT) as pool:
+        for result in pool.map(_read_sheets, [path] * workers, groups):
+            frames.update(result)
+    return frames
+
+
+PERFORMANCE_COLUMNS = ["platform", "period_month", "followers", "impressions", "engagement_rate"]
+ENGAGEMENT_COUNT_COLUMNS = ["total_engagements", "likes_reactions", "comments", "shares", "estimated_clicks", "reach"]
+DAILY_COLUMNS = ["date", "posts_published"] + ENGAGEMENT_COUNT_COLUMNS
+POST_COLUMNS = ["date", "post_content"] + ENGAGEMENT_COUNT_COLUMNS
+
+
+def _normalize_columns(columns) -> List[str]:
+    return [str(c).strip().lower().replace(" ", "_").replace("(", "").replace(")", "").replace("%", "pct") for c in columns]
+
+
+def _column(df: pd.DataFrame, name: str, default) -> pd.Series:
+    """Column ``name``, or ``default`` for every row when the sheet doesn't have it."""
+    return df[name] if name in df.columns else pd.Series(default, index=df.index, dtype=object)
+
+
+def _parse_counts(df: pd.DataFrame, columns: Dict[str, str]) -> Tuple[pd.DataFrame, Dict[str, pd.Series]]:
+    """Vectorized ``int(float(value))`` for each ``target: source`` column.
+
+    A missing column or empty string gives 0. Blank (NaN) and non-numeric cells
+    are flagged per source column so the row can be skipped, as before.
+    """
+    counts, errors = {}, {}
+    for target, source in columns.items():
+        if source not in df.columns:
+            counts[target] = pd.Series(0, index=df.index, dtype="int64")
+            continue
+        raw = df[source]
+        empty = raw.eq("")
+        numeric = pd.to_numeric(raw, errors="coerce").astype(float)
+        invalid = ~np.isfinite(numeric) & ~empty
+        counts[target] = np.trunc(numeric.where(~invalid & ~empty, 0)).astype("int64")
+        errors[source] = invalid
+    return pd.DataFrame(counts, index=df.index), errors
+
+
+def _parse_dates(df: pd.DataFrame, column: str) -> Tuple[pd.Series, Dict[str, pd.Series]]:
+    """Vectorized ``pd.to_datetime(value).date()``; blank cells give None, unparseable text is flagged."""
+    raw = _column(df, column, None)
+    parsed = pd.to_datetime(raw, errors="coerce", format="mixed")
+    invalid = parsed.isna() & raw.notna() & raw.ne("")
+    dates = pd.Series(parsed.dt.date, index=df.index, dtype=object).where(parsed.notna(), None)
+    return dates, {column: invalid}
+
+
+def _report_invalid_rows(sheet_name: str, frame: pd.DataFrame, errors: Dict[str, pd.Series]) -> pd.Series:
+    """Combine per-column error masks and report them once per sheet instead of once per row."""
+    invalid = pd.Series(False, index=frame.index)
+    for mask in errors.values():
+        invalid |= mask
+    if invalid.any():
+        detail = ", ".join(f"{column}: {int(mask.sum())}" for column, mask in errors.items() if mask.any())
+        print(f"Error processing {int(invalid.sum())} of {len(frame)} rows in {sheet_name} ({detail})")
+    return invalid
+
+
+def _drop_invalid_rows(sheet_name: str, frame: pd.DataFrame, errors: Dict[str, pd.Series]) -> pd.DataFrame:
+    """Drop rows with unparseable values, reporting them once per sheet."""
+    return frame[~_report_invalid_rows(sheet_name, frame, errors)]
 
 
 class SocialMediaDataLoader:
@@ -27,306 +230,306 @@ class SocialMediaDataLoader:
         "Post Engagement Scorecard ac"
     ]
 
-    def __init__(self, social_file: str, db_engine: Optional[sqlalchemy.engine.Engine] = None):
+    def __init__(self, social_file: str, db_engine: Optional[sqlalchemy.engine.Engine] = None, parse_workers: int = 0,
+                 load_mode: Optional[str] = None):
         self.social_file = social_file
         self.db_engine = db_engine
+        # "replace" rewrites the tables on every upload, "incremental" upserts changed rows
+        self.load_mode = load_mode or os.getenv("SOCIAL_MEDIA_LOAD_MODE", "replace")
+        self.parse_workers = parse_workers  # > 1 parses sheets in a process pool
+        self._raw_sheets: Optional[Dict[str, pd.DataFrame]] = None
+
+    def _workbook_sheets(self) -> Dict[str, pd.DataFrame]:
+        """Read every tab this loader uses from the workbook, opening it only once."""
+        if self._raw_sheets is None:
+            sheets = list(dict.fromkeys(self.REQUIRED_TABS + self.ENGAGEMENT_TABS))
+            try:
+                self._raw_sheets = read_workbook_sheets(self.social_file, sheets, self.parse_workers)
+            except Exception as e:
+                print(f"⚠️ Could not read workbook {self.social_file}: {e}")
+                self._raw_sheets = {}
+        return self._raw_sheets
 
     def _safe_read(self, sheet: str) -> pd.DataFrame:
-        """Read sheet if exists, else return empty DataFrame."""
-        try:
-            return pd.read_excel(self.social_file, sheet_name=sheet)
-        except Exception:
+        """Return the raw (headerless) sheet if it exists, else an empty DataFrame."""
+        return self._workbook_sheets().get(sheet, pd.DataFrame())
+
+    @staticmethod
+    def _parse_sheet(raw: pd.DataFrame) -> pd.DataFrame:
+        """Skip the widget metadata rows and use the actual header row.
+
+        The first two rows of each tab are widget metadata; row 2 holds the
+        column names and data starts at row 3.
+        """
+        if len(raw) < 3:
             return pd.DataFrame()
+        df = raw.iloc[3:].reset_index(drop=True)
+        df.columns = raw.iloc[2].values
+        return df
 
-    def extract(self) -> dict:
-        """Load performance tabs from workbook."""
+    def _extract_tabs(self, sheets: List[str], label: str) -> dict:
         data = {}
-
-        for sheet in self.REQUIRED_TABS:
-            df = self._safe_read(sheet)
-            if df.empty:
-                print(f"⚠️ Sheet missing or empty: {sheet}")
+        for sheet in sheets:
+            raw = self._safe_read(sheet)
+            # A tab holding only its title row has no data
+            if len(raw) < 2:
+                print(f"⚠️ {(label + 'sheet').capitalize()} missing or empty: {sheet}")
                 continue
-
-            # Parse the sheet properly - skip metadata row and use actual headers
             try:
-                # Read with header=1 to get the structure
-                temp_df = pd.read_excel(self.social_file, sheet_name=sheet, header=1)
-                if not temp_df.empty and len(temp_df) > 0:
-                    # First row contains actual column names
-                    actual_headers = temp_df.iloc[0].values
-                    # Data starts from second row
-                    df = temp_df.iloc[1:].reset_index(drop=True)
-                    df.columns = actual_headers
-                data[sheet] = df
+                data[sheet] = self._parse_sheet(raw)
             except Exception as e:
-                print(f"⚠️ Error parsing sheet {sheet}: {e}")
+                print(f"⚠️ Error parsing {label}sheet {sheet}: {e}")
                 data[sheet] = pd.DataFrame()
-
         return data
 
+    def extract(self) -> dict:
+        """Load performance tabs from workbook."""
+        return self._extract_tabs(self.REQUIRED_TABS, "")
+
     def extract_engagement(self) -> dict:
         """Load engagement tabs from workbook."""
-        data = {}
-
-        for sheet in self.ENGAGEMENT_TABS:
-            df = self._safe_read(sheet)
-            if df.empty:
-                print(f"⚠️ Engagement sheet missing or empty: {sheet}")
-                continue
-
-            # Parse the sheet properly - skip metadata row and use actual headers
-            try:
-                # Read with header=1 to get the structure
-                temp_df = pd.read_excel(self.social_file, sheet_name=sheet, header=1)
-                if not temp_df.empty and len(temp_df) > 0:
-                    # First row contains actual column names
-                    actual_headers = temp_df.iloc[0].values
-                    # Data starts from second row
-                    df = temp_df.iloc[1:].reset_index(drop=True)
-                    df.columns = actual_headers
-                data[sheet] = df
-            except Exception as e:
-                print(f"⚠️ Error parsing engagement sheet {sheet}: {e}")
-                data[sheet] = pd.DataFrame()
-
-        return data
+        return self._extract_tabs(self.ENGAGEMENT_TABS, "engagement ")
 
     def transform(self, data: dict) -> pd.DataFrame:
         """Normalize and unify social performance metrics (excluding engagement data)."""
-        # Use a dict to merge data by platform and period
-        merged_data = {}
+        frames = []
 
         for sheet_name, df in data.items():
             if df.empty:
                 continue
 
-            df.columns = [str(c).strip().lower().replace(" ", "_").replace("(", "").replace(")", "").replace("%", "pct") for c in df.columns]
+            df.columns = _normalize_columns(df.columns)
+            platform = _column(df, "social_network", "Unknown")
 
             if sheet_name == "Top 5 Channels by Followers":
-                # Follower data by platform
-                for _, r in df.iterrows():
-                    try:
-                        platform_name = r.get("social_network", "Unknown")
-                        key = (platform_name, "2024")  # Annual data
-                        if key not in merged_data:
-                            merged_data[key] = {
-                                "platform": platform_name,
-                                "period_month": "2024",
-                                "followers": 0,
-                                "impressions": 0,
-                                "engagement_rate": 0.0,
-                            }
-                        merged_data[key]["followers"] = int(float(r.get("followers_sum", 0))) if r.get("followers_sum") else 0
-                    except Exception as e:
-                        print(f"Error processing row in {sheet_name}: {e}")
+                # Follower data by platform (annual)
+                metrics, errors = _parse_counts(df, {"followers": "followers_sum"})
+                frame = metrics.assign(platform=platform, period_month="2024")
 
             elif sheet_name == "Channels by Post Reach":
-                # Impressions (post reach) by platform
-                for _, r in df.iterrows():
-                    try:
-                        platform_name = r.get("social_network", "Unknown")
-                        key = (platform_name, "2024")  # Annual data
-                        if key not in merged_data:
-                            merged_data[key] = {
-                                "platform": platform_name,
-                                "period_month": "2024",
-                                "followers": 0,
-                                "impressions": 0,
-                                "engagement_rate": 0.0,
-                            }
-                        merged_data[key]["impressions"] = int(float(r.get("post_reach_sum", 0))) if r.get("post_reach_sum") else 0
-                    except Exception as e:
-                        print(f"Error processing row in {sheet_name}: {e}")
+                # Impressions (post reach) by platform (annual)
+                metrics, errors = _parse_counts(df, {"impressions": "post_reach_sum"})
+                frame = metrics.assign(platform=platform, period_month="2024")
 
             elif sheet_name == "Channels by Engagement Rate ":
-                # Engagement rate by platform
-                for _, r in df.iterrows():
-                    try:
-                        platform_name = r.get("social_network", "Unknown")
-                        key = (platform_name, "2024")  # Annual data
-                        if key not in merged_data:
-                            merged_data[key] = {
-                                "platform": platform_name,
-                                "period_month": "2024",
-                                "followers": 0,
-                                "impressions": 0,
-                                "engagement_rate": 0.0,
-                            }
-                        eng_rate_str = str(r.get("engagement_rate_in_pct", "0%")).rstrip('%').strip()
-                        eng_rate = float(eng_rate_str) / 100 if eng_rate_str else 0.0
-                        merged_data[key]["engagement_rate"] = eng_rate
-                    except Exception as e:
-                        print(f"Error processing row in {sheet_name}: {e}")
+                # Engagement rate by platform (annual), e.g. "4.5%"
+                rate_text = _column(df, "engagement_rate_in_pct", "0%").astype(str).str.rstrip("%").str.strip()
+                rate = pd.to_numeric(rate_text, errors="coerce")
+                empty = rate_text.eq("")
+                errors = {"engagement_rate_in_pct": rate.isna() & ~empty & rate_text.str.lower().ne("nan")}
+                frame = pd.DataFrame({
+                    "platform": platform,
+                    "period_month": "2024",
+                    "engagement_rate": (rate / 100).where(~empty, 0.0)
+                })
 
             elif sheet_name == "Top Changes in Followers":
-                # Quarterly follower data by platform
-                for _, r in df.iterrows():
-                    try:
-                        platform_name = r.get("social_network", "Unknown")
-                        quarter_str = r.get("date", "").strip()
-                        if "," in quarter_str:
-                            quarter, year = quarter_str.split(", ")
-                            q_num = quarter.split(" ")[1]
-                            period_month = f"{year.strip()}-Q{q_num}"
-                            key = (platform_name, period_month)
-                            if key not in merged_data:
-                                merged_data[key] = {
-                                    "platform": platform_name,
-                                    "period_month": period_month,
-                                    "followers": 0,
-                                    "impressions": 0,
-                                    "engagement_rate": 0.0,
-                                }
-                            followers = int(float(r.get("followers_sum", 0))) if r.get("followers_sum") else 0
-                            merged_data[key]["followers"] = followers
-                    except Exception as e:
-                        print(f"Error processing row in {sheet_name}: {e}")
-
-        # Convert merged data to DataFrame
-        all_rows = list(merged_data.values())
-        transformed_df = pd.DataFrame(all_rows)
-
-        return transformed_df
+                # Quarterly follower data by platform, e.g. "Quarter 3, 2024" -> "2024-Q3"
+                quarter_text = _column(df, "date", "")
+                is_text = quarter_text.map(lambda value: isinstance(value, str))
+                quarter_text = quarter_text.where(is_text, "").str.strip()
+                has_comma = quarter_text.str.contains(",", regex=False)
+                pieces = quarter_text.str.split(", ")
+                q_num = pieces.str[0].str.split(" ").str[1]
+                malformed = ~is_text | (has_comma & ~(pieces.str.len().eq(2) & q_num.notna()))
+                metrics, errors = _parse_counts(df, {"followers": "followers_sum"})
+                frame = metrics.assign(platform=platform, period_month=pieces.str[1].str.strip() + "-Q" + q_num)
+                # Rows without a quarter label are not follower changes
+                frame = _drop_invalid_rows(sheet_name, frame, {"date": malformed})
+                keep = has_comma[frame.index]
+                frame, errors = frame[keep], {column: mask[frame.index][keep] for column, mask in errors.items()}
+
+            else:
+                continue
+
+            # A row with an unparseable metric still registers its platform and period,
+            # but doesn't overwrite the metric
+            invalid = _report_invalid_rows(sheet_name, frame, errors)
+            metrics = [column for column in PERFORMANCE_COLUMNS[2:] if column in frame.columns]
+            frame = frame.astype({column: float for column in metrics})
+            frame.loc[invalid, metrics] = np.nan
+            frames.append(frame)
+
+        if not frames:
+            return pd.DataFrame(columns=PERFORMANCE_COLUMNS)
+
+        # Merge by platform and period; later sheets overwrite the metrics they provide
+        combined = pd.concat(frames, ignore_index=True)
+        merged = combined.groupby(["platform", "period_month"], sort=False, dropna=False).last().reset_index()
+        for column, default in (("followers", 0), ("impressions", 0), ("engagement_rate", 0.0)):
+            merged[column] = merged[column].fillna(default) if column in merged else default
+        merged["followers"] = merged["followers"].astype("int64")
+        merged["impressions"] = merged["impressions"].astype("int64")
+        return merged[PERFORMANCE_COLUMNS]
 
     def transform_engagement_daily(self, data: dict) -> pd.DataFrame:
         """Transform daily engagement data from multiple sheets."""
-        daily_data = []
+        brand = pd.DataFrame(columns=DAILY_COLUMNS)
+        behaviour = pd.DataFrame(columns=["date"] + ENGAGEMENT_COUNT_COLUMNS)
 
         for sheet_name, df in data.items():
             if df.empty:
                 continue
 
-            df.columns = [str(c).strip().lower().replace(" ", "_").replace("(", "").replace(")", "").replace("%", "pct") for c in df.columns]
+            df.columns = _normalize_columns(df.columns)
 
             if sheet_name == "Brand Post vs Total Engageme":
                 # Daily posts published vs total engagements
-                for _, r in df.iterrows():
-                    try:
-                        daily_data.append({
-                            "date": pd.to_datetime(r.get("date")).date() if r.get("date") else None,
-                            "posts_published": int(float(r.get("volume_of_published_messages_sum", 0))) if r.get("volume_of_published_messages_sum") else 0,
-                            "total_engagements": int(float(r.get("total_engagements_sum", 0))) if r.get("total_engagements_sum") else 0,
-                            "likes_reactions": 0,
-                            "comments": 0,
-                            "shares": 0,
-                            "estimated_clicks": 0,
-                            "reach": 0
-                        })
-                    except Exception as e:
-                        print(f"Error processing daily engagement row in {sheet_name}: {e}")
+                dates, date_errors = _parse_dates(df, "date")
+                counts, errors = _parse_counts(df, {
+                    "posts_published": "volume_of_published_messages_sum",
+                    "total_engagements": "total_engagements_sum"
+                })
+                frame = counts.assign(date=dates, likes_reactions=0, comments=0, shares=0, estimated_clicks=0, reach=0)
+                brand = _drop_invalid_rows(sheet_name, frame, {**date_errors, **errors})[DAILY_COLUMNS]
 
             elif sheet_name == "Engagement Behaviour across ":
                 # Daily engagement breakdown
-                for _, r in df.iterrows():
-                    try:
-                        date_val = pd.to_datetime(r.get("date")).date() if r.get("date") else None
-                        # Find existing entry for this date or create new one
-                        existing_entry = None
-                        for entry in daily_data:
-                            if entry["date"] == date_val:
-                                existing_entry = entry
-                                break
-
-                        if existing_entry:
-                            # Update existing entry
-                            existing_entry.update({
-                                "total_engagements": int(float(r.get("total_engagements", 0))) if r.get("total_engagements") else 0,
-                                "likes_reactions": int(float(r.get("post_likes_and_reactions", 0))) if r.get("post_likes_and_reactions") else 0,
-                                "comments": int(float(r.get("post_comments", 0))) if r.get("post_comments") else 0,
-                                "shares": int(float(r.get("post_shares", 0))) if r.get("post_shares") else 0,
-                                "estimated_clicks": int(float(r.get("estimated_clicks", 0))) if r.get("estimated_clicks") else 0,
-                                "reach": int(float(r.get("post_reach", 0))) if r.get("post_reach") else 0
-                            })
-                        else:
-                            # Create new entry
-                            daily_data.append({
-                                "date": date_val,
-                                "posts_published": 0,
-                                "total_engagements": int(float(r.get("total_engagements", 0))) if r.get("total_engagements") else 0,
-                                "likes_reactions": int(float(r.get("post_likes_and_reactions", 0))) if r.get("post_likes_and_reactions") else 0,
-                                "comments": int(float(r.get("post_comments", 0))) if r.get("post_comments") else 0,
-                                "shares": int(float(r.get("post_shares", 0))) if r.get("post_shares") else 0,
-                                "estimated_clicks": int(float(r.get("estimated_clicks", 0))) if r.get("estimated_clicks") else 0,
-                                "reach": int(float(r.get("post_reach", 0))) if r.get("post_reach") else 0
-                            })
-                    except Exception as e:
-                        print(f"Error processing daily engagement row in {sheet_name}: {e}")
-
-        return pd.DataFrame(daily_data)
+                dates, date_errors = _parse_dates(df, "date")
+                counts, errors = _parse_counts(df, {
+                    "total_engagements": "total_engagements",
+                    "likes_reactions": "post_likes_and_reactions",
+                    "comments": "post_comments",
+                    "shares": "post_shares",
+                    "estimated_clicks": "estimated_clicks",
+                    "reach": "post_reach"
+                })
+                behaviour = _drop_invalid_rows(sheet_name, counts.assign(date=dates), {**date_errors, **errors})
+
+        # One row per day, in date order. Within a sheet the last row for a day wins; the
+        # breakdown's counts replace the brand sheet's and posts_published comes from the
+        # brand sheet. Rows without a date cannot be placed on a day and are skipped.
+        # (The row-by-row version matched only the first brand row per day, kept duplicate
+        # and undated rows and kept sheet order.)
+        undated = int(brand["date"].isna().sum() + behaviour["date"].isna().sum())
+        if undated:
+            print(f"⚠️ Skipping {undated} daily engagement rows without a date")
+        brand_days = brand.dropna(subset=["date"]).drop_duplicates("date", keep="last").set_index("date")
+        behaviour_days = behaviour.dropna(subset=["date"]).drop_duplicates("date", keep="last").set_index("date")
+        daily = behaviour_days[ENGAGEMENT_COUNT_COLUMNS].combine_first(brand_days).fillna(0)
+        return daily.reset_index()[DAILY_COLUMNS].astype({column: "int64" for column in DAILY_COLUMNS[1:]})
 
     def transform_engagement_posts(self, data: dict) -> pd.DataFrame:
         """Transform post-level engagement data."""
-        posts_data = []
+        frames = []
 
         for sheet_name, df in data.items():
             if df.empty:
                 continue
 
-            df.columns = [str(c).strip().lower().replace(" ", "_").replace("(", "").replace(")", "").replace("%", "pct") for c in df.columns]
+            df.columns = _normalize_columns(df.columns)
 
             if sheet_name == "Posts":
-                # Individual post engagement data
-                for _, r in df.iterrows():
-                    try:
-                        posts_data.append({
-                            "date": None,  # Posts sheet doesn't have dates
-                            "post_content": str(r.get("outbound_post", "")).strip(),
-                            "total_engagements": int(float(r.get("total_engagements_sum", 0))) if r.get("total_engagements_sum") else 0,
-                            "likes_reactions": int(float(r.get("post_likes_and_reactions_sum", 0))) if r.get("post_likes_and_reactions_sum") else 0,
-                            "comments": int(float(r.get("post_comments_sum", 0))) if r.get("post_comments_sum") else 0,
-                            "shares": int(float(r.get("post_shares_sum", 0))) if r.get("post_shares_sum") else 0,
-                            "estimated_clicks": int(float(r.get("estimated_clicks_sum", 0))) if r.get("estimated_clicks_sum") else 0,
-                            "reach": int(float(r.get("post_reach_sum", 0))) if r.get("post_reach_sum") else 0
-                        })
-                    except Exception as e:
-                        print(f"Error processing post engagement row in {sheet_name}: {e}")
-
+                # Individual post engagement data (the Posts sheet doesn't have dates)
+                dates, date_errors = pd.Series(None, index=df.index, dtype=object), {}
             elif sheet_name == "Post Engagement Scorecard":
                 # Dated post engagement data
-                for _, r in df.iterrows():
-                    try:
-                        posts_data.append({
-                            "date": pd.to_datetime(r.get("date")).date() if r.get("date") else None,
-                            "post_content": str(r.get("outbound_post", "")).strip(),
-                            "total_engagements": int(float(r.get("total_engagements_sum", 0))) if r.get("total_engagements_sum") else 0,
-                            "likes_reactions": int(float(r.get("post_likes_and_reactions_sum", 0))) if r.get("post_likes_and_reactions_sum") else 0,
-                            "comments": int(float(r.get("post_comments_sum", 0))) if r.get("post_comments_sum") else 0,
-                            "shares": int(float(r.get("post_shares_sum", 0))) if r.get("post_shares_sum") else 0,
-                            "estimated_clicks": int(float(r.get("estimated_clicks_sum", 0))) if r.get("estimated_clicks_sum") else 0,
-                            "reach": int(float(r.get("post_reach_sum", 0))) if r.get("post_reach_sum") else 0
-                        })
-                    except Exception as e:
-                        print(f"Error processing post engagement row in {sheet_name}: {e}")
-
-        return pd.DataFrame(posts_data)
+                dates, date_errors = _parse_dates(df, "date")
+            else:
+                continue
 
-    def load(self, df: pd.DataFrame):
-        """Load performance data into DB table."""
+            counts, errors = _parse_counts(df, {
+                "total_engagements": "total_engagements_sum",
+                "likes_reactions": "post_likes_and_reactions_sum",
+                "comments": "post_comments_sum",
+                "shares": "post_shares_sum",
+                "estimated_clicks": "estimated_clicks_sum",
+                "reach": "post_reach_sum"
+            })
+            frame = counts.assign(date=dates, post_content=_column(df, "outbound_post", "").astype(str).str.strip())
+            frames.append(_drop_invalid_rows(sheet_name, frame, {**date_errors, **errors})[POST_COLUMNS])
+
+        if not frames:
+            return pd.DataFrame(columns=POST_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+    def _write(self, df: pd.DataFrame, table: str):
         if self.db_engine is None:
             raise ValueError("❌ DB engine not initialized")
 
-        # For social media performance data, replace existing data
-        df.to_sql("social_media_performance", self.db_engine, if_exists="replace", index=False)
-        print(f"✅ Loaded {len(df)} rows into social_media_performance")
+        if self.load_mode == "incremental":
+            written = self._upsert(df, table)
+            print(f"✅ Upserted {written} new or changed of {len(df)} rows into {table}")
+        else:
+            # Drop and recreate the table with the uploaded data
+            df.to_sql(table, self.db_engine, if_exists="replace", index=False)
+            print(f"✅ Loaded {len(df)} rows into {table}")
+
+    def _ensure_table(self, table: str):
+        """Create the table with its primary key, migrating one left keyless by replace mode."""
+        inspector = sqlalchemy.inspect(self.db_engine)
+        if inspector.has_table(table) and not inspector.get_pk_constraint(table).get("constrained_columns"):
+            self._add_primary_key(table, [column["name"] for column in inspector.get_columns(table)])
+        with self.db_engine.begin() as conn:
+            conn.execute(sqlalchemy.text(SOCIAL_TABLES[table]["ddl"]))
+
+    def _add_primary_key(self, table: str, columns: List[str]):
+        """Key a table created by replace mode in place: drop duplicate keys (keeping the last row), then add the key."""
+        key = SOCIAL_TABLES[table]["key"]
+        how_to_migrate = (
+            f"Migrate it by hand (dedupe on {', '.join(key)} and add the primary key), or rename it "
+            f"(RENAME TABLE {table} TO {table}_keyless) and upload the workbook again to recreate it."
+        )
+        missing = [column for column in key if column not in columns]
+        if missing:
+            raise ValueError(f"❌ {table} has no primary key and no {', '.join(missing)} column "
+                             f"(created by replace mode). {how_to_migrate}")
+
+        with self.db_engine.connect() as conn:
+            null_keys = conn.execute(sqlalchemy.text(
+                f"SELECT COUNT(*) FROM {table} WHERE " + " OR ".join(f"{column} IS NULL" for column in key)
+            )).scalar()
+        if null_keys:
+            raise ValueError(f"❌ {table} has no primary key and {null_keys} rows without "
+                             f"{', '.join(key)}. {how_to_migrate}")
+
+        print(f"⚠️ {table} has no primary key (created by replace mode); adding PRIMARY KEY ({', '.join(key)})")
+        same_key = " AND ".join(f"older.{column} = newer.{column}" for column in key)
+        try:
+            # MySQL commits each ALTER on its own, so the steps run outside one transaction
+            with self.db_engine.begin() as conn:
+                conn.execute(sqlalchemy.text(
+                    f"ALTER TABLE {table} ADD COLUMN _migration_row BIGINT NOT NULL AUTO_INCREMENT UNIQUE"
+                ))
+            with self.db_engine.begin() as conn:
+                removed = conn.execute(sqlalchemy.text(
+                    f"DELETE older FROM {table} older JOIN {table} newer "
+                    f"ON {same_key} AND older._migration_row < newer._migration_row"
+                )).rowcount
+            with self.db_engine.begin() as conn:
+                conn.execute(sqlalchemy.text(
+                    f"ALTER TABLE {table} DROP COLUMN _migration_row, "
+                    + ", ".join(f"MODIFY {_column_definition(table, column)}" for column in key)
+                    + f", ADD PRIMARY KEY ({', '.join(key)})"
+                ))
+        except sqlalchemy.exc.SQLAlchemyError as e:
+            raise RuntimeError(f"❌ Could not add a primary key to {table}: {e}. {how_to_migrate}") from e
+        if removed:
+            print(f"⚠️ Removed {removed} duplicate {', '.join(key)} rows from {table} (kept the last of each)")
+
+    def _upsert(self, df: pd.DataFrame, table: str) -> int:
+        """Upsert only the rows that are new or changed; rows missing from the upload are kept."""
+        key = SOCIAL_TABLES[table]["key"]
+        df = prepare_for_upsert(df, table)
+        self._ensure_table(table)
+        existing = pd.read_sql(f"SELECT {', '.join(df.columns)} FROM {table}", self.db_engine)
+        changed = changed_rows(df, existing, key)
+        if not changed.empty:
+            changed.to_sql(table, self.db_engine, if_exists="append", index=False,
+                           method=_mysql_upsert, chunksize=DEFAULT_BATCH_SIZE)
+        return len(changed)
+
+    def load(self, df: pd.DataFrame):
+        """Load performance data into DB table."""
+        self._write(df, "social_media_performance")
 
     def load_engagement_daily(self, df: pd.DataFrame):
         """Load daily engagement data into DB table."""
-        if self.db_engine is None:
-            raise ValueError("❌ DB engine not initialized")
-
-        # Load daily engagement data
-        df.to_sql("social_media_engagement_daily", self.db_engine, if_exists="replace", index=False)
-        print(f"✅ Loaded {len(df)} rows into social_media_engagement_daily")
+        self._write(df, "social_media_engagement_daily")
 
     def load_engagement_posts(self, df: pd.DataFrame):
         """Load post-level engagement data into DB table."""
-        if self.db_engine is None:
-            raise ValueError("❌ DB engine not initialized")
-
-        # Load post-level engagement data
-        df.to_sql("social_media_engagement_posts", self.db_engine, if_exists="replace", index=False)
-        print(f"✅ Loaded {len(df)} rows into social_media_engagement_posts")
+        self._write(df, "social_media_engagement_posts")
 
     def run(self):
         """Execute full ETL pipeline for all social media data."""
@@ -0,0 +1,166 @@
+"""In-process retail parquet -> MySQL loader.
+
+Streams the parquet file in record batches with pyarrow, so memory stays flat
+for multi-GB files, and cleans each batch with vectorized pyarrow compute:
+- rows without SALE_DATE or SALE_DATE_TIME are dropped
+- text columns are trimmed
+- float ITEM_IDs (1947.0) become integers
+- dates are parsed (timestamps, ISO strings or MM/DD/YYYY) and truncated to whole
+  seconds; unparseable values become NULL
+
+Batches are written with chunked multi-row INSERTs over one connection and the
+load is recorded in file_upload_logs, replacing the parquet -> CSV ->
+``mysql`` CLI subprocess chain. Rows are committed every RETAIL_COMMIT_BATCHES
+batches so no single transaction spans the whole file. The file's rows are then
+aggregated into the retail rollups (see ``database/rollups.py``) and the upload
+is marked loaded in the final commit. If the load fails, the file's rows are
+deleted and its file_upload_logs row is marked failed (load_status = 2).
+"""
+import os
+from typing import Iterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from ..database.bulk_upsert import insert_rows
+from ..database.db_connection import DatabaseConnection
+from ..database.migrations import ensure_retail_partitions
+from ..database.rollups import ensure_rollup_tables, refresh_retail_rollups
+
+RETAIL_COLUMNS = [
+    'SALE_DATE_TIME', 'SALE_DATE', 'STORE_FORMAT', 'COMMAND_NAME',
+    'SITE_ID', 'SITE_NAME', 'SLIP_NO', 'LINE', 'ITEM_ID', 'ITEM_DESC',
+    'EXTENSION_AMOUNT', 'QTY', 'RETURN_IND', 'PRICE_STATUS'
+]
+DATE_FORMATS = ['%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d', '%m/%d/%Y %H:%M:%S', '%m/%d/%Y']
+READ_BATCH_ROWS = int(os.getenv('RETAIL_READ_BATCH_ROWS', '65536'))
+COMMIT_BATCHES = int(os.getenv('RETAIL_COMMIT_BATCHES', '8'))
+LOAD_FAILED = 2  # file_upload_logs.load_status: 0 loading, 1 loaded, 2 failed
+
+
+def _source_columns(schema: pa.Schema) -> List[str]:
+    """Map the required columns to the file's (case-insensitive) column names."""
+    by_upper = {name.upper(): name for name in schema.names}
+    missing = [column for column in RETAIL_COLUMNS if column not in by_upper]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)} (available: {', '.join(schema.names)})")
+    return [by_upper[column] for column in RETAIL_COLUMNS]
+
+
+def _parse_timestamps(column: pa.ChunkedArray) -> pa.ChunkedArray:
+    # Sub-second precision is truncated to whole seconds, as the CSV export did
+    if pa.types.is_timestamp(column.type):
+        return pc.floor_temporal(column, unit='second').cast(pa.timestamp('s'))
+    if pa.types.is_date(column.type):
+        return column.cast(pa.timestamp('s'))
+    text = pc.utf8_trim_whitespace(column.cast(pa.string()))
+    text = pc.replace_substring_regex(text, pattern=r'(\d:\d{2}:\d{2})\.\d+', replacement=r'\1')
+    parsed = [pc.strptime(text, format=fmt, unit='s', error_is_null=True) for fmt in DATE_FORMATS]
+    return pc.coalesce(*parsed)
+
+
+def normalize_batch(batch: pa.Table) -> pa.Table:
+    """Clean one batch of retail rows (columns already renamed to RETAIL_COLUMNS)."""
+    has_dates = pc.and_(pc.is_valid(batch['SALE_DATE']), pc.is_valid(batch['SALE_DATE_TIME']))
+    batch = batch.filter(has_dates)
+
+    columns = {}
+    for name in RETAIL_COLUMNS:
+        column = batch[name]
+        if name == 'SALE_DATE_TIME':
+            column = _parse_timestamps(column)
+        elif name == 'SALE_DATE':
+            column = _parse_timestamps(column).cast(pa.date32())
+        elif pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+            column = pc.utf8_trim_whitespace(column)
+        elif name == 'ITEM_ID' and pa.types.is_floating(column.type):
+            column = column.cast(pa.int64())
+        columns[name] = column
+    return pa.table(columns)
+
+
+def iter_retail_batches(parquet_path: str, rows_per_batch: Optional[int] = None) -> Iterator[pa.Table]:
+    """Yield cleaned retail batches, reading only the required columns one batch at a time."""
+    parquet_file = pq.ParquetFile(parquet_path)
+    source_columns = _source_columns(parquet_file.schema_arrow)
+    for record_batch in parquet_file.iter_batches(batch_size=rows_per_batch or READ_BATCH_ROWS, columns=source_columns):
+        yield normalize_batch(pa.Table.from_batches([record_batch]).rename_columns(RETAIL_COLUMNS))
+
+
+def batch_rows(batch: pa.Table) -> List[tuple]:
+    """Convert a cleaned batch to row tuples, column by column."""
+    return list(zip(*(batch[name].to_pylist() for name in RETAIL_COLUMNS)))
+
+
+def load_retail_file(parquet_path: str, user_id: str = "System", connection=None) -> dict:
+    """Load a retail parquet file into retail_data and record it in file_upload_logs.
+
+    Returns the new file_id and the number of rows loaded.
+    """
+    if not os.path.isfile(parquet_path):
+        raise FileNotFoundError(f"Retail data file not found at {parquet_path}")
+    if os.path.getsize(parquet_path) == 0:
+        raise ValueError(f"Retail data file {parquet_path} is empty")
+
+    db = None
+    if connection is None:
+        db = DatabaseConnection()
+        connection = db.get_connection()
+    cursor = connection.cursor()
+    file_name = os.path.basename(parquet_path)
+    file_id = None
+
+    try:
+        cursor.execute("""
+            INSERT INTO file_upload_logs (file_name, file_type, no_rows, user_id, load_status, date_time)
+            VALUES (%s, 'retail', 0, %s, 0, NOW())
+        """, (file_name, user_id))
+        file_id = cursor.lastrowid
+        connection.commit()
+        print(f"New file_id created: {file_id}")
+        ensure_rollup_tables(cursor)
+        ensure_retail_partitions(cursor)
+
+        columns = [name.lower() for name in RETAIL_COLUMNS] + ['file_id', 'load_status']
+        row_count = 0
+        for batch_number, batch in enumerate(iter_retail_batches(parquet_path), start=1):
+            rows = [row + (file_id, 1) for row in batch_rows(batch)]
+            row_count += insert_rows(cursor, 'retail_data', columns, rows)
+            if batch_number % COMMIT_BATCHES == 0:
+                connection.commit()
+            print(f"  Loaded {row_count:,} rows...", flush=True)
+
+        # Aggregate this file into the analytics rollups in the same transaction
+        refresh_retail_rollups(cursor, file_id)
+        cursor.execute("""
+            UPDATE file_upload_logs SET no_rows = %s, load_status = 1, date_time = NOW()
+            WHERE file_id = %s
+        """, (row_count, file_id))
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        if file_id is not None:
+            _discard_failed_load(connection, cursor, file_id)
+        raise
+    finally:
+        cursor.close()
+        if db:
+            db.close_connection()
+
+    print(f"Retail load complete: file_id {file_id}, {row_count:,} rows from {file_name}")
+    return {"file_id": file_id, "rows": row_count}
+
+
+def _discard_failed_load(connection, cursor, file_id: int):
+    """Delete the rows already committed for a failed load and mark its upload as failed."""
+    try:
+        cursor.execute("DELETE FROM retail_data WHERE file_id = %s", (file_id,))
+        cursor.execute("UPDATE file_upload_logs SET load_status = %s, date_time = NOW() WHERE file_id = %s",
+                       (LOAD_FAILED, file_id))
+        connection.commit()
+        print(f"Retail load failed: removed the rows of file_id {file_id} and marked it failed")
+    except Exception as e:
+        # Keep the original error; the rows can be removed by hand
+        connection.rollback()
+        print(f"Could not clean up failed retail load file_id {file_id}: {e}")
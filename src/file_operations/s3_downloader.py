@@ -0,0 +1,112 @@
+"""Concurrent S3 downloads for uploaded data files.
+
+- one boto3 client per process, shared by all downloads (clients are thread-safe)
+- a TransferConfig so large files are fetched as concurrent multipart ranges
+- every download gets its own temp directory, so concurrent uploads of the same
+  file name don't overwrite each other (the original file name is kept)
+- optional content cache (S3_CACHE_DIR) keyed by bucket/key/ETag, so processing
+  the same upload again skips the download
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=int(os.getenv('S3_TRANSFER_CONCURRENCY', '8')),
+    use_threads=True
+)
+DOWNLOAD_WORKERS = int(os.getenv('S3_DOWNLOAD_WORKERS', '5'))
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_s3_client():
+    """Return the process-wide S3 client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = boto3.client('s3')
+    return _client
+
+
+class S3Downloader:
+    def __init__(self, bucket: str, client=None, cache_dir: Optional[str] = None):
+        self.bucket = bucket
+        self.client = client or get_s3_client()
+        self.cache_dir = cache_dir if cache_dir is not None else os.getenv('S3_CACHE_DIR')
+
+    def _cache_path(self, key: str, etag: str) -> str:
+        digest = hashlib.sha256(f"{self.bucket}/{key}/{etag}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, digest, os.path.basename(key))
+
+    def download(self, key: str) -> tuple:
+        """Download one object; returns (local path, whether it is a temp file the caller must clean up)."""
+        if self.cache_dir:
+            etag = self.client.head_object(Bucket=self.bucket, Key=key)['ETag'].strip('"')
+            cache_path = self._cache_path(key, etag)
+            if os.path.exists(cache_path):
+                print(f"Using cached copy of s3://{self.bucket}/{key} at {cache_path}")
+                return cache_path, False
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            # Download next to the cache entry and rename, so readers never see a partial file
+            partial_path = f"{cache_path}.{threading.get_ident()}.partial"
+            self.client.download_file(self.bucket, key, partial_path, Config=TRANSFER_CONFIG)
+            os.replace(partial_path, cache_path)
+            print(f"Downloaded {key} from S3 bucket {self.bucket} to cache {cache_path}")
+            return cache_path, False
+
+        temp_path = os.path.join(tempfile.mkdtemp(prefix="s3_download_"), os.path.basename(key))
+        self.client.download_file(self.bucket, key, temp_path, Config=TRANSFER_CONFIG)
+        print(f"Downloaded {key} from S3 bucket {self.bucket} to {temp_path}")
+        return temp_path, True
+
+    def download_all(self, keys: List[str], max_workers: Optional[int] = None) -> Dict[str, tuple]:
+        """Download ``keys`` concurrently; returns key -> (local path, is temp file).
+
+        If any download fails, the temp files already written are removed and the
+        first error is raised.
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        with ThreadPoolExecutor(max_workers=max_workers or min(DOWNLOAD_WORKERS, len(keys))) as pool:
+            futures = {key: pool.submit(self.download, key) for key in keys}
+        results, errors = {}, []
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                errors.append((key, e))
+        if errors:
+            remove_temp_files([path for path, is_temp in results.values() if is_temp])
+            key, error = errors[0]
+            raise S3DownloadError(key, error)
+        return results
+
+
+class S3DownloadError(Exception):
+    def __init__(self, key: str, error: Exception):
+        super().__init__(f"Failed to download {key} from S3: {error}")
+        self.key = key
+        self.error = error
+
+
+def remove_temp_files(paths: List[str]):
+    """Remove downloaded temp files together with their per-download directories."""
+    for path in paths:
+        directory = os.path.dirname(path)
+        if os.path.basename(directory).startswith("s3_download_"):
+            shutil.rmtree(directory, ignore_errors=True)
+        elif os.path.exists(path):
+            os.unlink(path)
@@ -295,7 +295,14 @@ marketing_report_retrievers = {
         ),
         "multiple_values": False
     },
-    
+    "retail_sales_summary": {
+        "retriever": (
+            r._get_retail_sales_summary,
+            (lambda self: self.month, lambda self: self.year, lambda self: self.company),
+        ),
+        "multiple_values": True
+    },
+
     # Findings - CSAT and Reviews
     "findings_csat_header": {
         "retriever": (lambda self: "Findings – Review of Main Exchanges, Marine Marts, and MCHS CSAT Surveys and Google Reviews:"),
@@ -49,3 +49,5 @@ class ValidationResult(BaseModel):
     is_valid: bool
     message: str
     detailed_results: Optional[DetailedValidationResult] = None
+    # Findings that do not fail the report (e.g. rule-based numbers not found in the context)
+    warnings: List[ValidationIssue] = []
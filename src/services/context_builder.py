@@ -0,0 +1,248 @@
+"""Report context built from the database for the tags a report schema asks for.
+
+``ContextBuilder.build(structure, period)`` maps each tag of the requested
+schema to entries of ``marketing_report_retrievers`` (``SCHEMA_TAG_RETRIEVERS``).
+It evaluates only those retrievers, runs them in parallel (CONTEXT_WORKERS) and
+returns ``{"metadata": ..., "data": {retriever: value}}`` for the LLM
+generators. Empty values (retrievers without a data source) are left out, and
+``data`` is empty when none of the database-backed retrievers found anything.
+
+Retriever values are memoized per (period, company, data version). The data
+version is the one ``QueryRunner`` tracks, so a completed load invalidates the
+memo along with the cached query results. The cost of assembling a context
+grows with the tags requested, not with the whole retriever catalogue.
+"""
+import calendar
+import inspect
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .query_runner import get_query_runner
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_WORKERS = int(os.getenv('CONTEXT_WORKERS', '8'))
+CONTEXT_CACHE_ENTRIES = int(os.getenv('CONTEXT_CACHE_ENTRIES', '1024'))
+REPORT_COMPANY = os.getenv('REPORT_COMPANY', 'MCCS')
+
+# Schema tag id -> the retrievers whose values the LLM needs to write that tag.
+# Tags not listed here use the retriever with the same name, if there is one.
+SCHEMA_TAG_RETRIEVERS = {
+    "purpose_statement": [],  # written from the schema's own system content
+    "exec_summary_highlights": ["exec_summary_bullets"],
+    "digital_performance_summary": ["findings_digital_header", "industry_benchmarks", "email_blast_highlights"],
+    "campaign_performance": ["campaigns_details", "other_initiatives"],
+    "sales_analysis": ["retail_sales_summary"],
+    "main_exchange_overview": ["findings_csat_header", "main_exchange_satisfaction",
+                               "main_store_satisfaction_table", "main_exchange_comments"],
+    "marine_mart_overview": ["marine_mart_satisfaction", "marine_mart_satisfaction_table", "marine_mart_comments"],
+    "mchs_overview": ["mchs_satisfaction", "mchs_comments_header", "mchs_comments"],
+    "reviews_summary": ["google_reviews_summary", "google_reviews_header", "google_reviews_details"],
+    "assessment_summary": ["assessment_bullets"],
+    "key_insights": ["assessment_continued"],
+    "recommendations": ["satisfaction_opportunity_note"],
+    "email_highlight_campaign": ["email_highlight_header", "email_highlight_campaign"],
+    "email_metrics_table": ["email_campaigns_table_header", "email_campaigns_table"],
+    "email_metrics_summary": ["email_total_sends", "email_avg_open_rate", "email_avg_click_rate",
+                              "email_avg_click_to_open", "email_total_unsubscribes", "email_avg_unsubscribe_rate"],
+    "social_media_metrics": ["social_media_header", "social_media_table"],
+    "social_media_engagement": ["social_media_highlights", "social_media_continued"],
+}
+
+# Tags whose meaning depends on the report type
+REPORT_TAG_RETRIEVERS = {
+    "social-media-data": {
+        "digital_performance_summary": ["social_media_table"],
+    },
+}
+
+MONTH_ABBREVIATIONS = {9: "Sept"}  # the report style writes "01-Sept-24"
+
+
+class ReportPeriod:
+    """The reporting month; the ``self`` that ``marketing_report_retrievers`` lambdas receive."""
+
+    def __init__(self, year: int, month: int, company: str = REPORT_COMPANY,
+                 as_of_date: Optional[str] = None, data_collection_date: Optional[str] = None):
+        self.year = year
+        self.month = month
+        self.company = company
+        today = datetime.now().strftime("%B %d, %Y")
+        self.as_of_date = as_of_date or today
+        self.data_collection_date = data_collection_date or today
+
+    @classmethod
+    def from_metadata(cls, metadata: Dict[str, Any], **kwargs) -> Optional["ReportPeriod"]:
+        """Period from request metadata: ``period`` ('YYYY-MM') or ``dateRange.startDate``."""
+        date_range = metadata.get("dateRange") or {}
+        for value in (metadata.get("period"), date_range.get("startDate")):
+            match = re.match(r"^\s*(\d{4})-(\d{1,2})", str(value or ""))
+            if match and 1 <= int(match.group(2)) <= 12:
+                return cls(int(match.group(1)), int(match.group(2)), **kwargs)
+        return None
+
+    @property
+    def key(self) -> str:
+        return f"{self.year:04d}-{self.month:02d}"
+
+    @property
+    def start_date(self) -> str:
+        return f"{self.key}-01"
+
+    @property
+    def end_date(self) -> str:
+        return f"{self.key}-{self.get_last_day():02d}"
+
+    def get_month_name(self) -> str:
+        return calendar.month_name[self.month]
+
+    def get_month_abbrev(self) -> str:
+        return MONTH_ABBREVIATIONS.get(self.month, calendar.month_abbr[self.month])
+
+    def get_last_day(self) -> int:
+        return calendar.monthrange(self.year, self.month)[1]
+
+
+def required_retrievers(structure: Dict[str, Any], retrievers: Dict[str, Any],
+                        report_type: Optional[str] = None) -> List[Tuple[str, int]]:
+    """(retriever name, page number) for every retriever the schema's tags need, in order."""
+    mapping = {**SCHEMA_TAG_RETRIEVERS, **REPORT_TAG_RETRIEVERS.get(report_type, {})}
+    needed = OrderedDict()
+    for page in structure.get("pages", []):
+        for tag in page.get("tags", []):
+            names = mapping.get(tag["id"], [tag["id"]])
+            for name in names:
+                if name in retrievers and name not in needed:
+                    needed[name] = page.get("page_number", 1)
+    return list(needed.items())
+
+
+def _is_empty(value) -> bool:
+    return value is None or value == "" or value == []
+
+
+class ContextBuilder:
+    """Evaluates the retrievers a schema needs, in parallel, memoized per period and data version."""
+
+    def __init__(self, retrievers: Optional[Dict[str, Any]] = None, runner=None,
+                 max_workers: int = CONTEXT_WORKERS, cache_entries: int = CONTEXT_CACHE_ENTRIES):
+        self._retrievers = retrievers
+        self._runner = runner
+        self.cache_entries = cache_entries
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="context")
+        self._memo: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def retrievers(self) -> Dict[str, Any]:
+        if self._retrievers is None:
+            from ..models.report_schema import marketing_report_retrievers
+            self._retrievers = marketing_report_retrievers
+        return self._retrievers
+
+    @property
+    def runner(self):
+        if self._runner is None:
+            self._runner = get_query_runner()
+        return self._runner
+
+    def _evaluate(self, name: str, period: ReportPeriod, page: int, version) -> Any:
+        retriever = self.retrievers[name]["retriever"]
+        if not isinstance(retriever, tuple):
+            # Header text from the period itself; nothing to memoize
+            if len(inspect.signature(retriever).parameters) == 2:
+                return retriever(period, page)
+            return retriever(period)
+
+        key = (period.key, period.company, version, name)
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                self.hits += 1
+                return self._memo[key]
+            self.misses += 1
+        func, arg_getters = retriever
+        value = func(*(get(period) for get in arg_getters))
+        with self._lock:
+            self._memo[key] = value
+            while len(self._memo) > self.cache_entries:
+                self._memo.popitem(last=False)
+        return value
+
+    def _evaluate_safely(self, name: str, period: ReportPeriod, page: int, version) -> Any:
+        try:
+            return self._evaluate(name, period, page, version)
+        except Exception as e:
+            # One failing aggregate should not block the rest of the report
+            logger.error(f"Retriever {name} failed for {period.key}: {e}")
+            return None
+
+    def build(self, structure: Dict[str, Any], period: ReportPeriod,
+              report_type: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Context for one report: the values of the retrievers ``structure`` needs."""
+        needed = required_retrievers(structure, self.retrievers, report_type)
+        version = self.runner.current_data_version()
+        with self._lock:
+            # Values for older data versions can never be hit again
+            for key in [key for key in self._memo if key[2] != version]:
+                del self._memo[key]
+
+        values = list(self._executor.map(
+            lambda item: self._evaluate_safely(item[0], period, item[1], version), needed
+        ))
+        data = {name: value for (name, _), value in zip(needed, values) if not _is_empty(value)}
+        from_database = [name for name, _ in needed if isinstance(self.retrievers[name]["retriever"], tuple)]
+        if from_database and not any(name in data for name in from_database):
+            # Headers alone would make the LLM write a report with no figures
+            logger.warning(f"All {len(from_database)} database retrievers came back empty for {period.key}")
+            data = {}
+        else:
+            logger.info(f"Built report context for {period.key}: {len(data)} of {len(needed)} retrievers had data")
+
+        return {
+            "metadata": {
+                **(metadata or {}),
+                "period": period.key,
+                "dateRange": {"startDate": period.start_date, "endDate": period.end_date},
+                "dataVersion": list(version) if version else None,
+            },
+            "data": data,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"memoized": len(self._memo), "hits": self.hits, "misses": self.misses}
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_builder: Optional[ContextBuilder] = None
+_builder_lock = threading.Lock()
+
+
+def get_context_builder() -> ContextBuilder:
+    """Return the process-wide context builder, creating it on first use."""
+    global _builder
+    if _builder is None:
+        with _builder_lock:
+            if _builder is None:
+                _builder = ContextBuilder()
+    return _builder
+
+
+def shutdown_context_builder(wait: bool = False):
+    """Stop the retriever threads and drop the memo."""
+    global _builder
+    with _builder_lock:
+        if _builder is not None:
+            _builder.shutdown(wait=wait)
+            _builder = None
@@ -0,0 +1,102 @@
+"""Pearson and Spearman correlations between channel daily series.
+
+Each channel is aggregated to one row per day in SQL first
+(``query.CHANNEL_DAILY_SERIES``), and the daily series are joined 1:1 on date.
+Joining raw line items to engagement rows instead multiplies rows per day and
+inflates every sum. The coefficients are then computed here with NumPy in one
+pass over the days, so the cost grows linearly with the date range.
+
+Days where either side is missing (no email sent, no social posts) are left out
+of that pair's coefficient instead of being counted as zero.
+"""
+import logging
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+RETAIL_TARGET = "retail_sales"
+CHANNEL_METRICS = [
+    "email_open_rate",
+    "email_opens",
+    "email_clicks",
+    "social_engagements",
+    "social_posts",
+    "social_reach",
+]
+
+
+def _paired(x: Sequence[Any], y: Sequence[Any]):
+    """Both series as float arrays, keeping only the days where both have a value."""
+    xs = np.array([np.nan if v is None else float(v) for v in x], dtype=float)
+    ys = np.array([np.nan if v is None else float(v) for v in y], dtype=float)
+    keep = ~(np.isnan(xs) | np.isnan(ys))
+    return xs[keep], ys[keep]
+
+
+def _pearson(xs: np.ndarray, ys: np.ndarray) -> Optional[float]:
+    if len(xs) < 2:
+        return None
+    dx = xs - xs.mean()
+    dy = ys - ys.mean()
+    denominator = np.sqrt((dx * dx).sum() * (dy * dy).sum())
+    if denominator == 0:
+        return None  # a constant series has no correlation
+    return float((dx * dy).sum() / denominator)
+
+
+def _ranks(values: np.ndarray) -> np.ndarray:
+    """1-based ranks, with tied values sharing the average of their ranks."""
+    order = np.argsort(values, kind="mergesort")
+    ranks = np.empty(len(values), dtype=float)
+    sorted_values = values[order]
+    start = 0
+    while start < len(values):
+        end = start
+        while end + 1 < len(values) and sorted_values[end + 1] == sorted_values[start]:
+            end += 1
+        ranks[order[start:end + 1]] = (start + end) / 2 + 1
+        start = end + 1
+    return ranks
+
+
+def pearson(x: Sequence[Any], y: Sequence[Any]) -> Optional[float]:
+    """Pearson correlation of two equal-length series; None if it is undefined."""
+    return _pearson(*_paired(x, y))
+
+
+def spearman(x: Sequence[Any], y: Sequence[Any]) -> Optional[float]:
+    """Spearman rank correlation of two equal-length series; None if it is undefined."""
+    xs, ys = _paired(x, y)
+    return _pearson(_ranks(xs), _ranks(ys))
+
+
+def correlate(rows: Iterable[Mapping[str, Any]], target: str,
+              columns: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """Correlate ``target`` against each of ``columns`` across daily rows.
+
+    Returns ``{column: {"pearson", "spearman", "n"}}``, where ``n`` is the
+    number of days both series have a value.
+    """
+    rows = list(rows)
+    target_values = [row.get(target) for row in rows]
+    results = {}
+    for column in columns:
+        xs, ys = _paired(target_values, [row.get(column) for row in rows])
+        results[column] = {
+            "pearson": _pearson(xs, ys),
+            "spearman": _pearson(_ranks(xs), _ranks(ys)),
+            "n": len(xs),
+        }
+    return results
+
+
+def channel_correlations(start_date: str, end_date: str,
+                         columns: List[str] = CHANNEL_METRICS) -> Dict[str, Dict[str, Any]]:
+    """Correlate daily retail sales with email and social activity for a date range."""
+    import query
+
+    rows = query.run_query(query.CHANNEL_DAILY_SERIES, (start_date, end_date) * 3)
+    logger.info(f"Correlating {len(rows)} retail days between {start_date} and {end_date}")
+    return correlate(rows, RETAIL_TARGET, columns)
@@ -0,0 +1,261 @@
+"""Numeric fact index over a request's context.
+
+The context dict is flattened once per request into ``path -> value`` facts
+(numbers found inside strings are indexed under their path too). Values are
+stored in hash buckets per rounding precision, so checking whether a number
+quoted in a report appears in the context is a dictionary lookup rather than
+a scan. That keeps data-fidelity checks local and O(n) in the size of the
+report.
+
+Numbers are normalised on both sides:
+- currency symbols and thousands separators: "$2,100,000" -> 2100000
+- magnitude suffixes: "2.1M", "$4.5 million", "12K" -> 2100000, 4500000, 12000
+- percentages: "38.2%" matches either 38.2 or the fraction 0.382
+- precision: "12.3%" matches any value that rounds to 12.3
+
+Numbers the generation prompts ask the model to derive are accepted too:
+- inline calculations over context facts: "90.83% (calculation: 1090/12 = 90.83)"
+- ratios and differences of two facts: a 38.2% rate from opens and sends, a
+  "12.3% increase" from this month's and last month's totals
+"""
+import ast
+import bisect
+import math
+import operator
+import re
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+NUMBER_PATTERN = re.compile(
+    r"(?<![\w.])(?P<sign>-)?(?P<currency>[$€£])?\s?(?P<number>\d[\d,]*(?:\.\d+)?)"
+    r"(?:\s?(?P<suffix>[kKmMbB]\b|thousand\b|million\b|billion\b))?(?P<percent>\s?%)?"
+)
+DATE_PATTERN = re.compile(
+    r"\b\d{4}-\d{1,2}-\d{1,2}(?:[T ]\d{1,2}:\d{2}(?::\d{2})?)?\b"
+    r"|\b\d{1,2}/\d{1,2}/\d{2,4}\b"
+    r"|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+\d{1,2}(?:\s*[-–]\s*\d{1,2})?(?:,?\s*\d{4})?"
+    r"|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+\d{4}\b"
+    r"|\bq[1-4]\s+\d{4}\b|\bfy\s?\d{2,4}\b",
+    re.IGNORECASE
+)
+CALCULATION_PATTERN = re.compile(r"calculation:\s*(?P<expression>[^)\]\n;]+)", re.IGNORECASE)
+ARITHMETIC_OPERATORS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv,
+    ast.USub: operator.neg, ast.UAdd: operator.pos,
+}
+SUFFIX_MULTIPLIERS = {
+    "k": 1e3, "thousand": 1e3,
+    "m": 1e6, "million": 1e6,
+    "b": 1e9, "billion": 1e9,
+}
+
+
+@dataclass
+class NumberMention:
+    """A number quoted in text, normalised to its value and written precision."""
+    text: str
+    value: float
+    exponent: int  # the value is precise to 10 ** exponent
+    is_percent: bool = False
+    is_currency: bool = False
+
+
+def extract_numbers(text: str, skip_dates: bool = True) -> List[NumberMention]:
+    """Extract every number in ``text``, with magnitude suffixes and percent signs applied."""
+    if skip_dates:
+        text = DATE_PATTERN.sub(" ", text)
+    mentions = []
+    for match in NUMBER_PATTERN.finditer(text):
+        digits = match.group("number").rstrip(",")
+        try:
+            value = float(digits.replace(",", ""))
+        except ValueError:
+            continue
+        decimals = len(digits.split(".")[1]) if "." in digits else 0
+        exponent = -decimals
+        suffix = match.group("suffix")
+        if suffix:
+            multiplier = SUFFIX_MULTIPLIERS[suffix.lower()]
+            value *= multiplier
+            exponent += int(math.log10(multiplier))
+        if match.group("sign"):
+            value = -value
+        mentions.append(NumberMention(
+            text=match.group(0).strip(),
+            value=value,
+            exponent=exponent,
+            is_percent=bool(match.group("percent")),
+            is_currency=bool(match.group("currency"))
+        ))
+    return mentions
+
+
+def is_trivial(mention: NumberMention) -> bool:
+    """Years and small plain counts ("top 3 campaigns") are not treated as facts."""
+    if mention.is_percent or mention.is_currency or mention.exponent != 0:
+        return False
+    return abs(mention.value) < 10 or 1900 <= mention.value <= 2100
+
+
+def _evaluate(node: ast.AST) -> float:
+    """Evaluate a parsed arithmetic expression (numbers and + - * / only)."""
+    if isinstance(node, ast.Expression):
+        return _evaluate(node.body)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return float(node.value)
+    if isinstance(node, ast.BinOp) and type(node.op) in ARITHMETIC_OPERATORS:
+        return ARITHMETIC_OPERATORS[type(node.op)](_evaluate(node.left), _evaluate(node.right))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in ARITHMETIC_OPERATORS:
+        return ARITHMETIC_OPERATORS[type(node.op)](_evaluate(node.operand))
+    raise ValueError("not an arithmetic expression")
+
+
+def _matches(mention: NumberMention, value: float) -> bool:
+    """Whether ``value`` rounds to the mention at its precision (or to its percentage)."""
+    scale = 10.0 ** mention.exponent
+    key = math.floor(mention.value / scale + 0.5)
+    if math.floor(value / scale + 0.5) == key:
+        return True
+    return mention.is_percent and math.floor(value * 100 / scale + 0.5) == key
+
+
+def _flatten(node: Any, path: str = "") -> Iterator[Tuple[str, Any]]:
+    if isinstance(node, dict):
+        for key, value in node.items():
+            yield from _flatten(value, f"{path}.{key}" if path else str(key))
+    elif isinstance(node, (list, tuple)):
+        for index, value in enumerate(node):
+            yield from _flatten(value, f"{path}[{index}]")
+    else:
+        yield path, node
+
+
+class NumericFactIndex:
+    """Hash index of every number in a context, matched at the precision a report quotes it."""
+
+    def __init__(self, facts: Dict[str, float]):
+        self.facts = facts
+        self._buckets: Dict[Tuple[int, bool], Dict[int, List[str]]] = {}
+        self._sorted: Optional[List[float]] = None
+
+    @classmethod
+    def from_context(cls, context: Any) -> "NumericFactIndex":
+        """Flatten a context dict into ``path -> value`` facts."""
+        facts: Dict[str, float] = {}
+        for path, value in _flatten(context):
+            if isinstance(value, bool) or value is None:
+                continue
+            if isinstance(value, (int, float)):
+                if math.isfinite(value):
+                    facts[path] = float(value)
+                continue
+            # Numbers embedded in strings ("$2.1M", "38.2%") are indexed under their path
+            mentions = extract_numbers(str(value))
+            if len(mentions) == 1:
+                facts[path] = mentions[0].value
+            for position, mention in enumerate(mentions if len(mentions) > 1 else []):
+                facts[f"{path}#{position}"] = mention.value
+        return cls(facts)
+
+    def _bucket(self, exponent: int, as_percent: bool) -> Dict[int, List[str]]:
+        # Built lazily per precision: one O(n) pass, then O(1) lookups
+        key = (exponent, as_percent)
+        if key not in self._buckets:
+            bucket: Dict[int, List[str]] = {}
+            scale = 10.0 ** exponent
+            for path, value in self.facts.items():
+                if as_percent:
+                    value *= 100
+                bucket.setdefault(math.floor(value / scale + 0.5), []).append(path)
+            self._buckets[key] = bucket
+        return self._buckets[key]
+
+    def lookup(self, mention: NumberMention) -> List[str]:
+        """Return the context paths whose value matches the mention at its precision."""
+        key = math.floor(mention.value / 10.0 ** mention.exponent + 0.5)
+        paths = self._bucket(mention.exponent, False).get(key, [])
+        if not paths and mention.is_percent:
+            # 38.2% may be stored as the fraction 0.382
+            paths = self._bucket(mention.exponent, True).get(key, [])
+        return paths
+
+    def _supported(self, mention: NumberMention) -> bool:
+        return is_trivial(mention) or bool(self.lookup(mention)) or self.is_derived(mention)
+
+    def _count_between(self, low: float, high: float) -> int:
+        if self._sorted is None:
+            self._sorted = sorted(self.facts.values())
+        return bisect.bisect_right(self._sorted, high) - bisect.bisect_left(self._sorted, low)
+
+    def is_derived(self, mention: NumberMention) -> bool:
+        """Whether the mention is a ratio or a difference of two facts, at its precision.
+
+        Percentages are also tried as a rate (a / b), a change (a / b - 1, either sign),
+        and a difference of percentages stored either as 38.2 or as 0.382.
+        """
+        value, half = mention.value, 0.5 * 10.0 ** mention.exponent
+        ratios, differences = [(value, half)], [(value, half)]
+        if mention.is_percent:
+            ratios += [(value / 100, half / 100), (1 + value / 100, half / 100), (1 - value / 100, half / 100)]
+            differences.append((value / 100, half / 100))
+
+        for b in set(self.facts.values()):
+            for target, tolerance in ratios:
+                if b == 0:
+                    break
+                low, high = sorted(((target - tolerance) * b, (target + tolerance) * b))
+                # b / b is not a ratio of two facts
+                if self._count_between(low, high) > (1 if low <= b <= high else 0):
+                    return True
+            for target, tolerance in differences:
+                low, high = target + b - tolerance, target + b + tolerance
+                if self._count_between(low, high) > (1 if low <= b <= high else 0):
+                    return True
+        return False
+
+    def calculations(self, text: str) -> List[Tuple[Tuple[int, int], float]]:
+        """(span, result) of the inline calculations in ``text`` whose operands are context facts.
+
+        "(calculation: 1090/12 = 90.83)" gives 90.83 when 1090 and 12 are supported and the
+        arithmetic is right; a calculation with an unsupported operand gives nothing.
+        """
+        accepted = []
+        for match in CALCULATION_PATTERN.finditer(text):
+            expression, *results = match.group("expression").split("=")
+            operands = extract_numbers(expression, skip_dates=False)
+            # "1090 - 12" reads the minus as a sign; the operand itself is 12
+            if not operands or not all(self._supported(replace(operand, value=abs(operand.value)))
+                                       for operand in operands):
+                continue
+            arithmetic = NUMBER_PATTERN.sub(
+                lambda number: f" {extract_numbers(number.group(0), skip_dates=False)[0].value!r} ",
+                expression.replace("×", "*").replace("÷", "/")
+            )
+            try:
+                value = _evaluate(ast.parse(arithmetic.strip(), mode="eval"))
+            except (SyntaxError, ValueError, ZeroDivisionError):
+                continue
+            stated = [mention for result in results for mention in extract_numbers(result, skip_dates=False)]
+            if all(_matches(mention, value) for mention in stated):
+                accepted.append((match.span(), value))
+        return accepted
+
+    def unsupported_numbers(self, text: str) -> List[str]:
+        """Numbers quoted in ``text`` that are neither in the context nor derived from it."""
+        calculations = self.calculations(text)
+        calculated = [value for _, value in calculations]
+        for (start, end), _ in reversed(calculations):
+            # The calculation itself has been checked
+            text = text[:start] + " " + text[end:]
+        return [
+            mention.text for mention in extract_numbers(text)
+            if not any(_matches(mention, value) for value in calculated) and not self._supported(mention)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.facts)
+
+
+def build_fact_index(context: Optional[dict]) -> NumericFactIndex:
+    """Build the fact index for a request's context (an empty index for no context)."""
+    return NumericFactIndex.from_context(context or {})
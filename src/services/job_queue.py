@@ -0,0 +1,176 @@
+"""Background jobs for long-running work such as supporting data loads.
+
+Jobs run on a bounded thread pool (JOB_WORKERS) so the API's event loop and
+threadpool stay free while multi-minute S3 + Excel/parquet loads run. CPU-heavy
+workbook parsing inside a job fans out to a process pool (JOB_PARSE_WORKERS,
+see ``read_workbook_sheets``).
+
+Each job records its status and a list of stages with timings and row counts,
+which ``GET /jobs/{id}`` returns. Finished jobs are kept in memory (per worker
+process) up to JOB_HISTORY entries.
+
+At shutdown, jobs that have not started are marked cancelled and running jobs
+get up to JOB_SHUTDOWN_TIMEOUT seconds to finish.
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+JOB_PARSE_WORKERS = int(os.getenv('JOB_PARSE_WORKERS', '2'))
+JOB_HISTORY = int(os.getenv('JOB_HISTORY', '100'))
+JOB_SHUTDOWN_TIMEOUT = float(os.getenv('JOB_SHUTDOWN_TIMEOUT', '30'))
+
+
+class Job:
+    """Status, result and per-stage timings of one unit of background work."""
+
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.stages: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a stage; the caller may set ``record["rows"]`` on the yielded dict."""
+        record = {"name": name, "status": "running", "seconds": None, "rows": None}
+        with self._lock:
+            self.stages.append(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record["status"] = "failed"
+            record["error"] = str(e)
+            raise
+        else:
+            record["status"] = "completed"
+        finally:
+            record["seconds"] = round(time.perf_counter() - start, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        end = self.finished_at or time.time()
+        with self._lock:
+            stages = [dict(stage) for stage in self.stages]
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "seconds": round(end - self.started_at, 3) if self.started_at else None,
+            "stages": stages,
+            "result": self.result,
+            "error": self.error
+        }
+
+
+class JobQueue:
+    def __init__(self, max_workers: int = JOB_WORKERS, history: int = JOB_HISTORY):
+        self.max_workers = max_workers
+        self.history = history
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._futures: Dict[str, Future] = {}
+
+    def submit(self, kind: str, fn: Callable[..., Any], *args, **kwargs) -> Job:
+        """Queue ``fn(job, *args, **kwargs)``; returns the job immediately."""
+        job = Job(kind)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        future = self._executor.submit(self._run, job, fn, args, kwargs)
+        with self._lock:
+            self._futures[job.id] = future
+        future.add_done_callback(lambda _: self._forget_future(job.id))
+        return job
+
+    def _forget_future(self, job_id: str):
+        with self._lock:
+            self._futures.pop(job_id, None)
+
+    def _prune(self):
+        # Forget the oldest finished jobs once the history is full
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in ("completed", "failed", "cancelled")]
+        for job_id in finished[:max(0, len(self._jobs) - self.history)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: Job, fn: Callable[..., Any], args: tuple, kwargs: dict):
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.status = "completed"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+            logger.error(f"Job {job.id} ({job.kind}) failed: {e}")
+        finally:
+            job.finished_at = time.time()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self, timeout: Optional[float] = JOB_SHUTDOWN_TIMEOUT) -> bool:
+        """Cancel jobs that have not started and wait up to ``timeout`` seconds for running ones.
+
+        Returns False if jobs were still running when the timeout expired.
+        """
+        with self._lock:
+            futures = dict(self._futures)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for job_id, future in futures.items():
+            job = self._jobs.get(job_id)
+            if future.cancelled() and job is not None:
+                job.status = "cancelled"
+                job.error = "Cancelled at shutdown before it started"
+                job.finished_at = time.time()
+
+        running = [future for future in futures.values() if not future.cancelled()]
+        _, not_done = wait(running, timeout=timeout)
+        if not_done:
+            logger.warning(f"{len(not_done)} job(s) still running after waiting {timeout}s at shutdown")
+        return not not_done
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide job queue, creating it on first use."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue()
+    return _queue
+
+
+def shutdown_job_queue(timeout: Optional[float] = JOB_SHUTDOWN_TIMEOUT) -> bool:
+    """Stop the worker threads: cancel queued jobs and wait up to ``timeout`` for running ones."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            return True
+        finished = _queue.shutdown(timeout=timeout)
+        _queue = None
+        return finished
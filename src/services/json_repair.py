@@ -0,0 +1,263 @@
+"""Single-pass tolerant JSON parser for LLM output.
+
+LLM responses are usually valid JSON, so ``repair_json`` first tries
+``json.loads``. If that fails, one linear pass of a forgiving
+recursive-descent parser builds the value directly and records each repair
+it applied:
+- text before/after the JSON (markdown fences, explanations)
+- trailing, doubled or missing commas, and missing colons
+- unquoted keys and Python literals (True/False/None)
+- unescaped quotes inside strings
+- raw control characters and invalid escapes inside strings
+- truncated output (unterminated strings, objects and arrays are closed)
+"""
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, List
+
+_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+_STRING_RUN = re.compile(r'[^"\\\x00-\x1f]+')
+_BARE_KEY = re.compile(r"[A-Za-z_$][\w$-]*")
+_WHITESPACE = " \t\n\r"
+_WHITESPACE_RUN = re.compile(r"[ \t\n\r]*")
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+_LITERALS = {"true": True, "false": False, "null": None}
+_PYTHON_LITERALS = {"True": True, "False": False, "None": None}
+
+
+@dataclass
+class RepairResult:
+    """The parsed value and the repairs that were needed to get it (empty for valid JSON)."""
+    value: Any
+    repairs: List[str] = field(default_factory=list)
+
+
+class _TolerantParser:
+    def __init__(self, text: str):
+        self.text = text
+        self.length = len(text)
+        self.pos = 0
+        self.repairs: List[str] = []
+
+    def note(self, repair: str):
+        if repair not in self.repairs:
+            self.repairs.append(repair)
+
+    def skip_whitespace(self):
+        self.pos = _WHITESPACE_RUN.match(self.text, self.pos).end()
+
+    def peek(self) -> str:
+        return self.text[self.pos] if self.pos < self.length else ""
+
+    def parse_value(self) -> Any:
+        self.skip_whitespace()
+        char = self.peek()
+        if char == "{":
+            return self.parse_object()
+        if char == "[":
+            return self.parse_array()
+        if char == '"':
+            return self.parse_string()
+        if char == "-" or char.isdigit():
+            return self.parse_number()
+        for literals, repair in ((_LITERALS, None), (_PYTHON_LITERALS, "converted Python literal")):
+            for word, value in literals.items():
+                if self.text.startswith(word, self.pos):
+                    self.pos += len(word)
+                    if repair:
+                        self.note(repair)
+                    return value
+        if not char:
+            self.note("filled truncated value with null")
+            return None
+        # Unquoted text: keep it as a string up to the next delimiter
+        start = self.pos
+        while self.pos < self.length and self.text[self.pos] not in ",}]\n":
+            self.pos += 1
+        self.note("quoted bare value")
+        return self.text[start:self.pos].strip()
+
+    def parse_number(self) -> Any:
+        match = _NUMBER.match(self.text, self.pos)
+        if not match:
+            # A lone "-" (truncated number)
+            self.pos += 1
+            self.note("filled truncated value with null")
+            return None
+        self.pos = match.end()
+        token = match.group(0)
+        return float(token) if any(c in token for c in ".eE") else int(token)
+
+    def _closes_string(self, quote_pos: int) -> bool:
+        """Decide whether the quote at quote_pos ends the string or is an embedded quote."""
+        text, pos, length = self.text, quote_pos + 1, self.length
+        saw_newline = False
+        while pos < length and text[pos] in _WHITESPACE:
+            saw_newline = saw_newline or text[pos] == "\n"
+            pos += 1
+        if pos >= length or text[pos] in ":,}]":
+            return True
+        # '"a"\n"b"' is a missing comma rather than an embedded quote
+        return saw_newline and text[pos] == '"'
+
+    def parse_string(self) -> str:
+        self.pos += 1  # opening quote
+        text, length = self.text, self.length
+        parts = []
+        while True:
+            match = _STRING_RUN.match(text, self.pos)
+            if match:
+                parts.append(match.group(0))
+                self.pos = match.end()
+            if self.pos >= length:
+                self.note("closed truncated string")
+                return "".join(parts)
+            char = text[self.pos]
+            if char == '"':
+                if self._closes_string(self.pos):
+                    self.pos += 1
+                    return "".join(parts)
+                self.note("escaped unescaped quote")
+                parts.append('"')
+                self.pos += 1
+            elif char == "\\":
+                escape = text[self.pos + 1:self.pos + 2]
+                if escape in _ESCAPES:
+                    parts.append(_ESCAPES[escape])
+                    self.pos += 2
+                elif escape == "u" and re.fullmatch(r"[0-9a-fA-F]{4}", text[self.pos + 2:self.pos + 6] or ""):
+                    parts.append(chr(int(text[self.pos + 2:self.pos + 6], 16)))
+                    self.pos += 6
+                elif not escape:
+                    self.pos += 1
+                else:
+                    self.note("kept invalid escape")
+                    parts.append(escape)
+                    self.pos += 2
+            else:
+                # Raw control character inside a string
+                if char in "\n\r\t":
+                    parts.append(" " if char != "\t" else "\t")
+                    self.note("replaced raw newline in string")
+                else:
+                    self.note("removed control character")
+                self.pos += 1
+
+    def parse_key(self) -> str:
+        if self.peek() == '"':
+            return self.parse_string()
+        match = _BARE_KEY.match(self.text, self.pos)
+        if match:
+            self.pos = match.end()
+            self.note("quoted bare key")
+            return match.group(0)
+        if self.peek() == "'":
+            end = self.text.find("'", self.pos + 1)
+            end = self.length if end == -1 else end
+            key = self.text[self.pos + 1:end]
+            self.pos = min(end + 1, self.length)
+            self.note("quoted bare key")
+            return key
+        # Skip a stray character and let the caller try again
+        self.pos += 1
+        self.note("skipped unexpected character")
+        return None
+
+    def parse_object(self) -> dict:
+        self.pos += 1  # {
+        result = {}
+        expecting_member = True
+        while True:
+            self.skip_whitespace()
+            char = self.peek()
+            if not char:
+                self.note("closed truncated object")
+                return result
+            if char == "}":
+                self.pos += 1
+                if expecting_member and result:
+                    self.note("removed trailing comma")
+                return result
+            if char == ",":
+                self.pos += 1
+                if expecting_member:
+                    self.note("removed extra comma")
+                expecting_member = True
+                continue
+            if char == "]":
+                self.pos += 1
+                self.note("skipped unexpected character")
+                continue
+            if not expecting_member:
+                self.note("inserted missing comma")
+
+            key = self.parse_key()
+            if key is None:
+                continue
+            self.skip_whitespace()
+            if self.peek() == ":":
+                self.pos += 1
+            elif not self.peek():
+                self.note("closed truncated object")
+                result[key] = None
+                return result
+            else:
+                self.note("inserted missing colon")
+            result[key] = self.parse_value()
+            expecting_member = False
+
+    def parse_array(self) -> list:
+        self.pos += 1  # [
+        result = []
+        expecting_item = True
+        while True:
+            self.skip_whitespace()
+            char = self.peek()
+            if not char:
+                self.note("closed truncated array")
+                return result
+            if char == "]":
+                self.pos += 1
+                if expecting_item and result:
+                    self.note("removed trailing comma")
+                return result
+            if char == ",":
+                self.pos += 1
+                if expecting_item:
+                    self.note("removed extra comma")
+                expecting_item = True
+                continue
+            if char == "}":
+                self.pos += 1
+                self.note("skipped unexpected character")
+                continue
+            if not expecting_item:
+                self.note("inserted missing comma")
+            result.append(self.parse_value())
+            expecting_item = False
+
+
+def repair_json(text: str) -> RepairResult:
+    """Parse ``text`` as JSON, repairing common LLM formatting issues in one linear pass.
+
+    Raises json.JSONDecodeError when the text contains no JSON object or array.
+    """
+    try:
+        return RepairResult(json.loads(text))
+    except (json.JSONDecodeError, TypeError):
+        pass
+
+    text = text or ""
+    starts = [index for index in (text.find("{"), text.find("[")) if index != -1]
+    if not starts:
+        raise json.JSONDecodeError("No JSON object found in text", text, 0)
+
+    parser = _TolerantParser(text)
+    parser.pos = min(starts)
+    if text[:parser.pos].strip():
+        parser.note("removed text before JSON")
+    value = parser.parse_value()
+    if text[parser.pos:].strip():
+        parser.note("removed text after JSON")
+    return RepairResult(value, parser.repairs)
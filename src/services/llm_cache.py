@@ -0,0 +1,216 @@
+"""Content-addressed cache for LLM responses.
+
+Responses are keyed on a SHA-256 digest of the model name, the prompt (or the
+list of chat messages) and the generation parameters, so identical requests
+made by the Gemini and Ollama generators can be answered without another
+round-trip to the model.
+
+The cache has two tiers:
+- a size-bounded in-memory LRU (always on)
+- an optional on-disk SQLite store shared by every worker on the host
+
+Both tiers honour the same TTL. Any object implementing ``get``/``set``/
+``clear`` can be passed as the disk tier, which keeps the backend pluggable.
+
+Clients only cache responses that ``is_cacheable_response`` accepts (complete
+JSON), so a truncated or malformed answer is retried on the next request
+instead of being served for the whole TTL.
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from src.services.json_repair import repair_json
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(model: str, prompt: Any, params: Optional[Dict[str, Any]] = None) -> str:
+    """Build a stable cache key from the model, prompt/messages and generation params."""
+    payload = json.dumps(
+        {"model": model, "prompt": prompt, "params": params or {}},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_cacheable_response(text: Optional[str]) -> bool:
+    """True when ``text`` parses (with repairs) to a complete JSON object or array.
+
+    Every prompt sent through the cache asks for JSON; output that does not
+    parse, or that only parses by closing truncated values, is not cached.
+    """
+    if not text:
+        return False
+    try:
+        result = repair_json(text)
+    except json.JSONDecodeError:
+        return False
+    return isinstance(result.value, (dict, list)) and not any("truncated" in repair for repair in result.repairs)
+
+
+class SQLiteCacheStore:
+    """On-disk cache tier backed by a single SQLite table."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_response_cache (
+                cache_key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, expires_at FROM llm_response_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < time.time():
+                self._conn.execute("DELETE FROM llm_response_cache WHERE cache_key = ?", (key,))
+                self._conn.commit()
+                return None
+            return row[0]
+
+    def set(self, key: str, value: str, expires_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_response_cache (cache_key, response, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+            # Opportunistically drop expired rows so the file does not grow forever
+            self._conn.execute("DELETE FROM llm_response_cache WHERE expires_at < ?", (time.time(),))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_response_cache")
+            self._conn.commit()
+
+
+class LLMResponseCache:
+    """Two-tier (memory LRU + optional disk) cache with TTL eviction and hit/miss counters."""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: int = 3600, disk_store=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_store = disk_store
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for ``key`` or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at >= now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.evictions += 1
+
+        if self.disk_store is not None:
+            try:
+                value = self.disk_store.get(key)
+            except Exception as e:
+                logger.warning(f"LLM cache disk read failed: {e}")
+                value = None
+            if value is not None:
+                with self._lock:
+                    self._store(key, value, now + self.ttl_seconds)
+                    self.hits += 1
+                    self.disk_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: str):
+        """Store a response under ``key`` in every configured tier."""
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._store(key, value, expires_at)
+        if self.disk_store is not None:
+            try:
+                self.disk_store.set(key, value, expires_at)
+            except Exception as e:
+                logger.warning(f"LLM cache disk write failed: {e}")
+
+    def _store(self, key: str, value: str, expires_at: float):
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.disk_store is not None:
+            self.disk_store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "hit_rate": round(self.hits / total, 3) if total else 0.0
+            }
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_initialized = False
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Return the process-wide response cache, or None when caching is disabled."""
+    global _cache, _cache_initialized
+    if _cache_initialized:
+        return _cache
+    with _cache_lock:
+        if not _cache_initialized:
+            from src.config.settings import settings
+            if settings.LLM_CACHE_ENABLED:
+                disk_store = SQLiteCacheStore(settings.LLM_CACHE_DB_PATH) if settings.LLM_CACHE_DB_PATH else None
+                _cache = LLMResponseCache(
+                    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+                    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+                    disk_store=disk_store
+                )
+            _cache_initialized = True
+    return _cache
+
+
+def set_llm_cache(cache: Optional[LLMResponseCache]):
+    """Install a custom cache implementation (or None to disable caching)."""
+    global _cache, _cache_initialized
+    with _cache_lock:
+        _cache = cache
+        _cache_initialized = True
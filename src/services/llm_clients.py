@@ -0,0 +1,247 @@
+"""Native asyncio clients for the LLM providers.
+
+Gemini is called through its REST endpoint and Ollama through
+``ollama.AsyncClient``. Both ride on one process-wide httpx transport, so
+every in-flight report in the worker shares the same bounded connection pool
+instead of spinning up a thread (and a fresh connection) per call.
+"""
+import json
+import logging
+import os
+from typing import AsyncIterator, Optional
+
+import httpx
+from google.api_core import exceptions as google_exceptions
+from ollama import AsyncClient, ResponseError
+
+from src.config.settings import settings
+from src.services.llm_cache import get_llm_cache, is_cacheable_response, make_cache_key
+from src.services.rate_limiter import estimate_tokens, get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent"
+GEMINI_STREAM_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/{model}:streamGenerateContent?alt=sse"
+
+_transport: Optional[httpx.AsyncHTTPTransport] = None
+_http_client: Optional[httpx.AsyncClient] = None
+_ollama_client: Optional[AsyncClient] = None
+
+
+def _get_transport() -> httpx.AsyncHTTPTransport:
+    global _transport
+    if _transport is None:
+        _transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE
+            )
+        )
+    return _transport
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide httpx.AsyncClient used for Gemini REST calls."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            transport=_get_transport(),
+            timeout=httpx.Timeout(settings.LLM_HTTP_TIMEOUT, connect=10.0)
+        )
+    return _http_client
+
+
+def get_ollama_async_client() -> AsyncClient:
+    """Return the process-wide Ollama AsyncClient (shares the httpx transport)."""
+    global _ollama_client
+    if _ollama_client is None:
+        _ollama_client = AsyncClient(
+            host=os.getenv('OLLAMA_API_URL'),
+            transport=_get_transport(),
+            timeout=settings.LLM_HTTP_TIMEOUT
+        )
+    return _ollama_client
+
+
+async def close_clients():
+    """Close the shared clients and their connection pool (called on app shutdown)."""
+    global _transport, _http_client, _ollama_client
+    if _http_client is not None:
+        await _http_client.aclose()
+    if _transport is not None:
+        await _transport.aclose()
+    _transport = None
+    _http_client = None
+    _ollama_client = None
+
+
+def _retry_delay(retry_after: Optional[str], attempt: int) -> float:
+    """Seconds to pause a model after a 429: the server's Retry-After, else exponential backoff."""
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return settings.LLM_RATE_LIMIT_BACKOFF_SECONDS * (2 ** attempt)
+
+
+def _extract_gemini_text(payload: dict) -> str:
+    """Join the text parts of the first candidate in a generateContent response."""
+    candidates = payload.get("candidates") or []
+    if not candidates:
+        feedback = payload.get("promptFeedback", {})
+        raise ValueError(f"Gemini returned no candidates: {feedback}")
+    parts = candidates[0].get("content", {}).get("parts", [])
+    return "".join(part.get("text", "") for part in parts)
+
+
+async def gemini_generate_async(model: str, prompt: str, use_cache: bool = True) -> str:
+    """Generate content from Gemini without blocking the event loop.
+
+    Mirrors GeminiClient.generate: identical prompts are served from the
+    response cache and calls go through the model's shared rate limiter,
+    which also absorbs 429s.
+    """
+    cache = get_llm_cache() if use_cache else None
+    cache_key = make_cache_key(model, prompt) if cache else None
+    if cache:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    client = get_http_client()
+    limiter = get_rate_limiter(model)
+    body = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+    headers = {"x-goog-api-key": settings.GOOGLE_API_KEY}
+    tokens = estimate_tokens(prompt)
+
+    for attempt in range(settings.MAX_RETRIES):
+        async with limiter.limit(tokens):
+            response = await client.post(GEMINI_API_URL.format(model=model), json=body, headers=headers)
+        if response.status_code == 429 and attempt < settings.MAX_RETRIES - 1:
+            delay = _retry_delay(response.headers.get("retry-after"), attempt)
+            logger.warning(f"[Gemini] Rate limit hit. Pausing {model} for {delay} seconds before retry {attempt + 2}/{settings.MAX_RETRIES}...")
+            limiter.penalize(delay)
+            continue
+        if response.status_code >= 400:
+            raise google_exceptions.from_http_status(response.status_code, response.text)
+
+        payload = response.json()
+        usage = payload.get("usageMetadata", {}).get("totalTokenCount")
+        if usage:
+            limiter.record_usage(tokens, usage)
+        text = _extract_gemini_text(payload)
+        if cache and is_cacheable_response(text):
+            cache.set(cache_key, text)
+        return text
+
+    raise Exception("Failed to generate content after retries")
+
+
+async def gemini_stream_async(model: str, prompt: str, use_cache: bool = True) -> AsyncIterator[str]:
+    """Stream text chunks from Gemini as they are generated (server-sent events).
+
+    A cached response is yielded as a single chunk, and the full text is
+    cached once the stream completes.
+    """
+    cache = get_llm_cache() if use_cache else None
+    cache_key = make_cache_key(model, prompt) if cache else None
+    if cache:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+    client = get_http_client()
+    limiter = get_rate_limiter(model)
+    body = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+    headers = {"x-goog-api-key": settings.GOOGLE_API_KEY}
+    tokens = estimate_tokens(prompt)
+
+    for attempt in range(settings.MAX_RETRIES):
+        chunks = []
+        usage = None
+        async with limiter.limit(tokens):
+            async with client.stream("POST", GEMINI_STREAM_API_URL.format(model=model), json=body, headers=headers) as response:
+                if response.status_code == 429 and attempt < settings.MAX_RETRIES - 1:
+                    delay = _retry_delay(response.headers.get("retry-after"), attempt)
+                    logger.warning(f"[Gemini] Rate limit hit. Pausing {model} for {delay} seconds before retry {attempt + 2}/{settings.MAX_RETRIES}...")
+                    limiter.penalize(delay)
+                    continue
+                if response.status_code >= 400:
+                    await response.aread()
+                    raise google_exceptions.from_http_status(response.status_code, response.text)
+
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    payload = json.loads(line[len("data:"):])
+                    usage = payload.get("usageMetadata", {}).get("totalTokenCount", usage)
+                    text = _extract_gemini_text(payload)
+                    if text:
+                        chunks.append(text)
+                        yield text
+
+        if usage:
+            limiter.record_usage(tokens, usage)
+        text = "".join(chunks)
+        if cache and is_cacheable_response(text):
+            cache.set(cache_key, text)
+        return
+
+    raise Exception("Failed to generate content after retries")
+
+
+async def ollama_chat_async(model: str, messages: list, use_cache: bool = True) -> Optional[str]:
+    """Send a chat request through the shared Ollama AsyncClient and return the message content."""
+    cache = get_llm_cache() if use_cache else None
+    cache_key = make_cache_key(model, messages) if cache else None
+    if cache:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    limiter = get_rate_limiter(model)
+    tokens = estimate_tokens(messages)
+    for attempt in range(settings.MAX_RETRIES):
+        try:
+            async with limiter.limit(tokens):
+                response = await get_ollama_async_client().chat(model=model, messages=messages)
+            break
+        except ResponseError as e:
+            if e.status_code != 429 or attempt == settings.MAX_RETRIES - 1:
+                raise
+            delay = _retry_delay(None, attempt)
+            logger.warning(f"[Ollama] Rate limit hit. Pausing {model} for {delay} seconds before retry {attempt + 2}/{settings.MAX_RETRIES}...")
+            limiter.penalize(delay)
+
+    if not (response and hasattr(response, 'message') and response.message.get('content')):
+        return None
+
+    content = response.message['content']
+    if cache and is_cacheable_response(content):
+        cache.set(cache_key, content)
+    return content
+
+
+async def ollama_chat_stream_async(model: str, messages: list, use_cache: bool = True) -> AsyncIterator[str]:
+    """Stream message content chunks from Ollama as they are generated."""
+    cache = get_llm_cache() if use_cache else None
+    cache_key = make_cache_key(model, messages) if cache else None
+    if cache:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+    limiter = get_rate_limiter(model)
+    chunks = []
+    async with limiter.limit(estimate_tokens(messages)):
+        stream = await get_ollama_async_client().chat(model=model, messages=messages, stream=True)
+        async for part in stream:
+            text = part.message.get('content') if part and hasattr(part, 'message') else None
+            if text:
+                chunks.append(text)
+                yield text
+
+    content = "".join(chunks)
+    if cache and is_cacheable_response(content):
+        cache.set(cache_key, content)
@@ -1,13 +1,14 @@
 from config import client
-from typing import Dict, Any, List, Union
+from typing import Dict, Any, Callable, List, Union
 import json
-import re
 from src.config.prompts import (
     generate_report_prompt,
     generate_retail_data_report_prompt,
     generate_email_performance_report_prompt,
     generate_social_media_data_report_prompt
 )
+from src.services.llm_clients import gemini_stream_async
+from src.services.json_repair import repair_json
 
 def format_content(data: Union[str, List[str]]) -> Union[str, List[str]]:
     """Helper function to properly format content"""
@@ -15,94 +16,18 @@ def format_content(data: Union[str, List[str]]) -> Union[str, List[str]]:
         return [str(item).strip() for item in data if item]
     return str(data).strip()
 
-def repair_json_response(text):
-    """Robust JSON repair for common LLM formatting issues"""
-    
-    # Step 1: Remove any non-JSON content before/after the JSON object
-    first_brace = text.find('{')
-    last_brace = text.rfind('}')
-    if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
-        text = text[first_brace:last_brace + 1]
-    
-    # Step 2: Remove control characters
-    text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]', '', text)
-    
-    # Step 3: Handle trailing commas - multiple passes
-    for _ in range(10):
-        text = re.sub(r',(\s*[\]\}])', r'\1', text)
-    
-    # Step 4: Handle missing commas between elements
-    text = re.sub(r'"\s*\n\s*"', '",\n"', text)
-    text = re.sub(r'(\}|\])\s*\n\s*(\{|\[|")', r'\1,\n\2', text)
-    text = re.sub(r'(\d+)\s*\n\s*"', r'\1,\n"', text)
-    text = re.sub(r'(true|false|null)\s*\n\s*"', r'\1,\n"', text)
-    
-    # Step 5: Handle truncated JSON
-    open_braces = text.count('{') - text.count('}')
-    open_brackets = text.count('[') - text.count(']')
-    
-    if open_braces > 0:
-        text = text.rstrip().rstrip(',') + '}' * open_braces
-    if open_brackets > 0:
-        text = text.rstrip().rstrip(',') + ']' * open_brackets
-    
-    # Step 6: Remove double commas
-    text = re.sub(r',\s*,', ',', text)
-    
-    return text
-
 def try_parse_json_with_recovery(text):
-    """Try multiple strategies to parse JSON"""
-    strategies = []
-    
-    # Strategy 1: Direct parse
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError as e:
-        strategies.append(("direct", str(e)))
-    
-    # Strategy 2: Basic repair
-    try:
-        repaired = repair_json_response(text)
-        return json.loads(repaired)
-    except json.JSONDecodeError as e:
-        strategies.append(("basic_repair", str(e)))
-    
-    # Strategy 3: Collapse newlines then repair
-    try:
-        collapsed = re.sub(r'\n\s*', ' ', text)
-        collapsed = repair_json_response(collapsed)
-        return json.loads(collapsed)
-    except json.JSONDecodeError as e:
-        strategies.append(("collapse_newlines", str(e)))
-    
-    # Strategy 4: Binary search for valid JSON
-    try:
-        first_brace = text.find('{')
-        if first_brace != -1:
-            for end_pos in range(len(text), first_brace + 100, -100):
-                try:
-                    substring = text[first_brace:end_pos]
-                    open_braces = substring.count('{') - substring.count('}')
-                    open_brackets = substring.count('[') - substring.count(']')
-                    substring = substring.rstrip().rstrip(',')
-                    substring += ']' * max(0, open_brackets) + '}' * max(0, open_braces)
-                    result = json.loads(substring)
-                    if result:
-                        return result
-                except:
-                    continue
-    except Exception as e:
-        strategies.append(("binary_search", str(e)))
-    
-    # All strategies failed
-    error_msg = "; ".join([f"{s[0]}: {s[1][:50]}" for s in strategies])
-    raise json.JSONDecodeError(f"All JSON recovery strategies failed: {error_msg}", text, 0)
+    """Parse JSON from an LLM response, repairing common formatting issues in a single pass"""
+    result = repair_json(text)
+    if result.repairs:
+        print(f"Repaired LLM JSON output: {', '.join(result.repairs)}")
+    return result.value
 
-def generate_report(structure: dict, context: dict, feedback: Dict[str, Any] = None) -> dict:
-    """Generate structured report using Gemini with source tags"""
-    # Create a copy of the structure and add source information
-    modified_structure = {
+GEMINI_MODEL = "gemini-2.5-flash"
+
+def _gemini_structure(structure: dict) -> dict:
+    """Create a copy of the structure with Gemini source placeholders"""
+    return {
         'pages': [{
             'page_number': page['page_number'],
             'tags': [{
@@ -116,90 +41,78 @@ def generate_report(structure: dict, context: dict, feedback: Dict[str, Any] = N
         } for page in structure['pages']]
     }
 
-    prompt = generate_report_prompt(modified_structure, context)
-
-    response_text = client.generate("gemini-2.5-flash", prompt)
-
+def _parse_response(response_text: str) -> dict:
+    """Parse a Gemini response into a report dict"""
     try:
         return try_parse_json_with_recovery(response_text)
     except json.JSONDecodeError as e:
         raise ValueError(f"Gemini output not valid JSON: {e}")
 
+def generate_report(structure: dict, context: dict, feedback: Dict[str, Any] = None) -> dict:
+    """Generate structured report using Gemini with source tags"""
+    prompt = generate_report_prompt(_gemini_structure(structure), context)
+    response_text = client.generate(GEMINI_MODEL, prompt, use_cache=not feedback)
+    return _parse_response(response_text)
+
 def generate_retail_data_report(structure: dict, context: dict, feedback: Dict[str, Any] = None) -> dict:
     """Generate retail data report using Gemini with source tags"""
-    # Create a copy of the structure and add source information
-    modified_structure = {
-        'pages': [{
-            'page_number': page['page_number'],
-            'tags': [{
-                'id': tag['id'],
-                'content': [{
-                    'source': 'Gemini',
-                    'title': str(tag.get('id')),
-                    'data': []  # Initialize as empty list to support both string and list formats
-                }]
-            } for tag in page['tags']]
-        } for page in structure['pages']]
-    }
-
-    prompt = generate_retail_data_report_prompt(modified_structure, context)
-
-    response_text = client.generate("gemini-2.5-flash", prompt)
-
-    try:
-        return try_parse_json_with_recovery(response_text)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Gemini output not valid JSON: {e}")
+    prompt = generate_retail_data_report_prompt(_gemini_structure(structure), context)
+    response_text = client.generate(GEMINI_MODEL, prompt, use_cache=not feedback)
+    return _parse_response(response_text)
 
 def generate_email_performance_report(structure: dict, context: dict, feedback: Dict[str, Any] = None) -> dict:
     """Generate email performance report using Gemini with source tags"""
-    # Create a copy of the structure and add source information
-    modified_structure = {
-        'pages': [{
-            'page_number': page['page_number'],
-            'tags': [{
-                'id': tag['id'],
-                'content': [{
-                    'source': 'Gemini',
-                    'title': str(tag.get('id')),
-                    'data': []  # Initialize as empty list to support both string and list formats
-                }]
-            } for tag in page['tags']]
-        } for page in structure['pages']]
-    }
-
-    prompt = generate_email_performance_report_prompt(modified_structure, context)
-
-    response_text = client.generate("gemini-2.5-flash", prompt)
-
-    try:
-        return try_parse_json_with_recovery(response_text)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Gemini output not valid JSON: {e}")
+    prompt = generate_email_performance_report_prompt(_gemini_structure(structure), context)
+    response_text = client.generate(GEMINI_MODEL, prompt, use_cache=not feedback)
+    return _parse_response(response_text)
 
 def generate_social_media_data_report(structure: dict, context: dict, feedback: Dict[str, Any] = None) -> dict:
     """Generate social media data report using Gemini with source tags"""
-    # Create a copy of the structure and add source information
-    modified_structure = {
-        'pages': [{
-            'page_number': page['page_number'],
-            'tags': [{
-                'id': tag['id'],
-                'content': [{
-                    'source': 'Gemini',
-                    'title': str(tag.get('id')),
-                    'data': []  # Initialize as empty list to support both string and list formats
-                }]
-            } for tag in page['tags']]
-        } for page in structure['pages']]
-    }
-
-    prompt = generate_social_media_data_report_prompt(modified_structure, context)
-
-    response_text = client.generate("gemini-2.5-flash", prompt)
-
-    try:
-        return try_parse_json_with_recovery(response_text)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Gemini output not valid JSON: {e}")
-
+    prompt = generate_social_media_data_report_prompt(_gemini_structure(structure), context)
+    response_text = client.generate(GEMINI_MODEL, prompt, use_cache=not feedback)
+    return _parse_response(response_text)
+
+async def generate_report_async(structure: dict, context: dict, feedback: Dict[str, Any] = None) -> dict:
+    """Async counterpart of generate_report using the shared httpx connection pool"""
+    prompt = generate_report_prompt(_gemini_structure(structure), context)
+    response_text = await client.generate_async(GEMINI_MODEL, prompt, use_cache=not feedback)
+    return _parse_response(response_text)
+
+async def generate_retail_data_report_async(structure: dict, context: dict, feedback: Dict[str, Any] = None) -> dict:
+    """Async counterpart of generate_retail_data_report using the shared httpx connection pool"""
+    prompt = generate_retail_data_report_prompt(_gemini_structure(structure), context)
+    response_text = await client.generate_async(GEMINI_MODEL, prompt, use_cache=not feedback)
+    return _parse_response(response_text)
+
+async def generate_email_performance_report_async(structure: dict, context: dict, feedback: Dict[str, Any] = None) -> dict:
+    """Async counterpart of generate_email_performance_report using the shared httpx connection pool"""
+    prompt = generate_email_performance_report_prompt(_gemini_structure(structure), context)
+    response_text = await client.generate_async(GEMINI_MODEL, prompt, use_cache=not feedback)
+    return _parse_response(response_text)
+
+async def generate_social_media_data_report_async(structure: dict, context: dict, feedback: Dict[str, Any] = None) -> dict:
+    """Async counterpart of generate_social_media_data_report using the shared httpx connection pool"""
+    prompt = generate_social_media_data_report_prompt(_gemini_structure(structure), context)
+    response_text = await client.generate_async(GEMINI_MODEL, prompt, use_cache=not feedback)
+    return _parse_response(response_text)
+
+_PROMPT_BUILDERS = {
+    "retail-data": generate_retail_data_report_prompt,
+    "email-performance-data": generate_email_performance_report_prompt,
+    "social-media-data": generate_social_media_data_report_prompt,
+}
+
+async def stream_report_async(structure: dict, context: dict, report_type: str, on_chunk: Callable[[str], None]) -> dict:
+    """Stream the report for report_type through on_chunk as it is generated and return the parsed report"""
+    prompt_builder = _PROMPT_BUILDERS.get(report_type, generate_report_prompt)
+    prompt = prompt_builder(_gemini_structure(structure), context)
+    chunks = []
+    async for chunk in gemini_stream_async(GEMINI_MODEL, prompt):
+        chunks.append(chunk)
+        on_chunk(chunk)
+    return _parse_response("".join(chunks))
+
+async def regenerate_tags_async(prompt: str) -> dict:
+    """Send a partial regeneration prompt to Gemini and return the parsed {"tags": [...]} response"""
+    response_text = await client.generate_async(GEMINI_MODEL, prompt, use_cache=False)
+    return _parse_response(response_text)
@@ -1,165 +1,50 @@
-from typing import Dict, Any
+from typing import Dict, Any, Callable
 import json
 from ollama import Client
 from dotenv import load_dotenv
-from src.config.prompts import (
-    generate_report_prompt,
-    generate_retail_data_report_prompt,
-    generate_email_performance_report_prompt,
-    generate_social_media_data_report_prompt
-)
+from src.services.llm_cache import get_llm_cache, is_cacheable_response, make_cache_key
+from src.services.llm_clients import ollama_chat_async, ollama_chat_stream_async
+from src.services.rate_limiter import estimate_tokens, get_rate_limiter
+from src.services.json_repair import repair_json
 
 load_dotenv()
 import os
-import re
-
-def repair_json_response(text):
-    """Robust JSON repair for common LLM formatting issues"""
-    
-    # Step 1: Remove any non-JSON content before/after the JSON object
-    first_brace = text.find('{')
-    last_brace = text.rfind('}')
-    if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
-        text = text[first_brace:last_brace + 1]
-    
-    # Step 2: Remove control characters (except newlines and tabs for now)
-    text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]', '', text)
-    
-    # Step 3: Handle trailing commas - multiple passes
-    for _ in range(10):
-        text = re.sub(r',(\s*[\]\}])', r'\1', text)
-    
-    # Step 4: Handle missing commas between elements
-    text = re.sub(r'"\s*\n\s*"', '",\n"', text)
-    text = re.sub(r'(\}|\])\s*\n\s*(\{|\[|")', r'\1,\n\2', text)
-    text = re.sub(r'(\d+)\s*\n\s*"', r'\1,\n"', text)
-    text = re.sub(r'(true|false|null)\s*\n\s*"', r'\1,\n"', text)
-    
-    # Step 5: Handle truncated JSON
-    open_braces = text.count('{') - text.count('}')
-    open_brackets = text.count('[') - text.count(']')
-    
-    if open_braces > 0:
-        text = text.rstrip().rstrip(',') + '}' * open_braces
-    if open_brackets > 0:
-        text = text.rstrip().rstrip(',') + ']' * open_brackets
-    
-    # Step 6: Remove double commas
-    text = re.sub(r',\s*,', ',', text)
-    
-    return text
-
-def fix_unescaped_quotes_in_strings(text):
-    """Try to fix unescaped quotes within JSON string values"""
-    result = []
-    in_string = False
-    escape_next = False
-    
-    for i, char in enumerate(text):
-        if escape_next:
-            result.append(char)
-            escape_next = False
-            continue
-            
-        if char == '\\':
-            result.append(char)
-            escape_next = True
-            continue
-            
-        if char == '"':
-            if not in_string:
-                in_string = True
-                result.append(char)
-            else:
-                # Check if this quote ends the string or is embedded
-                # Look ahead to see if next non-whitespace is : , } ]
-                rest = text[i+1:].lstrip()
-                if rest and rest[0] in ':,}]':
-                    # This is a closing quote
-                    in_string = False
-                    result.append(char)
-                else:
-                    # This might be an embedded quote - escape it
-                    result.append('\\"')
-        else:
-            result.append(char)
-    
-    return ''.join(result)
 
-def try_parse_json_with_recovery(text):
-    """Try multiple strategies to parse JSON"""
-    strategies = []
-    
-    # Strategy 1: Direct parse
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError as e:
-        strategies.append(("direct", str(e)))
-    
-    # Strategy 2: Basic repair
-    try:
-        repaired = repair_json_response(text)
-        return json.loads(repaired)
-    except json.JSONDecodeError as e:
-        strategies.append(("basic_repair", str(e)))
-    
-    # Strategy 3: Fix unescaped quotes then repair
-    try:
-        fixed_quotes = fix_unescaped_quotes_in_strings(text)
-        repaired = repair_json_response(fixed_quotes)
-        return json.loads(repaired)
-    except json.JSONDecodeError as e:
-        strategies.append(("fix_quotes", str(e)))
-    
-    # Strategy 4: Remove all newlines within strings (collapse to single line)
-    try:
-        # Replace newlines that are inside strings with spaces
-        collapsed = re.sub(r'\n\s*', ' ', text)
-        collapsed = repair_json_response(collapsed)
-        return json.loads(collapsed)
-    except json.JSONDecodeError as e:
-        strategies.append(("collapse_newlines", str(e)))
-    
-    # Strategy 5: Binary search to find valid JSON prefix
-    try:
-        first_brace = text.find('{')
-        if first_brace != -1:
-            # Try progressively shorter substrings
-            for end_pos in range(len(text), first_brace + 100, -100):
-                try:
-                    substring = text[first_brace:end_pos]
-                    # Close any open structures
-                    open_braces = substring.count('{') - substring.count('}')
-                    open_brackets = substring.count('[') - substring.count(']')
-                    substring = substring.rstrip().rstrip(',')
-                    substring += ']' * max(0, open_brackets) + '}' * max(0, open_braces)
-                    result = json.loads(substring)
-                    if result:  # If we got something valid, return it
-                        return result
-                except:
-                    continue
-    except Exception as e:
-        strategies.append(("binary_search", str(e)))
-    
-    # Strategy 6: Try using ast.literal_eval as last resort for simpler structures
-    try:
-        import ast
-        # Replace JSON booleans/null with Python equivalents
-        py_text = text.replace('true', 'True').replace('false', 'False').replace('null', 'None')
-        result = ast.literal_eval(py_text)
-        # Convert back to JSON-compatible format
-        return json.loads(json.dumps(result))
-    except Exception as e:
-        strategies.append(("ast_eval", str(e)))
-    
-    # All strategies failed
-    error_msg = "; ".join([f"{s[0]}: {s[1][:50]}" for s in strategies])  # Truncate error messages
-    raise json.JSONDecodeError(f"All JSON recovery strategies failed: {error_msg}", text, 0)
+OLLAMA_MODEL = 'gpt-oss:120b'
 
-def generate_report(structure: dict, context: dict, feedback: Dict[str, Any] = None) -> dict:
-    """Generate structured report using Ollama with source tags"""
-    # Create a copy of the structure and add source information
-    modified_structure = {
+def _chat_content(messages: list, use_cache: bool = True) -> str:
+    """Send a chat request to Ollama and return the message content.
+
+    Repeated requests with identical messages are served from the LLM response cache.
+    """
+    cache = get_llm_cache() if use_cache else None
+    cache_key = make_cache_key(OLLAMA_MODEL, messages) if cache else None
+    if cache:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    client = Client(host=os.getenv('OLLAMA_API_URL'))
+    with get_rate_limiter(OLLAMA_MODEL).limit_sync(estimate_tokens(messages)):
+        response = client.chat(model=OLLAMA_MODEL, messages=messages)
+    if not (response and hasattr(response, 'message') and response.message.get('content')):
+        return None
+
+    content = response.message['content']
+    if cache and is_cacheable_response(content):
+        cache.set(cache_key, content)
+    return content
+
+def try_parse_json_with_recovery(text):
+    """Parse JSON from an LLM response, repairing common formatting issues in a single pass"""
+    result = repair_json(text)
+    if result.repairs:
+        print(f"Repaired LLM JSON output: {', '.join(result.repairs)}")
+    return result.value
+
+def _ollama_structure(structure: dict) -> dict:
+    """Create a copy of the structure with Ollama source placeholders"""
+    return {
         'pages': [{
             'page_number': page['page_number'],
             'tags': [{
@@ -173,17 +58,36 @@ def generate_report(structure: dict, context: dict, feedback: Dict[str, Any] = N
         } for page in structure['pages']]
     }
 
-    prompt = generate_report_prompt(modified_structure, context)
+def _parse_response(response_text: str) -> dict:
+    """Strip markdown fences from an Ollama response and parse it as JSON"""
+    if not response_text:
+        raise ValueError("No valid response received from Ollama")
 
-    # Create an Ollama client
-    client = Client(host=os.getenv('OLLAMA_API_URL'))
+    response_text = response_text.strip()
+
+    # Handle potential markdown code block
+    if response_text.startswith('```json'):
+        response_text = response_text[7:]  # Skip ```json
+    if response_text.startswith('```'):
+        response_text = response_text[3:]  # Skip ```
+    if response_text.endswith('```'):
+        response_text = response_text[:-3]  # Remove closing ```
+    response_text = response_text.strip()
+
+    try:
+        return try_parse_json_with_recovery(response_text)
+    except json.JSONDecodeError as e:
+        print(f"All JSON recovery attempts failed: {e}")
+        print("Response text (first 500 chars):", response_text[:500])
+        raise ValueError(f"Could not parse Ollama response as JSON: {str(e)}")
 
+def _report_messages(structure: dict, context: dict) -> list:
+    """Build the chat messages for the full marketing report"""
     # Break down the prompt into structured messages for better Ollama understanding
-    schema_str = json.dumps(modified_structure, indent=2)
+    schema_str = json.dumps(_ollama_structure(structure), indent=2)
     context_str = json.dumps(context, indent=2)
-    
-        # Generate response using Ollama with structured messages
-    response = client.chat(model='gpt-oss:120b', messages=[
+
+    return [
         {
             'role': 'system',
             'content': """You are an expert marketing data analyst for Marine Corps Community Services (MCCS).
@@ -225,59 +129,15 @@ The report must follow this exact JSON structure:
 6. Format percentages with %% (double %)
 7. Return ONLY the JSON object, no other text"""
         }
-    ])
-    
-    # Parse the response
-    if response and hasattr(response, 'message') and response.message.get('content'):
-        response_text = response.message['content'].strip()
-
-        # Handle potential markdown code block
-        if response_text.startswith('```json'):
-            response_text = response_text[7:]  # Skip ```json
-        if response_text.startswith('```'):
-            response_text = response_text[3:]  # Skip ```
-        if response_text.endswith('```'):
-            response_text = response_text[:-3]  # Remove closing ```
-        response_text = response_text.strip()
-
-        try:
-            return try_parse_json_with_recovery(response_text)
-        except json.JSONDecodeError as e:
-            print(f"All JSON recovery attempts failed: {e}")
-            print("Response text (first 500 chars):", response_text[:500])
-            raise ValueError(f"Could not parse Ollama response as JSON: {str(e)}")
-
-    else:
-        raise ValueError("No valid response received from Ollama")
-
-def generate_retail_data_report(structure: dict, context: dict, feedback: Dict[str, Any] = None) -> dict:
-    """Generate retail data report using Ollama with source tags"""
-    # Create a copy of the structure and add source information
-    modified_structure = {
-        'pages': [{
-            'page_number': page['page_number'],
-            'tags': [{
-                'id': tag['id'],
-                'title': tag.get('title', str(tag['id'])),
-                'content': [{
-                    'source': 'Ollama',
-                    'data': []
-                }]
-            } for tag in page['tags']]
-        } for page in structure['pages']]
-    }
-
-    prompt = generate_retail_data_report_prompt(modified_structure, context)
-
-    # Create an Ollama client
-    client = Client(host=os.getenv('OLLAMA_API_URL'))
+    ]
 
+def _retail_data_report_messages(structure: dict, context: dict) -> list:
+    """Build the chat messages for the retail data report"""
     # Break down the prompt into structured messages for better Ollama understanding
-    schema_str = json.dumps(modified_structure, indent=2)
+    schema_str = json.dumps(_ollama_structure(structure), indent=2)
     context_str = json.dumps(context, indent=2)
 
-    # Generate response using Ollama with structured messages
-    response = client.chat(model='gpt-oss:120b', messages=[
+    return [
         {
             'role': 'system',
             'content': """You are an expert retail data analyst for Marine Corps Community Services (MCCS).
@@ -326,59 +186,15 @@ CRITICAL JSON FORMATTING REQUIREMENTS:
 - Do not include any text before or after the JSON object
 - Ensure all brackets and braces are properly matched"""
         }
-    ])
-
-    # Parse the response
-    if response and hasattr(response, 'message') and response.message.get('content'):
-        response_text = response.message['content'].strip()
-
-        # Handle potential markdown code block
-        if response_text.startswith('```json'):
-            response_text = response_text[7:]  # Skip ```json
-        if response_text.startswith('```'):
-            response_text = response_text[3:]  # Skip ```
-        if response_text.endswith('```'):
-            response_text = response_text[:-3]  # Remove closing ```
-        response_text = response_text.strip()
-
-        try:
-            return try_parse_json_with_recovery(response_text)
-        except json.JSONDecodeError as e:
-            print(f"All JSON recovery attempts failed: {e}")
-            print("Response text (first 500 chars):", response_text[:500])
-            raise ValueError(f"Could not parse Ollama response as JSON: {str(e)}")
-
-    else:
-        raise ValueError("No valid response received from Ollama")
-
-def generate_email_performance_report(structure: dict, context: dict, feedback: Dict[str, Any] = None) -> dict:
-    """Generate email performance report using Ollama with source tags"""
-    # Create a copy of the structure and add source information
-    modified_structure = {
-        'pages': [{
-            'page_number': page['page_number'],
-            'tags': [{
-                'id': tag['id'],
-                'title': tag.get('title', str(tag['id'])),
-                'content': [{
-                    'source': 'Ollama',
-                    'data': []
-                }]
-            } for tag in page['tags']]
-        } for page in structure['pages']]
-    }
-
-    prompt = generate_email_performance_report_prompt(modified_structure, context)
-
-    # Create an Ollama client
-    client = Client(host=os.getenv('OLLAMA_API_URL'))
+    ]
 
+def _email_performance_report_messages(structure: dict, context: dict) -> list:
+    """Build the chat messages for the email performance report"""
     # Break down the prompt into structured messages for better Ollama understanding
-    schema_str = json.dumps(modified_structure, indent=2)
+    schema_str = json.dumps(_ollama_structure(structure), indent=2)
     context_str = json.dumps(context, indent=2)
 
-    # Generate response using Ollama with structured messages
-    response = client.chat(model='gpt-oss:120b', messages=[
+    return [
         {
             'role': 'system',
             'content': """You are an expert email marketing analyst for Marine Corps Community Services (MCCS).
@@ -427,59 +243,15 @@ CRITICAL JSON FORMATTING REQUIREMENTS:
 - Do not include any text before or after the JSON object
 - Ensure all brackets and braces are properly matched"""
         }
-    ])
-
-    # Parse the response
-    if response and hasattr(response, 'message') and response.message.get('content'):
-        response_text = response.message['content'].strip()
-
-        # Handle potential markdown code block
-        if response_text.startswith('```json'):
-            response_text = response_text[7:]  # Skip ```json
-        if response_text.startswith('```'):
-            response_text = response_text[3:]  # Skip ```
-        if response_text.endswith('```'):
-            response_text = response_text[:-3]  # Remove closing ```
-        response_text = response_text.strip()
-
-        try:
-            return try_parse_json_with_recovery(response_text)
-        except json.JSONDecodeError as e:
-            print(f"All JSON recovery attempts failed: {e}")
-            print("Response text (first 500 chars):", response_text[:500])
-            raise ValueError(f"Could not parse Ollama response as JSON: {str(e)}")
-
-    else:
-        raise ValueError("No valid response received from Ollama")
-
-def generate_social_media_data_report(structure: dict, context: dict, feedback: Dict[str, Any] = None) -> dict:
-    """Generate social media data report using Ollama with source tags"""
-    # Create a copy of the structure and add source information
-    modified_structure = {
-        'pages': [{
-            'page_number': page['page_number'],
-            'tags': [{
-                'id': tag['id'],
-                'title': tag.get('title', str(tag['id'])),
-                'content': [{
-                    'source': 'Ollama',
-                    'data': []
-                }]
-            } for tag in page['tags']]
-        } for page in structure['pages']]
-    }
-
-    prompt = generate_social_media_data_report_prompt(modified_structure, context)
-
-    # Create an Ollama client
-    client = Client(host=os.getenv('OLLAMA_API_URL'))
+    ]
 
+def _social_media_data_report_messages(structure: dict, context: dict) -> list:
+    """Build the chat messages for the social media data report"""
     # Break down the prompt into structured messages for better Ollama understanding
-    schema_str = json.dumps(modified_structure, indent=2)
+    schema_str = json.dumps(_ollama_structure(structure), indent=2)
     context_str = json.dumps(context, indent=2)
 
-    # Generate response using Ollama with structured messages
-    response = client.chat(model='gpt-oss:120b', messages=[
+    return [
         {
             'role': 'system',
             'content': """You are an expert social media analyst for Marine Corps Community Services (MCCS).
@@ -528,27 +300,64 @@ CRITICAL JSON FORMATTING REQUIREMENTS:
 - Do not include any text before or after the JSON object
 - Ensure all brackets and braces are properly matched"""
         }
-    ])
-
-    # Parse the response
-    if response and hasattr(response, 'message') and response.message.get('content'):
-        response_text = response.message['content'].strip()
-
-        # Handle potential markdown code block
-        if response_text.startswith('```json'):
-            response_text = response_text[7:]  # Skip ```json
-        if response_text.startswith('```'):
-            response_text = response_text[3:]  # Skip ```
-        if response_text.endswith('```'):
-            response_text = response_text[:-3]  # Remove closing ```
-        response_text = response_text.strip()
-
-        try:
-            return try_parse_json_with_recovery(response_text)
-        except json.JSONDecodeError as e:
-            print(f"All JSON recovery attempts failed: {e}")
-            print("Response text (first 500 chars):", response_text[:500])
-            raise ValueError(f"Could not parse Ollama response as JSON: {str(e)}")
-
-    else:
-        raise ValueError("No valid response received from Ollama")
+    ]
+
+def generate_report(structure: dict, context: dict, feedback: Dict[str, Any] = None) -> dict:
+    """Generate structured report using Ollama with source tags"""
+    response_text = _chat_content(_report_messages(structure, context), use_cache=not feedback)
+    return _parse_response(response_text)
+
+def generate_retail_data_report(structure: dict, context: dict, feedback: Dict[str, Any] = None) -> dict:
+    """Generate retail data report using Ollama with source tags"""
+    response_text = _chat_content(_retail_data_report_messages(structure, context), use_cache=not feedback)
+    return _parse_response(response_text)
+
+def generate_email_performance_report(structure: dict, context: dict, feedback: Dict[str, Any] = None) -> dict:
+    """Generate email performance report using Ollama with source tags"""
+    response_text = _chat_content(_email_performance_report_messages(structure, context), use_cache=not feedback)
+    return _parse_response(response_text)
+
+def generate_social_media_data_report(structure: dict, context: dict, feedback: Dict[str, Any] = None) -> dict:
+    """Generate social media data report using Ollama with source tags"""
+    response_text = _chat_content(_social_media_data_report_messages(structure, context), use_cache=not feedback)
+    return _parse_response(response_text)
+
+async def generate_report_async(structure: dict, context: dict, feedback: Dict[str, Any] = None) -> dict:
+    """Async counterpart of generate_report using the shared Ollama AsyncClient"""
+    response_text = await ollama_chat_async(OLLAMA_MODEL, _report_messages(structure, context), use_cache=not feedback)
+    return _parse_response(response_text)
+
+async def generate_retail_data_report_async(structure: dict, context: dict, feedback: Dict[str, Any] = None) -> dict:
+    """Async counterpart of generate_retail_data_report using the shared Ollama AsyncClient"""
+    response_text = await ollama_chat_async(OLLAMA_MODEL, _retail_data_report_messages(structure, context), use_cache=not feedback)
+    return _parse_response(response_text)
+
+async def generate_email_performance_report_async(structure: dict, context: dict, feedback: Dict[str, Any] = None) -> dict:
+    """Async counterpart of generate_email_performance_report using the shared Ollama AsyncClient"""
+    response_text = await ollama_chat_async(OLLAMA_MODEL, _email_performance_report_messages(structure, context), use_cache=not feedback)
+    return _parse_response(response_text)
+
+async def generate_social_media_data_report_async(structure: dict, context: dict, feedback: Dict[str, Any] = None) -> dict:
+    """Async counterpart of generate_social_media_data_report using the shared Ollama AsyncClient"""
+    response_text = await ollama_chat_async(OLLAMA_MODEL, _social_media_data_report_messages(structure, context), use_cache=not feedback)
+    return _parse_response(response_text)
+
+_MESSAGE_BUILDERS = {
+    "retail-data": _retail_data_report_messages,
+    "email-performance-data": _email_performance_report_messages,
+    "social-media-data": _social_media_data_report_messages,
+}
+
+async def stream_report_async(structure: dict, context: dict, report_type: str, on_chunk: Callable[[str], None]) -> dict:
+    """Stream the report for report_type through on_chunk as it is generated and return the parsed report"""
+    messages = _MESSAGE_BUILDERS.get(report_type, _report_messages)(structure, context)
+    chunks = []
+    async for chunk in ollama_chat_stream_async(OLLAMA_MODEL, messages):
+        chunks.append(chunk)
+        on_chunk(chunk)
+    return _parse_response("".join(chunks))
+
+async def regenerate_tags_async(prompt: str) -> dict:
+    """Send a partial regeneration prompt to Ollama and return the parsed {"tags": [...]} response"""
+    response_text = await ollama_chat_async(OLLAMA_MODEL, [{'role': 'user', 'content': prompt}], use_cache=False)
+    return _parse_response(response_text)
@@ -1,16 +1,20 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, AsyncIterator, List
 from src.services import llm_generator, ollama_llm_generator
 from src.services.llm_validator import (
-    validate_report,
-    validate_retail_data_report,
-    validate_email_performance_report,
-    validate_social_media_data_report
+    validate_report_async,
+    validate_retail_data_report_async,
+    validate_email_performance_report_async,
+    validate_social_media_data_report_async
 )
 from src.services.report_types import normalize_report_type
+from src.services.report_streaming import TagStreamParser
+from src.services.report_sharding import generate_sharded, sharded
+from src.services.rule_validator import validate_report_rules
+from src.services.fact_index import build_fact_index
 from src.models.validation_schema import ValidationResult
 from src.config.settings import settings
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import time
 
 import logging
 import sys
@@ -125,13 +129,108 @@ def calculate_confidence_score(is_valid: bool, regeneration_attempts: int, previ
 
     return round(confidence_score, 3)
 
+def _report_functions(report_type: str) -> tuple:
+    """Return the (Gemini generator, Ollama generator, validator) used for a report type."""
+    if report_type == "retail-data":
+        return (llm_generator.generate_retail_data_report_async,
+                ollama_llm_generator.generate_retail_data_report_async,
+                validate_retail_data_report_async)
+    if report_type == "email-performance-data":
+        return (llm_generator.generate_email_performance_report_async,
+                ollama_llm_generator.generate_email_performance_report_async,
+                validate_email_performance_report_async)
+    if report_type == "social-media-data":
+        return (llm_generator.generate_social_media_data_report_async,
+                ollama_llm_generator.generate_social_media_data_report_async,
+                validate_social_media_data_report_async)
+    # all-categories or unknown
+    return (llm_generator.generate_report_async,
+            ollama_llm_generator.generate_report_async,
+            validate_report_async)
+
+def _partial_regenerator(source_name: str):
+    """Return the function that regenerates individual tags for a source."""
+    if source_name == "Gemini":
+        return llm_generator.regenerate_tags_async
+    return ollama_llm_generator.regenerate_tags_async
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+class EventLoopLagMonitor:
+    """
+    Samples event loop responsiveness while a request is in flight.
+    A low max lag means other requests (e.g. health checks) kept being served.
+    """
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self.max_lag_ms = 0.0
+        self._task = None
+        self._expected = None
+
+    async def _sample(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.max_lag_ms = max(self.max_lag_ms, (loop.time() - self._expected) * 1000)
+
+    def start(self):
+        self._task = asyncio.create_task(self._sample())
+
+    async def stop(self):
+        if self._task:
+            # Count a stall in the sample still in flight, e.g. a blocking call just before stop
+            if self._expected is not None:
+                lag_ms = (asyncio.get_running_loop().time() - self._expected) * 1000
+                self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
 class ParallelReportGenerator:
     def __init__(self):
         self.max_retries = settings.MAX_RETRIES
         self.parallel_generation = settings.PARALLEL_GENERATION
         self.require_dual_validation = settings.REQUIRE_DUAL_VALIDATION
         self.min_consistency_score = settings.MIN_CONSISTENCY_SCORE
+        self.sharded_generation = settings.SHARDED_GENERATION
+        self.partial_regeneration = settings.PARTIAL_REGENERATION
+        self.rule_prevalidation = settings.RULE_PREVALIDATION
+        # Numeric fact index over the request context, built once and reused by every validation
+        self._fact_index = None
+        self._fact_index_context = None
+        # Per-request latency breakdown, populated by generate_reports
+        self.timings = {}
         
+    async def _validate(self, validate_func, structure: dict, report: dict, context: dict) -> ValidationResult:
+        """
+        Run the local rule checks first and only call the LLM validator when they pass.
+        Rule failures are structural (missing or empty tags, header-only content,
+        placeholders) and need regeneration anyway, so the LLM round-trip is skipped.
+        Heuristic findings (numbers not found in the context) are passed to the LLM
+        validator as hints instead of failing the report.
+        """
+        if not self.rule_prevalidation:
+            return await validate_func(structure, report)
+
+        if context and (self._fact_index is None or self._fact_index_context is not context):
+            self._fact_index = build_fact_index(context)
+            self._fact_index_context = context
+        rule_validation = validate_report_rules(structure, report, fact_index=self._fact_index if context else None)
+        if not rule_validation.is_valid:
+            logger.info(f"Rule-based validation failed for {rule_validation.detailed_results.regenerate_fields}; skipping LLM validation.")
+            return rule_validation
+        if not rule_validation.warnings:
+            return await validate_func(structure, report)
+
+        logger.info(f"Passing {len(rule_validation.warnings)} rule-based warning(s) to the LLM validator.")
+        validation = await validate_func(structure, report, hints=rule_validation.warnings)
+        validation.warnings = validation.warnings or rule_validation.warnings
+        return validation
+
     async def regenerate_invalid_report(self, structure: dict, context: dict, source: str, previous_validation: dict) -> dict:
         """Regenerate a report that failed validation"""
         logger.info(f"Regenerating {source} report after validation failure")
@@ -145,12 +244,12 @@ class ParallelReportGenerator:
         
         try:
             if source == "Gemini":
-                report = llm_generator.generate_report(structure, context, feedback)
+                report = await llm_generator.generate_report_async(structure, context, feedback)
             else:
-                report = ollama_llm_generator.generate_report(structure, context, feedback)
+                report = await ollama_llm_generator.generate_report_async(structure, context, feedback)
                 
             # Validate regenerated report
-            validation = validate_report(structure, report)
+            validation = await self._validate(validate_report_async, structure, report, context)
             
             # Calculate confidence score for regenerated report
             confidence_score = calculate_confidence_score(validation.is_valid, 1, [], "all_categories")
@@ -170,151 +269,143 @@ class ParallelReportGenerator:
             logger.error(f"Error regenerating {source} report: {str(e)}")
             return None
 
+    async def _generate_and_validate(self, source_name: str, generator_func, validate_func, structure: dict, context: dict, report_type: str) -> dict:
+        """
+        Generate a report for one source, validate it and regenerate flagged fields.
+        Returns None if generation fails so the other source can still succeed.
+        """
+        from src.services.report_regenerator import ReportRegenerator
+        timings = {"generation_ms": 0.0, "validation_ms": 0.0, "regeneration_ms": 0.0}
+        source_start = time.perf_counter()
+        try:
+            logger.info(f"[{source_name}] Report generation started.")
+            stage_start = time.perf_counter()
+            report = await generator_func(structure, context, None)
+            timings["generation_ms"] = _elapsed_ms(stage_start)
+            logger.info(f"[{source_name}] Report generation completed. Starting validation.")
+            stage_start = time.perf_counter()
+            validation = await self._validate(validate_func, structure, report, context)
+            timings["validation_ms"] = _elapsed_ms(stage_start)
+            logger.info(f"[{source_name}] Validation completed. Result: {'VALID' if validation.is_valid else 'INVALID'}.")
+
+            # Print detailed validator response to terminal
+            print(f"\n=== VALIDATOR RESPONSE FOR {source_name} ===")
+            print(f"Valid: {validation.is_valid}")
+            print(f"Message: {validation.message}")
+            if validation.detailed_results:
+                print(f"Detailed Results: {validation.detailed_results.dict()}")
+            print("=" * 50)
+            attempt = 0
+            max_attempts = 1  # Ensure up to 3 regeneration attempts
+            previous_attempts = []
+            while not validation.is_valid and attempt < max_attempts:
+                attempt += 1
+                logger.info(f"[{source_name}] Validation failed. Attempting targeted regeneration (Attempt {attempt}/{max_attempts})...")
+                details = validation.detailed_results
+                if details and details.regeneration_required and details.regenerate_fields:
+                    regenerator = ReportRegenerator(structure, context, report)
+                    # Patch only the flagged tags when every flagged field is a tag
+                    partial_fields = regenerator.partial_fields(details) if self.partial_regeneration else []
+
+                    stage_start = time.perf_counter()
+                    if partial_fields:
+                        regen_prompt = regenerator.create_partial_regeneration_prompt(details, source_name, previous_attempts)
+                        logger.info(f"[{source_name}] Regenerating fields: {partial_fields} (partial)")
+                        regenerated_tags = await _partial_regenerator(source_name)(regen_prompt)
+                        regenerated_report, patched = regenerator.apply_partial_regeneration(regenerated_tags, partial_fields)
+                        logger.info(f"[{source_name}] Patched tags: {patched}")
+                    else:
+                        regen_prompt = regenerator.create_regeneration_prompt(details, previous_attempts)
+                        logger.info(f"[{source_name}] Regenerating fields: {details.regenerate_fields}")
+                        regenerated_report = await generator_func(structure, context, {"regeneration_prompt": regen_prompt})
+                    timings["regeneration_ms"] += _elapsed_ms(stage_start)
+
+                    logger.info(f"[{source_name}] Regeneration completed. Re-validating...")
+                    stage_start = time.perf_counter()
+                    if partial_fields:
+                        # The rest of the report is unchanged, so only the patched tags are re-validated
+                        validation = await self._validate(validate_func, regenerator.partial_structure(partial_fields),
+                                                          regenerator.partial_report(regenerated_report, partial_fields), context)
+                    else:
+                        validation = await self._validate(validate_func, structure, regenerated_report, context)
+                    timings["validation_ms"] += _elapsed_ms(stage_start)
+                    logger.info(f"[{source_name}] Re-validation result: {'VALID' if validation.is_valid else 'INVALID'}.")
+                    previous_attempts.append({
+                        "attempt": attempt,
+                        "fields_regenerated": details.regenerate_fields,
+                        "issues": {
+                            "structure": details.validation_results.structure.dict() if details.validation_results else None,
+                            "data_quality": details.validation_results.data_quality.dict() if details.validation_results else None,
+                            "content": details.validation_results.content.dict() if details.validation_results else None
+                        }
+                    })
+                    report = regenerated_report
+                else:
+                    logger.info(f"[{source_name}] No fields to regenerate or missing details. Stopping regeneration attempts.")
+                    break
+
+            # Calculate confidence score based on validation results and attempts
+            confidence_score = calculate_confidence_score(validation.is_valid, attempt, previous_attempts, report_type)
+            timings["total_ms"] = _elapsed_ms(source_start)
+            result = {
+                "source": source_name,
+                "report": report,
+                "validation": {
+                    "is_valid": validation.is_valid,
+                    "message": validation.message,
+                    "details": validation.detailed_results.dict() if validation.detailed_results else None
+                },
+                "regeneration_attempt": attempt,
+                "confidence_score": confidence_score,
+                "timings": timings
+            }
+            logger.info(f"[{source_name}] Final result: {'VALID' if validation.is_valid else 'INVALID'} after {attempt} regeneration attempts.")
+            return result
+        except Exception as e:
+            logger.error(f"[{source_name}] Error generating or validating report: {str(e)}")
+            return None
+
     async def generate_reports(self, structure: dict, context: dict) -> List[dict]:
         """
         Generate reports in parallel using multiple LLMs and validate/regenerate each as soon as it is ready.
         If validation fails, provide targeted feedback and regenerate only problematic fields, up to 3 attempts per report.
         """
         from src.services.report_regenerator import ReportRegenerator
+        request_start = time.perf_counter()
+        lag_monitor = EventLoopLagMonitor()
+        lag_monitor.start()
         try:
             if self.parallel_generation:
-                    with ThreadPoolExecutor() as executor:
-                        loop = asyncio.get_event_loop()
-                        # Prepare futures and log start immediately
-                        futures = []
-                        future_to_source = {}
-
-                        # Determine which generator and validator functions to use based on report type
-                        # Auto-detect report type from available data to prevent content mismatch
-                        report_type = detect_report_type_from_data(context)
-                        logger.info(f"Detected report type: {report_type}")
-
-                        if report_type == "retail-data":
-                            gemini_func = llm_generator.generate_retail_data_report
-                            ollama_func = ollama_llm_generator.generate_retail_data_report
-                            validate_func = validate_retail_data_report
-                        elif report_type == "email-performance-data":
-                            gemini_func = llm_generator.generate_email_performance_report
-                            ollama_func = ollama_llm_generator.generate_email_performance_report
-                            validate_func = validate_email_performance_report
-                        elif report_type == "social-media-data":
-                            gemini_func = llm_generator.generate_social_media_data_report
-                            ollama_func = ollama_llm_generator.generate_social_media_data_report
-                            validate_func = validate_social_media_data_report
-                        else:  # all-categories or unknown
-                            gemini_func = llm_generator.generate_report
-                            ollama_func = ollama_llm_generator.generate_report
-                            validate_func = validate_report
-
-                        for source_name, generator_func in [
-                            ("Gemini", gemini_func),
-                            ("Ollama", ollama_func)
-                        ]:
-                            logger.info(f"[{source_name}] Report generation started.")
-                            fut = loop.run_in_executor(
-                                executor,
-                                generator_func,
-                                structure,
-                                context,
-                                None
-                            )
-                            futures.append(fut)
-                            future_to_source[fut] = source_name
-
-                    logger.info("Starting parallel report generation for: %s", ', '.join(future_to_source.values()))
-                    results = []
-                    async for completed_future in asyncio.as_completed(futures):
-                        source_name = future_to_source[completed_future]
-                        try:
-                            report = await completed_future
-                            logger.info(f"[{source_name}] Report generation completed. Starting validation.")
-                            validation = validate_func(structure, report)
-                            logger.info(f"[{source_name}] Validation completed. Result: {'VALID' if validation.is_valid else 'INVALID'}.")
-
-                            # Print detailed validator response to terminal
-                            print(f"\n=== VALIDATOR RESPONSE FOR {source_name} ===")
-                            print(f"Valid: {validation.is_valid}")
-                            print(f"Message: {validation.message}")
-                            if validation.detailed_results:
-                                print(f"Detailed Results: {validation.detailed_results.dict()}")
-                            print("=" * 50)
-                            attempt = 0
-                            max_attempts = 1  # Ensure up to 3 regeneration attempts
-                            previous_attempts = []
-                            while not validation.is_valid and attempt < max_attempts:
-                                attempt += 1
-                                logger.info(f"[{source_name}] Validation failed. Attempting targeted regeneration (Attempt {attempt}/{max_attempts})...")
-                                details = validation.detailed_results
-                                if details and details.regeneration_required and details.regenerate_fields:
-                                    regenerator = ReportRegenerator(structure, context, report)
-                                    regen_prompt = regenerator.create_regeneration_prompt(details, previous_attempts)
-                                    logger.info(f"[{source_name}] Regenerating fields: {details.regenerate_fields}")
-
-                                    # Use appropriate generator function for regeneration
-                                    if report_type == "retail-data":
-                                        regen_gemini_func = llm_generator.generate_retail_data_report
-                                        regen_ollama_func = ollama_llm_generator.generate_retail_data_report
-                                    elif report_type == "email-performance-data":
-                                        regen_gemini_func = llm_generator.generate_email_performance_report
-                                        regen_ollama_func = ollama_llm_generator.generate_email_performance_report
-                                    elif report_type == "social-media-data":
-                                        regen_gemini_func = llm_generator.generate_social_media_data_report
-                                        regen_ollama_func = ollama_llm_generator.generate_social_media_data_report
-                                    else:
-                                        regen_gemini_func = llm_generator.generate_report
-                                        regen_ollama_func = ollama_llm_generator.generate_report
-
-                                    if source_name == "Gemini":
-                                        regenerated_report = regen_gemini_func(structure, context, {"regeneration_prompt": regen_prompt})
-                                    else:
-                                        regenerated_report = regen_ollama_func(structure, context, {"regeneration_prompt": regen_prompt})
-
-                                    logger.info(f"[{source_name}] Regeneration completed. Re-validating...")
-                                    validation = validate_func(structure, regenerated_report)
-                                    logger.info(f"[{source_name}] Re-validation result: {'VALID' if validation.is_valid else 'INVALID'}.")
-                                    previous_attempts.append({
-                                        "attempt": attempt,
-                                        "fields_regenerated": details.regenerate_fields,
-                                        "issues": {
-                                            "structure": details.validation_results.structure.dict() if details.validation_results else None,
-                                            "data_quality": details.validation_results.data_quality.dict() if details.validation_results else None,
-                                            "content": details.validation_results.content.dict() if details.validation_results else None
-                                        }
-                                    })
-                                    report = regenerated_report
-                                else:
-                                    logger.info(f"[{source_name}] No fields to regenerate or missing details. Stopping regeneration attempts.")
-                                    break
-
-                            # Calculate confidence score based on validation results and attempts
-                            confidence_score = calculate_confidence_score(validation.is_valid, attempt, previous_attempts, report_type)
-                            result = {
-                                "source": source_name,
-                                "report": report,
-                                "validation": {
-                                    "is_valid": validation.is_valid,
-                                    "message": validation.message,
-                                    "details": validation.detailed_results.dict() if validation.detailed_results else None
-                                },
-                                "regeneration_attempt": attempt,
-                                "confidence_score": confidence_score
-                            }
-                            logger.info(f"[{source_name}] Final result: {'VALID' if validation.is_valid else 'INVALID'} after {attempt} regeneration attempts.")
-                            results.append(result)
-                        except Exception as e:
-                            logger.error(f"[{source_name}] Error generating or validating report: {str(e)}")
-                    if not results:
-                        logger.error("All report generations failed")
-                        raise ValueError("All report generations failed")
-                    logger.info("Parallel report generation and validation complete.")
-                    return results
+                # Determine which generator and validator functions to use based on report type
+                # Auto-detect report type from available data to prevent content mismatch
+                report_type = detect_report_type_from_data(context)
+                logger.info(f"Detected report type: {report_type}")
+                gemini_func, ollama_func, validate_func = _report_functions(report_type)
+                if self.sharded_generation:
+                    gemini_func, ollama_func = sharded(gemini_func), sharded(ollama_func)
+
+                sources = [("Gemini", gemini_func), ("Ollama", ollama_func)]
+                logger.info("Starting parallel report generation for: %s", ', '.join(name for name, _ in sources))
+
+                # Each source is generated, validated and regenerated independently on the event loop
+                outcomes = await asyncio.gather(*[
+                    self._generate_and_validate(source_name, generator_func, validate_func, structure, context, report_type)
+                    for source_name, generator_func in sources
+                ])
+                results = [result for result in outcomes if result is not None]
+                await self._record_timings(request_start, lag_monitor, results)
+                if not results:
+                    logger.error("All report generations failed")
+                    raise ValueError("All report generations failed")
+                logger.info("Parallel report generation and validation complete.")
+                return results
             else:
-                # Sequential generation (unchanged)
+                # Sequential generation
                 results = []
-                for source_name, generator_func in [("Gemini", llm_generator.generate_report), ("Ollama", ollama_llm_generator.generate_report)]:
-                    report = generator_func(structure, context)
+                for source_name, generator_func in [("Gemini", llm_generator.generate_report_async), ("Ollama", ollama_llm_generator.generate_report_async)]:
+                    report = await generator_func(structure, context)
                     if report:
-                        validation = validate_report(structure, report)
+                        validation = await self._validate(validate_report_async, structure, report, context)
                         attempt = 0
                         max_attempts = self.max_retries
                         previous_attempts = []
@@ -324,11 +415,8 @@ class ParallelReportGenerator:
                             if details and details.regeneration_required and details.regenerate_fields:
                                 regenerator = ReportRegenerator(structure, context, report)
                                 regen_prompt = regenerator.create_regeneration_prompt(details, previous_attempts)
-                                if source_name == "Gemini":
-                                    regenerated_report = llm_generator.generate_report(structure, context, {"regeneration_prompt": regen_prompt})
-                                else:
-                                    regenerated_report = ollama_llm_generator.generate_report(structure, context, {"regeneration_prompt": regen_prompt})
-                                validation = validate_report(structure, regenerated_report)
+                                regenerated_report = await generator_func(structure, context, {"regeneration_prompt": regen_prompt})
+                                validation = await self._validate(validate_report_async, structure, regenerated_report, context)
                                 previous_attempts.append({
                                     "attempt": attempt,
                                     "fields_regenerated": details.regenerate_fields,
@@ -355,7 +443,89 @@ class ParallelReportGenerator:
                             "confidence_score": confidence_score
                         }
                         results.append(result)
+                await self._record_timings(request_start, lag_monitor, results)
                 return results
         except Exception as e:
             logger.error(f"Error in parallel report generation: {str(e)}")
             raise
+        finally:
+            await lag_monitor.stop()
+
+    async def stream_reports(self, structure: dict, context: dict) -> AsyncIterator[dict]:
+        """
+        Generate and validate reports like generate_reports, yielding events as they happen:
+        - {"event": "tag", "source", "tag"}: a draft tag parsed from the streamed LLM output
+        - {"event": "source_complete", "source", "result"}: the validated (possibly regenerated) report
+        - {"event": "source_failed", "source"}: the source could not produce a report
+        """
+        request_start = time.perf_counter()
+        lag_monitor = EventLoopLagMonitor()
+        lag_monitor.start()
+
+        report_type = detect_report_type_from_data(context)
+        logger.info(f"Detected report type: {report_type}")
+        gemini_func, ollama_func, validate_func = _report_functions(report_type)
+        if self.sharded_generation:
+            gemini_func, ollama_func = sharded(gemini_func), sharded(ollama_func)
+        sources = [
+            ("Gemini", llm_generator.stream_report_async, gemini_func),
+            ("Ollama", ollama_llm_generator.stream_report_async, ollama_func)
+        ]
+        logger.info("Starting streamed report generation for: %s", ', '.join(name for name, _, _ in sources))
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def run_source(source_name, stream_func, regenerate_func):
+            async def stream_with_parser(structure, context, feedback=None):
+                # One parser per stream: concurrent shards must not interleave their text
+                parser = TagStreamParser()
+
+                def on_chunk(text):
+                    for tag in parser.feed(text):
+                        queue.put_nowait({"event": "tag", "source": source_name, "tag": tag})
+
+                return await stream_func(structure, context, report_type, on_chunk)
+
+            async def generator_func(structure, context, feedback=None):
+                # Regeneration output replaces the draft wholesale, so it is not streamed
+                if feedback:
+                    return await regenerate_func(structure, context, feedback)
+                if self.sharded_generation:
+                    return await generate_sharded(stream_with_parser, structure, context)
+                return await stream_with_parser(structure, context)
+
+            result = None
+            try:
+                result = await self._generate_and_validate(source_name, generator_func, validate_func, structure, context, report_type)
+            finally:
+                if result is None:
+                    queue.put_nowait({"event": "source_failed", "source": source_name})
+                else:
+                    queue.put_nowait({"event": "source_complete", "source": source_name, "result": result})
+
+        tasks = [asyncio.create_task(run_source(*source)) for source in sources]
+        results = []
+        try:
+            pending = len(tasks)
+            while pending:
+                event = await queue.get()
+                if event["event"] in ("source_complete", "source_failed"):
+                    pending -= 1
+                    if event["event"] == "source_complete":
+                        results.append(event["result"])
+                yield event
+            await self._record_timings(request_start, lag_monitor, results)
+        finally:
+            # The client may disconnect mid-stream; stop any generation still running
+            for task in tasks:
+                task.cancel()
+            await lag_monitor.stop()
+
+    async def _record_timings(self, request_start: float, lag_monitor: EventLoopLagMonitor, results: List[dict]):
+        """Store and log the per-request latency breakdown"""
+        await lag_monitor.stop()
+        self.timings = {
+            "total_ms": _elapsed_ms(request_start),
+            "event_loop_max_lag_ms": round(lag_monitor.max_lag_ms, 1),
+            "sources": {result["source"]: result.get("timings", {}) for result in results}
+        }
+        logger.info(f"Latency breakdown: {self.timings}")
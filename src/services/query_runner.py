@@ -0,0 +1,221 @@
+"""Executes the query.py statements for a reporting period.
+
+``QueryRunner.run(names, start_date, end_date)`` binds each named query's
+parameters for the period (``query.bind_params``), runs the queries
+concurrently on the pooled engine (one connection per query, at most
+QUERY_WORKERS at a time) and returns ``{name: DataFrame}``, or
+``{name: pyarrow.Table}`` with ``output="arrow"``. DECIMAL columns come back
+as float64 and DATE/DATETIME columns as datetime64.
+
+Results are cached per (query, params, data version). The data version comes
+from ``file_upload_logs``: the number of completed loads and the latest
+completed ``file_id``. It is read once per ``run`` call, so a finished load
+invalidates every cached aggregate on the next call, and the stale entries
+are dropped. Concurrent callers asking for the same uncached result share a
+single execution.
+"""
+import datetime
+import decimal
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+QUERY_WORKERS = int(os.getenv('QUERY_WORKERS', '4'))
+QUERY_CACHE_ENTRIES = int(os.getenv('QUERY_CACHE_ENTRIES', '256'))
+
+DATA_VERSION_SQL = "SELECT COUNT(*), MAX(file_id) FROM file_upload_logs WHERE load_status = 1"
+
+
+def _column(values: pd.Series) -> pd.Series:
+    """Give an object column from the driver a proper dtype."""
+    present = values.dropna()
+    if present.empty:
+        return values
+    if all(isinstance(v, (decimal.Decimal, int, float)) for v in present):
+        return pd.to_numeric(values.map(lambda v: None if v is None else float(v)), errors="coerce")
+    if all(isinstance(v, (datetime.date, datetime.datetime)) for v in present):
+        return pd.to_datetime(values)
+    return values
+
+
+def to_frame(columns, rows) -> pd.DataFrame:
+    """DataFrame from a cursor's column names and row tuples, with typed columns."""
+    frame = pd.DataFrame.from_records(list(rows), columns=list(columns))
+    for name in frame.columns[frame.dtypes == object]:
+        frame[name] = _column(frame[name])
+    return frame
+
+
+class QueryRunner:
+    """Runs named query.py statements concurrently, caching results per data version."""
+
+    def __init__(self, engine=None, max_workers: int = QUERY_WORKERS,
+                 cache_entries: int = QUERY_CACHE_ENTRIES, queries=None):
+        self._engine = engine
+        self._queries = queries
+        self.cache_entries = cache_entries
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="query")
+        self._cache: "OrderedDict[tuple, pd.DataFrame]" = OrderedDict()
+        self._pending: Dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+        self.data_version: Optional[Tuple] = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from src.database.db_connection import get_engine
+            self._engine = get_engine()
+        return self._engine
+
+    @property
+    def queries(self):
+        if self._queries is None:
+            import query
+            self._queries = query
+        return self._queries
+
+    def _execute(self, sql: str, params: tuple):
+        """Run one statement on a pooled connection; returns (column names, rows)."""
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(sql, params)
+                return [d[0] for d in cursor.description or ()], cursor.fetchall()
+            finally:
+                cursor.close()
+        finally:
+            connection.close()  # returns the connection to the pool
+
+    def current_data_version(self) -> Tuple:
+        """(completed loads, latest completed file_id); clears the cache when it moves."""
+        _, rows = self._execute(DATA_VERSION_SQL, ())
+        version = tuple(rows[0]) if rows else (0, None)
+        with self._lock:
+            if version != self.data_version:
+                if self.data_version is not None:
+                    logger.info(f"Data version {self.data_version} -> {version}; dropping {len(self._cache)} cached results")
+                self._cache.clear()
+                self.data_version = version
+        return version
+
+    def _fetch(self, name: str, params: tuple, version: Tuple) -> Future:
+        """A future for one query's frame: cached, already running, or newly submitted."""
+        key = (name, params, version)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                future = Future()
+                future.set_result(self._cache[key])
+                return future
+            if key in self._pending:
+                self.hits += 1
+                return self._pending[key]
+            self.misses += 1
+            future = self._executor.submit(self._load, key, getattr(self.queries, name))
+            self._pending[key] = future
+            return future
+
+    def _load(self, key: tuple, sql: str) -> pd.DataFrame:
+        name, params, version = key
+        started = time.perf_counter()
+        try:
+            frame = to_frame(*self._execute(sql, params))
+            logger.info(f"{name}: {len(frame)} rows in {time.perf_counter() - started:.2f}s")
+            with self._lock:
+                if version == self.data_version:
+                    self._cache[key] = frame
+                    while len(self._cache) > self.cache_entries:
+                        self._cache.popitem(last=False)
+            return frame
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def run(self, names: Iterable[str], start_date: str, end_date: str,
+            output: str = "pandas") -> Dict[str, Any]:
+        """Run the named queries for a period; returns {name: DataFrame or pyarrow.Table}.
+
+        Raises the first query error after every query has finished.
+        """
+        names = list(dict.fromkeys(names))
+        version = self.current_data_version()
+        futures = {
+            name: self._fetch(name, self.queries.bind_params(name, start_date, end_date), version)
+            for name in names
+        }
+        results, errors = {}, {}
+        for name, future in futures.items():
+            try:
+                results[name] = self._output(future.result(), output)
+            except Exception as e:
+                logger.error(f"{name} failed: {e}")
+                errors[name] = e
+        if errors:
+            raise next(iter(errors.values()))
+        return results
+
+    def run_one(self, name: str, params: tuple, output: str = "pandas"):
+        """Run one named query with explicit parameters (cached like ``run``)."""
+        version = self.current_data_version()
+        return self._output(self._fetch(name, tuple(params), version).result(), output)
+
+    @staticmethod
+    def _output(frame: pd.DataFrame, output: str):
+        if output == "arrow":
+            return pa.Table.from_pandas(frame, preserve_index=False)
+        if output == "pandas":
+            return frame.copy()  # cached frames stay unmodified
+        raise ValueError(f"Unknown output format: {output}")
+
+    def invalidate(self):
+        """Drop every cached result."""
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "data_version": self.data_version,
+                "cached": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_runner: Optional[QueryRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_query_runner() -> QueryRunner:
+    """Return the process-wide query runner, creating it on first use."""
+    global _runner
+    if _runner is None:
+        with _runner_lock:
+            if _runner is None:
+                _runner = QueryRunner()
+    return _runner
+
+
+def shutdown_query_runner(wait: bool = False):
+    """Stop the query threads and drop the cache."""
+    global _runner
+    with _runner_lock:
+        if _runner is not None:
+            _runner.shutdown(wait=wait)
+            _runner = None
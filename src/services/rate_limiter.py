@@ -0,0 +1,254 @@
+"""Per-model rate limiting for LLM calls.
+
+Every model gets one RateLimiter, shared by all requests in the process, that
+combines:
+- a requests-per-minute token bucket
+- a tokens-per-minute token bucket (prompt tokens are estimated up front)
+- a cap on the number of in-flight calls
+
+Callers reserve capacity before each call and wait only for as long as the
+buckets need to refill, so traffic is admitted smoothly at the quota instead
+of bursting into 429s and backing off. A 429 from the provider pauses the
+whole model, not just the request that saw it. The async path waits with
+``asyncio.sleep`` and never holds a worker thread.
+
+When ``LLM_RATE_LIMIT_STATE_DIR`` is set, bucket state lives in a small
+fcntl-locked JSON file per model, so every worker process on the host draws
+from the same quota. The in-flight cap is always per process, and shared by
+the sync and async paths.
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(prompt: Any) -> int:
+    """Rough token estimate (~4 characters per token) for a prompt or list of chat messages."""
+    if isinstance(prompt, list):
+        text = "".join(str(message.get("content", "")) for message in prompt)
+    else:
+        text = str(prompt)
+    return len(text) // 4 + 1
+
+
+class _MemoryState:
+    """Bucket state held in this process only."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state: Dict[str, float] = {}
+
+    def update(self, func: Callable[[Dict[str, float]], Any]) -> Any:
+        with self._lock:
+            return func(self._state)
+
+
+class _FileState:
+    """Bucket state stored in a JSON file guarded by an exclusive fcntl lock."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def update(self, func: Callable[[Dict[str, float]], Any]) -> Any:
+        with self._lock, open(self.path, "a+") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                handle.seek(0)
+                raw = handle.read()
+                try:
+                    state = json.loads(raw) if raw else {}
+                except json.JSONDecodeError:
+                    state = {}
+                result = func(state)
+                handle.seek(0)
+                handle.truncate()
+                handle.write(json.dumps(state))
+                handle.flush()
+                return result
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+class _InFlightSlots:
+    """A cap on concurrent calls shared by threads (limit_sync) and event loops (limit)."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+        self._lock = threading.Lock()
+        # Waiting callers in arrival order: a threading.Event, or (loop, future) for async callers
+        self._waiters = deque()
+
+    def acquire_sync(self):
+        with self._lock:
+            if self.in_use < self.limit:
+                self.in_use += 1
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        event.wait()  # release() hands its slot over
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.in_use < self.limit:
+                self.in_use += 1
+                return
+            future = loop.create_future()
+            waiter = (loop, future)
+            self._waiters.append(waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            # The slot was handed over as the wait was cancelled
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def _hand_over(self, future: asyncio.Future):
+        if future.done():  # the waiter was cancelled meanwhile
+            self.release()
+        else:
+            future.set_result(None)
+
+    def release(self):
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if isinstance(waiter, threading.Event):
+                    waiter.set()
+                    return
+                loop, future = waiter
+                try:
+                    loop.call_soon_threadsafe(self._hand_over, future)
+                    return
+                except RuntimeError:  # that event loop has been closed
+                    continue
+            self.in_use -= 1
+
+
+class RateLimiter:
+    """Token-bucket (RPM + TPM) limiter with an in-flight cap for a single model."""
+
+    def __init__(self, model: str, rpm: int, tpm: int, max_in_flight: int, state_dir: Optional[str] = None):
+        self.model = model
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_in_flight = max_in_flight
+        if state_dir and fcntl is not None:
+            file_name = re.sub(r"[^A-Za-z0-9_.-]", "_", model) + ".json"
+            self._state = _FileState(os.path.join(state_dir, file_name))
+        else:
+            if state_dir:
+                logger.warning("fcntl is unavailable; LLM rate limits will not be shared across workers")
+            self._state = _MemoryState()
+        self._slots = _InFlightSlots(max_in_flight)
+
+    def _refill(self, state: Dict[str, float], now: float):
+        updated_at = state.get("updated_at", now)
+        elapsed = max(0.0, now - updated_at)
+        state["requests"] = min(self.rpm, state.get("requests", self.rpm) + elapsed * self.rpm / 60)
+        state["tokens"] = min(self.tpm, state.get("tokens", self.tpm) + elapsed * self.tpm / 60)
+        state["updated_at"] = now
+
+    def reserve(self, tokens: int = 0) -> float:
+        """Take one request and ``tokens`` tokens from the buckets; return seconds to wait before calling."""
+        tokens = min(tokens, self.tpm)
+
+        def _reserve(state):
+            now = time.time()
+            self._refill(state, now)
+            state["requests"] -= 1
+            state["tokens"] -= tokens
+            return max(
+                0.0,
+                state.get("blocked_until", 0.0) - now,
+                -state["requests"] * 60 / self.rpm,
+                -state["tokens"] * 60 / self.tpm
+            )
+
+        return self._state.update(_reserve)
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int):
+        """Correct the TPM bucket once the provider reports the real token count."""
+        def _adjust(state):
+            self._refill(state, time.time())
+            state["tokens"] -= actual_tokens - estimated_tokens
+
+        self._state.update(_adjust)
+
+    def penalize(self, seconds: float):
+        """Hold back every caller of this model for ``seconds`` (used after a 429)."""
+        def _block(state):
+            state["blocked_until"] = max(state.get("blocked_until", 0.0), time.time() + seconds)
+
+        self._state.update(_block)
+
+    @asynccontextmanager
+    async def limit(self, tokens: int = 0):
+        """Async context manager that admits one call once a slot and quota are available."""
+        await self._slots.acquire()
+        try:
+            wait = self.reserve(tokens)
+            if wait > 0:
+                logger.info(f"[{self.model}] Rate limit: waiting {wait:.1f}s before calling")
+                await asyncio.sleep(wait)
+            yield
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def limit_sync(self, tokens: int = 0):
+        """Blocking counterpart of limit() for callers outside the event loop."""
+        self._slots.acquire_sync()
+        try:
+            wait = self.reserve(tokens)
+            if wait > 0:
+                logger.info(f"[{self.model}] Rate limit: waiting {wait:.1f}s before calling")
+                time.sleep(wait)
+            yield
+        finally:
+            self._slots.release()
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(model: str) -> RateLimiter:
+    """Return the process-wide limiter for ``model``, configured from settings."""
+    limiter = _limiters.get(model)
+    if limiter is not None:
+        return limiter
+    with _limiters_lock:
+        if model not in _limiters:
+            from src.config.settings import settings
+            limits = settings.LLM_RATE_LIMITS.get(model, {})
+            _limiters[model] = RateLimiter(
+                model,
+                rpm=limits.get("rpm", settings.LLM_DEFAULT_RPM),
+                tpm=limits.get("tpm", settings.LLM_DEFAULT_TPM),
+                max_in_flight=limits.get("max_in_flight", settings.LLM_DEFAULT_MAX_IN_FLIGHT),
+                state_dir=settings.LLM_RATE_LIMIT_STATE_DIR
+            )
+        return _limiters[model]
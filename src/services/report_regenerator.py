@@ -1,5 +1,8 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from src.models.validation_schema import DetailedValidationResult, ValidationResult
+from src.services.context_builder import REPORT_TAG_RETRIEVERS, SCHEMA_TAG_RETRIEVERS
+from src.services.report_types import normalize_report_type
+import copy
 import json
 
 class ReportRegenerator:
@@ -85,13 +88,162 @@ class ReportRegenerator:
                                    for i in field_issues])
             formatted.append(f"""
             Field: {field}
-            Current Value: {json.dumps(self.original_report.get(field, ""), indent=2)}
+            Current Value: {json.dumps(self._current_value(field), indent=2)}
             Issues:
             {issues_text}
             """)
             
         return "\n".join(formatted)
         
+    def _find_tag(self, report: dict, tag_id: str) -> Optional[dict]:
+        """
+        Find a tag by id in a report's pages
+        """
+        for page in report.get("pages", []):
+            for tag in page.get("tags", []):
+                if str(tag.get("id")) == str(tag_id):
+                    return tag
+        return None
+
+    def _current_value(self, field: str) -> Any:
+        """
+        Current content of a field: a tag's content, or a top-level key of the report
+        """
+        tag = self._find_tag(self.original_report, field)
+        if tag is not None:
+            return tag.get("content", "")
+        return self.original_report.get(field, "")
+
+    def partial_fields(self, validation_result: DetailedValidationResult) -> List[str]:
+        """
+        Fields flagged for regeneration that are tags in the structure.
+        Empty when the validator named fields that cannot be patched individually.
+        """
+        fields = [field for field in validation_result.regenerate_fields
+                  if self._find_tag(self.structure, field) is not None]
+        if len(fields) != len(validation_result.regenerate_fields):
+            return []
+        return list(dict.fromkeys(fields))
+
+    def partial_structure(self, fields: List[str]) -> dict:
+        """
+        The structure reduced to the given tags (pages without any of them are dropped)
+        """
+        pages = []
+        for page in self.structure["pages"]:
+            tags = [tag for tag in page["tags"] if str(tag["id"]) in fields]
+            if tags:
+                pages.append({**page, "tags": tags})
+        return {**self.structure, "pages": pages}
+
+    def partial_report(self, report: dict, fields: List[str]) -> dict:
+        """
+        A report containing only the given tags, for re-validating patched fields
+        """
+        pages = []
+        for page in report.get("pages", []):
+            tags = [tag for tag in page.get("tags", []) if str(tag.get("id")) in fields]
+            if tags:
+                pages.append({"page_number": page.get("page_number"), "tags": tags})
+        return {"pages": pages}
+
+    def partial_context(self, fields: List[str]) -> Any:
+        """
+        The context entries the given tags need: the retrievers mapped to each tag in
+        SCHEMA_TAG_RETRIEVERS (or the entry named after the tag), plus the metadata.
+        Falls back to the full context when a tag has no mapping or its entries are missing.
+        """
+        data = self.context.get("data") if isinstance(self.context, dict) else None
+        if not isinstance(data, dict):
+            return self.context
+        report_type = normalize_report_type((self.context.get("metadata") or {}).get("reportType"))
+        mapping = {**SCHEMA_TAG_RETRIEVERS, **REPORT_TAG_RETRIEVERS.get(report_type, {})}
+
+        needed = []
+        for field in fields:
+            names = mapping.get(field, [field])
+            if names and not any(name in data for name in names):
+                return self.context
+            needed += [name for name in names if name in data]
+        return {**self.context, "data": {name: data[name] for name in dict.fromkeys(needed)}}
+
+    def create_partial_regeneration_prompt(self, validation_result: DetailedValidationResult, source: str,
+                                           previous_attempts: list = None) -> str:
+        """
+        Create a prompt that asks for only the failing tags, with only the context they need
+        """
+        fields = self.partial_fields(validation_result)
+        issues_by_field = self._get_issues_by_field(validation_result)
+        previous_attempts_summary = self._format_previous_attempts(previous_attempts) if previous_attempts else ""
+        tag_titles = {str(tag["id"]): tag.get("title", "")
+                      for page in self.partial_structure(fields)["pages"] for tag in page["tags"]}
+        tags_to_fix = "\n".join(f"- {tag_id}: {title}" for tag_id, title in tag_titles.items())
+
+        prompt = f"""You are fixing specific sections of an MCCS Marketing Analytics report that failed validation.
+        Regenerate ONLY the tags listed below using the context data.
+
+        {previous_attempts_summary}
+
+        # TAGS TO REGENERATE
+        {tags_to_fix}
+
+        # CURRENT CONTENT AND ISSUES
+        {self._format_fields_with_issues(fields, issues_by_field)}
+
+        # CONTEXT DATA
+        {json.dumps(self.partial_context(fields), separators=(',', ':'), default=str)}
+
+        # INSTRUCTIONS
+        1. Fix every identified issue
+        2. Use only numbers and metrics that appear in the context data
+        3. When appropriate, return content as a list of strings
+
+        Respond ONLY with a JSON object of this form (no markdown, no explanations):
+        {{"tags": [{{"id": "<tag id>", "content": [{{"source": "{source}", "title": "<tag id>", "data": "<content or list of strings>"}}]}}]}}
+        """
+
+        return prompt
+
+    def apply_partial_regeneration(self, regenerated: Any, fields: List[str]) -> tuple:
+        """
+        Patch regenerated tags into a copy of the original report, keeping their positions.
+        Only tags in ``fields`` (the ones requested) are patched; other tags the model
+        returned are ignored. Accepts {"tags": [...]}, a bare list of tags, or a report with pages.
+        Returns (patched_report, patched_tag_ids).
+        """
+        if isinstance(regenerated, dict) and "pages" in regenerated:
+            new_tags = [tag for page in regenerated["pages"] for tag in page.get("tags", [])]
+        elif isinstance(regenerated, dict):
+            new_tags = regenerated.get("tags", [])
+        else:
+            new_tags = regenerated or []
+        replacements = {str(tag["id"]): tag for tag in new_tags
+                        if isinstance(tag, dict) and "id" in tag and str(tag["id"]) in fields}
+
+        patched_report = copy.deepcopy(self.original_report)
+        patched = []
+        for page in patched_report.get("pages", []):
+            for index, tag in enumerate(page.get("tags", [])):
+                tag_id = str(tag.get("id"))
+                if tag_id in replacements and tag_id not in patched:
+                    page["tags"][index] = replacements[tag_id]
+                    patched.append(tag_id)
+
+        # Tags the original report was missing go onto their structure page
+        for page in self.structure["pages"]:
+            for tag in page["tags"]:
+                tag_id = str(tag["id"])
+                if tag_id not in replacements or tag_id in patched:
+                    continue
+                target = next((p for p in patched_report.setdefault("pages", [])
+                               if p.get("page_number") == page["page_number"]), None)
+                if target is None:
+                    target = {"page_number": page["page_number"], "tags": []}
+                    patched_report["pages"].append(target)
+                target.setdefault("tags", []).append(replacements[tag_id])
+                patched.append(tag_id)
+        return patched_report, patched
+
     def _format_previous_attempts(self, previous_attempts: list) -> str:
         """
         Format history of previous regeneration attempts
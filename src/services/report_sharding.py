@@ -0,0 +1,83 @@
+"""Sharded report generation.
+
+Large schemas (``marketing_report_schema`` has ~25 tags) are slow to fill in
+one prompt and the LLM output is often truncated. In sharded mode the
+structure is split into groups of at most ``SHARD_TAG_COUNT`` tags, every
+group is generated concurrently with the same context, and the partial
+reports are merged back into one report in schema order. Wall-clock time is
+then bounded by the slowest shard instead of the whole document.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+GeneratorFunc = Callable[[dict, dict, Optional[dict]], Awaitable[dict]]
+
+
+def split_structure(structure: dict, tags_per_shard: int) -> List[dict]:
+    """Split a report structure into sub-structures of at most ``tags_per_shard`` tags.
+
+    Tags keep their schema order and page numbers; a page may span shards.
+    """
+    tagged = [(page, tag) for page in structure["pages"] for tag in page["tags"]]
+    shards = []
+    for start in range(0, len(tagged), max(1, tags_per_shard)):
+        pages = []
+        for page, tag in tagged[start:start + tags_per_shard]:
+            if not pages or pages[-1]["page_number"] != page["page_number"]:
+                pages.append({**page, "tags": []})
+            pages[-1]["tags"].append(tag)
+        shards.append({**structure, "pages": pages})
+    return shards
+
+
+def merge_reports(structure: dict, reports: List[dict]) -> dict:
+    """Merge shard reports into one report that follows the structure's page and tag order.
+
+    Tags that no shard produced are left out, so validation flags them as missing.
+    """
+    generated = {}
+    for report in reports:
+        for page in report.get("pages", []):
+            for tag in page.get("tags", []):
+                generated.setdefault(str(tag.get("id")), tag)
+
+    pages = []
+    for page in structure["pages"]:
+        tags = [generated[str(tag["id"])] for tag in page["tags"] if str(tag["id"]) in generated]
+        pages.append({"page_number": page["page_number"], "tags": tags})
+    return {"pages": pages}
+
+
+async def generate_sharded(generator_func: GeneratorFunc, structure: dict, context: dict,
+                           feedback: Optional[dict] = None, tags_per_shard: Optional[int] = None) -> dict:
+    """Run ``generator_func`` on every shard concurrently and merge the results.
+
+    Failed shards are logged and skipped; an error is raised only if every shard fails.
+    """
+    shards = split_structure(structure, tags_per_shard or settings.SHARD_TAG_COUNT)
+    outcomes = await asyncio.gather(
+        *[generator_func(shard, context, feedback) for shard in shards],
+        return_exceptions=True
+    )
+
+    reports = []
+    for index, outcome in enumerate(outcomes):
+        if isinstance(outcome, Exception):
+            logger.warning(f"Shard {index + 1}/{len(shards)} failed: {outcome}")
+        else:
+            reports.append(outcome)
+    if not reports:
+        raise ValueError(f"All {len(shards)} report shards failed")
+    return merge_reports(structure, reports)
+
+
+def sharded(generator_func: GeneratorFunc) -> GeneratorFunc:
+    """Wrap a (structure, context, feedback) generator so it generates shard by shard."""
+    async def _generate(structure: dict, context: dict, feedback: Optional[dict] = None) -> dict:
+        return await generate_sharded(generator_func, structure, context, feedback)
+    return _generate
@@ -0,0 +1,192 @@
+"""Helpers for turning generated reports into the flat per-tag API response.
+
+Used by both ``/generate_report`` (whole reports at once) and
+``/generate_report/stream`` (tags pulled out of the LLM output while it is
+still being generated).
+"""
+import json
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+
+def normalize_text(s) -> str:
+    """Normalize text for deduplication (NFKC, collapsed whitespace, lowercase)."""
+    if not s:
+        return ""
+    if isinstance(s, list):
+        # For lists, normalize each item and join with newlines
+        return "\n".join(normalize_text(item) for item in s)
+    # Convert to string if not already
+    s = str(s)
+    s2 = unicodedata.normalize('NFKC', s)
+    s2 = s2.replace('\u00A0', ' ')
+    s2 = re.sub(r"\s+", ' ', s2)
+    return s2.strip().lower()
+
+
+def extract_tag_data(content) -> Any:
+    """Pull the ``data`` value out of a tag's content, whatever shape the LLM returned."""
+    data = ""
+    try:
+        if isinstance(content, list) and len(content) > 0:
+            item = content[0]
+            if isinstance(item, dict):
+                data = item.get("data", "")
+            elif isinstance(item, str):
+                try:
+                    parsed = json.loads(item)
+                    if isinstance(parsed, dict):
+                        data = parsed.get("data", "")
+                    elif isinstance(parsed, list) and len(parsed) > 0 and isinstance(parsed[0], dict):
+                        data = parsed[0].get("data", "")
+                except json.JSONDecodeError:
+                    data = item
+            else:
+                data = str(item)
+        else:
+            data = str(content)
+    except Exception:
+        data = ""
+    return data
+
+
+def build_title_map(structure: dict) -> Dict[str, str]:
+    """Map tag IDs to their titles from the report structure."""
+    title_map = {}
+    for page in structure.get("pages", []):
+        for tag in page.get("tags", []):
+            if tag.get("title") and tag.get("id"):
+                title_map[tag["id"]] = tag["title"]
+    return title_map
+
+
+class FlatReportBuilder:
+    """Accumulates per-source tag content into the flat ``items`` response."""
+
+    def __init__(self, structure: dict):
+        self.title_map = build_title_map(structure)
+        self.flat_data: Dict[str, dict] = {}
+
+    def add_tag(self, source: str, tag: dict, replace: bool = False) -> Optional[dict]:
+        """
+        Record one tag from a source. The first non-empty content per source
+        wins unless ``replace`` is set (used for validated/regenerated output).
+        Returns the updated response item when the tag's content changed.
+        """
+        tag_id = str(tag["id"])
+        if tag_id not in self.flat_data:
+            self.flat_data[tag_id] = {
+                "id": tag_id,
+                "title": self.title_map.get(tag_id, tag_id),
+                "sources": {}
+            }
+        entry = self.flat_data[tag_id]
+
+        if not tag.get("content"):
+            return None
+        data = extract_tag_data(tag["content"])
+        current = entry["sources"].get(source)
+        if replace or source not in entry["sources"] or not normalize_text(current):
+            if current == data:
+                return None
+            entry["sources"][source] = data
+            return self._item(entry)
+        return None
+
+    def add_report(self, source: str, report: dict, replace: bool = False) -> List[dict]:
+        """Record every tag of a full report; returns the items that changed."""
+        changed = []
+        for page in report["pages"]:
+            for tag in page["tags"]:
+                item = self.add_tag(source, tag, replace=replace)
+                if item:
+                    changed.append(item)
+        return changed
+
+    @staticmethod
+    def _item(item_data: dict) -> dict:
+        return {
+            "id": item_data["id"],
+            "title": item_data["title"],
+            "content": [
+                {
+                    "source": source,
+                    "data": data
+                }
+                for source, data in item_data["sources"].items()
+                if data  # Only include non-empty data
+            ]
+        }
+
+    def items(self) -> List[dict]:
+        """The flat response items, skipping tags without any content."""
+        return [
+            self._item(item_data)
+            for item_data in self.flat_data.values()
+            if any(data for data in item_data["sources"].values())  # Only include items with non-empty content
+        ]
+
+
+class TagStreamParser:
+    """
+    Incrementally extracts complete tag objects (dicts with ``id`` and
+    ``content``) from a JSON report that is still being streamed.
+    Each tag is returned once, as soon as its closing brace arrives.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._in_string = False
+        self._escape = False
+        self._open_braces: List[int] = []
+        self._seen = set()
+
+    def feed(self, chunk: str) -> List[dict]:
+        """Consume a chunk of streamed text and return any newly completed tags."""
+        self._text += chunk
+        tags = []
+        text = self._text
+        for i in range(self._pos, len(text)):
+            char = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._open_braces.append(i)
+            elif char == "}" and self._open_braces:
+                start = self._open_braces.pop()
+                tag = self._parse_tag(text[start:i + 1])
+                if tag is not None:
+                    tags.append(tag)
+        self._pos = len(text)
+
+        # Drop text that can no longer be part of an open object
+        keep_from = self._open_braces[0] if self._open_braces else self._pos
+        if keep_from:
+            self._text = text[keep_from:]
+            self._pos -= keep_from
+            self._open_braces = [index - keep_from for index in self._open_braces]
+        return tags
+
+    def _parse_tag(self, candidate: str) -> Optional[dict]:
+        if '"id"' not in candidate or '"content"' not in candidate:
+            return None
+        try:
+            obj = json.loads(candidate)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(obj, dict) or "id" not in obj or "content" not in obj:
+            return None
+        tag_id = str(obj["id"])
+        if tag_id in self._seen:
+            return None
+        self._seen.add(tag_id)
+        return obj
@@ -1,21 +1,194 @@
+"""Report retrievers: the values behind the tags in ``marketing_report_retrievers``.
+
+Each ``_get_*(month, year, company)`` formats one part of a monthly report from
+the query.py aggregates for that month. The queries run through the shared
+``QueryRunner``, so retrievers that need the same aggregate share one execution
+and its cached result until the next load.
+
+Customer satisfaction surveys, store comments, Google reviews, industry
+benchmarks and campaign images are not loaded into the database yet. Their
+retrievers return "" or [], and the context builder leaves empty values out.
+"""
+import calendar
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .correlation import CHANNEL_METRICS, RETAIL_TARGET, correlate
+from .query_runner import get_query_runner
+
+CORRELATION_LABELS = {
+    "email_open_rate": "email open rate",
+    "email_opens": "email opens",
+    "email_clicks": "email clicks",
+    "social_engagements": "social media engagements",
+    "social_posts": "social media posts",
+    "social_reach": "social media reach",
+}
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def _month_range(month: int, year: int, months_back: int = 0) -> Tuple[str, str]:
+    """('YYYY-MM-DD', 'YYYY-MM-DD') from the first day ``months_back`` months earlier to the month's last day."""
+    start_index = year * 12 + (month - 1) - months_back
+    start = date(start_index // 12, start_index % 12 + 1, 1)
+    end = date(year, month, calendar.monthrange(year, month)[1])
+    return start.isoformat(), end.isoformat()
+
+
+def _frames(month: int, year: int, *names: str, months_back: int = 0) -> Dict[str, Any]:
+    """DataFrames for the named queries over the month (cached per data version)."""
+    start_date, end_date = _month_range(month, year, months_back)
+    return get_query_runner().run(names, start_date, end_date)
+
+
+def _records(month: int, year: int, name: str, months_back: int = 0) -> List[Dict[str, Any]]:
+    frame = _frames(month, year, name, months_back=months_back)[name]
+    return [{k: _value(v) for k, v in row.items()} for row in frame.to_dict("records")]
+
+
+def _value(value):
+    """None for NaN/NaT so formatting can skip missing numbers."""
+    if value is None:
+        return None
+    try:
+        if value != value:  # NaN, NaT
+            return None
+    except (TypeError, ValueError):
+        pass
+    return value
+
+
+def _count(value) -> str:
+    return f"{int(round(value)):,}" if value is not None else "n/a"
+
+
+def _money(value) -> str:
+    return f"${value:,.2f}" if value is not None else "n/a"
+
+
+def _rate(value) -> str:
+    """A stored fraction (0.3808) as a percentage ("38.08%")."""
+    return f"{value * 100:.2f}%" if value is not None else "n/a"
+
+
+def _percent(value) -> str:
+    """A value that is already a percentage (12.5) as "12.50%"."""
+    return f"{value:.2f}%" if value is not None else "n/a"
+
+
+def _day(value) -> str:
+    return value.strftime("%m-%d-%y") if hasattr(value, "strftime") else str(value or "")
+
+
+def _table(headers: Sequence[str], rows: Sequence[Sequence[str]]) -> str:
+    """A markdown table, or "" when there are no rows."""
+    if not rows:
+        return ""
+    lines = ["| " + " | ".join(headers) + " |", "| " + " | ".join("---" for _ in headers) + " |"]
+    lines.extend("| " + " | ".join(str(cell) for cell in row) + " |" for row in rows)
+    return "\n".join(lines)
+
+
+def _email_summary(month, year) -> Dict[str, Any]:
+    rows = _records(month, year, "EMAIL_PERIOD_SUMMARY")
+    summary = rows[0] if rows else {}
+    return summary if summary.get("total_sends") or summary.get("avg_open_rate") is not None else {}
+
+
+def _email_campaigns(month, year) -> List[Dict[str, Any]]:
+    return [row for row in _records(month, year, "EMAIL_CAMPAIGN_OVERVIEW") if row.get("sends")]
+
+
+def _highlight_campaign(month, year) -> Optional[Dict[str, Any]]:
+    """The campaign send with the most unique clicks."""
+    campaigns = _email_campaigns(month, year)
+    if not campaigns:
+        return None
+    return max(campaigns, key=lambda row: (row.get("unique_clicks") or 0, row.get("open_rate") or 0))
+
+
+# =============================================================================
+# EXECUTIVE SUMMARY AND FINDINGS
+# =============================================================================
+
 def _get_purpose_statement():
     return ""
 
 def _get_executive_summary_bullets(month, year, company):
-    return []
+    frames = _frames(month, year, "RETAIL_PERIOD_COMPARISON", "EMAIL_PERIOD_SUMMARY", "SOCIAL_MEDIA_DAILY_TRENDS")
+    bullets = []
+
+    retail = frames["RETAIL_PERIOD_COMPARISON"].to_dict("records")
+    if retail and _value(retail[0].get("current_sales")) is not None:
+        row = {k: _value(v) for k, v in retail[0].items()}
+        growth = row.get("sales_growth_pct")
+        change = f" ({growth:+.2f}% vs. the previous period)" if growth is not None else ""
+        bullets.append(
+            f"Retail sales totaled {_money(row['current_sales'])}{change} across "
+            f"{_count(row.get('current_transactions'))} transactions."
+        )
+
+    email = _email_summary(month, year)
+    if email:
+        bullets.append(
+            f"{_count(email.get('campaigns_sent'))} email campaigns reached {_count(email.get('total_sends'))} sends "
+            f"with an average open rate of {_rate(email.get('avg_open_rate'))} and click rate of "
+            f"{_rate(email.get('avg_click_rate'))}."
+        )
+
+    social = frames["SOCIAL_MEDIA_DAILY_TRENDS"]
+    if not social.empty:
+        bullets.append(
+            f"{_count(social['posts_published'].sum())} social media posts earned "
+            f"{_count(social['total_engagements'].sum())} engagements and reached {_count(social['reach'].sum())} people."
+        )
+    return bullets
 
 def _get_industry_benchmarks(month, year, company):
     return ""
 
 def _get_email_blast_highlights(month, year, company):
-    return []
+    campaigns = sorted(_email_campaigns(month, year), key=lambda row: row.get("open_rate") or 0, reverse=True)
+    return [
+        f"{row['email_content_name']} ({_day(row.get('send_date'))}): {_count(row['sends'])} sends, "
+        f"{_rate(row.get('open_rate'))} open rate, {_rate(row.get('click_to_open_rate'))} click-to-open rate"
+        for row in campaigns[:3]
+    ]
 
 def _get_all_campaigns_details(month, year, company):
-    return []
+    return [
+        f"{row['email_content_name']} ({_day(row.get('send_date'))}): {_count(row['sends'])} sends, "
+        f"{_rate(row.get('open_rate'))} open rate, {_rate(row.get('click_rate'))} click rate, "
+        f"{_rate(row.get('unsubscribe_rate'))} unsubscribe rate"
+        for row in _email_campaigns(month, year)
+    ]
 
 def _get_other_initiatives(month, year, company):
     return ""
 
+def _get_retail_sales_summary(month, year, company):
+    frames = _frames(month, year, "RETAIL_PERIOD_COMPARISON", "RETAIL_STORE_PERFORMANCE")
+    bullets = []
+    comparison = frames["RETAIL_PERIOD_COMPARISON"].to_dict("records")
+    if comparison and _value(comparison[0].get("current_sales")) is not None:
+        row = {k: _value(v) for k, v in comparison[0].items()}
+        bullets.append(
+            f"Sales of {_money(row['current_sales'])} vs. {_money(row.get('previous_sales'))} in the previous period "
+            f"({_percent(row.get('sales_growth_pct'))} change); average transaction "
+            f"{_money(row.get('current_avg_transaction'))} ({_percent(row.get('avg_transaction_growth_pct'))} change)."
+        )
+    for store in frames["RETAIL_STORE_PERFORMANCE"].head(3).to_dict("records"):
+        store = {k: _value(v) for k, v in store.items()}
+        bullets.append(
+            f"{store.get('site_name') or 'Unknown site'} ({store.get('store_format') or 'n/a'}, "
+            f"{store.get('command_name') or 'n/a'}): {_money(store.get('total_sales'))} from "
+            f"{_count(store.get('total_transactions'))} transactions over {_count(store.get('active_days'))} days."
+        )
+    return bullets
+
 def _get_main_exchange_satisfaction_summary(month, year, company):
     return ""
 
@@ -29,52 +202,135 @@ def _get_google_reviews_summary(month, year, company):
     return ""
 
 def _get_assessment_bullets(month, year, company):
-    return []
+    # One month earlier too, so every metric has a previous month to compare with
+    current = f"{year:04d}-{month:02d}"
+    changes = [row for row in _records(month, year, "TREND_ANALYSIS_TOP_CHANGES", months_back=1) if row.get("month") == current]
+    return [
+        f"{row['metric']} {'rose' if row['change_pct'] >= 0 else 'fell'} {abs(row['change_pct']):.2f}% month over month "
+        f"(from {_count(row.get('prev_value'))} to {_count(row.get('value'))})."
+        for row in changes if row.get("change_pct") is not None
+    ]
 
 def _get_assessment_continued(month, year, company):
-    return []
+    rows = _records(month, year, "CHANNEL_DAILY_SERIES")
+    results = correlate(rows, RETAIL_TARGET, CHANNEL_METRICS)
+    ranked = sorted(
+        ((metric, result) for metric, result in results.items() if result["pearson"] is not None),
+        key=lambda item: abs(item[1]["pearson"]), reverse=True
+    )
+    bullets = []
+    for metric, result in ranked[:3]:
+        r = result["pearson"]
+        strength = "strongly" if abs(r) >= 0.7 else "moderately" if abs(r) >= 0.4 else "weakly"
+        direction = "positively" if r >= 0 else "negatively"
+        spearman = f", Spearman {result['spearman']:.2f}" if result["spearman"] is not None else ""
+        bullets.append(
+            f"Daily retail sales are {strength} {direction} correlated with {CORRELATION_LABELS[metric]} "
+            f"(Pearson {r:.2f}{spearman}, {result['n']} days)."
+        )
+    return bullets
+
+
+# =============================================================================
+# EMAIL DETAILS
+# =============================================================================
 
 def _get_email_highlight_campaign(month, year, company):
-    return ""
+    campaign = _highlight_campaign(month, year)
+    return campaign["email_content_name"] if campaign else ""
 
 def _get_email_highlight_image(month, year, company):
     return ""
 
 def _get_email_highlight_details(month, year, company):
-    return []
+    campaign = _highlight_campaign(month, year)
+    if not campaign:
+        return []
+    details = [f"Sent {_day(campaign.get('send_date'))} to {_count(campaign['sends'])} recipients"]
+    if campaign.get("email_subject"):
+        details.insert(0, f"Subject: {campaign['email_subject']}")
+    details.append(f"{_count(campaign.get('unique_opens'))} unique opens and {_count(campaign.get('unique_clicks'))} unique clicks")
+    return details
 
 def _get_email_highlight_metrics(month, year, company):
-    return ""
+    campaign = _highlight_campaign(month, year)
+    if not campaign:
+        return ""
+    return (
+        f"Open rate {_rate(campaign.get('open_rate'))} | Click rate {_rate(campaign.get('click_rate'))} | "
+        f"Click-to-open {_rate(campaign.get('click_to_open_rate'))} | "
+        f"Unsubscribe rate {_rate(campaign.get('unsubscribe_rate'))}"
+    )
 
 def _get_email_campaigns_table(month, year, company):
-    return ""
+    return _table(
+        ["Campaign", "Send Date", "Sends", "Open Rate", "Click Rate", "Click-to-Open", "Unsubscribe Rate"],
+        [
+            [row["email_content_name"], _day(row.get("send_date")), _count(row["sends"]), _rate(row.get("open_rate")),
+             _rate(row.get("click_rate")), _rate(row.get("click_to_open_rate")), _rate(row.get("unsubscribe_rate"))]
+            for row in _email_campaigns(month, year)
+        ]
+    )
 
 def _get_email_total_sends(month, year, company):
-    return ""
+    summary = _email_summary(month, year)
+    return _count(summary["total_sends"]) if summary.get("total_sends") is not None else ""
 
 def _get_email_avg_open_rate(month, year, company):
-    return ""
+    summary = _email_summary(month, year)
+    return _rate(summary["avg_open_rate"]) if summary.get("avg_open_rate") is not None else ""
 
 def _get_email_avg_click_rate(month, year, company):
-    return ""
+    summary = _email_summary(month, year)
+    return _rate(summary["avg_click_rate"]) if summary.get("avg_click_rate") is not None else ""
 
 def _get_email_avg_click_to_open(month, year, company):
-    return ""
+    summary = _email_summary(month, year)
+    return _rate(summary["avg_click_to_open_rate"]) if summary.get("avg_click_to_open_rate") is not None else ""
 
 def _get_email_total_unsubscribes(month, year, company):
-    return ""
+    summary = _email_summary(month, year)
+    return _count(summary["total_unsubscribes"]) if summary.get("total_unsubscribes") is not None else ""
 
 def _get_email_avg_unsubscribe_rate(month, year, company):
-    return ""
+    summary = _email_summary(month, year)
+    return _rate(summary["avg_unsubscribe_rate"]) if summary.get("avg_unsubscribe_rate") is not None else ""
+
+
+# =============================================================================
+# SOCIAL MEDIA
+# =============================================================================
 
 def _get_social_media_table(month, year, company):
-    return ""
+    return _table(
+        ["Platform", "Period", "Followers", "Impressions", "Engagement Rate"],
+        [
+            [row["platform"], row.get("period_month") or "", _count(row.get("followers")),
+             _count(row.get("impressions")), _rate(row.get("engagement_rate"))]
+            for row in _records(month, year, "SOCIAL_MEDIA_OVERVIEW")
+        ]
+    )
 
 def _get_social_media_highlights(month, year, company):
-    return []
+    return [
+        f"{_day(row.get('date'))}: \"{(row.get('post_preview') or '').strip()}\" earned "
+        f"{_count(row.get('total_engagements'))} engagements and {_count(row.get('reach'))} reach "
+        f"({_percent(row.get('engagement_rate'))} engagement rate)"
+        for row in _records(month, year, "SOCIAL_MEDIA_TOP_POSTS")[:3]
+    ]
 
 def _get_social_media_continued(month, year, company):
-    return []
+    return [
+        f"{row['content_type']} posts ({_count(row.get('post_count'))}) averaged "
+        f"{_count(row.get('avg_engagements'))} engagements and a {_percent(row.get('avg_engagement_rate_pct'))} "
+        f"engagement rate."
+        for row in _records(month, year, "SOCIAL_MEDIA_CONTENT_ANALYSIS")
+    ]
+
+
+# =============================================================================
+# CUSTOMER SATISFACTION (no data source yet)
+# =============================================================================
 
 def _get_main_exchange_comments(month, year, company):
     return []
@@ -96,118 +352,3 @@ def _get_google_reviews_details(month, year, company):
 
 def _get_satisfaction_opportunity_note(month, year, company):
     return ""
-
-def get_mock_data():
-    """
-    Simulates fetching structured numerical and contextual data
-    for September 2024 MCCS Marketing Analytics Report.
-    """
-
-    # 🏪 Store Information
-    store_information = {
-        "total_stores": 12,
-        "reporting_stores": 12,
-        "survey_responses": 382
-    }
-    
-    # 💬 Customer Comments
-    customer_comments = {
-        "main_exchange": [
-            {
-                "location": "Camp Pendleton",
-                "shopper_type": "Active Duty (Marine Corps) | Shopping for Essentials",
-                "comment": "Great selection of items and friendly staff!"
-            },
-            {
-                "location": "Quantico",
-                "shopper_type": "Military Dependent | Shopping Sales",
-                "comment": "The Anniversary sale had amazing deals."
-            }
-        ],
-        "marine_mart": [
-            {
-                "location": "Camp Lejeune",
-                "request": "More healthy snack options",
-                "frequency": 3
-            },
-            {
-                "location": "Twentynine Palms",
-                "request": "Energy drinks variety",
-                "frequency": 2
-            }
-        ]
-    }
-    
-    # 📨 Email Campaign Performance Summary
-    email_performance_summary = {
-        "month": "September 2024",
-        "total_sends": 895_773,
-        "avg_open_rate": 38.08,
-        "avg_click_rate": 0.65,
-        "avg_click_to_open_rate": 1.70,
-        "total_unsubscribes": 192,
-        "avg_unsubscribe_rate": 0.02,
-        "campaign_examples": [
-            {
-                "campaign_name": "09-13-24 Anniversary Sale",
-                "sends": 59_680,
-                "open_rate": 39.60,
-                "click_rate": 1.24,
-                "click_to_open": 3.14,
-                "unsubscribes": 8,
-                "unsubscribe_rate": 0.02
-            },
-            {
-                "campaign_name": "Quantico Firearms",
-                "sends": 11_459,
-                "open_rate": 44.60,
-                "click_rate": 0.52,
-                "click_to_open": 1.16,
-                "unsubscribes": 1,
-                "unsubscribe_rate": 0.01
-            },
-            {
-                "campaign_name": "09-04-24 Anniversary Sale + Fall Glam",
-                "sends": 59_625,
-                "open_rate": 38.38,
-                "click_rate": 1.42,
-                "click_to_open": 3.69,
-                "unsubscribes": 9,
-                "unsubscribe_rate": 0.02
-            }
-        ]
-    }
-
-    # 🏬 Customer Satisfaction by Location
-    satisfaction_data = {
-        "month": "September 2024",
-        "locations": [
-            {"name": "Camp Pendleton", "sept_satisfied": 90, "aug_satisfied": 92, "change": -2},
-            {"name": "Camp Lejeune", "sept_satisfied": 94, "aug_satisfied": 96, "change": -2},
-            {"name": "Cherry Point", "sept_satisfied": 96, "aug_satisfied": 96, "change": 0},
-            {"name": "Henderson Hall", "sept_satisfied": 90, "aug_satisfied": 96, "change": -6},
-            {"name": "Iwakuni", "sept_satisfied": 84, "aug_satisfied": 84, "change": 0},
-            {"name": "Kbay", "sept_satisfied": 94, "aug_satisfied": 94, "change": 0},
-            {"name": "Miramar", "sept_satisfied": 94, "aug_satisfied": 96, "change": -2},
-            {"name": "Quantico", "sept_satisfied": 82, "aug_satisfied": 92, "change": -10},
-            {"name": "San Diego", "sept_satisfied": 96, "aug_satisfied": 98, "change": -2},
-            {"name": "South Carolina", "sept_satisfied": 88, "aug_satisfied": 100, "change": -12},
-            {"name": "Twentynine Palms", "sept_satisfied": 96, "aug_satisfied": 94, "change": 2},
-            {"name": "Yuma", "sept_satisfied": 86, "aug_satisfied": 96, "change": -10}
-        ]
-    }
-
-    # 🎯 Combine all into single context
-    mock_context = {
-        "report_title": "MCCS Marketing Analytics and Customer Satisfaction Report",
-        "report_month": "September 2024",
-        "email_performance": email_performance_summary,
-        "customer_satisfaction": satisfaction_data,
-        "notes": (
-            "The data combines marketing analytics (email campaign KPIs) "
-            "and customer satisfaction feedback from various locations. "
-            "The goal is to generate insights, trends, and improvement recommendations."
-        )
-    }
-
-    return mock_context
@@ -0,0 +1,133 @@
+"""Deterministic pre-validation of generated reports.
+
+Runs the checks that do not need a model, against the schema and the context,
+before any LLM validator round-trip:
+- every schema tag is present
+- no tag is empty
+- no tag's content is just its title (the anti-header rule in prompts.py)
+- no placeholder text such as "XX%", "TBD" or "[Insert data]"
+- numbers quoted in the report appear in the context or are derived from it
+  (see fact_index.py)
+
+Failures are returned in the same ValidationResult / DetailedValidationResult
+shape as the LLM validators, with the failing tags in ``regenerate_fields``,
+so the regeneration path can act on them without asking the LLM first.
+Unsupported numbers are a heuristic: they are returned as ``warnings`` and do
+not fail a tag.
+"""
+import re
+from typing import List, Optional
+
+from src.models.validation_schema import (
+    DetailedValidationResult, ValidationIssue, ValidationResult, ValidationResults, ValidationSection
+)
+from src.services.fact_index import NumericFactIndex, build_fact_index
+from src.services.report_streaming import extract_tag_data, normalize_text
+
+PLACEHOLDER_PATTERN = re.compile(
+    r"\bX{2,}(?:\.X+)?\s*%"                          # XX%, XX.XX%
+    r"|\$\s?X{1,}(?:[.,]X+)*\b"                      # $X, $XX.XX
+    r"|\bTBD\b|\bTBA\b"
+    r"|\[(?:insert|placeholder|add|enter|tbd)[^\]]*\]"
+    r"|lorem ipsum",
+    re.IGNORECASE
+)
+
+
+def _text_of(data) -> str:
+    if isinstance(data, list):
+        return "\n".join(str(item) for item in data)
+    return str(data or "")
+
+
+def validate_report_rules(structure: dict, report: dict, context: Optional[dict] = None,
+                          fact_index: Optional[NumericFactIndex] = None) -> ValidationResult:
+    """
+    Run the deterministic checks; the result is invalid if any tag fails one.
+    Numbers are checked against ``fact_index`` (built from ``context`` if not given).
+    """
+    structure_issues: List[ValidationIssue] = []
+    quality_issues: List[ValidationIssue] = []
+    content_issues: List[ValidationIssue] = []
+    warnings: List[ValidationIssue] = []
+
+    generated = {}
+    for page in report.get("pages", []) if isinstance(report, dict) else []:
+        for tag in page.get("tags", []):
+            generated.setdefault(str(tag.get("id")), tag)
+
+    if fact_index is None and context:
+        fact_index = build_fact_index(context)
+
+    for page in structure.get("pages", []):
+        for schema_tag in page.get("tags", []):
+            tag_id = str(schema_tag["id"])
+            title = schema_tag.get("title", "")
+            tag = generated.get(tag_id)
+            if tag is None:
+                structure_issues.append(ValidationIssue(
+                    field=tag_id, issue="Tag is missing from the report",
+                    fix=f"Add the '{tag_id}' tag with content based on the context"))
+                continue
+
+            text = _text_of(extract_tag_data(tag.get("content")) if tag.get("content") else "")
+            normalized = normalize_text(text)
+            if not normalized:
+                content_issues.append(ValidationIssue(
+                    field=tag_id, issue="Content is empty",
+                    fix="Provide content from the context, or 'No data available' if there is none"))
+                continue
+
+            # Tags with schema-provided content (e.g. the purpose statement) are fixed text
+            if schema_tag.get("content"):
+                continue
+
+            if normalized in (normalize_text(title), normalize_text(tag_id.replace("_", " "))):
+                content_issues.append(ValidationIssue(
+                    field=tag_id, issue=f"Content only repeats the header '{title}'",
+                    fix="Replace the header text with the actual content for this section"))
+
+            placeholder = PLACEHOLDER_PATTERN.search(text)
+            if placeholder:
+                quality_issues.append(ValidationIssue(
+                    field=tag_id, issue=f"Placeholder text '{placeholder.group(0)}'",
+                    fix="Replace the placeholder with the actual value from the context"))
+
+            if fact_index is not None:
+                unsupported = fact_index.unsupported_numbers(text)
+                if unsupported:
+                    warnings.append(ValidationIssue(
+                        field=tag_id, issue=f"Numbers not found in the context: {', '.join(unsupported[:5])}",
+                        fix="Use only numbers that appear in the context data"))
+
+    warning_parts = [f"Warning ({issue.field}): {issue.issue}" for issue in warnings]
+    if not (structure_issues or quality_issues or content_issues):
+        message = " | ".join(["Rule-based validation passed"] + warning_parts)
+        return ValidationResult(is_valid=True, message=message, warnings=warnings)
+
+    failing_fields = list(dict.fromkeys(issue.field for issue in structure_issues + quality_issues + content_issues))
+    detailed_result = DetailedValidationResult(
+        is_valid=False,
+        validation_results=ValidationResults(
+            structure=ValidationSection(passed=not structure_issues, issues=structure_issues),
+            data_quality=ValidationSection(passed=not quality_issues, issues=quality_issues),
+            content=ValidationSection(passed=not content_issues, issues=content_issues)
+        ),
+        summary=f"Rule-based validation failed for {len(failing_fields)} tag(s)",
+        regeneration_required=True,
+        regenerate_fields=failing_fields
+    )
+
+    # Same message format as the LLM validators
+    message_parts = ["Source: rule-based validation"]
+    for issue in structure_issues:
+        message_parts.append(f"Structure ({issue.field}): {issue.issue}")
+    for issue in quality_issues:
+        message_parts.append(f"Quality ({issue.field}): {issue.issue}")
+    for issue in content_issues:
+        message_parts.append(f"Content ({issue.field}): {issue.issue}")
+    message_parts.append(f"Please regenerate the following fields: {', '.join(failing_fields)}")
+    message_parts += warning_parts
+
+    return ValidationResult(is_valid=False, message=" | ".join(message_parts), detailed_results=detailed_result,
+                            warnings=warnings)
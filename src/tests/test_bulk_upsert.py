@@ -0,0 +1,62 @@
+import unittest
+import datetime
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.database.bulk_upsert import dataframe_rows, upsert_dataframe
+
+class RecordingCursor:
+    def __init__(self):
+        self.calls = []
+
+    def execute(self, sql, params=None):
+        self.calls.append((sql, params))
+
+class TestBulkUpsert(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'message_name': ['Fall Sale', 'Winter Promo', 'Spring Launch'],
+            'send_date': [datetime.date(2024, 9, 1), pd.NaT, datetime.date(2024, 9, 3)],
+            'unique_opens': pd.array([120, None, 75], dtype='Int64'),
+            'open_rate': [0.382, np.nan, 0.25],
+        })
+
+    def test_missing_values_become_none(self):
+        rows = dataframe_rows(self.df, ['message_name', 'send_date', 'unique_opens', 'open_rate'])
+        self.assertEqual(rows[0], ('Fall Sale', datetime.date(2024, 9, 1), 120, 0.382))
+        self.assertEqual(rows[1], ('Winter Promo', None, None, None))
+        self.assertIs(type(rows[2][2]), int)
+
+    def test_rows_are_sent_in_multi_row_chunks(self):
+        cursor = RecordingCursor()
+        count = upsert_dataframe(
+            cursor, 'email_engagement_details', self.df,
+            columns=['message_name', 'unique_opens'],
+            update_columns=['unique_opens'],
+            batch_size=2
+        )
+
+        self.assertEqual(count, 3)
+        self.assertEqual(len(cursor.calls), 2)
+        sql, params = cursor.calls[0]
+        self.assertEqual(
+            sql,
+            "INSERT INTO email_engagement_details (message_name, unique_opens) VALUES (%s, %s), (%s, %s)"
+            " ON DUPLICATE KEY UPDATE unique_opens=VALUES(unique_opens)"
+        )
+        self.assertEqual(params, ['Fall Sale', 120, 'Winter Promo', None])
+        self.assertEqual(cursor.calls[1][1], ['Spring Launch', 75])
+
+    def test_empty_frame_executes_nothing(self):
+        cursor = RecordingCursor()
+        self.assertEqual(upsert_dataframe(cursor, 't', self.df.iloc[0:0], ['message_name'], ['message_name']), 0)
+        self.assertEqual(cursor.calls, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import sys
+import os
+from unittest.mock import patch
+
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.report_schema import get_report_schema, marketing_report_retrievers
+from src.services import retrievers
+from src.services.context_builder import ContextBuilder, ReportPeriod, required_retrievers
+
+class FakeRunner:
+    """Stands in for QueryRunner: fixed frames per query and a settable data version."""
+    def __init__(self, frames):
+        self.frames = frames
+        self.version = (2, 7)
+        self.calls = []
+
+    def current_data_version(self):
+        return self.version
+
+    def run(self, names, start_date, end_date, output="pandas"):
+        names = list(names)
+        self.calls.append((tuple(names), start_date, end_date))
+        return {name: self.frames.get(name, pd.DataFrame()).copy() for name in names}
+
+class TestContextBuilder(unittest.TestCase):
+    def setUp(self):
+        self.runner = FakeRunner({
+            "RETAIL_PERIOD_COMPARISON": pd.DataFrame([{
+                "current_sales": 125000.5, "previous_sales": 100000.0, "sales_growth_pct": 25.0,
+                "current_transactions": 4200, "previous_transactions": 4000, "transaction_growth_pct": 5.0,
+                "current_avg_transaction": 29.76, "previous_avg_transaction": 25.0, "avg_transaction_growth_pct": 19.04
+            }]),
+            "RETAIL_STORE_PERFORMANCE": pd.DataFrame([{
+                "site_name": "Camp Pendleton", "store_format": "Main Store", "command_name": "West",
+                "active_days": 30, "total_sales": 80000.0, "total_transactions": 2500
+            }]),
+            "EMAIL_PERIOD_SUMMARY": pd.DataFrame([{
+                "campaigns_sent": 12, "total_sends": 895773, "avg_open_rate": 0.3808, "avg_click_rate": 0.0065,
+                "avg_click_to_open_rate": 0.017, "avg_unsubscribe_rate": 0.0002, "total_unsubscribes": 192
+            }]),
+            "TREND_ANALYSIS_TOP_CHANGES": pd.DataFrame([
+                {"metric": "Retail Sales", "month": "2024-09", "value": 125000.0, "prev_value": 100000.0, "change_pct": 25.0},
+                {"metric": "Email Opens", "month": "2024-08", "value": 900.0, "prev_value": 1000.0, "change_pct": -10.0},
+            ]),
+        })
+        self.patcher = patch.object(retrievers, "get_query_runner", return_value=self.runner)
+        self.patcher.start()
+        self.builder = ContextBuilder(runner=self.runner, max_workers=4)
+        self.period = ReportPeriod(2024, 9, as_of_date="October 01, 2024")
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.builder.shutdown(wait=True)
+
+    def test_only_the_schemas_retrievers_run(self):
+        structure = get_report_schema("retail-data").dict()
+        names = [name for name, _ in required_retrievers(structure, marketing_report_retrievers)]
+        self.assertIn("retail_sales_summary", names)
+        self.assertFalse(any(name.startswith(("email_", "social_", "campaigns")) for name in names), names)
+
+        context = self.builder.build(structure, self.period, "retail-data")
+        queried = {name for names, _, _ in self.runner.calls for name in names}
+        self.assertNotIn("EMAIL_CAMPAIGN_OVERVIEW", queried)
+        self.assertNotIn("SOCIAL_MEDIA_OVERVIEW", queried)
+
+        data = context["data"]
+        self.assertEqual(data["exec_summary_period"], "Period Covered: 01-Sept-24 - 30-Sept-24")
+        self.assertEqual(data["as_of_date"], "October 01, 2024")
+        self.assertIn("Retail sales totaled $125,000.50 (+25.00% vs. the previous period)", data["exec_summary_bullets"][0])
+        self.assertIn("895,773 sends", data["exec_summary_bullets"][1])
+        self.assertIn("Camp Pendleton (Main Store, West): $80,000.00", data["retail_sales_summary"][1])
+        self.assertEqual(data["assessment_bullets"], [
+            "Retail Sales rose 25.00% month over month (from 100,000 to 125,000)."
+        ])
+        # No survey data and no daily series: left out rather than sent empty
+        self.assertNotIn("satisfaction_opportunity_note", data)
+        self.assertNotIn("assessment_continued", data)
+        self.assertEqual(context["metadata"]["dateRange"], {"startDate": "2024-09-01", "endDate": "2024-09-30"})
+        self.assertIn(((("TREND_ANALYSIS_TOP_CHANGES",), "2024-08-01", "2024-09-30")), self.runner.calls)
+
+    def test_values_are_memoized_per_data_version(self):
+        structure = get_report_schema("email-performance-data").dict()
+        first = self.builder.build(structure, self.period, "email-performance-data")
+        self.assertEqual(first["data"]["email_total_sends"], "895,773")
+        self.assertEqual(first["data"]["email_avg_open_rate"], "38.08%")
+        calls = len(self.runner.calls)
+
+        self.assertEqual(self.builder.build(structure, self.period, "email-performance-data")["data"], first["data"])
+        self.assertEqual(len(self.runner.calls), calls)
+
+        # Another month is evaluated separately
+        self.builder.build(structure, ReportPeriod(2024, 10), "email-performance-data")
+        self.assertGreater(len(self.runner.calls), calls)
+
+        calls = len(self.runner.calls)
+        self.runner.version = (3, 8)
+        self.builder.build(structure, self.period, "email-performance-data")
+        self.assertGreater(len(self.runner.calls), calls)
+        self.assertTrue(all(key[2] == (3, 8) for key in self.builder._memo))
+
+    def test_period_from_request_metadata(self):
+        period = ReportPeriod.from_metadata({"period": "2024-09", "dateRange": {"startDate": "", "endDate": ""}})
+        self.assertEqual((period.year, period.month, period.end_date), (2024, 9, "2024-09-30"))
+        period = ReportPeriod.from_metadata({"period": "", "dateRange": {"startDate": "2024-02-01"}})
+        self.assertEqual(period.end_date, "2024-02-29")
+        self.assertIsNone(ReportPeriod.from_metadata({"period": "September"}))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+import tempfile
+import sys
+import os
+
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.file_operations.convert_parquet_to_csv_1 import clean_data, convert_streaming, normalize_date_formats
+from src.tests.test_retail_loader import _retail_frame
+
+class TestStreamingConversion(unittest.TestCase):
+    def test_streaming_matches_whole_file_conversion(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            parquet_path = os.path.join(tmpdir, 'retail.parquet')
+            frame = pd.concat([_retail_frame()] * 5, ignore_index=True)
+            frame['item_id'] = [1947.0, None] * 10
+            frame.to_parquet(parquet_path, row_group_size=4)
+
+            whole_path = os.path.join(tmpdir, 'whole.csv')
+            normalize_date_formats(clean_data(pd.read_parquet(parquet_path), verbose=False), verbose=False) \
+                .to_csv(whole_path, index=False)
+            stream_path = os.path.join(tmpdir, 'stream.csv')
+            rows_written = convert_streaming(parquet_path, stream_path, batch_rows=3)
+
+            with open(whole_path) as whole, open(stream_path) as streamed:
+                self.assertEqual(streamed.read(), whole.read())
+            self.assertEqual(rows_written, 15)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import math
+import sqlite3
+import sys
+import os
+
+import numpy as np
+
+# Add src and the project root (query.py) to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import query
+from src.services.correlation import correlate, pearson, spearman
+
+class TestCorrelation(unittest.TestCase):
+    def test_linear_series(self):
+        self.assertAlmostEqual(pearson([1, 2, 3, 4], [10, 20, 30, 40]), 1.0)
+        self.assertAlmostEqual(pearson([1, 2, 3, 4], [8, 6, 4, 2]), -1.0)
+
+    def test_spearman_uses_ranks(self):
+        x = [1, 2, 3, 4, 5]
+        y = [1, 8, 27, 64, 1000]
+        self.assertAlmostEqual(spearman(x, y), 1.0)
+        self.assertLess(pearson(x, y), 0.99)
+
+    def test_ties_share_average_ranks(self):
+        # Ranks are [1, 2.5, 2.5, 4] and [1, 2, 3, 4]
+        self.assertAlmostEqual(spearman([1, 2, 2, 3], [1, 2, 3, 4]), np.corrcoef([1, 2.5, 2.5, 4], [1, 2, 3, 4])[0, 1])
+
+    def test_missing_days_and_constant_series(self):
+        rows = [
+            {"retail_sales": 100, "email_opens": 10, "social_posts": 3},
+            {"retail_sales": 200, "email_opens": None, "social_posts": 3},
+            {"retail_sales": 300, "email_opens": 30, "social_posts": 3},
+            {"retail_sales": 400, "email_opens": 45, "social_posts": 3},
+        ]
+        result = correlate(rows, "retail_sales", ["email_opens", "social_posts"])
+        self.assertEqual(result["email_opens"]["n"], 3)
+        self.assertAlmostEqual(result["email_opens"]["pearson"], pearson([100, 300, 400], [10, 30, 45]))
+        self.assertEqual(result["social_posts"], {"pearson": None, "spearman": None, "n": 4})
+
+    def test_sql_pearson_matches_numpy(self):
+        connection = sqlite3.connect(":memory:")
+        connection.create_function("SQRT", 1, math.sqrt)
+        connection.execute("CREATE TABLE daily (x REAL, y REAL)")
+        x = [5.0, 7.5, 3.0, 9.0, 4.0, None]
+        y = [1.0, 2.0, 0.5, 2.5, None, 3.0]
+        connection.executemany("INSERT INTO daily VALUES (?, ?)", list(zip(x, y)))
+        sql_value = connection.execute(f"SELECT {query._pearson('x', 'y')} FROM daily").fetchone()[0]
+        self.assertAlmostEqual(sql_value, np.corrcoef([5.0, 7.5, 3.0, 9.0], [1.0, 2.0, 0.5, 2.5])[0, 1])
+
+    def test_daily_series_are_not_joined_to_line_items(self):
+        for name in ("RETAIL_CORRELATION_ANALYSIS", "MULTI_CHANNEL_CORRELATION", "CHANNEL_DAILY_SERIES"):
+            sql = getattr(query, name)
+            self.assertNotIn("CORR(", sql, name)
+            self.assertNotIn("FROM retail_data", sql, name)
+            self.assertEqual(sql.count("%s"), 6, name)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import tempfile
+import sys
+import os
+from unittest.mock import patch
+
+import sqlalchemy
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.database import db_connection
+from src.database.db_connection import DatabaseConnection, dispose_engine, get_engine, pool_metrics
+
+class TestPooledConnections(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        sqlite_url = f"sqlite:///{os.path.join(self.tmpdir.name, 'pool.db')}"
+
+        def sqlite_engine(url, **kwargs):
+            kwargs.pop("connect_args")
+            return sqlalchemy.create_engine(sqlite_url, poolclass=sqlalchemy.pool.QueuePool, **kwargs)
+
+        dispose_engine()
+        db_connection._pool_counters.update(connections_created=0, checkouts=0, invalidated=0)
+        self.patcher = patch.object(db_connection, "create_engine", side_effect=sqlite_engine)
+        self.patcher.start()
+
+    def tearDown(self):
+        dispose_engine()
+        self.patcher.stop()
+        self.tmpdir.cleanup()
+
+    def test_engine_is_shared(self):
+        self.assertIs(get_engine(), get_engine())
+        self.assertEqual(db_connection.create_engine.call_count, 1)
+        self.assertTrue(db_connection.create_engine.call_args.kwargs["pool_pre_ping"])
+
+    def test_connections_are_reused_through_the_pool(self):
+        for _ in range(3):
+            db = DatabaseConnection()
+            cursor = db.get_connection().cursor()
+            cursor.execute("SELECT 1")
+            self.assertEqual(pool_metrics()["checked_out"], 1)
+            db.close_connection()
+
+        metrics = pool_metrics()
+        self.assertEqual(metrics["checked_out"], 0)
+        self.assertEqual(metrics["connections_created"], 1)
+        self.assertEqual(metrics["checkouts"], 3)
+
+    def test_password_is_url_encoded(self):
+        with patch.dict(os.environ, {"MYSQL_PASSWORD": "p@ss:word"}):
+            self.assertIn("p%40ss%3Aword@", db_connection.build_db_url())
+
+if __name__ == '__main__':
+    unittest.main()
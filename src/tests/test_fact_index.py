@@ -0,0 +1,61 @@
+import unittest
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.fact_index import NumericFactIndex, extract_numbers
+
+CONTEXT = {
+    "metadata": {"period": "September 2024"},
+    "data": {
+        "sales": {"total": 2134567.25, "transactions": 48211},
+        "email": [{"campaign": "Fall Sale", "open_rate": 0.382, "clicks": "1,204 clicks"}],
+        "summary": "Revenue reached $4.5 million, up 12.3%"
+    }
+}
+
+class TestNumericFactIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = NumericFactIndex.from_context(CONTEXT)
+
+    def test_context_is_flattened_to_paths(self):
+        self.assertEqual(self.index.facts["data.sales.transactions"], 48211)
+        self.assertEqual(self.index.facts["data.email[0].clicks"], 1204)
+        self.assertEqual(self.index.facts["data.summary#0"], 4500000)
+
+    def test_normalized_lookups(self):
+        def paths(text):
+            return self.index.lookup(extract_numbers(text)[0])
+
+        self.assertEqual(paths("$2,134,567.25"), ["data.sales.total"])
+        self.assertEqual(paths("$2.1M"), ["data.sales.total"])
+        self.assertEqual(paths("48,211 transactions"), ["data.sales.transactions"])
+        self.assertEqual(paths("38.2%"), ["data.email[0].open_rate"])
+        self.assertEqual(paths("12.3%"), ["data.summary#1"])
+        self.assertEqual(paths("48.2K"), ["data.sales.transactions"])
+        self.assertEqual(paths("39%"), [])
+
+    def test_unsupported_numbers_ignore_dates_years_and_small_counts(self):
+        text = "Period Covered: September 1-30, 2024. Top 3 campaigns drove 1,204 clicks, 38.2% opens and $9.9M in sales."
+        self.assertEqual(self.index.unsupported_numbers(text), ["$9.9M"])
+
+    def test_calculations_over_facts_are_accepted(self):
+        index = NumericFactIndex.from_context({"total": 1090, "count": 12})
+        self.assertEqual(index.unsupported_numbers("Average = 90.83% (calculation: 1090/12 = 90.83)"), [])
+        # Wrong arithmetic or an operand that is not a fact
+        self.assertEqual(index.unsupported_numbers("Average = 95.5% (calculation: 1090/12 = 95.5)"), ["95.5%", "95.5"])
+        self.assertEqual(index.unsupported_numbers("(calculation: 1090/13 = 83.85)"), ["13", "83.85"])
+
+    def test_ratios_and_differences_of_facts_are_accepted(self):
+        index = NumericFactIndex.from_context({"sales": 2100000, "previous_sales": 1870000,
+                                               "opens": 382, "sends": 1000, "rate": 41.5, "prev_rate": 38.2})
+        self.assertEqual(index.unsupported_numbers("a 12.3% increase over last month"), [])
+        self.assertEqual(index.unsupported_numbers("sales fell 11.0% in October"), [])
+        self.assertEqual(index.unsupported_numbers("an open rate of 38.2%"), [])
+        self.assertEqual(index.unsupported_numbers("up 3.3 points, 230,000 more in sales"), [])
+        self.assertEqual(index.unsupported_numbers("a 57.1% increase"), ["57.1%"])
+
+if __name__ == '__main__':
+    unittest.main()
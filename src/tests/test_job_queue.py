@@ -0,0 +1,44 @@
+import unittest
+import threading
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.job_queue import JobQueue
+
+class TestJobQueueShutdown(unittest.TestCase):
+    def test_running_jobs_finish_and_queued_jobs_are_cancelled(self):
+        queue = JobQueue(max_workers=1)
+        started, release = threading.Event(), threading.Event()
+
+        def load(job):
+            started.set()
+            release.wait(5)
+            return "loaded"
+
+        running = queue.submit("load", load)
+        started.wait(5)
+        queued = queue.submit("load", load)
+        threading.Timer(0.1, release.set).start()
+
+        self.assertTrue(queue.shutdown(timeout=5))
+        self.assertEqual((running.status, running.result), ("completed", "loaded"))
+        self.assertEqual(queued.status, "cancelled")
+        self.assertIsNotNone(queued.finished_at)
+
+    def test_shutdown_reports_jobs_still_running_after_the_timeout(self):
+        queue = JobQueue(max_workers=1)
+        started, release = threading.Event(), threading.Event()
+        job = queue.submit("load", lambda job: started.set() or release.wait(5))
+        started.wait(5)
+        try:
+            with self.assertLogs("src.services.job_queue", level="WARNING"):
+                self.assertFalse(queue.shutdown(timeout=0.05))
+            self.assertEqual(job.status, "running")
+        finally:
+            release.set()
+
+if __name__ == '__main__':
+    unittest.main()
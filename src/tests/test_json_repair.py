@@ -0,0 +1,53 @@
+import unittest
+import json
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.json_repair import repair_json
+
+REPORT = {"pages": [{"page_number": 1, "tags": [
+    {"id": "exec_summary_highlights", "content": [{"source": "Ollama", "data": ["Sales rose 12.3%", "Open rate 38.2%"]}]},
+    {"id": "key_insights", "content": [{"source": "Ollama", "data": "Email drove most traffic"}]}
+]}]}
+
+class TestJSONRepair(unittest.TestCase):
+    def test_valid_json_needs_no_repairs(self):
+        result = repair_json(json.dumps(REPORT))
+        self.assertEqual(result.value, REPORT)
+        self.assertEqual(result.repairs, [])
+
+    def test_fences_and_trailing_commas(self):
+        text = "```json\n" + json.dumps(REPORT).replace("]}]}]}", "],}],}],}") + "\n```"
+        result = repair_json(text)
+        self.assertEqual(result.value, REPORT)
+        self.assertIn("removed trailing comma", result.repairs)
+        self.assertIn("removed text before JSON", result.repairs)
+
+    def test_missing_commas_and_bare_keys(self):
+        result = repair_json('{"a": 1\n "b": [1 2]\n c: True}')
+        self.assertEqual(result.value, {"a": 1, "b": [1, 2], "c": True})
+        self.assertIn("inserted missing comma", result.repairs)
+        self.assertIn("quoted bare key", result.repairs)
+
+    def test_unescaped_quotes(self):
+        result = repair_json('{"data": "Campaign "Fall Sale" led", "n": 1}')
+        self.assertEqual(result.value, {"data": 'Campaign "Fall Sale" led', "n": 1})
+        self.assertEqual(result.repairs, ["escaped unescaped quote"])
+
+    def test_truncated_output_keeps_completed_tags(self):
+        text = json.dumps(REPORT)
+        result = repair_json(text[:text.index("Email drove") + 5])
+        tags = result.value["pages"][0]["tags"]
+        self.assertEqual(tags[0], REPORT["pages"][0]["tags"][0])
+        self.assertEqual(tags[1]["content"][0]["data"], "Email")
+        self.assertIn("closed truncated string", result.repairs)
+
+    def test_text_without_json_raises(self):
+        with self.assertRaises(json.JSONDecodeError):
+            repair_json("I could not generate the report.")
+
+if __name__ == '__main__':
+    unittest.main()
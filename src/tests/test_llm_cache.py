@@ -0,0 +1,94 @@
+import unittest
+from unittest.mock import patch
+import asyncio
+import sys
+import os
+import tempfile
+
+import httpx
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services import llm_cache, llm_clients
+from src.services.llm_cache import LLMResponseCache, SQLiteCacheStore, is_cacheable_response, make_cache_key
+
+class TestLLMResponseCache(unittest.TestCase):
+    def test_cache_key_depends_on_model_prompt_and_params(self):
+        base = make_cache_key("gemini-2.5-flash", "prompt")
+        self.assertEqual(base, make_cache_key("gemini-2.5-flash", "prompt"))
+        self.assertNotEqual(base, make_cache_key("gpt-oss:120b", "prompt"))
+        self.assertNotEqual(base, make_cache_key("gemini-2.5-flash", "other prompt"))
+        self.assertNotEqual(base, make_cache_key("gemini-2.5-flash", "prompt", {"temperature": 0.2}))
+
+    def test_hit_and_miss_counters(self):
+        cache = LLMResponseCache(max_entries=4, ttl_seconds=60)
+        self.assertIsNone(cache.get("a"))
+        cache.set("a", "response")
+        self.assertEqual(cache.get("a"), "response")
+
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_lru_eviction(self):
+        cache = LLMResponseCache(max_entries=2, ttl_seconds=60)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")  # "b" becomes least recently used
+        cache.set("c", "3")
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "1")
+        self.assertEqual(cache.get("c"), "3")
+
+    def test_ttl_expiry(self):
+        cache = LLMResponseCache(max_entries=2, ttl_seconds=10)
+        with patch("src.services.llm_cache.time.time", return_value=1000):
+            cache.set("a", "1")
+        with patch("src.services.llm_cache.time.time", return_value=1011):
+            self.assertIsNone(cache.get("a"))
+
+    def test_disk_tier_survives_new_memory_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.sqlite3")
+            LLMResponseCache(disk_store=SQLiteCacheStore(path)).set("a", "from disk")
+
+            cache = LLMResponseCache(disk_store=SQLiteCacheStore(path))
+            self.assertEqual(cache.get("a"), "from disk")
+            self.assertEqual(cache.stats()["disk_hits"], 1)
+
+    def test_only_complete_json_is_cacheable(self):
+        self.assertTrue(is_cacheable_response('```json\n{"pages": []}\n```'))
+        self.assertFalse(is_cacheable_response('{"pages": [{"page_number": 1, "tags": ['))
+        self.assertFalse(is_cacheable_response("I could not generate the report."))
+        self.assertFalse(is_cacheable_response(None))
+
+    def test_bad_response_is_not_served_again(self):
+        responses = ['{"pages": [{"tags": [', '{"pages": []}']
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            text = responses[len(calls) - 1]
+            return httpx.Response(200, json={"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+        async def generate_twice():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+                with patch.object(llm_clients, "get_http_client", return_value=http_client):
+                    first = await llm_clients.gemini_generate_async("test-model", "prompt")
+                    second = await llm_clients.gemini_generate_async("test-model", "prompt")
+                    third = await llm_clients.gemini_generate_async("test-model", "prompt")
+            return first, second, third
+
+        with patch.object(llm_cache, "_cache", LLMResponseCache()), patch.object(llm_cache, "_cache_initialized", True):
+            first, second, third = asyncio.run(generate_twice())
+
+        self.assertEqual(first, '{"pages": [{"tags": [')
+        # The truncated answer was not cached, so the model was asked again
+        self.assertEqual(second, '{"pages": []}')
+        self.assertEqual(third, '{"pages": []}')
+        self.assertEqual(len(calls), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+import json
+import sys
+import os
+import time
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services import llm_validator
+from src.services import parallel_report_generator as prg
+from src.services.parallel_report_generator import EventLoopLagMonitor
+
+STRUCTURE = {"pages": [{"page_number": 1, "tags": [{"id": "sales_analysis", "title": "Sales"}]}]}
+REPORT = {"pages": [{"page_number": 1, "tags": [
+    {"id": "sales_analysis", "content": [{"source": "Gemini", "data": "Sales were XX%"}]}
+]}]}
+GEMINI_RESPONSE = "```json\n" + json.dumps({
+    "is_valid": False,
+    "source": "Gemini",
+    "validation_results": {
+        "structure": {"passed": True, "issues": []},
+        "data_quality": {"passed": False, "issues": [
+            {"field": "sales_analysis", "issue": "placeholder value", "fix": "use the sales figure"}
+        ]},
+        "content": {"passed": True, "issues": []}
+    },
+    "summary": "Placeholder in sales analysis",
+    "regeneration_required": True,
+    "regenerate_fields": ["sales_analysis"]
+}) + "\n```"
+
+VALIDATORS = [
+    (llm_validator.validate_report, llm_validator.validate_report_async),
+    (llm_validator.validate_retail_data_report, llm_validator.validate_retail_data_report_async),
+    (llm_validator.validate_email_performance_report, llm_validator.validate_email_performance_report_async),
+    (llm_validator.validate_social_media_data_report, llm_validator.validate_social_media_data_report_async),
+]
+
+class TestAsyncValidators(unittest.TestCase):
+    def test_async_validators_match_sync(self):
+        client = MagicMock()
+        client.generate.return_value = GEMINI_RESPONSE
+        client.generate_async = AsyncMock(return_value=GEMINI_RESPONSE)
+
+        with patch.object(llm_validator, "client", client):
+            for validate, validate_async in VALIDATORS:
+                with self.subTest(validator=validate.__name__):
+                    expected = validate(STRUCTURE, REPORT)
+                    self.assertEqual(asyncio.run(validate_async(STRUCTURE, REPORT)), expected)
+                    self.assertFalse(expected.is_valid)
+        self.assertEqual(client.generate.call_args_list, client.generate_async.call_args_list)
+
+    def test_async_validator_errors_match_sync(self):
+        client = MagicMock()
+        client.generate.side_effect = RuntimeError("quota exceeded")
+        client.generate_async = AsyncMock(side_effect=RuntimeError("quota exceeded"))
+
+        with patch.object(llm_validator, "client", client):
+            for validate, validate_async in VALIDATORS:
+                with self.subTest(validator=validate.__name__):
+                    self.assertEqual(asyncio.run(validate_async(STRUCTURE, REPORT)), validate(STRUCTURE, REPORT))
+
+class TestRulePrevalidation(unittest.TestCase):
+    def _validate(self, text):
+        report = {"pages": [{"page_number": 1, "tags": [
+            {"id": "sales_analysis", "content": [{"source": "Gemini", "data": text}]}
+        ]}]}
+        client = MagicMock()
+        client.generate_async = AsyncMock(return_value='{"is_valid": true}')
+        generator_obj = prg.ParallelReportGenerator()
+        generator_obj.rule_prevalidation = True
+        with patch.object(llm_validator, "client", client):
+            result = asyncio.run(generator_obj._validate(
+                llm_validator.validate_retail_data_report_async, STRUCTURE, report, {"data": {"sales": 2100000}}
+            ))
+        return result, client.generate_async
+
+    def test_structural_failures_skip_the_llm(self):
+        result, generate_async = self._validate("Sales were XX%")
+        self.assertFalse(result.is_valid)
+        generate_async.assert_not_called()
+
+    def test_heuristic_findings_go_to_the_llm_as_hints(self):
+        result, generate_async = self._validate("Sales of $2.1M, 97.5% of target")
+        self.assertTrue(result.is_valid)
+        prompt = generate_async.call_args[0][1]
+        self.assertIn("HINTS FROM RULE-BASED CHECKS", prompt)
+        self.assertIn("- sales_analysis: Numbers not found in the context: 97.5%", prompt)
+        self.assertEqual([warning.field for warning in result.warnings], ["sales_analysis"])
+
+        _, generate_async = self._validate("Sales of $2.1M")
+        self.assertNotIn("HINTS FROM RULE-BASED CHECKS", generate_async.call_args[0][1])
+
+class TestValidationDoesNotBlockLoop(unittest.TestCase):
+    def _max_lag_ms(self, generate_async):
+        async def generator(structure, context, feedback=None):
+            return REPORT
+
+        async def run():
+            generator_obj = prg.ParallelReportGenerator()
+            generator_obj.rule_prevalidation = False
+            monitor = EventLoopLagMonitor(interval=0.01)
+            monitor.start()
+            await asyncio.sleep(monitor.interval)  # let the monitor take its first sample
+            result = await generator_obj._generate_and_validate(
+                "Gemini", generator, llm_validator.validate_retail_data_report_async, STRUCTURE, {}, "retail-data"
+            )
+            await monitor.stop()
+            return result, monitor.max_lag_ms
+
+        client = MagicMock()
+        client.generate_async = generate_async
+        with patch.object(llm_validator, "client", client), patch("builtins.print"):
+            result, max_lag_ms = asyncio.run(run())
+        self.assertTrue(result["validation"]["is_valid"])
+        return max_lag_ms
+
+    def test_slow_validator_is_awaited(self):
+        async def slow_validator(model, prompt):
+            await asyncio.sleep(0.3)
+            return '{"is_valid": true}'
+
+        self.assertLess(self._max_lag_ms(slow_validator), 100)
+
+    def test_monitor_catches_a_blocking_validator(self):
+        async def blocking_validator(model, prompt):
+            time.sleep(0.3)
+            return '{"is_valid": true}'
+
+        self.assertGreater(self._max_lag_ms(blocking_validator), 200)
+
+if __name__ == '__main__':
+    unittest.main()
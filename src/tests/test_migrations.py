@@ -0,0 +1,126 @@
+import unittest
+import datetime
+import sys
+import os
+from unittest.mock import MagicMock, patch
+
+# Add src and the project root (query.py) to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import query
+from src.database import migrations
+from src.database.migrations import (
+    apply_migrations, ensure_retail_partitions, full_scans, query_params, query_statements
+)
+
+class FixedDate(datetime.date):
+    @classmethod
+    def today(cls):
+        return cls(2024, 12, 15)
+
+class ScriptedCursor:
+    """Answers the information_schema lookups the migrations make."""
+    def __init__(self, applied=(), partitions=(), indexes=(), min_sale_date=None):
+        self.applied = list(applied)
+        self.partitions = list(partitions)
+        self.indexes = list(indexes)
+        self.min_sale_date = min_sale_date
+        self.statements = []
+        self.result = []
+
+    def execute(self, sql, params=None):
+        sql = " ".join(sql.split())
+        self.statements.append(sql)
+        if "GET_LOCK" in sql:
+            self.result = [(1,)]
+        elif sql.startswith("SELECT version FROM schema_migrations"):
+            self.result = [(version,) for version in self.applied]
+        elif "information_schema.TABLES" in sql:
+            self.result = [(1,)]
+        elif "information_schema.PARTITIONS" in sql:
+            self.result = [(name,) for name in self.partitions]
+        elif "NON_UNIQUE = 0" in sql:
+            self.result = []
+        elif "information_schema.STATISTICS" in sql:
+            self.result = [(name, column) for table, name, column in self.indexes if table == params[0]]
+        elif "MIN(sale_date)" in sql:
+            self.result = [(self.min_sale_date,)]
+        else:
+            self.result = []
+
+    def fetchone(self):
+        return self.result[0]
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+class TestMigrations(unittest.TestCase):
+    def setUp(self):
+        # Pin "today" so the partition list is predictable
+        self.patcher = patch.object(migrations, "date", FixedDate)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def test_pending_migrations_run_once_in_order(self):
+        cursor = ScriptedCursor(
+            applied=[1],
+            indexes=[("email_engagement_details", "uq_email_engagement", "message_name"),
+                     ("email_engagement_details", "uq_email_engagement", "send_date")],
+            min_sale_date=datetime.date(2024, 10, 5)
+        )
+        connection = MagicMock()
+        connection.cursor.return_value = cursor
+
+        self.assertEqual(apply_migrations(connection), [2, 3])
+
+        self.assertFalse(any(sql.startswith("CREATE TABLE IF NOT EXISTS retail_data") for sql in cursor.statements))
+        created = [sql for sql in cursor.statements if sql.startswith("CREATE INDEX")]
+        self.assertIn("CREATE INDEX idx_retail_sale_date_site ON retail_data (sale_date, site_name)", created)
+        # (message_name, send_date) is already covered by the unique key
+        self.assertFalse(any("idx_engagement_message_send_date" in sql for sql in created))
+
+        partition_sql = next(sql for sql in cursor.statements if sql.startswith("ALTER TABLE retail_data PARTITION BY"))
+        self.assertIn("PARTITION p_start VALUES LESS THAN ('2024-10-01')", partition_sql)
+        self.assertIn("PARTITION p202410 VALUES LESS THAN ('2024-11-01')", partition_sql)
+        self.assertIn("PARTITION p202503 VALUES LESS THAN ('2025-04-01')", partition_sql)
+        self.assertTrue(partition_sql.endswith("PARTITION p_future VALUES LESS THAN (MAXVALUE))"))
+        self.assertEqual(connection.commit.call_count, 2)
+        self.assertIn("SELECT RELEASE_LOCK('schema_migrations')", cursor.statements)
+
+    def test_future_partition_is_split_into_months(self):
+        cursor = ScriptedCursor(partitions=["p_start", "p202412", "p202501", "p_future"])
+        ensure_retail_partitions(cursor, through=datetime.date(2025, 3, 1))
+        self.assertEqual(cursor.statements[-1], (
+            "ALTER TABLE retail_data REORGANIZE PARTITION p_future INTO ("
+            "PARTITION p202502 VALUES LESS THAN ('2025-03-01'), "
+            "PARTITION p202503 VALUES LESS THAN ('2025-04-01'), "
+            "PARTITION p_future VALUES LESS THAN (MAXVALUE))"
+        ))
+
+    def test_only_whole_statements_are_collected(self):
+        statements = query_statements(query)
+        self.assertNotIn("_CHANNEL_DAILY_CTES", statements)
+        for name, sql in statements.items():
+            self.assertRegex(sql.lstrip(), r"^(SELECT|WITH)\b", name)
+
+    def test_every_query_gets_its_parameters(self):
+        for name, sql in query_statements(query).items():
+            self.assertEqual(len(query_params(name, sql, "2024-01-01", "2024-12-31")), sql.count("%s"), name)
+
+    def test_full_scans_ignore_derived_and_indexed_reads(self):
+        plan = [
+            {"table": "<derived2>", "type": "ALL", "key": None},
+            {"table": "retail_sales_daily", "type": "range", "key": "idx_retail_sales_daily_date"},
+            {"table": "email_engagement_details", "type": "ALL", "key": None},
+            {"table": "social_media_performance", "type": "ALL", "key": None},
+        ]
+        self.assertEqual(full_scans(plan), ["email_engagement_details"])
+
+if __name__ == '__main__':
+    unittest.main()
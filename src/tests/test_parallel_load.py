@@ -0,0 +1,80 @@
+import unittest
+import tempfile
+import sys
+import os
+from unittest.mock import MagicMock, patch
+
+import openpyxl
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.file_operations import load_email_marketing_data
+from src.file_operations.load_email_marketing_data import SupportingDataLoadError, SupportingDataLoader
+
+def _workbook(path, title, rows):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = title
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+
+class TestParallelLoad(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.performance_file = os.path.join(self.tmpdir.name, "performance.xlsx")
+        _workbook(self.performance_file, "Email Performance Email Sends T", [
+            ["Widget: Email Sends"], [None], [None], [None],
+            ["Email Content Name", "Email Subject", "Sends", "Open Rate", "Click to Open Rate"],
+            ["Spring Launch", "New arrivals", 1000, "25%", "10%"],
+            ["Fall Sale", "Save 20%", 800, "20%", "5%"]
+        ])
+        # No "Email Content Name" header row, so parsing fails
+        self.deliveries_file = os.path.join(self.tmpdir.name, "deliveries.xlsx")
+        _workbook(self.deliveries_file, "Email Deliveries Details", [["Widget: Deliveries"], ["nothing here"]])
+
+        self.connections = []
+
+        def pooled_connection():
+            db = MagicMock()
+            self.connections.append(db)
+            return db
+
+        self.patcher = patch.object(load_email_marketing_data, "DatabaseConnection", side_effect=pooled_connection)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmpdir.cleanup()
+
+    def _load_with_bad_workbook(self, mode):
+        loader = SupportingDataLoader(self.deliveries_file, None, self.performance_file)
+        stages = []
+
+        def stage(name):
+            stages.append(name)
+            return load_email_marketing_data._print_stage(name)
+
+        with self.assertRaises(SupportingDataLoadError) as ctx:
+            loader.load_all_data(stage=stage, mode=mode)
+
+        self.assertEqual(list(ctx.exception.failures), ["email_delivery"])
+        self.assertIn("Could not find data start", str(ctx.exception))
+        self.assertEqual(loader.row_counts, {"email_performance": 2})
+        self.assertEqual(sorted(stages), ["email_delivery", "email_performance"])
+        return loader
+
+    def test_bad_workbook_is_reported_the_same_in_both_modes(self):
+        loader = self._load_with_bad_workbook("sequential")
+        loader.db.close_connection.assert_called()
+
+    def test_bad_workbook_does_not_hide_the_others(self):
+        self._load_with_bad_workbook("parallel")
+        # The shared connection plus one pooled connection per file, all returned
+        self.assertEqual(len(self.connections), 3)
+        for db in self.connections:
+            db.close_connection.assert_called()
+
+if __name__ == '__main__':
+    unittest.main()
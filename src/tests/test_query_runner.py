@@ -0,0 +1,107 @@
+import unittest
+import datetime
+import decimal
+import threading
+import sys
+import os
+
+import pyarrow as pa
+
+# Add src and the project root (query.py) to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import query
+from src.services.query_runner import DATA_VERSION_SQL, QueryRunner
+
+class FakeEngine:
+    """Pooled engine whose connections answer from a {sql: (columns, rows)} table."""
+    def __init__(self, results):
+        self.results = results
+        self.version = (3, 12)
+        self.executed = []
+        self.lock = threading.Lock()
+
+    def raw_connection(self):
+        return FakeConnection(self)
+
+class FakeConnection:
+    def __init__(self, engine):
+        self.engine = engine
+
+    def cursor(self):
+        return FakeCursor(self.engine)
+
+    def close(self):
+        pass
+
+class FakeCursor:
+    def __init__(self, engine):
+        self.engine = engine
+
+    def execute(self, sql, params=()):
+        with self.engine.lock:
+            self.engine.executed.append((sql, params))
+        if sql == DATA_VERSION_SQL:
+            columns, self.rows = ["count", "max"], [self.engine.version]
+        else:
+            columns, self.rows = self.engine.results[sql]
+        self.description = [(name,) for name in columns]
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+class TestQueryRunner(unittest.TestCase):
+    def setUp(self):
+        self.engine = FakeEngine({
+            query.RETAIL_MONTHLY_SALES: (
+                ["month", "total_sales", "first_sale_date"],
+                [("2024-09", decimal.Decimal("1200.50"), datetime.date(2024, 9, 1)),
+                 ("2024-10", None, datetime.date(2024, 10, 1))]
+            ),
+            query.SOCIAL_MEDIA_OVERVIEW: (["platform", "followers"], [("Facebook", 5000)]),
+        })
+        self.runner = QueryRunner(engine=self.engine, max_workers=2)
+
+    def tearDown(self):
+        self.runner.shutdown(wait=True)
+
+    def query_calls(self):
+        return [(sql, params) for sql, params in self.engine.executed if sql != DATA_VERSION_SQL]
+
+    def test_runs_bound_queries_into_typed_frames(self):
+        results = self.runner.run(["RETAIL_MONTHLY_SALES", "SOCIAL_MEDIA_OVERVIEW"], "2024-09-01", "2024-10-31")
+
+        sales = results["RETAIL_MONTHLY_SALES"]
+        self.assertEqual(str(sales["total_sales"].dtype), "float64")
+        self.assertAlmostEqual(sales["total_sales"][0], 1200.5)
+        self.assertTrue(str(sales["first_sale_date"].dtype).startswith("datetime64"))
+        self.assertEqual(sorted(params for _, params in self.query_calls()),
+                         [("2024%",), ("2024-09-01", "2024-10-31")])
+
+        table = self.runner.run(["SOCIAL_MEDIA_OVERVIEW"], "2024-09-01", "2024-10-31", output="arrow")["SOCIAL_MEDIA_OVERVIEW"]
+        self.assertIsInstance(table, pa.Table)
+        self.assertEqual(table.column("followers").to_pylist(), [5000])
+
+    def test_results_are_cached_until_a_new_file_is_loaded(self):
+        self.runner.run(["RETAIL_MONTHLY_SALES"], "2024-09-01", "2024-10-31")
+        frame = self.runner.run(["RETAIL_MONTHLY_SALES"], "2024-09-01", "2024-10-31")["RETAIL_MONTHLY_SALES"]
+        frame.loc[0, "month"] = "changed"  # callers get copies
+        self.assertEqual(len(self.query_calls()), 1)
+        self.assertEqual(self.runner.stats()["hits"], 1)
+
+        # A different period is a different cache entry
+        self.runner.run(["RETAIL_MONTHLY_SALES"], "2024-01-01", "2024-10-31")
+        self.assertEqual(len(self.query_calls()), 2)
+
+        self.engine.version = (4, 13)
+        again = self.runner.run(["RETAIL_MONTHLY_SALES"], "2024-09-01", "2024-10-31")["RETAIL_MONTHLY_SALES"]
+        self.assertEqual(len(self.query_calls()), 3)
+        self.assertEqual(again["month"][0], "2024-09")
+        self.assertEqual(self.runner.stats()["cached"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+from unittest.mock import patch
+import asyncio
+import sys
+import os
+import tempfile
+import threading
+import time
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.rate_limiter import RateLimiter, estimate_tokens
+
+class TestRateLimiter(unittest.TestCase):
+    def test_requests_are_spread_at_the_rpm_quota(self):
+        limiter = RateLimiter("model", rpm=2, tpm=1000, max_in_flight=4)
+        with patch("src.services.rate_limiter.time.time", return_value=1000):
+            waits = [limiter.reserve() for _ in range(4)]
+        # Two calls fit in the bucket, then one call every 30 seconds
+        self.assertEqual(waits, [0.0, 0.0, 30.0, 60.0])
+
+    def test_tokens_per_minute_bucket(self):
+        limiter = RateLimiter("model", rpm=100, tpm=600, max_in_flight=4)
+        with patch("src.services.rate_limiter.time.time", return_value=1000):
+            self.assertEqual(limiter.reserve(600), 0.0)
+            self.assertAlmostEqual(limiter.reserve(300), 30.0)
+
+    def test_penalize_holds_back_every_caller(self):
+        limiter = RateLimiter("model", rpm=100, tpm=1000, max_in_flight=4)
+        with patch("src.services.rate_limiter.time.time", return_value=1000):
+            limiter.penalize(45)
+            self.assertEqual(limiter.reserve(), 45.0)
+
+    def test_file_state_is_shared_between_limiters(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            first = RateLimiter("gemini-2.5-flash", rpm=1, tpm=1000, max_in_flight=1, state_dir=tmp)
+            second = RateLimiter("gemini-2.5-flash", rpm=1, tpm=1000, max_in_flight=1, state_dir=tmp)
+            with patch("src.services.rate_limiter.time.time", return_value=1000):
+                self.assertEqual(first.reserve(), 0.0)
+                self.assertEqual(second.reserve(), 60.0)
+
+    def test_in_flight_cap(self):
+        limiter = RateLimiter("model", rpm=1000, tpm=100000, max_in_flight=2)
+        state = {"active": 0, "peak": 0}
+
+        async def call():
+            async with limiter.limit():
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+                await asyncio.sleep(0.01)
+                state["active"] -= 1
+
+        async def run():
+            await asyncio.gather(*(call() for _ in range(6)))
+
+        asyncio.run(run())
+        self.assertEqual(state["peak"], 2)
+
+    def test_sync_and_async_calls_share_the_in_flight_cap(self):
+        limiter = RateLimiter("model", rpm=1000, tpm=100000, max_in_flight=2)
+        state = {"active": 0, "peak": 0}
+        lock = threading.Lock()
+
+        def enter():
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+
+        def leave():
+            with lock:
+                state["active"] -= 1
+
+        def sync_call():
+            with limiter.limit_sync():
+                enter()
+                time.sleep(0.02)
+                leave()
+
+        async def async_call():
+            async with limiter.limit():
+                enter()
+                await asyncio.sleep(0.02)
+                leave()
+
+        async def run():
+            threads = [threading.Thread(target=sync_call) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            await asyncio.gather(*(async_call() for _ in range(4)))
+            for thread in threads:
+                await asyncio.to_thread(thread.join)
+
+        asyncio.run(run())
+        self.assertEqual(state["peak"], 2)
+        self.assertEqual(limiter._slots.in_use, 0)
+
+    def test_cancelled_waiter_does_not_leak_a_slot(self):
+        limiter = RateLimiter("model", rpm=1000, tpm=100000, max_in_flight=1)
+
+        async def hold():
+            async with limiter.limit():
+                await asyncio.sleep(0.02)
+
+        async def run():
+            holder = asyncio.create_task(hold())
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(hold())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            await holder
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+            await asyncio.wait_for(hold(), timeout=1)
+
+        asyncio.run(run())
+        self.assertEqual(limiter._slots.in_use, 0)
+
+    def test_defaults_do_not_throttle_to_a_free_tier(self):
+        from src.config.settings import Settings
+        self.assertEqual(Settings().LLM_RATE_LIMITS, {})
+        with patch.dict(os.environ, {"LLM_RATE_LIMITS": '{"gemini-2.5-flash": {"rpm": 10}}', "LLM_DEFAULT_RPM": "300"}):
+            settings = Settings()
+        self.assertEqual(settings.LLM_RATE_LIMITS, {"gemini-2.5-flash": {"rpm": 10}})
+        self.assertEqual(settings.LLM_DEFAULT_RPM, 300)
+
+    def test_estimate_tokens_accepts_chat_messages(self):
+        messages = [{"role": "user", "content": "a" * 40}]
+        self.assertEqual(estimate_tokens(messages), estimate_tokens("a" * 40))
+
+if __name__ == '__main__':
+    unittest.main()
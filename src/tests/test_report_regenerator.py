@@ -0,0 +1,132 @@
+import unittest
+from unittest.mock import patch
+import asyncio
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.report_regenerator import ReportRegenerator
+from src.models.validation_schema import (
+    DetailedValidationResult, ValidationIssue, ValidationResult, ValidationResults, ValidationSection
+)
+
+STRUCTURE = {"pages": [
+    {"page_number": 1, "tags": [{"id": "a", "title": "A"}, {"id": "b", "title": "B"}]},
+    {"page_number": 2, "tags": [{"id": "c", "title": "C"}]}
+]}
+REPORT = {"pages": [
+    {"page_number": 1, "tags": [
+        {"id": "a", "content": [{"source": "Gemini", "data": "fine"}]},
+        {"id": "b", "content": [{"source": "Gemini", "data": "Revenue was XX%"}]}
+    ]}
+]}
+CONTEXT = {"data": {"revenue_growth": 12.5}}
+
+def _details(fields):
+    issues = [ValidationIssue(field=field, issue="placeholder value", fix="use context") for field in fields]
+    return DetailedValidationResult(
+        is_valid=False,
+        validation_results=ValidationResults(
+            structure=ValidationSection(passed=True),
+            data_quality=ValidationSection(passed=False, issues=issues),
+            content=ValidationSection(passed=True)
+        ),
+        summary="invalid",
+        regeneration_required=True,
+        regenerate_fields=fields
+    )
+
+class TestPartialRegeneration(unittest.TestCase):
+    def test_partial_prompt_contains_only_failing_tags(self):
+        regenerator = ReportRegenerator(STRUCTURE, CONTEXT, REPORT)
+        prompt = regenerator.create_partial_regeneration_prompt(_details(["b"]), "Gemini")
+
+        self.assertIn("Revenue was XX%", prompt)
+        self.assertNotIn('"fine"', prompt)
+        self.assertIn('"revenue_growth":12.5', prompt)
+        self.assertLess(len(prompt), len(regenerator.create_regeneration_prompt(_details(["b"]))))
+
+    def test_partial_prompt_sends_only_the_context_the_tags_need(self):
+        structure = {"pages": [{"page_number": 1, "tags": [
+            {"id": "sales_analysis", "title": "Sales"}, {"id": "email_metrics_summary", "title": "Email"}
+        ]}]}
+        report = {"pages": [{"page_number": 1, "tags": [
+            {"id": "sales_analysis", "content": [{"source": "Gemini", "data": "Sales were XX%"}]}
+        ]}]}
+        context = {"metadata": {"period": "2024-09"}, "data": {
+            "retail_sales_summary": ["Retail sales totaled $125,000.50"],
+            "email_campaigns_table": ["Fall Sale: 38.2% opens"],
+            "social_media_table": ["Facebook: 12,000 followers"]
+        }}
+        regenerator = ReportRegenerator(structure, context, report)
+
+        self.assertEqual(regenerator.partial_context(["sales_analysis"]), {
+            "metadata": {"period": "2024-09"}, "data": {"retail_sales_summary": ["Retail sales totaled $125,000.50"]}
+        })
+        prompt = regenerator.create_partial_regeneration_prompt(_details(["sales_analysis"]), "Gemini")
+        self.assertIn("$125,000.50", prompt)
+        self.assertNotIn("Fall Sale", prompt)
+        # No context entry for the tag's retrievers: send everything
+        self.assertIs(regenerator.partial_context(["email_metrics_summary"]), context)
+
+    def test_fields_that_are_not_tags_fall_back_to_full_regeneration(self):
+        regenerator = ReportRegenerator(STRUCTURE, CONTEXT, REPORT)
+        self.assertEqual(regenerator.partial_fields(_details(["b", "c"])), ["b", "c"])
+        self.assertEqual(regenerator.partial_fields(_details(["b", "overall_tone"])), [])
+
+    def test_patch_replaces_in_place_and_adds_missing_tags(self):
+        regenerator = ReportRegenerator(STRUCTURE, CONTEXT, REPORT)
+        patched_report, patched = regenerator.apply_partial_regeneration({"tags": [
+            {"id": "c", "content": [{"source": "Gemini", "data": "new c"}]},
+            {"id": "b", "content": [{"source": "Gemini", "data": "Revenue grew 12.5%"}]}
+        ]}, ["b", "c"])
+
+        self.assertEqual(sorted(patched), ["b", "c"])
+        self.assertEqual([tag["id"] for tag in patched_report["pages"][0]["tags"]], ["a", "b"])
+        self.assertEqual(patched_report["pages"][0]["tags"][1]["content"][0]["data"], "Revenue grew 12.5%")
+        self.assertEqual(patched_report["pages"][1], {"page_number": 2, "tags": [{"id": "c", "content": [{"source": "Gemini", "data": "new c"}]}]})
+        # The original report is not modified
+        self.assertEqual(REPORT["pages"][0]["tags"][1]["content"][0]["data"], "Revenue was XX%")
+
+    def test_tags_that_were_not_requested_are_ignored(self):
+        regenerator = ReportRegenerator(STRUCTURE, CONTEXT, REPORT)
+        patched_report, patched = regenerator.apply_partial_regeneration({"tags": [
+            {"id": "a", "content": [{"source": "Gemini", "data": "rewritten a"}]},
+            {"id": "b", "content": [{"source": "Gemini", "data": "Revenue grew 12.5%"}]},
+            {"id": "c", "content": [{"source": "Gemini", "data": "new c"}]}
+        ]}, regenerator.partial_fields(_details(["b"])))
+
+        self.assertEqual(patched, ["b"])
+        self.assertEqual(patched_report["pages"][0]["tags"][0], REPORT["pages"][0]["tags"][0])
+        self.assertEqual(len(patched_report["pages"]), 1)
+
+    def test_pipeline_revalidates_only_patched_tags(self):
+        from src.services import parallel_report_generator as prg
+        validated = []
+
+        async def generator(structure, context, feedback=None):
+            return REPORT
+
+        async def validate(structure, report):
+            validated.append(structure)
+            if len(validated) == 1:
+                return ValidationResult(is_valid=False, message="bad", detailed_results=_details(["b"]))
+            return ValidationResult(is_valid=True, message="ok")
+
+        async def regenerate_tags(prompt):
+            return {"tags": [{"id": "b", "content": [{"source": "Gemini", "data": "Revenue grew 12.5%"}]}]}
+
+        generator_obj = prg.ParallelReportGenerator()
+        generator_obj.partial_regeneration = True
+        generator_obj.rule_prevalidation = False
+        with patch.object(prg.llm_generator, "regenerate_tags_async", regenerate_tags):
+            result = asyncio.run(generator_obj._generate_and_validate("Gemini", generator, validate, STRUCTURE, CONTEXT, "all-categories"))
+
+        self.assertTrue(result["validation"]["is_valid"])
+        self.assertEqual([tag["id"] for page in validated[1]["pages"] for tag in page["tags"]], ["b"])
+        self.assertEqual(result["report"]["pages"][0]["tags"][1]["content"][0]["data"], "Revenue grew 12.5%")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import asyncio
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.report_sharding import generate_sharded, merge_reports, split_structure
+from src.models.report_schema import get_report_schema
+
+STRUCTURE = {
+    "pages": [
+        {"page_number": 1, "tags": [{"id": "a", "title": "A"}, {"id": "b", "title": "B"}, {"id": "c", "title": "C"}]},
+        {"page_number": 2, "tags": [{"id": "d", "title": "D"}, {"id": "e", "title": "E"}]}
+    ]
+}
+
+def _fill(structure):
+    return {"pages": [{"page_number": page["page_number"], "tags": [
+        {"id": tag["id"], "content": [{"data": tag["title"]}]} for tag in page["tags"]
+    ]} for page in structure["pages"]]}
+
+class TestReportSharding(unittest.TestCase):
+    def test_split_keeps_order_and_page_numbers(self):
+        shards = split_structure(STRUCTURE, 2)
+        self.assertEqual(
+            [[(page["page_number"], [tag["id"] for tag in page["tags"]]) for page in shard["pages"]] for shard in shards],
+            [[(1, ["a", "b"])], [(1, ["c"]), (2, ["d"])], [(2, ["e"])]]
+        )
+
+    def test_marketing_schema_round_trips(self):
+        structure = get_report_schema("all-categories").dict()
+        shards = split_structure(structure, 8)
+        self.assertTrue(all(sum(len(p["tags"]) for p in shard["pages"]) <= 8 for shard in shards))
+
+        merged = merge_reports(structure, [_fill(shard) for shard in reversed(shards)])
+        self.assertEqual(merged, _fill(structure))
+
+    def test_shards_run_concurrently_and_failures_are_skipped(self):
+        state = {"active": 0, "peak": 0}
+
+        async def generator(structure, context, feedback=None):
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            await asyncio.sleep(0.01)
+            state["active"] -= 1
+            if structure["pages"][0]["tags"][0]["id"] == "c":
+                raise ValueError("truncated output")
+            return _fill(structure)
+
+        report = asyncio.run(generate_sharded(generator, STRUCTURE, {}, tags_per_shard=2))
+        self.assertEqual(state["peak"], 3)
+        self.assertEqual([[tag["id"] for tag in page["tags"]] for page in report["pages"]], [["a", "b"], ["e"]])
+
+if __name__ == '__main__':
+    unittest.main()
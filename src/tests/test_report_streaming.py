@@ -0,0 +1,92 @@
+import unittest
+from unittest.mock import patch
+import asyncio
+import json
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.report_streaming import FlatReportBuilder, TagStreamParser
+from src.models.validation_schema import ValidationResult
+
+REPORT = {
+    "pages": [{
+        "page_number": 1,
+        "tags": [
+            {"id": "1", "content": [{"source": "Gemini", "title": "1", "data": "Revenue rose {12%} to \"$4.5M\""}]},
+            {"id": "2", "content": [{"source": "Gemini", "title": "2", "data": ["a", "b"]}]}
+        ]
+    }]
+}
+
+STRUCTURE = {"pages": [{"page_number": 1, "tags": [{"id": "1", "title": "Revenue"}, {"id": "2", "title": "Highlights"}]}]}
+
+class TestTagStreamParser(unittest.TestCase):
+    def test_tags_are_emitted_as_soon_as_they_close(self):
+        text = "```json\n" + json.dumps(REPORT) + "\n```"
+        parser = TagStreamParser()
+        emitted = []
+        for i in range(0, len(text), 7):
+            for tag in parser.feed(text[i:i + 7]):
+                emitted.append((i, tag))
+
+        self.assertEqual([tag["id"] for _, tag in emitted], ["1", "2"])
+        self.assertEqual(emitted[0][1], REPORT["pages"][0]["tags"][0])
+        # The first tag is available before the rest of the report has streamed
+        self.assertLess(emitted[0][0], emitted[1][0])
+
+    def test_each_tag_is_emitted_once(self):
+        parser = TagStreamParser()
+        tag = json.dumps({"id": "1", "content": []})
+        self.assertEqual(len(parser.feed(tag)), 1)
+        self.assertEqual(parser.feed(tag), [])
+
+class TestFlatReportBuilder(unittest.TestCase):
+    def test_first_content_per_source_wins_unless_replaced(self):
+        builder = FlatReportBuilder(STRUCTURE)
+        builder.add_report("Gemini", REPORT)
+        retry = {"pages": [{"tags": [{"id": "1", "content": [{"data": "Revenue rose 13%"}]}]}]}
+
+        self.assertEqual(builder.add_report("Gemini", retry), [])
+        changed = builder.add_report("Gemini", retry, replace=True)
+        self.assertEqual(changed[0]["content"], [{"source": "Gemini", "data": "Revenue rose 13%"}])
+
+        items = builder.items()
+        self.assertEqual([item["title"] for item in items], ["Revenue", "Highlights"])
+
+class TestStreamReports(unittest.TestCase):
+    def test_events_follow_generation_and_validation(self):
+        from src.services import parallel_report_generator as prg
+
+        async def stream(structure, context, report_type, on_chunk):
+            text = json.dumps(REPORT)
+            for i in range(0, len(text), 20):
+                on_chunk(text[i:i + 20])
+                await asyncio.sleep(0)
+            return REPORT
+
+        async def failing_stream(structure, context, report_type, on_chunk):
+            raise ValueError("boom")
+
+        async def validate(structure, report):
+            return ValidationResult(is_valid=True, message="ok")
+
+        async def collect():
+            generator = prg.ParallelReportGenerator()
+            return [event async for event in generator.stream_reports(STRUCTURE, {})]
+
+        with patch.object(prg.llm_generator, "stream_report_async", stream), \
+             patch.object(prg.ollama_llm_generator, "stream_report_async", failing_stream), \
+             patch.object(prg, "_report_functions", return_value=(None, None, validate)):
+            events = asyncio.run(collect())
+
+        kinds = [(event["event"], event["source"]) for event in events]
+        self.assertEqual(kinds.count(("tag", "Gemini")), 2)
+        self.assertIn(("source_failed", "Ollama"), kinds)
+        self.assertIn(("source_complete", "Gemini"), kinds)
+        self.assertLess(kinds.index(("tag", "Gemini")), kinds.index(("source_complete", "Gemini")))
+
+if __name__ == '__main__':
+    unittest.main()
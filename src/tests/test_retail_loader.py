@@ -0,0 +1,116 @@
+import unittest
+import datetime
+import tempfile
+import sys
+import os
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.file_operations import retail_loader
+from src.file_operations.retail_loader import RETAIL_COLUMNS, batch_rows, iter_retail_batches, load_retail_file
+
+def _retail_frame():
+    frame = pd.DataFrame({
+        'sale_date_time': ['2024-01-05 10:15:00', None, '01/06/2024 09:00:00', 'not a date'],
+        'sale_date': ['2024-01-05', '2024-01-05', '01/06/2024', '2024-01-07'],
+        'store_format': ['  Mall ', 'Mall', 'Express', 'Mall'],
+        'item_id': [1947.0, 12.0, 13.0, None],
+    })
+    for column in RETAIL_COLUMNS:
+        if column.lower() not in frame:
+            frame[column.lower()] = ['x', 'y', 'z', 'w'] if column.endswith(('NAME', 'DESC', 'IND', 'STATUS')) else [1, 2, 3, 4]
+    return frame
+
+class TestRetailLoader(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'retail.parquet')
+        _retail_frame().to_parquet(self.path, row_group_size=2)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_batches_are_cleaned(self):
+        rows = [row for batch in iter_retail_batches(self.path, rows_per_batch=2) for row in batch_rows(batch)]
+        by_column = dict(zip(RETAIL_COLUMNS, zip(*rows)))
+
+        # The row with no SALE_DATE_TIME is dropped; an unparseable one becomes NULL
+        self.assertEqual(by_column['SALE_DATE_TIME'], (
+            datetime.datetime(2024, 1, 5, 10, 15), datetime.datetime(2024, 1, 6, 9, 0), None
+        ))
+        self.assertEqual(by_column['SALE_DATE'], (
+            datetime.date(2024, 1, 5), datetime.date(2024, 1, 6), datetime.date(2024, 1, 7)
+        ))
+        self.assertEqual(by_column['STORE_FORMAT'], ('Mall', 'Express', 'Mall'))
+        self.assertEqual(by_column['ITEM_ID'], (1947, 13, None))
+
+    def test_sub_second_timestamps_are_truncated(self):
+        frame = _retail_frame()
+        frame['sale_date_time'] = pd.to_datetime([
+            '2024-01-05 10:15:00.123456', '2024-01-05 11:00:00', '2024-01-06 09:00:00.5', '2024-01-07 08:00:00'
+        ], format='mixed').as_unit('ns')
+        frame.to_parquet(self.path)
+        rows = [row for batch in iter_retail_batches(self.path) for row in batch_rows(batch)]
+        self.assertEqual(rows[0][0], datetime.datetime(2024, 1, 5, 10, 15))
+        self.assertEqual(rows[2][0], datetime.datetime(2024, 1, 6, 9, 0))
+
+        frame['sale_date_time'] = ['2024-01-05 10:15:00.123', '2024-01-05T11:00:00.5', '01/06/2024 09:00:00.25', None]
+        frame.to_parquet(self.path)
+        rows = [row for batch in iter_retail_batches(self.path) for row in batch_rows(batch)]
+        self.assertEqual([row[0] for row in rows], [
+            datetime.datetime(2024, 1, 5, 10, 15), datetime.datetime(2024, 1, 5, 11, 0), datetime.datetime(2024, 1, 6, 9, 0)
+        ])
+
+    def test_load_writes_rows_and_upload_log(self):
+        connection = MagicMock()
+        cursor = connection.cursor.return_value
+        cursor.lastrowid = 42
+
+        result = load_retail_file(self.path, 'analyst@example.com', connection)
+
+        self.assertEqual(result, {'file_id': 42, 'rows': 3})
+        inserted = [row for call in cursor.executemany.call_args_list for row in call[0][1]]
+        self.assertEqual(len(inserted), 3)
+        self.assertTrue(all(row[-2:] == (42, 1) for row in inserted))
+        self.assertIn('INSERT INTO retail_data', cursor.executemany.call_args[0][0])
+        self.assertEqual(cursor.execute.call_args[0][1], (3, 42))
+        connection.rollback.assert_not_called()
+
+    def test_rows_are_committed_every_few_batches(self):
+        connection = MagicMock()
+        connection.cursor.return_value.lastrowid = 42
+
+        with patch.object(retail_loader, 'READ_BATCH_ROWS', 1), patch.object(retail_loader, 'COMMIT_BATCHES', 2):
+            load_retail_file(self.path, 'analyst@example.com', connection)
+
+        # The upload log row, two commits for four one-row batches, and the final one
+        self.assertEqual(connection.commit.call_count, 4)
+
+    def test_failed_load_removes_its_rows_and_marks_the_upload_failed(self):
+        connection = MagicMock()
+        cursor = connection.cursor.return_value
+        cursor.lastrowid = 42
+
+        with patch.object(retail_loader, 'READ_BATCH_ROWS', 1), patch.object(retail_loader, 'COMMIT_BATCHES', 1), \
+             patch.object(retail_loader, 'insert_rows', side_effect=[1, RuntimeError('lost connection')]):
+            with self.assertRaisesRegex(RuntimeError, 'lost connection'):
+                load_retail_file(self.path, 'analyst@example.com', connection)
+
+        connection.rollback.assert_called_once()
+        statements = [(call[0][0], call[0][1]) for call in cursor.execute.call_args_list[-2:]]
+        self.assertEqual(statements[0], ('DELETE FROM retail_data WHERE file_id = %s', (42,)))
+        self.assertIn('UPDATE file_upload_logs SET load_status', statements[1][0])
+        self.assertEqual(statements[1][1], (retail_loader.LOAD_FAILED, 42))
+        self.assertEqual(connection.commit.call_count, 3)
+
+    def test_missing_columns_are_rejected(self):
+        _retail_frame().drop(columns=['qty']).to_parquet(self.path)
+        with self.assertRaises(ValueError):
+            next(iter_retail_batches(self.path))
+
+if __name__ == '__main__':
+    unittest.main()
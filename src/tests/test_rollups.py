@@ -0,0 +1,45 @@
+import unittest
+import sys
+import os
+
+# Add src and the project root (query.py) to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import query
+from src.database.rollups import ROLLUP_TABLES, refresh_retail_rollups
+
+class RecordingCursor:
+    def __init__(self):
+        self.calls = []
+
+    def execute(self, sql, params=None):
+        self.calls.append((" ".join(sql.split()), params))
+
+class TestRetailRollups(unittest.TestCase):
+    def test_refresh_replaces_one_files_rows(self):
+        cursor = RecordingCursor()
+        refresh_retail_rollups(cursor, 7)
+
+        statements = [sql for sql, _ in cursor.calls]
+        deletes = [sql for sql in statements if sql.startswith("DELETE")]
+        self.assertEqual(deletes, [f"DELETE FROM {table} WHERE file_id = %s" for table in ROLLUP_TABLES])
+        # Old rows go before new ones are aggregated, and daily is built before monthly
+        self.assertTrue(all(sql.startswith("DELETE") for sql in statements[:len(ROLLUP_TABLES)]))
+        inserts = [sql.split()[2] for sql in statements if sql.startswith("INSERT")]
+        self.assertEqual(inserts, ["retail_sales_daily", "retail_sales_monthly", "retail_items_daily"])
+        self.assertTrue(all(params == (7,) for _, params in cursor.calls))
+        self.assertFalse(any("CREATE TABLE" in sql for sql in statements))
+
+    def test_queries_keep_their_parameters(self):
+        # Callers pass the same date tuples as before the rollups
+        self.assertEqual(query.RETAIL_MONTHLY_SALES.count("%s"), 2)
+        self.assertEqual(query.RETAIL_PERIOD_COMPARISON.count("%s"), 6)
+        self.assertEqual(query.RETAIL_TOP_TRENDS.count("%s"), 2)
+        self.assertEqual(query.RETAIL_STORE_PERFORMANCE.count("%s"), 2)
+        for name in ("RETAIL_MONTHLY_SALES", "RETAIL_PERIOD_COMPARISON", "RETAIL_TOP_TRENDS",
+                     "RETAIL_STORE_PERFORMANCE", "TREND_ANALYSIS_TOP_CHANGES"):
+            self.assertNotIn("FROM retail_data", getattr(query, name), name)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.services.rule_validator import validate_report_rules
+
+STRUCTURE = {"pages": [{"page_number": 1, "tags": [
+    {"id": "exec_summary_highlights", "title": "Executive Summary", "content": []},
+    {"id": "sales_analysis", "title": "Sales Analysis", "content": []},
+    {"id": "purpose_statement", "title": "Purpose", "content": [{"source": "system", "data": "fixed"}]}
+]}]}
+CONTEXT = {"data": {"total_sales": 2100000, "open_rate": 0.382, "summary": "Revenue grew 12.3% in September"}}
+
+def _report(**tags):
+    return {"pages": [{"page_number": 1, "tags": [
+        {"id": tag_id, "content": [{"source": "Gemini", "data": data}]} for tag_id, data in tags.items()
+    ]}]}
+
+class TestRuleValidator(unittest.TestCase):
+    def test_grounded_report_passes(self):
+        report = _report(
+            exec_summary_highlights=["Period Covered: September 1-30, 2024", "Email open rate reached 38.2%"],
+            sales_analysis="Total sales of 2,100,000 grew 12.3% over the prior month",
+            purpose_statement="fixed"
+        )
+        self.assertTrue(validate_report_rules(STRUCTURE, report, CONTEXT).is_valid)
+
+    def test_local_failures_are_reported_per_tag(self):
+        report = _report(exec_summary_highlights="Executive Summary", sales_analysis="Sales grew XX% to $4,750,000")
+        result = validate_report_rules(STRUCTURE, report, CONTEXT)
+        details = result.detailed_results
+
+        self.assertFalse(result.is_valid)
+        self.assertTrue(details.regeneration_required)
+        self.assertEqual(details.regenerate_fields, ["purpose_statement", "sales_analysis", "exec_summary_highlights"])
+        self.assertEqual([i.field for i in details.validation_results.structure.issues], ["purpose_statement"])
+        self.assertEqual(len(details.validation_results.data_quality.issues), 1)
+        self.assertIn("Content (exec_summary_highlights)", result.message)
+        # An unsupported number is only a warning
+        self.assertEqual([w.field for w in result.warnings], ["sales_analysis"])
+        self.assertIn("$4,750,000", result.warnings[0].issue)
+
+    def test_computed_numbers_are_accepted(self):
+        context = {"data": {"satisfaction_total": 1090, "surveyed_locations": 12,
+                            "sales": 2100000, "previous_sales": 1870000, "opens": 382, "sends": 1000}}
+        report = _report(
+            exec_summary_highlights="Average satisfaction = 90.83% (calculation: 1090/12 = 90.83)",
+            sales_analysis="Total retail sales of $2.1M represented a 12.3% increase over last month; open rate 38.2%",
+            purpose_statement="fixed"
+        )
+        result = validate_report_rules(STRUCTURE, report, context)
+        self.assertTrue(result.is_valid)
+        self.assertEqual(result.warnings, [])
+
+        report = _report(exec_summary_highlights="Satisfaction reached 97.5%", sales_analysis="No data available",
+                         purpose_statement="fixed")
+        result = validate_report_rules(STRUCTURE, report, context)
+        self.assertTrue(result.is_valid)
+        self.assertIn("Warning (exec_summary_highlights): Numbers not found in the context: 97.5%", result.message)
+
+    def test_empty_content_fails(self):
+        report = _report(exec_summary_highlights="", sales_analysis="No data available", purpose_statement="fixed")
+        result = validate_report_rules(STRUCTURE, report, CONTEXT)
+        self.assertEqual(result.detailed_results.regenerate_fields, ["exec_summary_highlights"])
+
+if __name__ == '__main__':
+    unittest.main()
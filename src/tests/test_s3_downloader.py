@@ -0,0 +1,88 @@
+import unittest
+import tempfile
+import threading
+import sys
+import os
+
+import boto3
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.file_operations.s3_downloader import S3DownloadError, S3Downloader, remove_temp_files
+
+try:
+    from moto import mock_aws
+except ImportError:  # moto is a dev-only dependency
+    mock_aws = None
+
+class InMemoryS3:
+    """Minimal stand-in for the two client calls the downloader makes."""
+    def __init__(self, objects):
+        self.objects = objects
+        self.downloads = []
+        self.lock = threading.Lock()
+
+    def head_object(self, Bucket, Key):
+        return {'ETag': f'"{hash(self.objects[Key])}"'}
+
+    def download_file(self, bucket, key, path, Config=None):
+        if key not in self.objects:
+            raise KeyError(key)
+        with self.lock:
+            self.downloads.append(key)
+        with open(path, 'wb') as f:
+            f.write(self.objects[key])
+
+class TestS3Downloader(unittest.TestCase):
+    def setUp(self):
+        self.client = InMemoryS3({'uploads/a/data.xlsx': b'first', 'uploads/b/data.xlsx': b'second'})
+
+    def test_same_file_names_get_unique_temp_paths(self):
+        downloads = S3Downloader('bucket', self.client, cache_dir='').download_all(
+            ['uploads/a/data.xlsx', 'uploads/b/data.xlsx'])
+        paths = [path for path, _ in downloads.values()]
+        try:
+            self.assertNotEqual(paths[0], paths[1])
+            self.assertTrue(all(os.path.basename(path) == 'data.xlsx' for path in paths))
+            with open(downloads['uploads/b/data.xlsx'][0], 'rb') as f:
+                self.assertEqual(f.read(), b'second')
+        finally:
+            remove_temp_files(paths)
+        self.assertFalse(any(os.path.exists(os.path.dirname(path)) for path in paths))
+
+    def test_cache_skips_repeat_downloads(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            downloader = S3Downloader('bucket', self.client, cache_dir=cache_dir)
+            first, is_temp = downloader.download('uploads/a/data.xlsx')
+            second, _ = downloader.download('uploads/a/data.xlsx')
+
+            self.assertFalse(is_temp)
+            self.assertEqual(first, second)
+            self.assertEqual(self.client.downloads, ['uploads/a/data.xlsx'])
+
+            # New content means a new ETag and a fresh download
+            self.client.objects['uploads/a/data.xlsx'] = b'changed'
+            third, _ = downloader.download('uploads/a/data.xlsx')
+            self.assertNotEqual(third, first)
+            self.assertEqual(len(self.client.downloads), 2)
+
+    def test_failed_download_reports_key(self):
+        with self.assertRaises(S3DownloadError) as ctx:
+            S3Downloader('bucket', self.client, cache_dir='').download_all(['uploads/a/data.xlsx', 'missing.xlsx'])
+        self.assertEqual(ctx.exception.key, 'missing.xlsx')
+
+@unittest.skipIf(mock_aws is None, "moto is not installed")
+class TestS3DownloaderWithMoto(unittest.TestCase):
+    def test_downloads_from_local_s3(self):
+        with mock_aws():
+            client = boto3.client('s3', region_name='us-east-1')
+            client.create_bucket(Bucket='uploads')
+            client.put_object(Bucket='uploads', Key='retail/data.parquet', Body=b'parquet bytes')
+            with tempfile.TemporaryDirectory() as cache_dir:
+                path, _ = S3Downloader('uploads', client, cache_dir=cache_dir).download('retail/data.parquet')
+                with open(path, 'rb') as f:
+                    self.assertEqual(f.read(), b'parquet bytes')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,197 @@
+import unittest
+import datetime
+import tempfile
+import sys
+import os
+from unittest.mock import MagicMock, patch
+
+import openpyxl
+import pandas as pd
+import sqlalchemy
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy.dialects import mysql
+
+from src.file_operations.load_social_media_data import (
+    SocialMediaDataLoader, _mysql_upsert, changed_rows, prepare_for_upsert
+)
+
+def _add_tab(workbook, title, header, rows):
+    sheet = workbook.create_sheet(title)
+    sheet.append([f"Widget: {title}"])
+    sheet.append([None])
+    sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+
+class TestSocialMediaWorkbook(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        workbook = openpyxl.Workbook()
+        workbook.remove(workbook.active)
+        _add_tab(workbook, "Top 5 Channels by Followers", ["Social Network", "Followers (SUM)"],
+                 [["Instagram", 1200], ["Facebook", 800]])
+        _add_tab(workbook, "Channels by Post Reach", ["Social Network", "Post Reach (SUM)"], [["Instagram", 5000]])
+        _add_tab(workbook, "Posts", ["Outbound Post", "Total Engagements (SUM)"], [["Fall Sale", 42]])
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmpdir.name, "social.xlsx")
+        workbook.save(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def test_workbook_is_opened_once(self):
+        loader = SocialMediaDataLoader(self.path)
+        with patch("src.file_operations.load_social_media_data.pd.ExcelFile", wraps=pd.ExcelFile) as excel_file:
+            performance = loader.extract()
+            engagement = loader.extract_engagement()
+
+        self.assertEqual(excel_file.call_count, 1)
+        self.assertEqual(set(performance), {"Top 5 Channels by Followers", "Channels by Post Reach"})
+        self.assertEqual(set(engagement), {"Posts"})
+        followers = performance["Top 5 Channels by Followers"]
+        self.assertEqual(list(followers.columns), ["Social Network", "Followers (SUM)"])
+        self.assertEqual(followers.values.tolist(), [["Instagram", 1200], ["Facebook", 800]])
+
+    def test_transform_matches_sheet_values(self):
+        loader = SocialMediaDataLoader(self.path)
+        performance = loader.transform(loader.extract()).set_index("platform")
+        self.assertEqual(performance.loc["Instagram", "followers"], 1200)
+        self.assertEqual(performance.loc["Instagram", "impressions"], 5000)
+
+    def test_process_pool_returns_same_sheets(self):
+        sequential = SocialMediaDataLoader(self.path).extract()
+        pooled = SocialMediaDataLoader(self.path, parse_workers=2).extract()
+        self.assertEqual(set(sequential), set(pooled))
+        for sheet, df in sequential.items():
+            pd.testing.assert_frame_equal(df, pooled[sheet])
+
+class TestSocialMediaTransforms(unittest.TestCase):
+    def test_daily_breakdown_merges_on_date(self):
+        data = {
+            "Brand Post vs Total Engageme": pd.DataFrame({
+                "Date": ["2024-09-01", "2024-09-02"],
+                "Volume of Published Messages (SUM)": [3, 4],
+                "Total Engagements (SUM)": [10, 20]
+            }),
+            "Engagement Behaviour across ": pd.DataFrame({
+                "Date": ["2024-09-02", "2024-09-03", "2024-09-02"],
+                "Total Engagements": [21, 30, 22],
+                "Post Comments": [1, 2, 5]
+            })
+        }
+        daily = SocialMediaDataLoader("unused.xlsx").transform_engagement_daily(data)
+
+        self.assertEqual([str(d) for d in daily["date"]], ["2024-09-01", "2024-09-02", "2024-09-03"])
+        self.assertEqual(daily["posts_published"].tolist(), [3, 4, 0])
+        self.assertEqual(daily["total_engagements"].tolist(), [10, 22, 30])
+        self.assertEqual(daily["comments"].tolist(), [0, 5, 2])
+
+    def test_daily_rows_are_one_per_date(self):
+        data = {
+            "Brand Post vs Total Engageme": pd.DataFrame({
+                "Date": ["2024-09-02", "2024-09-01", "2024-09-02", None],
+                "Volume of Published Messages (SUM)": [4, 3, 5, 9],
+                "Total Engagements (SUM)": [20, 10, 25, 90]
+            }),
+            "Engagement Behaviour across ": pd.DataFrame({
+                "Date": [None, "2024-09-01"],
+                "Total Engagements": [70, 11],
+                "Post Shares": [7, 1]
+            })
+        }
+        with patch("builtins.print") as mock_print:
+            daily = SocialMediaDataLoader("unused.xlsx").transform_engagement_daily(data)
+
+        self.assertEqual([str(d) for d in daily["date"]], ["2024-09-01", "2024-09-02"])
+        self.assertEqual(daily["posts_published"].tolist(), [3, 5])
+        self.assertEqual(daily["total_engagements"].tolist(), [11, 25])
+        self.assertEqual(daily["shares"].tolist(), [1, 0])
+        mock_print.assert_called_once_with("⚠️ Skipping 2 daily engagement rows without a date")
+        self.assertEqual(len(SocialMediaDataLoader("unused.xlsx").transform_engagement_daily({})), 0)
+
+    def test_unparseable_rows_are_skipped_and_reported_once(self):
+        data = {"Posts": pd.DataFrame({
+            "Outbound Post": ["a", "b", "c"],
+            "Total Engagements (SUM)": [5, "n/a", float("nan")],
+            "Post Shares (SUM)": ["2.9", 1, 1]
+        })}
+        with patch("builtins.print") as mock_print:
+            posts = SocialMediaDataLoader("unused.xlsx").transform_engagement_posts(data)
+
+        self.assertEqual(posts["post_content"].tolist(), ["a"])
+        self.assertEqual(posts["shares"].tolist(), [2])
+        mock_print.assert_called_once()
+        self.assertIn("2 of 3 rows in Posts", mock_print.call_args[0][0])
+
+class TestIncrementalLoad(unittest.TestCase):
+    def test_prepare_keys_posts_and_drops_keyless_rows(self):
+        posts = pd.DataFrame({"date": [None, None, datetime.date(2024, 9, 1)],
+                              "post_content": ["Fall Sale", "Fall Sale", "Fall Sale"], "reach": [1, 2, 3]})
+        prepared = prepare_for_upsert(posts, "social_media_engagement_posts")
+        self.assertEqual(prepared["reach"].tolist(), [2, 3])
+        self.assertEqual(prepared["post_key"].str.len().tolist(), [40, 40])
+
+        daily = pd.DataFrame({"date": [datetime.date(2024, 9, 1), None], "reach": [5, 6]})
+        with patch("builtins.print"):
+            self.assertEqual(prepare_for_upsert(daily, "social_media_engagement_daily")["reach"].tolist(), [5])
+
+    def test_only_new_or_changed_rows_are_written(self):
+        new = pd.DataFrame({"date": [datetime.date(2024, 9, d) for d in (1, 2, 3)],
+                            "reach": [10, 25, 30], "shares": [1, 2, None]})
+        existing = pd.DataFrame({"date": pd.to_datetime(["2024-09-01", "2024-09-02"]),
+                                 "reach": [10, 20], "shares": [1, 2]})
+        self.assertEqual(changed_rows(new, existing, ["date"])["reach"].tolist(), [25, 30])
+        self.assertEqual(len(changed_rows(new.iloc[:1], existing, ["date"])), 0)
+
+    def test_upsert_method_builds_one_multi_row_statement(self):
+        table = sqlalchemy.Table("social_media_performance", sqlalchemy.MetaData(),
+                                 sqlalchemy.Column("platform"), sqlalchemy.Column("followers"))
+        conn = MagicMock()
+        _mysql_upsert(MagicMock(table=table), conn, ["platform", "followers"], iter([("A", 1), ("B", 2)]))
+
+        sql = str(conn.execute.call_args[0][0].compile(dialect=mysql.dialect()))
+        self.assertEqual(conn.execute.call_count, 1)
+        self.assertIn("VALUES (%s, %s), (%s, %s)", sql)
+        self.assertIn("ON DUPLICATE KEY UPDATE", sql)
+
+    def _keyless_table(self, columns, null_keys=0):
+        engine, conn = MagicMock(), MagicMock()
+        engine.begin.return_value.__enter__.return_value = conn
+        engine.connect.return_value.__enter__.return_value = conn
+        conn.execute.return_value.scalar.return_value = null_keys
+        conn.execute.return_value.rowcount = 1
+        inspector = MagicMock()
+        inspector.has_table.return_value = True
+        inspector.get_pk_constraint.return_value = {"constrained_columns": []}
+        inspector.get_columns.return_value = [{"name": name} for name in columns]
+        loader = SocialMediaDataLoader("social.xlsx", db_engine=engine, load_mode="incremental")
+        return loader, conn, patch("sqlalchemy.inspect", return_value=inspector)
+
+    def test_keyless_table_is_keyed_in_place_not_dropped(self):
+        loader, conn, inspect_patch = self._keyless_table(["date", "reach"])
+        with inspect_patch, patch("builtins.print"):
+            loader._ensure_table("social_media_engagement_daily")
+
+        statements = [str(call.args[0]) for call in conn.execute.call_args_list]
+        self.assertFalse(any("DROP TABLE" in sql for sql in statements), statements)
+        self.assertTrue(any(sql.startswith("DELETE older") for sql in statements))
+        self.assertIn("MODIFY date DATE NOT NULL, ADD PRIMARY KEY (date)", statements[-2])
+        self.assertIn("CREATE TABLE IF NOT EXISTS", statements[-1])
+
+    def test_keyless_table_that_cannot_be_keyed_fails_with_instructions(self):
+        loader, conn, inspect_patch = self._keyless_table(["date", "post_content"])
+        with inspect_patch, self.assertRaisesRegex(ValueError, "RENAME TABLE social_media_engagement_posts"):
+            loader._ensure_table("social_media_engagement_posts")
+
+        loader, conn, inspect_patch = self._keyless_table(["date", "reach"], null_keys=3)
+        with inspect_patch, self.assertRaisesRegex(ValueError, "3 rows without date"):
+            loader._ensure_table("social_media_engagement_daily")
+        statements = [str(call.args[0]) for call in conn.execute.call_args_list]
+        self.assertFalse(any(sql.startswith(("ALTER", "DELETE", "DROP")) for sql in statements), statements)
+
+if __name__ == '__main__':
+    unittest.main()
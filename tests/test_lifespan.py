@@ -0,0 +1,30 @@
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Mock ollama module before importing main
+sys.modules["ollama"] = MagicMock()
+
+import main
+
+
+def test_shutdown_closes_resources_in_order():
+    calls = []
+
+    async def close_clients():
+        calls.append("llm_clients")
+
+    with patch("main.close_clients", close_clients), \
+         patch("main.shutdown_job_queue", lambda: calls.append("job_queue") or True), \
+         patch("main.shutdown_context_builder", lambda: calls.append("context_builder")), \
+         patch("main.shutdown_query_runner", lambda: calls.append("query_runner")), \
+         patch("main.dispose_engine", lambda: calls.append("db_pool")):
+        with TestClient(main.app) as client:
+            assert client.get("/").status_code == 200
+            assert calls == []
+
+    assert calls == ["llm_clients", "job_queue", "context_builder", "query_runner", "db_pool"]
@@ -3,6 +3,7 @@ from fastapi.testclient import TestClient
 from unittest.mock import MagicMock, patch
 import sys
 import os
+import time
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -67,6 +68,39 @@ def test_load_supporting_data_lowercase_filename(mock_dependencies):
     assert args[4] == "uploads/1765042788274-g3bnm0-retaildata_jan-24_.parquet"
     assert args[5] == "mccs-capstone-s3"
 
+def test_load_supporting_data_job(mock_dependencies):
+    payload = [
+        {
+            "filename": "RetailData(Jan-24).parquet",
+            "uploadedBy": "Capstone",
+            "bucketName": "mccs-capstone-s3",
+            "s3Key": "uploads/retaildata.parquet"
+        }
+    ]
+
+    def load_all_data(stage):
+        with stage("retail") as record:
+            record["rows"] = 42
+    mock_dependencies["loader_cls"].return_value.load_all_data.side_effect = load_all_data
+
+    response = client.post("/jobs/load_supporting_data", json=payload)
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    for _ in range(100):
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("completed", "failed"):
+            break
+        time.sleep(0.05)
+
+    assert job["status"] == "completed"
+    assert [stage["name"] for stage in job["stages"]] == ["download", "retail", "notify", "report_trigger"]
+    assert job["result"] == {"rows": {"retail": 42}}
+    assert all(stage["seconds"] is not None for stage in job["stages"])
+
+def test_unknown_job_returns_404():
+    assert client.get("/jobs/does-not-exist").status_code == 404
+
 if __name__ == "__main__":
     # Manually run the test function if executed as a script
     # This is just a helper to run it without pytest installed if needed, 
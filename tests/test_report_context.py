@@ -0,0 +1,57 @@
+import logging
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+import sqlalchemy
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Mock ollama module before importing main
+sys.modules["ollama"] = MagicMock()
+
+import main
+from src.models.report_schema import get_report_schema
+from src.services.context_builder import ContextBuilder
+
+REQUEST = {"metadata": {"reportType": "retail-data", "period": "2024-09"}, "notes": "from the request"}
+
+
+class UnreachableRunner:
+    def current_data_version(self):
+        raise sqlalchemy.exc.OperationalError("SELECT COUNT(*) FROM file_upload_logs", {}, Exception("Can't connect to MySQL server"))
+
+
+class EmptyRunner:
+    def current_data_version(self):
+        return (0, None)
+
+    def run(self, names, start_date, end_date, output="pandas"):
+        return {}
+
+
+def _build(runner):
+    builder = ContextBuilder(runner=runner, max_workers=2)
+    structure = get_report_schema("retail-data").dict()
+    try:
+        with patch("main.get_context_builder", return_value=builder), \
+             patch("src.services.retrievers.get_query_runner", return_value=runner):
+            return main._build_report_context(REQUEST, REQUEST["metadata"], "retail-data", structure)
+    finally:
+        builder.shutdown(wait=True)
+
+
+def test_unreachable_database_falls_back_to_request_context(caplog):
+    with caplog.at_level(logging.ERROR, logger="main"):
+        context = _build(UnreachableRunner())
+    assert context is REQUEST
+    assert "Can't connect to MySQL server" in caplog.text
+
+
+def test_empty_database_keeps_request_context(caplog):
+    with caplog.at_level(logging.WARNING):
+        context = _build(EmptyRunner())
+    assert context is REQUEST
+    assert "came back empty for 2024-09" in caplog.text
+    assert "No report data in the database for 2024-09" in caplog.text